@@ -0,0 +1,101 @@
+"""
+Benchmark de la détection de hauteur (réponses chantées ou jouées):
+justesse, délai avant la réponse et vitesse de calcul de
+music_game.DetecteurHauteur.
+
+Les extraits sont les sons du jeu (music_game.synthetiser, le tampon que
+joue generer_son) pour les 7 notes de chaque clé et chaque timbre,
+légèrement désaccordés et mêlés de bruit, comme une voix ou un micro réels.
+
+Usage:
+    python benchmarks/bench_detection.py [duree_par_note_s]
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from music_game import (DetecteurHauteur, SourcePCM, BanqueSons, synthetiser, octave_par_defaut,
+                        DEGRE_LIGNE_BAS, NOTES, TIMBRES)
+
+SAMPLE_RATE = 22050
+OBJECTIF_MS = 50      # Délai maximal voulu entre le début de la note et la réponse
+GRAINE = 2024
+DESACCORD_CENTS = 20  # Une voix juste à ±20 cents près
+BRUIT = 0.02          # Bruit de fond, en fraction de la pleine échelle
+
+
+def extraits(duree, rng):
+    """Retourne [(nom attendu, échantillons float32 entre -1 et 1)] pour toutes les clés et timbres"""
+    resultats = []
+    for cle in DEGRE_LIGNE_BAS:
+        for nom in NOTES:
+            frequence = BanqueSons.frequence(cle, nom, octave_par_defaut(cle, nom))
+            for timbre in TIMBRES:
+                desaccord = 2 ** (rng.uniform(-DESACCORD_CENTS, DESACCORD_CENTS) / 1200)
+                son = synthetiser(frequence * desaccord, duree, SAMPLE_RATE, 1, timbre=timbre) / 32768
+                son += rng.normal(0, BRUIT, len(son))
+                resultats.append((nom, son.astype(np.float32)))
+    return resultats
+
+
+def flux(echantillons):
+    """Source PCM 16 bits en mémoire (comme un tube)"""
+    pcm = (np.clip(echantillons, -1, 1) * 32767).astype(np.int16)
+    return SourcePCM(io.BytesIO(pcm.tobytes()), SAMPLE_RATE)
+
+
+def justesse(clips):
+    """Analyse chaque extrait comme un flux: justesse, réponses en trop, délai et calcul"""
+    justes = en_trop = 0
+    delais = []
+    calculs = []
+    for nom, son in clips:
+        detecteur = DetecteurHauteur(flux(son)).demarrer()
+        detecteur.attendre_fin()
+        detections = detecteur.notes()
+        if detections and detections[0].nom == nom:
+            justes += 1
+            delais.append(detections[0].instant * 1000)
+        en_trop += max(0, len(detections) - 1)
+        calculs += [d.calcul_ms for d in detections]
+    return justes / len(clips), en_trop, np.array(delais), np.array(calculs)
+
+
+def debit(clips, taille_bloc):
+    """Retourne (secondes de son analysées par seconde de calcul, temps par bloc en µs p50/p99)"""
+    son = np.concatenate([s for _, s in clips])
+    detecteur = DetecteurHauteur(flux(son[:0]))
+    debut = time.perf_counter()
+    for i in range(0, len(son), taille_bloc):
+        detecteur.analyser(son[i:i + taille_bloc])
+    duree = time.perf_counter() - debut
+    return (len(son) / SAMPLE_RATE / duree, detecteur.calculs.percentile(50),
+            detecteur.calculs.percentile(99))
+
+
+def main():
+    duree = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+    clips = extraits(duree, np.random.default_rng(GRAINE))
+    print(f"{len(clips)} extraits de {duree} s ({len(DEGRE_LIGNE_BAS)} clés x {len(NOTES)} notes"
+          f" x {len(TIMBRES)} timbres), ±{DESACCORD_CENTS} cents, bruit {BRUIT}")
+    taux, en_trop, delais, calculs = justesse(clips)
+    print(f"Justesse            : {taux:.1%} ({en_trop} réponse(s) en trop)")
+    atteint = "atteint" if delais.max() < OBJECTIF_MS else "NON atteint"
+    print(f"Délai avant réponse : p50 {np.percentile(delais, 50):5.1f} ms"
+          f"  max {delais.max():5.1f} ms (depuis le début de la note;"
+          f" objectif {OBJECTIF_MS} ms {atteint})")
+    print(f"Calcul par décision : p50 {np.percentile(calculs, 50):5.2f} ms  max {calculs.max():5.2f} ms")
+    pas = DetecteurHauteur(flux(np.zeros(0))).pas
+    for taille_bloc in (pas, 16 * pas):
+        temps_reel, p50, p99 = debit(clips, taille_bloc)
+        print(f"Blocs de {taille_bloc:5d} éch. : x{temps_reel:6.0f} temps réel"
+              f"  ({p50:6.0f} µs/bloc p50, {p99:6.0f} µs p99)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark de la logique du jeu (score, combos, statistiques) sans affichage:
+nombre de réponses traitées par seconde et mémoire conservée par réponse.
+
+Les réponses passent par le vrai code de Jeu.verifier_reponse et
+Jeu.temps_ecoule, pilotées par MoteurSimulation. Le résultat est
+reproductible (graine fixe): à relancer avant et après une modification
+du calcul des points ou des statistiques.
+
+Usage:
+    python benchmarks/bench_logique.py [nombre_de_reponses]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from music_game import MoteurSimulation, JOUEURS_VIRTUELS
+
+GRAINE = 2024
+
+
+def debit(joueur, nb_reponses, repetitions):
+    """Retourne le meilleur débit mesuré, en réponses par seconde"""
+    meilleur = min(timeit.repeat(lambda: MoteurSimulation(joueur, graine=GRAINE).executer(nb_reponses),
+                                 number=1, repeat=repetitions))
+    return nb_reponses / meilleur
+
+
+def memoire(joueur, nb_reponses):
+    """
+    Retourne (octets, blocs) conservés par réponse, et le pic en octets.
+
+    On mesure après un échauffement: un chemin de calcul qui garde quelque
+    chose à chaque réponse (liste qui grandit, cache sans limite) apparaît
+    ici comme un nombre d'octets par réponse nettement supérieur à zéro.
+    """
+    moteur = MoteurSimulation(joueur, graine=GRAINE)
+    moteur.executer(1000)
+    tracemalloc.start()
+    avant = tracemalloc.take_snapshot()
+    moteur.executer(nb_reponses)
+    apres = tracemalloc.take_snapshot()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    differences = apres.compare_to(avant, 'filename')
+    octets = sum(d.size_diff for d in differences)
+    blocs = sum(d.count_diff for d in differences)
+    return octets / nb_reponses, blocs / nb_reponses, pic
+
+
+def main():
+    nb_reponses = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{nb_reponses} réponses par joueur, graine {GRAINE}")
+    for joueur in JOUEURS_VIRTUELS:
+        reponses_s = debit(joueur, nb_reponses, repetitions=3)
+        octets, blocs, pic = memoire(joueur, nb_reponses // 10)
+        resultats = MoteurSimulation(joueur, graine=GRAINE).executer(nb_reponses)
+        print(f"{joueur:<9}: {reponses_s:9.0f} réponses/s ({reponses_s * 60 / 1e6:4.1f} M/min)"
+              f"  mémoire conservée {octets:6.1f} o/réponse ({blocs:5.2f} blocs)"
+              f"  pic {pic / 1024:6.0f} Kio"
+              f"  | réussite {resultats['taux_reussite']:.0%}, niveau {resultats['niveau']}")
+
+
+if __name__ == '__main__':
+    main()
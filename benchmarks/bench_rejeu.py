@@ -0,0 +1,48 @@
+"""
+Benchmark d'une partie enregistrée (option --enregistrer du jeu): durée des
+images de la vraie boucle de jeu, rejouée sans fenêtre aussi vite que possible.
+
+Une partie enregistrée donne toujours les mêmes notes, les mêmes réponses
+et les mêmes heures: à rejouer avant et après une modification de la
+logique du jeu pour comparer les percentiles. Chaque passage vérifie aussi
+que le rejeu reste identique au premier.
+
+Usage:
+    python benchmarks/bench_rejeu.py partie.mgs [repetitions]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from music_game import rejouer_session, init_runtime
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    chemin = sys.argv[1]
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    reference = None
+    meilleurs = None
+    for _ in range(repetitions):
+        resultats = rejouer_session(chemin)
+        if reference is None:
+            reference = resultats['evenements']
+        elif resultats['evenements'] != reference:
+            print("Rejeu différent du premier: la partie ne dépend pas que de l'enregistrement")
+            sys.exit(1)
+        percentiles = init_runtime().profileur.percentiles()
+        if meilleurs is None or percentiles.get(50, 0) < meilleurs.get(50, 0):
+            meilleurs = percentiles
+            meilleur_rejeu = resultats
+    vitesse = meilleur_rejeu['duree_partie_s'] / max(meilleur_rejeu['duree_rejeu_s'], 1e-9)
+    print(f"{meilleur_rejeu['images']} images, {meilleur_rejeu['duree_partie_s']:.1f} s de partie,"
+          f" {meilleur_rejeu['reponses']} réponses, meilleur de {repetitions} rejeux")
+    print(f"  image (ms): p50 {meilleurs[50]:.3f}  p95 {meilleurs[95]:.3f}  p99 {meilleurs[99]:.3f}"
+          f"  | rejeu x{vitesse:.0f} plus rapide que la partie")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de la synthèse des notes: ancienne version (boucles Python)
+contre le moteur vectorisé de music_game.synthetiser, puis synthèse des
+accords: une note à la fois additionnée ensuite, contre
+music_game.synthetiser_accord (toutes les voix en une passe).
+
+Usage:
+    python benchmarks/bench_synthese.py [nombre_de_notes]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from music_game import synthetiser, synthetiser_accord, FREQUENCIES_SOL, FREQUENCIES_FA, FREQUENCES_MIDI
+
+SAMPLE_RATE = 22050
+CANAUX = 1
+
+
+def synthese_ancienne(frequence, duree=0.5):
+    """Copie de l'ancien generer_son (sans make_sound) pour comparaison"""
+    sample_rate = 22050
+    n_samples = int(sample_rate * duree)
+    t = np.linspace(0, duree, n_samples, False)
+    note = np.sin(frequence * t * 2 * np.pi)
+    attack = int(0.01 * sample_rate)
+    release = int(0.1 * sample_rate)
+    for i in range(attack):
+        note[i] *= i / attack
+    for i in range(release):
+        note[-(i+1)] *= i / release
+    note = note * (2**15 - 1) / np.max(np.abs(note))
+    note = note.astype(np.int16)
+    return np.column_stack((note, note))
+
+
+def mesurer(fonction, frequences, repetitions):
+    """Retourne le meilleur temps moyen par note, en microsecondes"""
+    def lot():
+        for f in frequences:
+            fonction(f)
+    meilleur = min(timeit.repeat(lot, number=1, repeat=repetitions))
+    return meilleur / len(frequences) * 1e6
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    frequences = list(FREQUENCIES_SOL.values()) + list(FREQUENCIES_FA.values())
+
+    ancien = mesurer(synthese_ancienne, frequences, repetitions)
+    print(f"Ancienne synthèse        : {ancien:8.1f} µs/note")
+    for timbre in ('sinus', 'piano'):
+        nouveau = mesurer(lambda f: synthetiser(f, 0.5, SAMPLE_RATE, CANAUX, timbre=timbre),
+                          frequences, repetitions)
+        print(f"Synthèse vectorisée {timbre:<5}: {nouveau:8.1f} µs/note  (x{ancien / nouveau:.1f})")
+
+    # Triades de Do majeur, Ré mineur...: trois voix chacune
+    triades = [tuple(FREQUENCES_MIDI[n] for n in (60 + d, 64 + d, 67 + d)) for d in range(7)]
+    for timbre in ('sinus', 'piano'):
+        separees = mesurer(lambda voix: np.sum([synthetiser(f, 0.5, SAMPLE_RATE, CANAUX, timbre=timbre)
+                                                for f in voix], axis=0, dtype=np.int32),
+                           triades, repetitions)
+        accord = mesurer(lambda voix: synthetiser_accord(voix, 0.5, SAMPLE_RATE, CANAUX, timbre=timbre),
+                         triades, repetitions)
+        print(f"Triade {timbre:<5}: voix séparées {separees:8.1f} µs, en une passe {accord:8.1f} µs/accord")
+
+
+if __name__ == '__main__':
+    main()
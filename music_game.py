@@ -7,17 +7,23 @@ import sys         # Pour accéder aux fonctions système
 import os          # Pour gérer les chemins de fichiers
 import numpy as np # Pour les calculs mathématiques (génération de sons)
 import json        # Pour sauvegarder les scores et statistiques
+import time        # Pour mesurer les durées (démarrage, performances)
+import argparse    # Pour lire les options de la ligne de commande
+import functools   # Pour mettre en cache des calculs (enveloppes audio)
+import hashlib     # Pour calculer l'empreinte des sons mis en cache
+import collections # Pour les structures de données (cache LRU)
+import threading   # Pour les tâches en arrière-plan (chargement des sons)
+import atexit      # Pour sauvegarder les données en attente à la fermeture
+import sqlite3     # Pour le stockage par profil d'élève (base de données locale)
+import math        # Pour les seaux logarithmiques des histogrammes
+import heapq       # File de priorité (choix de la prochaine note à réviser)
+import queue       # File des notes reconnues par le détecteur de hauteur
+import wave        # Pour lire les fichiers WAV (réponses chantées enregistrées)
+import struct      # Format binaire des parties enregistrées (--enregistrer)
+import zlib        # Compression des données du joueur dans ces enregistrements
 
-# ========================================
-# INITIALISATION DE PYGAME
-# ========================================
-pygame.init()  # Démarre tous les modules Pygame
-# Initialise le système audio :
-# - frequency=22050 : 22050 échantillons par seconde (qualité CD)
-# - size=-16 : audio 16 bits signé
-# - channels=1 : mono (une seule piste audio)
-# - buffer=512 : taille du tampon audio (plus petit = moins de latence)
-pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
+# Instant de l'import du module : sert de référence pour mesurer le démarrage
+_T_IMPORT = time.perf_counter()
 
 # ========================================
 # CONSTANTES - Valeurs qui ne changent pas
@@ -37,42 +43,884 @@ BLEU = (50, 100, 200)    # Bleu pour les titres et boutons
 JAUNE = (255, 215, 0)    # Jaune pour les avertissements
 GRIS_FONCE = (100, 100, 100)  # Gris foncé pour les textes secondaires
 
+def resource_path(relative_path):
+    """Retourne le chemin d'une ressource embarquée (compatible PyInstaller)"""
+    try:
+        # PyInstaller crée un dossier temporaire et stocke le chemin dans _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
 # ========================================
-# CONFIGURATION DE LA FENÊTRE
+# RUNTIME - Ressources Pygame créées à la demande
 # ========================================
-# Crée la fenêtre de jeu avec les dimensions définies
-fenetre = pygame.display.set_mode((LARGEUR, HAUTEUR))
-# Définit le titre qui apparaît dans la barre de la fenêtre
-pygame.display.set_caption("Apprendre les Notes de Musique")
-# Crée une horloge pour contrôler le nombre d'images par seconde
-horloge = pygame.time.Clock()
+# Importer ce module ne crée ni fenêtre, ni mixer, ni police : tout est
+# initialisé au premier usage par init_runtime(). Les scripts de test ou
+# de calcul de score qui importent seulement Jeu, Note ou generer_son
+# restent donc rapides et sans affichage.
+class Runtime:
+    """
+    Regroupe les ressources Pygame du jeu (fenêtre, horloge, polices, sons).
+
+    Chaque groupe de ressources est initialisé séparément, la première fois
+    qu'on y accède : afficher un menu n'initialise pas l'audio, jouer une note
+    n'ouvre pas de fenêtre.
+
+    Attributs:
+        chronos: Durée en millisecondes de chaque étape d'initialisation
+        echelle: Passage des coordonnées du jeu aux pixels de la fenêtre (voir Echelle)
+        plein_ecran: True si la fenêtre occupe tout l'écran (option --plein-ecran, touche F11)
+    """
+    # Attributs créés par init_affichage()
+    RESSOURCES_AFFICHAGE = ('fenetre', 'horloge', 'cadenceur')
+    # Polices à la taille de l'échelle actuelle (voir polices), et leur taille à l'échelle 1
+    RESSOURCES_POLICES = ('police_grande', 'police_moyenne', 'police_petite',
+                          'police_mini', 'police_musicale')
+    TAILLES_POLICES = {'police_grande': 72,   # Pour les titres
+                       'police_moyenne': 48,  # Pour les sous-titres
+                       'police_petite': 36,   # Pour le texte normal
+                       'police_mini': 24,     # Pour les petites indications
+                       'police_musicale': 55} # Clés et notes (Bravura)
+
+    def __init__(self):
+        self.chronos = {}
+        self.options = {}  # Options de la ligne de commande (voir main)
+        self._audio_pret = False
+        self._verrou_audio = threading.Lock()  # Une seule initialisation du mixer à la fois
+        # Sons des notes, synthétisés ou lus sur le disque à la première demande
+        self.banque = BanqueSons()
+        # Canaux du mixer réservés aux notes et au métronome
+        self.canaux = CanauxAudio()
+        # Surfaces des textes déjà rendus, partagées par tous les écrans
+        self.textes = CacheTextes()
+        # Sauvegarde des scores en arrière-plan
+        self.ecrivain = EcrivainDonnees()
+        # Fonds de portée pré-rendus, partagés par le jeu et l'entraînement
+        self.portees = RenduPortee()
+        self._stockage = None  # Dernier stockage ouvert (voir ouvrir_stockage)
+        # Mesure du temps de chaque image (touche F3, option --trace)
+        self.profileur = Profileur()
+        self.profileur.ajouter_compteur('textes', lambda: self.textes.succes + self.textes.echecs)
+        self.profileur.ajouter_compteur('rendus', lambda: self.textes.echecs)
+        self._modele = None  # Statistiques en mémoire du stockage (voir ouvrir_modele)
+        # Échelle 1 tant qu'aucune fenêtre n'est ouverte (tests, rejeu sans affichage)
+        self.echelle = Echelle()
+        self.plein_ecran = False
+        self._polices = {}  # facteur d'échelle -> {nom: police} (voir polices)
+
+    def _chrono(self, etape, debut):
+        """Enregistre la durée d'une étape commencée à l'instant 'debut'"""
+        self.chronos[etape] = (time.perf_counter() - debut) * 1000
+
+    def __getattr__(self, nom):
+        # Appelé seulement si l'attribut n'existe pas encore : on crée alors
+        # le groupe de ressources correspondant puis on le retourne
+        if nom in Runtime.RESSOURCES_AFFICHAGE:
+            self.init_affichage()
+            return self.__dict__[nom]
+        if nom in Runtime.RESSOURCES_POLICES:
+            # Jamais gardées comme attributs: elles changent avec l'échelle
+            return self.polices()[nom]
+        raise AttributeError(nom)
+
+    def parametres_audio(self):
+        """Réglages du mixer: PARAMETRES_AUDIO, modifiés par la ligne de commande"""
+        parametres = dict(PARAMETRES_AUDIO)
+        for nom in ('frequence', 'canaux', 'tampon'):
+            if self.options.get('audio_' + nom):
+                parametres[nom] = self.options['audio_' + nom]
+        return parametres
+
+    def init_audio(self):
+        """
+        Initialise le système audio (une seule fois).
+
+        Les réglages demandés (parametres_audio) ne sont pas toujours ceux
+        obtenus: la carte son peut imposer sa fréquence ou son nombre de
+        canaux. La synthèse relit donc le format réel avec
+        pygame.mixer.get_init() (voir format_audio).
+
+        À appeler depuis le thread principal: SDL n'accepte pas d'être
+        initialisé ailleurs (voir BanqueSons.prechauffer).
+        """
+        with self._verrou_audio:
+            if self._audio_pret:
+                return
+            debut = time.perf_counter()
+            parametres = self.parametres_audio()
+            # pre_init avant pygame.init(): sinon pygame.init() ouvre déjà le mixer
+            # avec ses propres réglages, et un mixer.init() après coup ne change rien
+            pygame.mixer.pre_init(frequency=parametres['frequence'], size=parametres['taille'],
+                                  channels=parametres['canaux'], buffer=parametres['tampon'])
+            pygame.init()  # Démarre tous les modules Pygame
+            pygame.mixer.init()  # Au cas où pygame.init() était déjà appelé sans le mixer
+            self._audio_pret = True
+            self._chrono('audio', debut)
+
+    def init_affichage(self):
+        """Crée la fenêtre de jeu et l'horloge (une seule fois)"""
+        if 'fenetre' in self.__dict__:
+            return
+        debut = time.perf_counter()
+        # Windows: sans cette indication, un écran HiDPI reçoit une fenêtre
+        # agrandie (et floue) par le système au lieu de sa vraie taille en pixels
+        os.environ.setdefault('SDL_WINDOWS_DPI_AWARENESS', 'permonitorv2')
+        pygame.display.init()
+        # Crée la fenêtre de jeu (ou passe en plein écran, option --plein-ecran)
+        self.fenetre = self._ouvrir_fenetre(self.options.get('plein_ecran', False))
+        # Définit le titre qui apparaît dans la barre de la fenêtre
+        pygame.display.set_caption("Apprendre les Notes de Musique")
+        # Crée une horloge pour contrôler le nombre d'images par seconde
+        self.horloge = pygame.time.Clock()
+        # Rythme des boucles: attente bloquante sur les écrans statiques
+        # Il suit aussi la taille de la fenêtre et passe la souris en unités du jeu
+        self.cadenceur = Cadenceur(self.horloge, profileur=self.profileur, ecran=self)
+        self._chrono('affichage', debut)
+
+    def _ouvrir_fenetre(self, plein_ecran):
+        """Ouvre la fenêtre (redimensionnable) ou le plein écran, et retourne sa surface"""
+        if plein_ecran:
+            # (0, 0): garder la résolution actuelle de l'écran
+            fenetre = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            if self.plein_ecran:
+                # Une fenêtre redimensionnable déjà ouverte garderait la taille
+                # du plein écran: on revient d'abord à une fenêtre fixe
+                pygame.display.set_mode((LARGEUR, HAUTEUR))
+            fenetre = pygame.display.set_mode((LARGEUR, HAUTEUR), pygame.RESIZABLE)
+        self.plein_ecran = plein_ecran
+        self.echelle = Echelle.pour_fenetre(fenetre.get_size())
+        return fenetre
+
+    def adapter_fenetre(self):
+        """Recalcule l'échelle après un changement de taille de la fenêtre"""
+        self.fenetre = pygame.display.get_surface()
+        self.echelle = Echelle.pour_fenetre(self.fenetre.get_size())
+
+    def basculer_plein_ecran(self):
+        """Passe du plein écran à la fenêtre, et inversement (touche F11)"""
+        self.fenetre = self._ouvrir_fenetre(not self.plein_ecran)
+        # Les écrans statiques redessinent leur image à la nouvelle taille
+        pygame.event.post(pygame.event.Event(pygame.VIDEOEXPOSE))
+
+    def polices(self):
+        """
+        Retourne les polices à la taille de l'échelle actuelle: {nom: police}.
+
+        Les caractères et les glyphes Bravura sont rastérisés directement à
+        la bonne taille, une seule fois par facteur d'échelle (les polices
+        sont ensuite gardées): aucune image de texte n'est agrandie pendant
+        le jeu, et revenir à une taille de fenêtre déjà vue ne recharge rien.
+        """
+        facteur = self.echelle.facteur
+        polices = self._polices.get(facteur)
+        if polices is not None:
+            return polices
+        debut = time.perf_counter()
+        pygame.font.init()
+        polices = {}
+        for nom, taille in Runtime.TAILLES_POLICES.items():
+            taille = round(taille * facteur)
+            if nom != 'police_musicale':
+                # None = police par défaut de Pygame, le nombre = taille en pixels
+                polices[nom] = pygame.font.Font(None, taille)
+                continue
+            # Police musicale pour les clés et les notes
+            try:
+                polices[nom] = pygame.font.Font(resource_path("Bravura.otf"), taille)
+            except Exception as e:
+                # Fallback si la police n'est pas trouvée
+                print(f"Avertissement: impossible de charger la police Bravura.otf - {e}")
+                polices[nom] = polices['police_grande']
+        self._polices[facteur] = polices
+        # Le premier chargement compte dans le démarrage; les suivants à part
+        self._chrono('polices' if len(self._polices) == 1 else f'polices x{facteur:g}', debut)
+        return polices
+
+    def ouvrir_stockage(self):
+        """
+        Retourne le stockage des scores choisi sur la ligne de commande.
+
+        Par défaut, le fichier JSON et son journal (JournalReponses). Avec
+        --stockage sqlite, la base SQLite et le profil donné par --profil.
+        Le même objet est réutilisé tant que le fichier et le profil ne changent pas.
+        """
+        if self.options.get('stockage') == 'sqlite':
+            stockage = StockageSQLite(profil=self.options.get('profil') or PROFIL_DEFAUT)
+        else:
+            stockage = JournalReponses()
+        if self._stockage is None or self._stockage.identifiant != stockage.identifiant:
+            self._stockage = stockage
+        return self._stockage
+
+    def ouvrir_modele(self):
+        """
+        Retourne les statistiques en mémoire (ModeleStats) du stockage courant.
+
+        Le modèle est lu sur le disque une seule fois, puis le jeu le tient à
+        jour à chaque réponse: l'écran des statistiques ne relit plus rien.
+        """
+        stockage = self.ouvrir_stockage()
+        if self._modele is None or self._modele.identifiant != stockage.identifiant:
+            self._modele = ModeleStats.depuis_stockage(stockage)
+        return self._modele
+
+    def marquer_premiere_image(self):
+        """Mémorise le temps écoulé entre l'import et la première image affichée"""
+        if 'premiere_image' not in self.chronos:
+            self.chronos['premiere_image'] = (time.perf_counter() - _T_IMPORT) * 1000
+
+    def rapport_demarrage(self):
+        """Retourne un résumé lisible des durées d'initialisation"""
+        lignes = ["Démarrage (ms):"]
+        for etape, duree in self.chronos.items():
+            lignes.append(f"  {etape:<15} {duree:8.1f}")
+        return "\n".join(lignes)
+
+    def rapport_performances(self):
+        """Retourne un résumé lisible des compteurs de performance"""
+        sections = [
+            ("Banque de sons", self.banque.statistiques()),
+            ("Cache des textes", self.textes.statistiques()),
+            ("Sauvegarde", self.ecrivain.statistiques()),
+        ]
+        if self._audio_pret:
+            sections.append(("Audio", self.canaux.statistiques()))
+        if 'cadenceur' in self.__dict__:
+            sections.append(("Cadenceur", self.cadenceur.statistiques()))
+        if self.profileur.images:
+            sections.append(("Profileur", self.profileur.statistiques()))
+        lignes = []
+        for titre, compteurs in sections:
+            lignes.append(f"{titre}:")
+            for nom, valeur in compteurs.items():
+                lignes.append(f"  {nom:<15} {valeur}")
+        return "\n".join(lignes)
+
+_runtime = None  # Instance unique, créée par init_runtime()
+
+def init_runtime():
+    """
+    Retourne le Runtime du jeu, en le créant lors du premier appel.
+
+    Retourne:
+        Runtime: L'objet qui donne accès à la fenêtre, aux polices et aux sons
+    """
+    global _runtime
+    if _runtime is None:
+        _runtime = Runtime()
+    return _runtime
 
 # ========================================
-# POLICES DE CARACTÈRES
+# CACHE DES TEXTES - Évite de redessiner les mêmes textes à chaque image
 # ========================================
-# Crée différentes tailles de police pour le texte
-# None = police par défaut de Pygame, le nombre = taille en pixels
-police_grande = pygame.font.Font(None, 72)  # Pour les titres
-police_moyenne = pygame.font.Font(None, 48) # Pour les sous-titres
-police_petite = pygame.font.Font(None, 36)  # Pour le texte normal
-police_mini = pygame.font.Font(None, 24)    # Pour les petites indications
+class CacheTextes:
+    """
+    Cache partagé des surfaces produites par font.render().
 
-# Police musicale pour les clés
-try:
-    # Fonction pour obtenir le chemin des ressources (pour PyInstaller)
-    def resource_path(relative_path):
-        try:
-            # PyInstaller crée un dossier temporaire et stocke le chemin dans _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        return os.path.join(base_path, relative_path)
-    
-    police_musicale = pygame.font.Font(resource_path("Bravura.otf"), 55)
-except Exception as e:
-    # Fallback si la police n'est pas trouvée
-    print(f"Avertissement: impossible de charger la police Bravura.otf - {e}")
-    police_musicale = police_grande
+    Rendre un texte (rastérisation des caractères) coûte cher, alors que la
+    plupart des textes affichés ne changent presque jamais ("ESC pour
+    quitter", noms des boutons, symboles des clés...). Chaque surface est
+    donc gardée en mémoire, indexée par (police, texte, antialiasing, couleur).
+    Au-delà de 'capacite' entrées, la moins récemment utilisée est oubliée.
+
+    Les surfaces retournées sont partagées: il faut seulement les afficher
+    (blit), jamais les modifier.
+
+    Attributs:
+        succes: Nombre de textes trouvés dans le cache
+        echecs: Nombre de textes réellement rendus par la police
+        evictions: Nombre de surfaces oubliées pour respecter la capacité
+    """
+    def __init__(self, capacite=256):
+        self.capacite = capacite
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self._surfaces = collections.OrderedDict()
+
+    def rendre(self, police, texte, couleur, antialias=True):
+        """
+        Retourne la surface du texte, rendue seulement si elle n'est pas en cache.
+
+        Paramètres:
+            police: La police pygame.font.Font à utiliser
+            texte: Le texte à afficher
+            couleur: Couleur RGB du texte
+            antialias: True pour lisser les caractères
+        """
+        cle = (police, texte, antialias, couleur)
+        surface = self._surfaces.get(cle)
+        if surface is not None:
+            self._surfaces.move_to_end(cle)  # Devient la plus récente
+            self.succes += 1
+            return surface
+        self.echecs += 1
+        surface = police.render(texte, antialias, couleur)
+        self._surfaces[cle] = surface
+        if len(self._surfaces) > self.capacite:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def taux_succes(self):
+        """Retourne la proportion de textes servis par le cache (0 à 1)"""
+        total = self.succes + self.echecs
+        return self.succes / total if total else 0.0
+
+    def statistiques(self):
+        """Retourne les compteurs du cache sous forme de dictionnaire"""
+        return {
+            'en_memoire': len(self._surfaces),
+            'capacite': self.capacite,
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'evictions': self.evictions,
+            'taux_succes': f"{self.taux_succes():.1%}",
+        }
+
+def rendre_texte(police, texte, couleur, antialias=True):
+    """
+    Retourne la surface d'un texte en passant par le cache partagé du Runtime.
+
+    S'utilise comme police.render(texte, True, couleur).
+    """
+    return init_runtime().textes.rendre(police, texte, couleur, antialias)
+
+# ========================================
+# ÉCHELLE - Fenêtre de n'importe quelle taille
+# ========================================
+# Tout le jeu est placé en "unités du jeu", comme dans une fenêtre de
+# LARGEUR x HAUTEUR. L'échelle les convertit en pixels de la vraie fenêtre.
+PAS_ECHELLE = 0.125  # Facteurs par huitièmes: peu de tailles de polices à charger
+ECHELLE_MIN = 0.5    # En dessous, les textes deviennent illisibles
+
+class Echelle:
+    """
+    Passage des coordonnées du jeu (LARGEUR x HAUTEUR) aux pixels de la fenêtre.
+
+    Dans une fenêtre agrandie, en plein écran ou sur un écran HiDPI, chaque
+    position du jeu est multipliée par le facteur d'échelle, et l'image est
+    centrée: si les proportions de la fenêtre ne sont pas celles du jeu, des
+    bandes blanches restent sur les côtés (ou en haut et en bas).
+
+    Les images sont dessinées directement à la bonne taille (polices
+    chargées à la taille de l'échelle, voir Runtime.polices): rien n'est
+    agrandi à chaque image, et une image en 4K coûte à peu près le même
+    travail qu'en 800 x 600.
+
+    Attributs:
+        facteur: Pixels de la fenêtre par unité du jeu (1 dans une fenêtre 800 x 600)
+        x0, y0: Position dans la fenêtre du point (0, 0) du jeu
+    """
+    def __init__(self, facteur=1, x0=0, y0=0):
+        self.facteur = facteur
+        self.x0 = x0
+        self.y0 = y0
+
+    @classmethod
+    def pour_fenetre(cls, taille):
+        """Retourne l'échelle qui fait tenir tout le jeu, centré, dans une fenêtre de cette taille"""
+        largeur, hauteur = taille
+        facteur = min(largeur / LARGEUR, hauteur / HAUTEUR)
+        facteur = max(ECHELLE_MIN, math.floor(facteur / PAS_ECHELLE) * PAS_ECHELLE)
+        return cls(facteur, (largeur - round(LARGEUR * facteur)) // 2,
+                   (hauteur - round(HAUTEUR * facteur)) // 2)
+
+    def x(self, x):
+        """Abscisse du jeu -> abscisse dans la fenêtre"""
+        return self.x0 + round(x * self.facteur)
+
+    def y(self, y):
+        """Ordonnée du jeu -> ordonnée dans la fenêtre"""
+        return self.y0 + round(y * self.facteur)
+
+    def point(self, point):
+        """Point (x, y) du jeu -> point dans la fenêtre"""
+        return (self.x(point[0]), self.y(point[1]))
+
+    def longueur(self, longueur):
+        """Longueur du jeu (épaisseur de trait, rayon) -> pixels, au moins 1"""
+        return max(1, round(longueur * self.facteur))
+
+    def rect(self, rect):
+        """
+        Rectangle du jeu -> pygame.Rect dans la fenêtre.
+
+        Chaque bord est converti séparément: deux zones qui se touchent dans
+        le jeu se touchent encore dans la fenêtre, sans trou ni recouvrement.
+        """
+        rect = pygame.Rect(rect)
+        gauche, haut = self.x(rect.left), self.y(rect.top)
+        return pygame.Rect(gauche, haut, self.x(rect.right) - gauche, self.y(rect.bottom) - haut)
+
+    def placer(self, image, **ancre):
+        """
+        Retourne le rectangle d'une image (déjà à l'échelle) ancrée sur un point du jeu.
+
+        Exemple: placer(titre, midtop=(LARGEUR // 2, 20)) centre le titre en
+        haut de l'écran, quelle que soit la taille de la fenêtre.
+        """
+        (nom, point), = ancre.items()
+        return image.get_rect(**{nom: self.point(point)})
+
+    def logique(self, pos):
+        """Position dans la fenêtre (souris) -> point du jeu"""
+        return (math.floor((pos[0] - self.x0) / self.facteur),
+                math.floor((pos[1] - self.y0) / self.facteur))
+
+    def couche(self, x, y):
+        """
+        Retourne l'échelle d'une image à part dont le coin (0, 0) est le point (x, y) du jeu.
+
+        Une couche dessinée avec cette échelle puis affichée en
+        self.point((x, y)) tombe exactement sur les mêmes pixels qu'un
+        dessin direct dans la fenêtre.
+        """
+        return Echelle(self.facteur, -round(x * self.facteur), -round(y * self.facteur))
+
+# ========================================
+# CADENCEUR - Attente des événements sans gaspiller le processeur
+# ========================================
+# Événements qui demandent de redessiner un écran statique (fenêtre découverte,
+# agrandie, passée en plein écran...)
+EVENEMENTS_REDESSIN = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+                       pygame.WINDOWRESTORED, pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED)
+# Événements de la souris dont la position passe en unités du jeu (voir Echelle)
+EVENEMENTS_SOURIS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+class Cadenceur:
+    """
+    Rythme les boucles d'affichage selon ce qui est à l'écran.
+
+    - Écran statique (menu, statistiques, entraînement): attente bloquante
+      avec pygame.event.wait(), le programme dort jusqu'au prochain
+      événement ou jusqu'au délai maximal. Rien n'est recalculé tant que
+      rien ne se passe.
+    - Écran animé (barre de temps du jeu): cadence fixe, FPS images par seconde.
+      Entre deux images, le programme dort dans pygame.event.wait() jusqu'à
+      l'heure de l'image suivante: chaque événement est daté à son arrivée
+      (liste 'arrivees') et non à la fin de l'image.
+
+    Le temps réel et le temps processeur passés dans chaque mode sont
+    mesurés, pour vérifier qu'un jeu laissé ouvert ne charge pas la machine.
+    Si un Profileur est actif, l'attente ('attente') et la lecture des
+    événements ('evenements') y sont comptées comme phases de l'image.
+
+    Avec un 'ecran' (le Runtime), tous les écrans profitent sans rien faire
+    de la fenêtre de taille libre: l'échelle suit la taille de la fenêtre,
+    F11 bascule le plein écran, et les positions de la souris arrivent
+    déjà en unités du jeu (boutons et rejeux ne dépendent pas de la fenêtre).
+    """
+    def __init__(self, horloge, fps=FPS, delai_max_ms=1000, profileur=None, ecran=None):
+        self.horloge = horloge
+        self.ecran = ecran
+        self.fps = fps
+        self.delai_max_ms = delai_max_ms
+        self.profileur = profileur or Profileur()  # Inactif par défaut
+        # Temps cumulés par mode: {'statique'|'anime': [temps réel, temps processeur]}
+        self.temps = {'statique': [0.0, 0.0], 'anime': [0.0, 0.0]}
+        self.reveils = 0  # Nombre de retours de pygame.event.wait()
+        self._dernier = None  # (mode, temps réel, temps processeur) de l'appel précédent
+        self._prochaine_image = None  # perf_counter() de la prochaine image animée
+        # perf_counter() de l'arrivée de chaque événement du dernier attendre() (même ordre)
+        self.arrivees = []
+
+    def _mesurer(self, mode):
+        """Attribue le temps écoulé depuis l'appel précédent au mode de cet appel"""
+        maintenant = (time.perf_counter(), time.process_time())
+        if self._dernier is not None:
+            mode_precedent, mur, cpu = self._dernier
+            cumul = self.temps[mode_precedent]
+            cumul[0] += maintenant[0] - mur
+            cumul[1] += maintenant[1] - cpu
+        self._dernier = (mode, *maintenant)
+
+    def attendre(self, anime=False, bloquer=True):
+        """
+        Attend la prochaine image (écran animé) ou le prochain événement (écran statique).
+
+        Paramètres:
+            anime: True si quelque chose bouge à l'écran (cadence fixe)
+            bloquer: False pour un écran statique qui a déjà une image à
+                dessiner: on lit alors les événements sans attendre
+
+        Retourne:
+            list: Les événements pygame reçus (éventuellement vide)
+        """
+        mode = 'anime' if anime else 'statique'
+        self._mesurer(mode)
+        evenements = []
+        self.arrivees = []
+        if anime:
+            with self.profileur.phase('attente'):
+                self._attendre_image(evenements)
+            with self.profileur.phase('evenements'):
+                return self._lire_tout(evenements)
+        self._prochaine_image = None  # La prochaine image animée repart de zéro
+        if not bloquer:
+            return self._lire_tout(evenements)
+        # Dormir jusqu'au prochain événement (ou jusqu'au délai maximal)
+        event = pygame.event.wait(self.delai_max_ms)
+        self.reveils += 1
+        # Remettre à zéro l'horloge: la prochaine image animée ne doit pas
+        # croire que l'attente était une image très lente
+        self.horloge.tick()
+        if event.type == pygame.NOEVENT:
+            return []
+        self._noter(evenements, event)
+        return self._lire_tout(evenements)
+
+    def _noter(self, evenements, event):
+        """Ajoute un événement qui vient d'arriver, avec son heure d'arrivée"""
+        if self.ecran is not None:
+            event = self._adapter(event)
+        evenements.append(event)
+        self.arrivees.append(time.perf_counter())
+
+    def _adapter(self, event):
+        """Suit la taille de la fenêtre (F11: plein écran) et passe la souris en unités du jeu"""
+        if event.type in EVENEMENTS_SOURIS:
+            pos = self.ecran.echelle.logique(event.pos)
+            return pygame.event.Event(event.type, {**event.dict, 'pos': pos})
+        if event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+            self.ecran.adapter_fenetre()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+            self.ecran.basculer_plein_ecran()
+        return event
+
+    def _lire_tout(self, evenements):
+        """Ajoute les événements déjà en attente (arrivés pendant le calcul de l'image)"""
+        for event in pygame.event.get():
+            self._noter(evenements, event)
+        return evenements
+
+    def _attendre_image(self, evenements):
+        """Dort jusqu'à l'heure de la prochaine image, en notant les événements qui arrivent"""
+        periode = 1 / self.fps
+        maintenant = time.perf_counter()
+        if self._prochaine_image is None:
+            self._prochaine_image = maintenant
+        # Les événements arrivés pendant le calcul de l'image: datés maintenant
+        self._lire_tout(evenements)
+        while True:
+            reste_ms = int((self._prochaine_image - time.perf_counter()) * 1000)
+            if reste_ms <= 0:
+                break
+            event = pygame.event.wait(reste_ms)
+            if event.type != pygame.NOEVENT:
+                self._noter(evenements, event)
+        # Une image très en retard ne fait pas enchaîner les suivantes sans pause
+        self._prochaine_image = max(self._prochaine_image + periode, time.perf_counter())
+        self.horloge.tick()  # Garde les mesures de l'horloge pygame (get_fps)
+
+    def statistiques(self):
+        """Retourne les temps mesurés (en secondes) et la charge processeur par mode"""
+        if self._dernier is not None:
+            self._mesurer(self._dernier[0])  # Compter aussi la période en cours
+        resultat = {'reveils': self.reveils}
+        for mode, (mur, cpu) in self.temps.items():
+            resultat[f'{mode}_reel_s'] = round(mur, 2)
+            resultat[f'{mode}_cpu_s'] = round(cpu, 3)
+            resultat[f'{mode}_cpu'] = f"{cpu / mur:.1%}" if mur else "-"
+        return resultat
+
+# ========================================
+# PROFILEUR D'IMAGES
+# ========================================
+class _PhaseInactive:
+    """Phase qui ne mesure rien: retournée par Profileur.phase() quand il est désactivé"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_PHASE_INACTIVE = _PhaseInactive()
+
+class _Phase:
+    """Mesure d'une phase d'une image (voir Profileur.phase)"""
+    __slots__ = ('profileur', 'nom', 'debut', 'enfants')
+
+    def __init__(self, profileur, nom):
+        self.profileur = profileur
+        self.nom = nom
+        self.enfants = 0.0  # Durée des phases imbriquées dans celle-ci
+
+    def __enter__(self):
+        self.profileur._pile.append(self)
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fin = time.perf_counter()
+        duree = fin - self.debut
+        profileur = self.profileur
+        profileur._pile.pop()
+        if profileur._pile:
+            profileur._pile[-1].enfants += duree
+        # Temps propre: sans les phases imbriquées (pas de double comptage)
+        phases = profileur._phases
+        phases[self.nom] = phases.get(self.nom, 0.0) + duree - self.enfants
+        if profileur._trace is not None:
+            profileur._tracer(self.nom, self.debut, duree)
+        return False
+
+class Profileur:
+    """
+    Mesure le temps passé dans chaque phase des images de la boucle de jeu.
+
+    Utilisation:
+        with profileur:                  # Pendant toute la boucle
+            while ...:
+                profileur.debut_image()
+                with profileur.phase('dessin'):
+                    jeu.dessiner(fenetre)
+                profileur.fin_image()
+
+    Pour chacune des TAILLE_FENETRE dernières images, on garde sa durée
+    totale, le temps propre de chaque phase et les compteurs (textes rendus,
+    appels de dessin). L'overlay (touche F3) affiche les percentiles
+    p50/p95/p99 et les moyennes par phase. La trace (option --trace) enregistre
+    chaque phase au format « Chrome trace event » (chrome://tracing, Perfetto).
+
+    Désactivé, il ne fait presque rien: phase() retourne un objet partagé
+    vide et debut_image()/fin_image() retournent aussitôt.
+
+    Les appels de dessin sont comptés en remplaçant les fonctions de
+    pygame.draw, seulement à l'intérieur d'un bloc "with profileur:" et
+    quand les mesures sont actives. En sortant du bloc, même sur une
+    exception, les fonctions d'origine sont toujours remises en place.
+
+    Attributs:
+        actif: True si les mesures sont en cours
+        continu: True pour mesurer même sans overlay ni trace (rejeu d'une partie)
+        overlay: True si l'overlay doit être affiché
+        images: Nombre d'images mesurées
+    """
+    TAILLE_FENETRE = 300  # Images prises en compte (5 secondes à 60 FPS)
+    MAX_EVENEMENTS_TRACE = 200_000  # Les plus anciens sont oubliés au-delà
+    RAFRAICHISSEMENT_S = 0.5  # Mise à jour du texte de l'overlay
+    # Fonctions de pygame.draw comptées comme appels de dessin
+    FONCTIONS_DESSIN = ('line', 'lines', 'aaline', 'aalines', 'rect', 'circle',
+                        'ellipse', 'arc', 'polygon')
+
+    def __init__(self):
+        self.actif = False
+        self.overlay = False
+        self.images = 0
+        self._historique = collections.deque(maxlen=self.TAILLE_FENETRE)
+        self._phases = {}  # Temps propre de chaque phase de l'image en cours
+        self._pile = []  # Phases en cours (imbriquées)
+        self._debut_image = None
+        self._compteurs = {}  # Nom -> fonction qui retourne un total cumulé
+        self._valeurs_debut = {}
+        self._trace = None  # Événements de la trace, si elle est demandée
+        self.continu = False
+        self._origine = time.perf_counter()
+        self._dessins = 0
+        self._fonctions_originales = {}
+        self._boucles = 0  # Blocs "with profileur:" en cours
+        self._surface_overlay = None
+        self._date_overlay = 0.0
+
+    # --- Activation ---
+
+    def activer(self, actif=True):
+        """Active ou désactive les mesures (et le comptage des appels de dessin)"""
+        if actif == self.actif:
+            return
+        self.actif = actif
+        self._debut_image = None
+        if actif and self._boucles:
+            self._installer_comptage()
+        else:
+            self._retirer_comptage()
+
+    def __enter__(self):
+        """Début de la boucle mesurée: les appels de dessin seront comptés"""
+        self._boucles += 1
+        if self.actif:
+            self._installer_comptage()
+        return self
+
+    def __exit__(self, *exc):
+        self._boucles -= 1
+        if not self._boucles:
+            self._retirer_comptage()
+        return False
+
+    def _installer_comptage(self):
+        """Remplace les fonctions de pygame.draw par des versions qui comptent"""
+        if self._fonctions_originales:
+            return  # Déjà en place
+        for nom in self.FONCTIONS_DESSIN:
+            originale = getattr(pygame.draw, nom)
+            self._fonctions_originales[nom] = originale
+            setattr(pygame.draw, nom, self._compter_dessin(originale))
+
+    def _retirer_comptage(self):
+        """Remet en place les fonctions d'origine de pygame.draw"""
+        for nom, originale in self._fonctions_originales.items():
+            setattr(pygame.draw, nom, originale)
+        self._fonctions_originales.clear()
+
+    def _compter_dessin(self, fonction):
+        """Retourne 'fonction' enveloppée pour compter ses appels"""
+        def fonction_comptee(*args, **kwargs):
+            self._dessins += 1
+            return fonction(*args, **kwargs)
+        return fonction_comptee
+
+    def basculer_overlay(self):
+        """Affiche ou masque l'overlay (touche F3); les mesures suivent, sauf pendant une trace"""
+        self.overlay = not self.overlay
+        self.activer(self.overlay or self._trace is not None or self.continu)
+
+    def demarrer_trace(self):
+        """Commence à enregistrer la trace (active les mesures)"""
+        self._trace = collections.deque(maxlen=self.MAX_EVENEMENTS_TRACE)
+        self.activer(True)
+
+    def reinitialiser(self, fenetre=TAILLE_FENETRE):
+        """
+        Oublie les images déjà mesurées.
+
+        Paramètre:
+            fenetre: Nombre d'images prises en compte (None: toutes, pour le
+                     rapport d'un rejeu, voir rejouer_session)
+        """
+        self._historique = collections.deque(maxlen=fenetre)
+        self.images = 0
+
+    def ajouter_compteur(self, nom, fonction):
+        """
+        Ajoute un compteur relevé à chaque image.
+
+        Paramètres:
+            nom: Nom affiché
+            fonction: Retourne un total cumulé; on garde la différence par image
+        """
+        self._compteurs[nom] = fonction
+
+    # --- Mesures ---
+
+    def phase(self, nom):
+        """Retourne un gestionnaire de contexte qui mesure la phase 'nom'"""
+        if not self.actif:
+            return _PHASE_INACTIVE
+        return _Phase(self, nom)
+
+    def debut_image(self):
+        """Marque le début d'une image"""
+        if not self.actif:
+            return
+        self._debut_image = time.perf_counter()
+        self._phases = {}
+        self._dessins = 0
+        self._valeurs_debut = {nom: f() for nom, f in self._compteurs.items()}
+
+    def fin_image(self):
+        """Marque la fin de l'image en cours et l'ajoute à l'historique"""
+        if not self.actif or self._debut_image is None:
+            return
+        duree = time.perf_counter() - self._debut_image
+        compteurs = {nom: f() - self._valeurs_debut[nom] for nom, f in self._compteurs.items()}
+        compteurs['dessins'] = self._dessins
+        self._historique.append((duree * 1000, self._phases, compteurs))
+        self.images += 1
+        if self._trace is not None:
+            self._tracer('image', self._debut_image, duree)
+            self._trace.append({'name': 'compteurs', 'ph': 'C', 'pid': 1, 'tid': 1,
+                                'ts': (self._debut_image - self._origine) * 1e6, 'args': compteurs})
+        self._debut_image = None
+
+    def _tracer(self, nom, debut, duree):
+        """Ajoute un événement « complet » (ph='X') à la trace, en microsecondes"""
+        self._trace.append({'name': nom, 'ph': 'X', 'pid': 1, 'tid': 1,
+                            'ts': (debut - self._origine) * 1e6, 'dur': duree * 1e6})
+
+    # --- Résultats ---
+
+    def percentiles(self):
+        """Retourne {50: ms, 95: ms, 99: ms} sur les dernières images (vide si aucune)"""
+        durees = sorted(image[0] for image in self._historique)
+        if not durees:
+            return {}
+        return {p: durees[min(len(durees) - 1, int(p / 100 * len(durees)))] for p in (50, 95, 99)}
+
+    def moyennes(self):
+        """Retourne (temps propre moyen par phase en ms, moyenne de chaque compteur par image)"""
+        phases = {}
+        compteurs = {}
+        for _, phases_image, compteurs_image in self._historique:
+            for nom, duree in phases_image.items():
+                phases[nom] = phases.get(nom, 0.0) + duree * 1000
+            for nom, valeur in compteurs_image.items():
+                compteurs[nom] = compteurs.get(nom, 0) + valeur
+        n = max(1, len(self._historique))
+        return ({nom: total / n for nom, total in phases.items()},
+                {nom: total / n for nom, total in compteurs.items()})
+
+    def lignes(self):
+        """Retourne le texte de l'overlay, ligne par ligne"""
+        p = self.percentiles()
+        if not p:
+            return ["Profileur: en attente d'images..."]
+        phases, compteurs = self.moyennes()
+        lignes = [f"Image (ms): p50 {p[50]:.1f}  p95 {p[95]:.1f}  p99 {p[99]:.1f}"]
+        for nom, duree in sorted(phases.items(), key=lambda e: -e[1]):
+            lignes.append(f"  {nom:<11} {duree:6.2f} ms")
+        lignes.append(" ".join(f"{nom} {valeur:.1f}" for nom, valeur in compteurs.items())
+                      + " /image")
+        return lignes
+
+    def dessiner_overlay(self, surface, police):
+        """
+        Dessine l'overlay en haut à gauche de 'surface'.
+
+        Le texte n'est recalculé que toutes les RAFRAICHISSEMENT_S secondes, et
+        rendu directement (sans le cache des textes, pour ne pas fausser ses
+        compteurs).
+
+        Retourne:
+            pygame.Rect: Zone occupée (à envoyer à l'écran en rendu partiel)
+        """
+        maintenant = time.perf_counter()
+        if self._surface_overlay is None or maintenant - self._date_overlay >= self.RAFRAICHISSEMENT_S:
+            textes = [police.render(ligne, True, BLANC) for ligne in self.lignes()]
+            largeur = max(t.get_width() for t in textes) + 12
+            hauteur = sum(t.get_height() for t in textes) + 10
+            if self._surface_overlay is not None:
+                # Ne jamais rétrécir: en rendu partiel, rien n'effacerait l'ancien cadre
+                largeur = max(largeur, self._surface_overlay.get_width())
+                hauteur = max(hauteur, self._surface_overlay.get_height())
+            self._surface_overlay = pygame.Surface((largeur, hauteur))
+            self._surface_overlay.fill(NOIR)
+            y = 5
+            for texte in textes:
+                self._surface_overlay.blit(texte, (6, y))
+                y += texte.get_height()
+            self._date_overlay = maintenant
+        return surface.blit(self._surface_overlay, (5, 5))
+
+    def ecrire_trace(self, chemin):
+        """Écrit la trace au format JSON « Chrome trace event »"""
+        if self._trace is None:
+            return
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': list(self._trace), 'displayTimeUnit': 'ms'}, f)
+
+    def statistiques(self):
+        """Retourne un résumé des mesures sous forme de dictionnaire"""
+        p = self.percentiles()
+        resultat = {'images': self.images}
+        for centile, duree in p.items():
+            resultat[f'image_p{centile}_ms'] = round(duree, 2)
+        return resultat
 
 # ========================================
 # NOTES MUSICALES
@@ -84,93 +932,332 @@ NOTES = ['Do', 'Ré', 'Mi', 'Fa', 'Sol', 'La', 'Si']
 # pygame.K_1 = touche "1" du clavier, etc.
 TOUCHES = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_7]
 
-# Fréquences des notes en Hertz (vibrations par seconde) - CLÉ DE SOL (octave 4)
-# Chaque note a une fréquence spécifique qui détermine sa hauteur
-# Par exemple, le La (A4) = 440 Hz est la note de référence internationale
-FREQUENCIES_SOL = {
-    'Do': 261.63,   # C4 - Note la plus grave en clé de Sol
-    'Ré': 293.66,   # D4
-    'Mi': 329.63,   # E4
-    'Fa': 349.23,   # F4
-    'Sol': 392.00,  # G4
-    'La': 440.00,   # A4 - Note de référence (diapason)
-    'Si': 493.88,   # B4 - Note la plus aiguë en clé de Sol
+# ----- Modèle des hauteurs -----
+# Chaque hauteur a un numéro MIDI: 60 = Do central (Do4), 69 = La4.
+# Un demi-ton de plus = +1, une octave de plus = +12.
+# Sur la portée, on compte en "degrés": un degré = une ligne ou un interligne.
+# degré = 7 × octave + rang de la note (Do4 = 28, Ré4 = 29...). Do4 et Do#4
+# ont le même degré: seule l'altération (dièse, bémol) les distingue.
+LA_REFERENCE = 440.0          # Diapason: fréquence du La4 en Hz
+MIDI_LA_REFERENCE = 69        # Numéro MIDI du La4
+MIDI_MIN, MIDI_MAX = 21, 108  # Étendue d'un piano à 88 touches (La0 à Do8)
+NB_DEGRES = 7 * 10            # Degrés des octaves 0 à 9 (tout le clavier et plus)
+
+# Nombre de demi-tons entre le Do et chaque note de la gamme
+DEMI_TONS = (0, 2, 4, 5, 7, 9, 11)
+
+# Altérations: -1 = bémol, 0 = aucune, 1 = dièse
+ALTERATIONS = {-1: 'b', 0: '', 1: '#'}  # Pour les noms affichés en texte
+
+# Orthographe des 12 demi-tons de l'octave: (rang de la note, altération)
+# Les touches noires s'écrivent avec un dièse (Do#) ou un bémol (Réb)
+ORTHOGRAPHE_DIESES = ((0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (3, 0),
+                      (3, 1), (4, 0), (4, 1), (5, 0), (5, 1), (6, 0))
+ORTHOGRAPHE_BEMOLS = ((0, 0), (1, -1), (1, 0), (2, -1), (2, 0), (3, 0),
+                      (4, -1), (4, 0), (5, -1), (5, 0), (6, -1), (6, 0))
+
+# Fréquence de chaque numéro MIDI en gamme tempérée, calculée une seule fois:
+# chaque demi-ton multiplie la fréquence par 2^(1/12)
+FREQUENCES_MIDI = tuple(LA_REFERENCE * 2 ** ((numero - MIDI_LA_REFERENCE) / 12)
+                        for numero in range(128))
+
+def numero_midi(nom, octave, alteration=0):
+    """
+    Retourne le numéro MIDI d'une note.
+    
+    Exemples: ('Do', 4) -> 60, ('La', 4) -> 69, ('Fa', 4, 1) -> 66 (Fa#4)
+    """
+    return 12 * (octave + 1) + DEMI_TONS[NOTES.index(nom)] + alteration
+
+def degre(nom, octave):
+    """Retourne le degré de la note (sa place sur la portée, sans l'altération)"""
+    return 7 * octave + NOTES.index(nom)
+
+def depuis_midi(numero, bemols=False):
+    """
+    Retourne (nom, octave, altération) pour un numéro MIDI.
+    
+    Paramètres:
+        numero: Numéro MIDI (60 = Do4)
+        bemols: True pour écrire les touches noires avec un bémol (Réb et non Do#)
+    """
+    octave, demi_ton = divmod(numero, 12)
+    rang, alteration = (ORTHOGRAPHE_BEMOLS if bemols else ORTHOGRAPHE_DIESES)[demi_ton]
+    return NOTES[rang], octave - 1, alteration
+
+def nom_complet(nom, octave, alteration=0):
+    """Retourne le nom affiché d'une hauteur (ex: 'Fa#4')"""
+    return f"{nom}{ALTERATIONS[alteration]}{octave}"
+
+# ----- Clés -----
+# Une clé dit quelle note est sur quelle ligne: on la décrit par le degré de
+# la ligne du bas de la portée
+DEGRE_LIGNE_BAS = {
+    'sol': degre('Mi', 4),  # Clé de Sol: la ligne du bas est le Mi4
+    'fa': degre('Sol', 2),  # Clé de Fa: la ligne du bas est le Sol2
+    'ut3': degre('Fa', 3),  # Clé d'Ut 3e ligne (alto): le Do4 est sur la 3e ligne
+    'ut4': degre('Ré', 3),  # Clé d'Ut 4e ligne (ténor): le Do4 est sur la 4e ligne
+}
+
+# Les 7 notes du jeu occupent 7 degrés de suite à partir de celui-ci
+DEGRE_PREMIERE_NOTE = {
+    'sol': degre('Do', 4),  # Do4 à Si4
+    'fa': degre('Ré', 3),   # Ré3 à Do4
+    'ut3': degre('Sol', 3), # Sol3 à Fa4
+    'ut4': degre('Mi', 3),  # Mi3 à Ré4
 }
 
-# Fréquences pour la CLÉ DE FA (octave 3-4, gamme mixte)
-# En clé de Fa, le Do est identique à la clé de Sol (C4 = 261.6 Hz)
-# Les notes Sol, La, Si sont en dessous (octave 3)
-# Les notes Ré, Mi, Fa sont également en octave 3, formant une gamme cohérente
-FREQUENCIES_FA = {
-    'Sol': 196.00,   # G3 - Le plus grave, en dessous de la portée avec ligne additionnelle
-    'La': 220.00,   # A3 - En dessous de la portée
-    'Si': 246.94,   # B3 - Sur la première ligne
-    'Do': 261.6,    # C4 - Même fréquence qu'en clé de Sol (au-dessus avec ligne additionnelle)
-    'Ré': 146.83,   # D3 - Sur la 2ème ligne
-    'Mi': 164.81,   # E3 - Entre 2ème et 3ème ligne
-    'Fa': 174.61,   # F3 - Sur la 3ème ligne (en haut)
+NOMS_CLES = {'sol': "Clé de Sol", 'fa': "Clé de Fa", 'ut3': "Clé d'Ut 3", 'ut4': "Clé d'Ut 4"}
+
+# Modes de jeu qui font alterner plusieurs clés
+# 'grande_portee' affiche en plus les deux portées à la fois (comme au piano)
+MODES_CLES = {
+    'mixte': ('sol', 'fa'),
+    'ut': ('ut3', 'ut4'),
+    'grande_portee': ('sol', 'fa'),
+}
+
+def cles_du_mode(mode_cle):
+    """
+    Retourne la liste des clés d'un mode de jeu.
+    
+    Paramètre:
+        mode_cle: Une clé ('sol', 'ut3'...), un mode de MODES_CLES ('mixte'...)
+                  ou directement une liste de clés (ex: ['sol', 'ut3'])
+    """
+    if isinstance(mode_cle, str):
+        cles = list(MODES_CLES.get(mode_cle, (mode_cle,)))
+    else:
+        cles = list(mode_cle)
+    for cle in cles:
+        if cle not in DEGRE_LIGNE_BAS:
+            raise ValueError(f"Clé inconnue: {cle}")
+    return cles
+
+def octave_par_defaut(cle, nom):
+    """
+    Retourne l'octave où une note est jouée dans le jeu, selon la clé.
+    
+    C'est l'octave qui place la note parmi les 7 degrés du jeu de la clé
+    (DEGRE_PREMIERE_NOTE). Ex: en clé de Sol, les notes vont du Do4 au Si4;
+    en clé de Fa, du Ré3 au Do4: seul le Do est à l'octave 4 (Do central).
+    """
+    # Plus petite octave dont le degré n'est pas sous la première note
+    return -((NOTES.index(nom) - DEGRE_PREMIERE_NOTE[cle]) // 7)
+
+# Fréquences des notes du jeu en Hertz (vibrations par seconde)
+# Par exemple, le La4 = 440 Hz est la note de référence internationale
+FREQUENCIES_SOL = {nom: FREQUENCES_MIDI[numero_midi(nom, octave_par_defaut('sol', nom))]
+                   for nom in NOTES}  # Do4 à Si4
+FREQUENCIES_FA = {nom: FREQUENCES_MIDI[numero_midi(nom, octave_par_defaut('fa', nom))]
+                  for nom in NOTES}   # Ré3 à Si3, et le Do4 (même son qu'en clé de Sol)
+
+# ========================================
+# SYNTHÈSE SONORE
+# ========================================
+# Enveloppe ADSR: (attack, decay, sustain, release)
+# - attack: durée de la montée du volume de 0 à 1 (secondes)
+# - decay: durée de la descente de 1 jusqu'au niveau de sustain (secondes)
+# - sustain: niveau de volume tenu pendant la note (0 à 1)
+# - release: durée de l'extinction finale jusqu'à 0 (secondes)
+# L'enveloppe par défaut reproduit le son d'origine: 10 ms de montée, 100 ms d'extinction
+ENVELOPPE_DEFAUT = (0.01, 0.0, 1.0, 0.1)
+
+# Timbres: liste de (harmonique, amplitude)
+# L'harmonique 1 est la fondamentale, 2 l'octave, 3 la quinte au-dessus, etc.
+# Plus il y a d'harmoniques aiguës, plus le son est "brillant"
+TIMBRES = {
+    'sinus': ((1, 1.0),),                                          # Son pur (par défaut)
+    'doux': ((1, 1.0), (2, 0.3), (3, 0.1)),                        # Flûte douce
+    'piano': ((1, 1.0), (2, 0.5), (3, 0.25), (4, 0.12), (5, 0.06)),  # Son plus riche
+    'orgue': ((1, 1.0), (2, 0.6), (4, 0.4), (8, 0.2)),             # Jeux d'octaves
 }
+TIMBRE_DEFAUT = 'sinus'
+
+def format_audio():
+    """
+    Retourne le format réel du mixer: (fréquence d'échantillonnage, nombre de canaux).
+
+    Le mixer est initialisé s'il ne l'est pas encore, pour que les sons
+    synthétisés correspondent toujours au périphérique audio.
+    """
+    if not pygame.mixer.get_init():
+        init_runtime().init_audio()
+    frequence, _, canaux = pygame.mixer.get_init()
+    return frequence, canaux
+
+@functools.lru_cache(maxsize=32)
+def enveloppe_adsr(n_samples, sample_rate, enveloppe=ENVELOPPE_DEFAUT):
+    """
+    Construit une enveloppe ADSR complète sous forme de rampes NumPy.
+
+    Le résultat est mis en cache: toutes les notes de même durée partagent
+    la même enveloppe précalculée. Le tableau est en lecture seule.
+
+    Paramètres:
+        n_samples: Nombre d'échantillons de la note
+        sample_rate: Fréquence d'échantillonnage en Hz
+        enveloppe: Tuple (attack, decay, sustain, release)
+
+    Retourne:
+        np.ndarray: Coefficients de volume (float32) entre 0 et 1
+    """
+    attack, decay, sustain, release = enveloppe
+    # Conversion des durées en nombres d'échantillons, sans dépasser la note
+    n_release = min(int(release * sample_rate), n_samples)
+    n_attack = min(int(attack * sample_rate), n_samples - n_release)
+    n_decay = min(int(decay * sample_rate), n_samples - n_release - n_attack)
+    
+    env = np.full(n_samples, sustain, dtype=np.float32)
+    # Attack: rampe de 0 à 1
+    env[:n_attack] = np.arange(n_attack, dtype=np.float32) / max(n_attack, 1)
+    # Decay: rampe de 1 jusqu'au sustain
+    fin_decay = n_attack + n_decay
+    env[n_attack:fin_decay] = np.linspace(1.0, sustain, n_decay, endpoint=False, dtype=np.float32)
+    # Release: rampe du sustain jusqu'à 0 (le dernier échantillon vaut 0)
+    if n_release:
+        env[n_samples - n_release:] = (sustain / n_release) * np.arange(n_release - 1, -1, -1, dtype=np.float32)
+    env.flags.writeable = False
+    return env
+
+@functools.lru_cache(maxsize=8)
+def _phases(n_samples, sample_rate):
+    """Retourne 2π·t pour chaque échantillon (float32, en cache, lecture seule)"""
+    phases = np.arange(n_samples, dtype=np.float32) * np.float32(2 * np.pi / sample_rate)
+    phases.flags.writeable = False
+    return phases
+
+def synthetiser(frequence, duree=0.5, sample_rate=None, canaux=None,
+                enveloppe=ENVELOPPE_DEFAUT, timbre=TIMBRE_DEFAUT):
+    """
+    Synthétise une note et retourne directement le tampon PCM 16 bits.
+
+    Tout le calcul est vectorisé: les harmoniques du timbre sont additionnées
+    dans un seul tableau de travail, l'enveloppe précalculée y est appliquée
+    sur place, puis le résultat est écrit dans le tampon int16 final
+    (un ou plusieurs canaux) sans copie intermédiaire.
+
+    Paramètres:
+        frequence (float): La fréquence de la note en Hz
+        duree (float): La durée du son en secondes
+        sample_rate (int): Fréquence d'échantillonnage (par défaut celle du mixer)
+        canaux (int): Nombre de canaux (par défaut celui du mixer)
+        enveloppe: Tuple ADSR (voir ENVELOPPE_DEFAUT)
+        timbre: Nom d'un timbre de TIMBRES
+
+    Retourne:
+        np.ndarray: Tableau int16 de forme (n,) en mono ou (n, canaux) sinon
+    """
+    if sample_rate is None or canaux is None:
+        frequence_mixer, canaux_mixer = format_audio()
+        sample_rate = sample_rate or frequence_mixer
+        canaux = canaux or canaux_mixer
+    if timbre not in TIMBRES:
+        raise ValueError(f"Timbre inconnu: {timbre}")
+    n_samples = int(sample_rate * duree)
+    phases = _phases(n_samples, sample_rate)
+    
+    # ÉTAPE 1: Additionner les harmoniques (somme de sinusoïdes)
+    signal = np.zeros(n_samples, dtype=np.float32)
+    onde = np.empty(n_samples, dtype=np.float32)  # Tableau de travail réutilisé
+    for harmonique, amplitude in TIMBRES[timbre]:
+        np.multiply(phases, np.float32(frequence * harmonique), out=onde)
+        np.sin(onde, out=onde)
+        onde *= np.float32(amplitude)
+        signal += onde
+    
+    # ÉTAPE 2: Appliquer l'enveloppe ADSR et le volume en une passe
+    # La somme des amplitudes borne le signal: diviser par elle évite
+    # toute saturation sans avoir à chercher le maximum (np.max)
+    gain = (2**15 - 1) / sum(amplitude for _, amplitude in TIMBRES[timbre])
+    np.multiply(signal, enveloppe_adsr(n_samples, sample_rate, enveloppe), out=signal)
+    signal *= np.float32(gain)
+    
+    # ÉTAPE 3: Écrire dans le tampon 16 bits au format du mixer
+    return _vers_pcm(signal, canaux)
+
+def _vers_pcm(signal, canaux):
+    """Écrit un signal float32 (déjà à l'échelle 16 bits) dans un tampon int16 à 1 ou plusieurs canaux"""
+    if canaux == 1:
+        tampon = np.empty(len(signal), dtype=np.int16)
+        np.copyto(tampon, signal, casting='unsafe')
+    else:
+        tampon = np.empty((len(signal), canaux), dtype=np.int16)
+        # signal[:, None] est une vue: chaque canal reçoit le même signal
+        np.copyto(tampon, signal[:, None], casting='unsafe')
+    return tampon
+
+# Marge des accords: leur crête reste à 90% de la pleine échelle (environ -1 dB)
+MARGE_ACCORD = 0.9
+
+def synthetiser_accord(frequences, duree=0.5, sample_rate=None, canaux=None,
+                       enveloppe=ENVELOPPE_DEFAUT, timbre=TIMBRE_DEFAUT, marge=MARGE_ACCORD):
+    """
+    Synthétise plusieurs notes jouées ensemble dans un seul tampon PCM 16 bits.
+    
+    Toutes les sinusoïdes (chaque harmonique de chaque voix) sont calculées
+    d'un coup dans une matrice (une ligne par sinusoïde), puis additionnées
+    par un produit matriciel. Les voix partent donc exactement ensemble, au
+    lieu de plusieurs Sound lancés l'un après l'autre.
+    
+    Volume: jouer trois notes à pleine échelle en même temps saturerait.
+    Le mélange est divisé par la racine du nombre de voix (l'accord sonne
+    à peu près aussi fort qu'une note seule), puis réduit si sa crête
+    dépasse 'marge'.
+    
+    Paramètres:
+        frequences: Fréquences des voix en Hz
+        duree, sample_rate, canaux, enveloppe, timbre: Comme synthetiser()
+        marge: Crête maximale, en fraction de la pleine échelle
+    
+    Retourne:
+        np.ndarray: Tableau int16 de forme (n,) en mono ou (n, canaux) sinon
+    """
+    if sample_rate is None or canaux is None:
+        frequence_mixer, canaux_mixer = format_audio()
+        sample_rate = sample_rate or frequence_mixer
+        canaux = canaux or canaux_mixer
+    if timbre not in TIMBRES:
+        raise ValueError(f"Timbre inconnu: {timbre}")
+    n_samples = int(sample_rate * duree)
+    harmoniques = np.array([h for h, _ in TIMBRES[timbre]], dtype=np.float32)
+    amplitudes = np.array([a for _, a in TIMBRES[timbre]], dtype=np.float32)
+    voix = np.asarray(frequences, dtype=np.float32)
+    
+    # ÉTAPE 1: Une ligne par sinusoïde (voix × harmonique), puis somme pondérée
+    ondes = np.multiply.outer(np.multiply.outer(voix, harmoniques).ravel(), _phases(n_samples, sample_rate))
+    np.sin(ondes, out=ondes)
+    signal = np.tile(amplitudes, len(voix)) @ ondes
+    
+    # ÉTAPE 2: Volume (puissance d'une note seule, crête sous la marge), puis enveloppe
+    gain = 1.0 / (amplitudes.sum() * math.sqrt(len(voix)))
+    crete = float(np.abs(signal).max()) * gain
+    if crete > marge:
+        gain *= marge / crete
+    np.multiply(signal, enveloppe_adsr(n_samples, sample_rate, enveloppe), out=signal)
+    signal *= np.float32(gain * (2**15 - 1))
+    
+    # ÉTAPE 3: Écrire dans le tampon 16 bits au format du mixer
+    return _vers_pcm(signal, canaux)
 
-def generer_son(frequence, duree=0.5):
+def generer_son(frequence, duree=0.5, enveloppe=ENVELOPPE_DEFAUT, timbre=TIMBRE_DEFAUT):
     """
     Génère un son musical à partir d'une fréquence donnée.
     
     Cette fonction crée une onde sonore synthétique qui ressemble
-    à une note de musique réelle.
+    à une note de musique réelle, au format exact du mixer.
     
     Paramètres:
         frequence (float): La fréquence de la note en Hz (ex: 440 pour un La)
         duree (float): La durée du son en secondes (par défaut 0.5s)
+        enveloppe: Tuple ADSR (attack, decay, sustain, release)
+        timbre: Nom d'un timbre de TIMBRES ('sinus', 'piano', ...)
     
     Retourne:
         pygame.mixer.Sound: Un objet son jouable par Pygame
     """
-    # Nombre d'échantillons audio par seconde (qualité du son)
-    sample_rate = 22050
-    # Nombre total d'échantillons nécessaires pour la durée voulue
-    n_samples = int(sample_rate * duree)  # Ex: 22050 * 0.5 = 11025 échantillons
-    
-    # ÉTAPE 1: Créer l'onde sinusoïdale (la forme de base du son)
-    # np.linspace crée une liste de moments dans le temps de 0 à 'duree'
-    t = np.linspace(0, duree, n_samples, False)
-    # np.sin crée une onde qui monte et descend (comme une vague)
-    # frequence * t * 2 * np.pi : formule mathématique pour créer le bon nombre de cycles
-    note = np.sin(frequence * t * 2 * np.pi)
-    
-    # ÉTAPE 2: Adoucir le son avec une enveloppe ADSR
-    # Sans ça, le son serait brutal (comme un bip électronique)
-    # Attack: montée progressive du volume au début
-    attack = int(0.01 * sample_rate)  # 10 millisecondes
-    # Release: descente progressive du volume à la fin
-    release = int(0.1 * sample_rate)  # 100 millisecondes
-    
-    # Appliquer l'attack: le volume monte progressivement de 0 à 1
-    for i in range(attack):
-        note[i] *= i / attack  # Multiplie par un coefficient qui augmente
-    
-    # Appliquer le release: le volume descend progressivement de 1 à 0
-    for i in range(release):
-        note[-(i+1)] *= i / release  # -(i+1) = partir de la fin du tableau
-    
-    # ÉTAPE 3: Normaliser (ajuster le volume) et convertir en format 16-bit
-    # Les cartes son utilisent des nombres entiers de -32768 à +32767
-    note = note * (2**15 - 1) / np.max(np.abs(note))  # Ajuste au maximum possible
-    note = note.astype(np.int16)  # Convertit en entiers 16-bit
-    
-    # ÉTAPE 4: Convertir en stéréo (canal gauche + canal droit)
-    # On duplique simplement le signal mono pour avoir le même son des deux côtés
-    stereo_note = np.column_stack((note, note))  # Colle deux colonnes identiques
-    
-    # ÉTAPE 5: Créer un objet Sound que Pygame peut jouer
-    sound = pygame.sndarray.make_sound(stereo_note)
-    return sound
-
-# Pré-générer tous les sons des notes au démarrage du programme
-# Cela évite de recalculer les sons à chaque fois qu'on en a besoin
-# {nom: generer_son(freq) ...} = dictionnaire par compréhension
-# Pour chaque paire (nom, freq) dans FREQUENCIES_SOL et FREQUENCIES_FA, on crée un son
-SONS_NOTES_SOL = {nom: generer_son(freq) for nom, freq in FREQUENCIES_SOL.items()}
-SONS_NOTES_FA = {nom: generer_son(freq) for nom, freq in FREQUENCIES_FA.items()}
+    tampon = synthetiser(frequence, duree, enveloppe=enveloppe, timbre=timbre)
+    return pygame.sndarray.make_sound(tampon)
 
 # ========================================
 # GESTION DES DONNÉES (SCORES ET STATS)
@@ -188,13 +1275,263 @@ def get_data_path():
 
 FICHIER_DONNEES = os.path.join(get_data_path(), 'music_game_data.json')
 
-def charger_donnees():
+def chemin_journal(chemin=None):
     """
-    Charge les scores et statistiques depuis le fichier JSON.
-    
-    Structure des données:
-    {
-        'high_score': int - Meilleur score de tous les temps
+    Retourne le chemin du journal des réponses associé à un fichier de données.
+
+    Exemple: music_game_data.json -> music_game_data_journal.jsonl
+    """
+    return os.path.splitext(chemin or FICHIER_DONNEES)[0] + '_journal.jsonl'
+
+def donnees_par_defaut():
+    """Retourne une structure de données vierge (première utilisation)"""
+    return {
+        'high_score': 0,
+        'stats': {
+            'total_notes': 0,
+            'notes_correctes': 0,
+            'sessions': 0,
+            'par_note': {note: {'tentatives': 0, 'reussites': 0} for note in NOTES},
+            'par_cle': {},
+            'par_jour': {},
+            'temps_reponse': {},
+            'temps_par_note': {},
+            'temps_par_cle': {},
+            'boites': {},
+            # Mode accords: réponses comptées à part (voir appliquer_evenement)
+            'par_accord': {},
+            'boites_accords': {}
+        }
+    }
+
+# Répétition espacée: chaque élément (clé, note) est rangé dans une boîte de
+# Leitner, de 1 (à revoir très vite) à NB_BOITES (bien connu)
+NB_BOITES = 5
+
+def element_leitner(cle, note):
+    """Retourne la clé d'un élément dans stats['boites'] (ex: 'sol:Do')"""
+    return f"{cle}:{note}"
+
+def jour_de(ts):
+    """Retourne la date locale d'un horodatage, au format 'AAAA-MM-JJ'"""
+    return time.strftime('%Y-%m-%d', time.localtime(ts))
+
+class Histogramme:
+    """
+    Histogramme de durées à seaux logarithmiques, pour calculer des percentiles.
+    
+    Le seau i contient les valeurs comprises entre RAPPORT**i et
+    RAPPORT**(i+1): la précision est donc de 10 % quelle que soit la durée
+    (1 ms près pour 10 ms, 1 s près pour 10 s). Ajouter une valeur coûte
+    O(1), et la mémoire est bornée (NB_SEAUX seaux au plus).
+    
+    Les comptes sont un dictionnaire {numéro de seau (texte): nombre}, pour
+    être enregistrés tels quels dans le fichier JSON.
+    
+    Attributs:
+        comptes: Dictionnaire des seaux non vides
+        total: Nombre de valeurs ajoutées
+    """
+    RAPPORT = 1.1
+    NB_SEAUX = 128  # Jusqu'à 1.1**128 ms, soit environ 3 minutes
+    
+    def __init__(self, comptes=None):
+        self.comptes = comptes if comptes is not None else {}
+        self.total = sum(self.comptes.values())
+    
+    @staticmethod
+    def seau(valeur):
+        """Retourne le numéro (texte) du seau d'une valeur"""
+        if valeur <= 1:
+            return '0'
+        return str(min(Histogramme.NB_SEAUX - 1, int(math.log(valeur, Histogramme.RAPPORT))))
+    
+    def ajouter(self, valeur):
+        """Ajoute une valeur (en O(1))"""
+        seau = Histogramme.seau(valeur)
+        self.comptes[seau] = self.comptes.get(seau, 0) + 1
+        self.total += 1
+    
+    def percentile(self, p):
+        """
+        Retourne la valeur sous laquelle se trouvent p % des valeurs.
+        
+        Paramètre:
+            p: Pourcentage entre 0 et 100
+        
+        Retourne:
+            float: Milieu du seau concerné, ou None si l'histogramme est vide
+        """
+        if self.total == 0:
+            return None
+        rang = p / 100 * self.total
+        cumul = 0
+        for seau in sorted(self.comptes, key=int):
+            cumul += self.comptes[seau]
+            if cumul >= rang:
+                break
+        return Histogramme.RAPPORT ** (int(seau) + 0.5)
+
+def appliquer_evenement(donnees, evenement):
+    """
+    Met à jour les statistiques agrégées avec un événement du journal.
+    
+    C'est le seul endroit où les compteurs sont modifiés: le jeu l'appelle
+    pour chaque réponse, et charger_donnees() l'appelle pour rejouer la fin
+    du journal. Les deux obtiennent donc toujours le même résultat.
+    
+    Types d'événements:
+        {'type': 'reponse', 'ts', 'cle', 'note', 'choix', 'temps_ms', 'resultat'}
+            resultat vaut 'correct', 'faux' ou 'temps' (choix vaut alors None)
+            En mode accords, 'exercice' vaut 'triades' ou 'intervalles' et
+            'note' est le nom de l'accord ('Ré mineur', 'Tierce')
+        {'type': 'session', 'ts'}
+        {'type': 'record', 'ts', 'score'}
+    
+    Boîtes de Leitner: une bonne réponse fait monter l'élément (clé, note)
+    d'une boîte, une erreur ou un temps écoulé le renvoie dans la boîte 1.
+    
+    Les réponses du mode accords ne comptent pas dans les statistiques des
+    notes: elles ont leurs propres compteurs (par_accord) et leurs propres
+    boîtes (boites_accords).
+    
+    Paramètres:
+        donnees: Dictionnaire des données (modifié sur place)
+        evenement: Dictionnaire décrivant l'événement
+    """
+    stats = donnees['stats']
+    genre = evenement.get('type')
+    if genre == 'reponse' and evenement.get('exercice'):
+        # Accord ou intervalle: ni dans les totaux, ni dans les compteurs des notes
+        correct = evenement['resultat'] == 'correct'
+        compteur = stats.setdefault('par_accord', {}).setdefault(evenement['note'],
+                                                                 {'tentatives': 0, 'reussites': 0})
+        compteur['tentatives'] += 1
+        if correct:
+            compteur['reussites'] += 1
+        boites = stats.setdefault('boites_accords', {})
+        element = element_leitner(evenement['cle'], evenement['note'])
+        boites[element] = min(NB_BOITES, boites.get(element, 1) + 1) if correct else 1
+    elif genre == 'reponse':
+        # Compteurs par note, par clé et par jour
+        # setdefault: les anciens fichiers ne connaissent pas tous ces compteurs
+        compteurs = [
+            stats['par_note'].setdefault(evenement['note'], {'tentatives': 0, 'reussites': 0}),
+            stats.setdefault('par_cle', {}).setdefault(evenement['cle'],
+                                                       {'tentatives': 0, 'reussites': 0}),
+            stats.setdefault('par_jour', {}).setdefault(jour_de(evenement['ts']),
+                                                        {'tentatives': 0, 'reussites': 0}),
+        ]
+        correct = evenement['resultat'] == 'correct'
+        stats['total_notes'] += 1
+        if correct:
+            stats['notes_correctes'] += 1
+        for compteur in compteurs:
+            compteur['tentatives'] += 1
+            if correct:
+                compteur['reussites'] += 1
+        # Temps de réponse (sauf quand le temps est écoulé: le joueur n'a pas répondu)
+        # Un histogramme pour toutes les réponses, un par note et un par clé
+        if evenement['resultat'] != 'temps' and evenement.get('temps_ms') is not None:
+            seau = Histogramme.seau(evenement['temps_ms'])
+            for temps in (stats.setdefault('temps_reponse', {}),
+                          stats.setdefault('temps_par_note', {}).setdefault(evenement['note'], {}),
+                          stats.setdefault('temps_par_cle', {}).setdefault(evenement['cle'], {})):
+                temps[seau] = temps.get(seau, 0) + 1
+        # Boîte de Leitner de l'élément (clé, note)
+        boites = stats.setdefault('boites', {})
+        element = element_leitner(evenement['cle'], evenement['note'])
+        boites[element] = min(NB_BOITES, boites.get(element, 1) + 1) if correct else 1
+    elif genre == 'session':
+        stats['sessions'] += 1
+    elif genre == 'record':
+        donnees['high_score'] = max(donnees['high_score'], evenement['score'])
+
+def lire_journal(chemin_jnl, position=0):
+    """
+    Parcourt les événements du journal écrits après 'position'.
+    
+    Une ligne incomplète (arrêt brutal pendant une écriture) ou illisible
+    est ignorée.
+    
+    Paramètres:
+        chemin_jnl: Chemin du fichier journal
+        position: Position en octets où commence la lecture
+    
+    Retourne:
+        Un générateur de dictionnaires (un par événement)
+    """
+    try:
+        f = open(chemin_jnl, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        # Journal plus court que prévu: il a été recréé, on le relit en entier
+        if position > os.fstat(f.fileno()).st_size:
+            position = 0
+        f.seek(position)
+        for ligne in f:
+            if not ligne.endswith(b'\n'):
+                break  # Dernière ligne tronquée
+            try:
+                yield json.loads(ligne)
+            except ValueError:
+                continue  # Ligne illisible: on passe à la suivante
+
+def lire_journal_depuis(chemin_jnl, position):
+    """
+    Comme lire_journal(), mais 'position' peut tomber au milieu d'une ligne:
+    cette ligne partielle est alors sautée.
+    """
+    if position == 0:
+        yield from lire_journal(chemin_jnl)
+        return
+    try:
+        with open(chemin_jnl, 'rb') as f:
+            f.seek(position - 1)
+            # Si l'octet précédent n'est pas une fin de ligne, aller à la ligne suivante
+            if f.read(1) != b'\n':
+                f.readline()
+            position = f.tell()
+    except OSError:
+        return
+    yield from lire_journal(chemin_jnl, position)
+
+def rejouer_journal(donnees, chemin_jnl, position=0):
+    """
+    Applique aux données les événements du journal écrits après 'position'.
+    
+    Seule la fin du journal est lue (depuis la dernière compaction): le
+    temps de chargement ne dépend pas de la taille de l'historique.
+    
+    Paramètres:
+        donnees: Dictionnaire des données (modifié sur place)
+        chemin_jnl: Chemin du fichier journal
+        position: Position en octets où commence la partie à rejouer
+    
+    Retourne:
+        int: Nombre d'événements rejoués
+    """
+    nombre = 0
+    for evenement in lire_journal(chemin_jnl, position):
+        try:
+            appliquer_evenement(donnees, evenement)
+        except (KeyError, TypeError):
+            continue  # Événement incomplet: on passe au suivant
+        nombre += 1
+    return nombre
+
+def charger_donnees(chemin=None):
+    """
+    Charge les scores et statistiques depuis le fichier JSON.
+    
+    Le fichier JSON est un instantané des compteurs. Les réponses données
+    depuis sa dernière mise à jour sont lues dans le journal
+    (voir chemin_journal) puis ajoutées aux compteurs.
+    
+    Structure des données:
+    {
+        'high_score': int - Meilleur score de tous les temps
         'stats': {
             'total_notes': int - Nombre total de notes jouées
             'notes_correctes': int - Nombre de bonnes réponses
@@ -207,452 +1544,3791 @@ def charger_donnees():
         }
     }
     
+    Paramètres:
+        chemin: Fichier à lire (par défaut FICHIER_DONNEES)
+    
     Retourne:
         dict: Les données chargées ou une structure par défaut si le fichier n'existe pas
     """
+    chemin = chemin or FICHIER_DONNEES
     try:
-        with open(FICHIER_DONNEES, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(chemin, 'r', encoding='utf-8') as f:
+            donnees = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         # Première utilisation ou fichier corrompu: créer une structure vierge
-        return {
-            'high_score': 0,
-            'stats': {
-                'total_notes': 0,
-                'notes_correctes': 0,
-                'sessions': 0,
-                'par_note': {note: {'tentatives': 0, 'reussites': 0} for note in NOTES}
-            }
-        }
+        # (le journal, s'il existe, est alors rejoué depuis le début)
+        donnees = donnees_par_defaut()
+    # Position du journal au moment où l'instantané a été écrit
+    position = donnees.pop('journal', {}).get('position', 0)
+    rejouer_journal(donnees, chemin_journal(chemin), position)
+    return donnees
 
-def sauvegarder_donnees(donnees):
+def sauvegarder_donnees(donnees, chemin=None, position_journal=None):
     """
     Sauvegarde les scores et statistiques dans le fichier JSON.
     
     Le fichier est créé dans le même répertoire que l'exécutable (mode portable).
     Les données sont formatées avec indent=2 pour être lisibles par un humain.
+    L'écriture est atomique: on écrit d'abord un fichier temporaire, puis on
+    le renomme. Un arrêt brutal ne laisse donc jamais un fichier à moitié écrit.
     
-    Paramètre:
+    Si un journal des réponses existe, sa taille est notée dans le fichier:
+    au prochain chargement, seuls les événements écrits après seront rejoués.
+    
+    Paramètres:
         donnees: Dictionnaire contenant high_score et stats à sauvegarder
+        chemin: Fichier de destination (par défaut FICHIER_DONNEES)
+        position_journal: Position du journal déjà comptée dans 'donnees'
+                          (par défaut, sa taille actuelle)
     """
+    chemin = chemin or FICHIER_DONNEES
+    if position_journal is None:
+        try:
+            position_journal = os.path.getsize(chemin_journal(chemin))
+        except OSError:
+            position_journal = None  # Pas de journal: rien à noter
+    if position_journal is not None:
+        donnees = dict(donnees, journal={'position': position_journal})
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
     try:
-        with open(FICHIER_DONNEES, 'w', encoding='utf-8') as f:
+        with open(temporaire, 'w', encoding='utf-8') as f:
             # indent=2: format lisible, ensure_ascii=False: garde les accents
             json.dump(donnees, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())  # S'assurer que les données sont sur le disque
+        os.replace(temporaire, chemin)  # Remplacement atomique de l'ancien fichier
     except Exception as e:
         # En cas d'erreur (permissions, disque plein...), afficher le message
         print(f"Erreur lors de la sauvegarde: {e}")
+        try:
+            os.remove(temporaire)
+        except OSError:
+            pass
 
-# ========================================
-# POSITIONS DES NOTES SUR LA PORTÉE
-# ========================================
-# Ces valeurs définissent où dessiner chaque note (coordonnée Y)
-# Plus le nombre est grand, plus la note est basse à l'écran
+class JournalReponses:
+    """
+    Journal des réponses en ajout seul (une ligne JSON par événement).
+    
+    Chaque réponse coûte une ligne ajoutée en fin de fichier, quelle que soit
+    la taille de l'historique. De temps en temps, compacter() réécrit
+    l'instantané JSON des compteurs (petit, de taille fixe) en notant la
+    position atteinte dans le journal. L'historique complet reste dans le
+    journal, qui n'est jamais réécrit.
+    
+    C'est le stockage par défaut (un seul joueur par fichier). StockageSQLite
+    offre la même interface: charger(), ajouter(), compacter(), resume() et
+    taux_reussite().
+    
+    Attributs:
+        chemin_donnees: Fichier JSON de l'instantané
+        chemin: Fichier journal (.jsonl)
+        identifiant: Identifie le stockage (deux objets sur le même fichier sont égaux)
+        depuis_compaction: Nombre d'événements écrits depuis le dernier instantané
+    """
+    profil = None  # Un seul profil: le fichier entier
+    
+    def __init__(self, chemin_donnees=None):
+        self.chemin_donnees = chemin_donnees or FICHIER_DONNEES
+        self.chemin = chemin_journal(self.chemin_donnees)
+        self.identifiant = ('json', os.path.abspath(self.chemin_donnees))
+        self.depuis_compaction = 0
+        self._etat = None  # Compteurs à jour, chargés à la première écriture
+    
+    def charger(self):
+        """Retourne les données (instantané + fin du journal), voir charger_donnees()"""
+        return charger_donnees(self.chemin_donnees)
+    
+    def resume(self):
+        """Retourne le meilleur score, le nombre de sessions et les totaux de réponses"""
+        donnees = self.charger()
+        stats = donnees['stats']
+        return {'high_score': donnees['high_score'], 'sessions': stats['sessions'],
+                'total_notes': stats['total_notes'], 'notes_correctes': stats['notes_correctes']}
+    
+    def taux_reussite(self, critere):
+        """
+        Retourne les tentatives et réussites regroupées par note, clé ou jour.
+        
+        Paramètre:
+            critere: 'note', 'cle' ou 'jour'
+        
+        Retourne:
+            list: Tuples (valeur, tentatives, reussites) triés par valeur
+        """
+        compteurs = self.charger()['stats'].get('par_' + critere, {})
+        return sorted((valeur, c['tentatives'], c['reussites']) for valeur, c in compteurs.items())
+    
+    def dernieres_reponses(self, nombre):
+        """
+        Retourne les 'nombre' dernières réponses du journal (les plus anciennes d'abord).
+        
+        Seule la fin du fichier est lue, par blocs de plus en plus grands.
+        """
+        try:
+            taille = os.path.getsize(self.chemin)
+        except OSError:
+            return []
+        bloc = 16 * 1024
+        while True:
+            debut = max(0, taille - bloc)
+            # Les réponses du mode accords ne sont pas des notes (voir appliquer_evenement)
+            reponses = [e for e in lire_journal_depuis(self.chemin, debut)
+                        if e.get('type') == 'reponse' and not e.get('exercice')]
+            if len(reponses) >= nombre or debut == 0:
+                return reponses[-nombre:] if nombre else []
+            bloc *= 4
+    
+    def ajouter(self, evenements):
+        """
+        Ajoute des événements à la fin du journal, en une seule écriture.
+        
+        Retourne:
+            bool: True si l'écriture a réussi
+        """
+        premiere_ecriture = self._etat is None
+        if premiere_ecriture:
+            self._etat = charger_donnees(self.chemin_donnees)
+        lignes = [json.dumps(e, ensure_ascii=False) + '\n' for e in evenements]
+        try:
+            with open(self.chemin, 'ab') as f:
+                # Après un arrêt brutal, la dernière ligne peut être incomplète:
+                # on la termine pour que le nouvel événement reste lisible
+                if premiere_ecriture and f.tell() > 0:
+                    with open(self.chemin, 'rb') as lecture:
+                        lecture.seek(-1, os.SEEK_END)
+                        if lecture.read(1) != b'\n':
+                            f.write(b'\n')
+                f.write(''.join(lignes).encode('utf-8'))
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du journal: {e}")
+            return False
+        for evenement in evenements:
+            appliquer_evenement(self._etat, evenement)
+        self.depuis_compaction += len(evenements)
+        return True
+    
+    def compacter(self):
+        """Réécrit l'instantané des compteurs à partir de l'état courant"""
+        if self._etat is None or self.depuis_compaction == 0:
+            return
+        try:
+            position = os.path.getsize(self.chemin)
+        except OSError:
+            return
+        sauvegarder_donnees(self._etat, self.chemin_donnees, position)
+        self.depuis_compaction = 0
 
-# Positions pour la clé de SOL (clé de Sol)
-POSITIONS_NOTES_SOL = {
-    'Do': 370,   # En dessous de la portée (ligne additionnelle)
-    'Ré': 360,   # Juste en dessous de la portée
-    'Mi': 351,   # Sur la première ligne (du bas)
-    'Fa': 343,   # Entre la 1ère et 2ème ligne
-    'Sol': 336,  # Sur la 2ème ligne
-    'La': 329,   # Entre la 2ème et 3ème ligne
-    'Si': 321,   # Sur la 3ème ligne (en haut de la portée)
-}
+class EcrivainDonnees:
+    """
+    Écrit les événements du jeu dans le journal, en arrière-plan et par lots.
+    
+    Le jeu appelle enregistrer() à chaque réponse: l'événement est mis en
+    attente et l'appel retourne tout de suite. Le thread ajoute les événements
+    en attente au journal quand le plus ancien attend depuis 'delai_max_s'
+    secondes, quand 'max_en_attente' événements se sont accumulés, ou quand on
+    appelle vider() (par exemple en quittant). L'instantané des compteurs est
+    réécrit tous les 'seuil_compaction' événements, et à chaque vider().
+    L'affichage n'attend jamais le disque.
+    
+    Un lot que le stockage n'a pas pu écrire (ajouter() retourne False, ou
+    lève une exception imprévue) n'arrête pas le thread: il est remis en
+    attente, pour être réessayé jusqu'à ESSAIS_MAX fois avant d'être abandonné.
+    
+    Attributs:
+        demandes: Nombre d'événements reçus
+        ecritures: Nombre d'ajouts réellement faits dans le journal
+        compactions: Nombre d'instantanés réécrits
+        erreurs: Nombre de lots dont l'écriture a échoué
+        perdus: Nombre d'événements abandonnés après ESSAIS_MAX échecs
+    """
+    ESSAIS_MAX = 3  # Tentatives d'écriture d'un lot avant de l'abandonner
 
-# Positions pour la clé de FA (clé de Fa)
-# Les notes sont différemment placées en clé de Fa
-POSITIONS_NOTES_FA = {
-    'Sol': 299,  # En dessous de la portée (ligne additionnelle)
-    'La': 291,   # Juste en dessous de la portée
-    'Si': 283,   # Sur la première ligne
-    'Do': 270,   # Entre la 1ère et 2ème ligne
-    'Ré': 321,   # Sur la 2ème ligne
-    'Mi': 313,   # Entre la 2ème et 3ème ligne
-    'Fa': 306,   # Sur la 3ème ligne
-}
+    def __init__(self, delai_max_s=2.0, max_en_attente=20, seuil_compaction=500):
+        self.delai_max_s = delai_max_s
+        self.max_en_attente = max_en_attente
+        self.seuil_compaction = seuil_compaction
+        self.demandes = 0
+        self.ecritures = 0
+        self.compactions = 0
+        self.erreurs = 0
+        self.perdus = 0
+        self.latences_ms = collections.deque(maxlen=100)  # Durée des dernières écritures
+        self._condition = threading.Condition()
+        self._en_attente = {}  # Identifiant du stockage -> événements à écrire
+        self._nb_en_attente = 0
+        self._debut_attente = 0.0
+        self._vidage_demande = False
+        self._en_ecriture = False
+        self._stockages = {}  # Identifiant -> stockage (premier objet reçu)
+        self._essais = {}  # Identifiant -> échecs successifs de son lot
+        self._thread = None
+    
+    def enregistrer(self, evenement, stockage=None):
+        """
+        Ajoute un événement au journal (sans attendre l'écriture).
+        
+        Paramètres:
+            evenement: Dictionnaire décrit dans appliquer_evenement()
+            stockage: JournalReponses ou StockageSQLite (par défaut le
+                      journal de FICHIER_DONNEES)
+        """
+        stockage = stockage or JournalReponses()
+        with self._condition:
+            if self._nb_en_attente == 0:
+                self._debut_attente = time.monotonic()
+            # Un seul objet par stockage, pour que ses compteurs restent cohérents
+            stockage = self._stockages.setdefault(stockage.identifiant, stockage)
+            self._en_attente.setdefault(stockage.identifiant, []).append(evenement)
+            self._nb_en_attente += 1
+            self.demandes += 1
+            self._demarrer()
+            self._condition.notify()
+    
+    def vider(self, timeout=5.0):
+        """Écrit immédiatement les événements en attente, met à jour l'instantané et attend"""
+        with self._condition:
+            if self._thread is None:
+                return
+            self._vidage_demande = True
+            self._condition.notify()
+            self._condition.wait_for(lambda: not self._vidage_demande and not self._en_ecriture,
+                                     timeout)
+    
+    def _demarrer(self):
+        """Démarre le thread d'écriture au premier besoin (verrou déjà pris)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._boucle, name="ecriture-donnees", daemon=True)
+            self._thread.start()
+            # Ne rien perdre si le programme se termine sans appeler vider()
+            atexit.register(self.vider)
+    
+    def _pret_a_ecrire(self):
+        """Indique si le lot en attente doit être écrit maintenant (verrou pris)"""
+        if self._vidage_demande:
+            return True
+        if not self._en_attente:
+            return False
+        return (self._nb_en_attente >= self.max_en_attente
+                or time.monotonic() - self._debut_attente >= self.delai_max_s)
+    
+    def _boucle(self):
+        """Boucle du thread: attend qu'un lot soit prêt puis l'écrit"""
+        while True:
+            with self._condition:
+                while not self._pret_a_ecrire():
+                    if not self._en_attente:
+                        self._condition.wait()
+                    else:
+                        # Se réveiller au plus tard à l'échéance du délai
+                        reste = self.delai_max_s - (time.monotonic() - self._debut_attente)
+                        self._condition.wait(max(reste, 0.001))
+                lots = self._en_attente
+                vidage = self._vidage_demande
+                self._en_attente = {}
+                self._nb_en_attente = 0
+                self._en_ecriture = True
+            debut = time.perf_counter()
+            ecritures = compactions = 0
+            rates = {}  # Lots à remettre en attente
+            try:
+                for identifiant, evenements in lots.items():
+                    try:
+                        ecrit = self._stockages[identifiant].ajouter(evenements)
+                    except Exception as e:
+                        print(f"Erreur lors de l'écriture des données: {e!r}")
+                        ecrit = False
+                    if ecrit:
+                        ecritures += 1
+                    else:
+                        # Disque plein, base verrouillée...: réessayé comme une exception
+                        rates[identifiant] = evenements
+                with self._condition:
+                    stockages = list(self._stockages.values())
+                for stockage in stockages:
+                    if stockage.depuis_compaction and (vidage or stockage.depuis_compaction >= self.seuil_compaction):
+                        try:
+                            stockage.compacter()
+                            compactions += 1
+                        except Exception as e:
+                            print(f"Erreur lors de la compaction des données: {e!r}")
+            finally:
+                # Toujours exécuté: sinon vider() attendrait un thread arrêté
+                with self._condition:
+                    for identifiant in lots:
+                        if identifiant not in rates:
+                            self._essais.pop(identifiant, None)
+                    self._remettre_en_attente(rates)
+                    if lots:
+                        self.latences_ms.append((time.perf_counter() - debut) * 1000)
+                    self.ecritures += ecritures
+                    self.compactions += compactions
+                    if vidage:
+                        self._vidage_demande = False
+                    self._en_ecriture = False
+                    self._condition.notify_all()
+    
+    def _remettre_en_attente(self, rates):
+        """Remet les lots en échec devant la file, ou les abandonne après ESSAIS_MAX (verrou pris)"""
+        for identifiant, evenements in rates.items():
+            self.erreurs += 1
+            essais = self._essais.get(identifiant, 0) + 1
+            if essais >= self.ESSAIS_MAX:
+                print(f"{len(evenements)} événement(s) abandonné(s) après {essais} échecs")
+                self._essais.pop(identifiant, None)
+                self.perdus += len(evenements)
+                continue
+            self._essais[identifiant] = essais
+            if self._nb_en_attente == 0:
+                # Nouvel essai après le délai, pas tout de suite
+                self._debut_attente = time.monotonic()
+            # Devant les événements arrivés entre-temps, pour garder l'ordre
+            self._en_attente[identifiant] = evenements + self._en_attente.get(identifiant, [])
+            self._nb_en_attente += len(evenements)
+    
+    def statistiques(self):
+        """Retourne les compteurs d'écriture sous forme de dictionnaire"""
+        with self._condition:
+            latences = sorted(self.latences_ms)
+        return {
+            'demandes': self.demandes,
+            'ecritures': self.ecritures,
+            'ecritures_evitees': self.demandes - self.ecritures,
+            'compactions': self.compactions,
+            'erreurs': self.erreurs,
+            'latence_moy_ms': round(sum(latences) / len(latences), 2) if latences else '-',
+            'latence_max_ms': round(latences[-1], 2) if latences else '-',
+        }
 
 # ========================================
-# CLASSE BOUTON - Pour les boutons cliquables
+# STOCKAGE SQLITE (UN PROFIL PAR ÉLÈVE)
 # ========================================
-class Bouton:
+PROFIL_DEFAUT = 'défaut'  # Profil utilisé sans --profil (reçoit l'ancien fichier JSON)
+
+def chemin_base():
+    """Retourne le chemin de la base SQLite (à côté du fichier de données)"""
+    return os.path.join(os.path.dirname(FICHIER_DONNEES), 'music_game_data.sqlite3')
+
+class StockageSQLite:
     """
-    Représente un bouton cliquable à l'écran.
-    
-    Gère l'affichage, la détection de clic et l'effet de survol.
+    Stockage des réponses dans une base SQLite locale, avec un profil par élève.
+
+    Pensé pour les PC partagés d'une classe: chaque élève a son profil dans
+    la même base. Chaque réponse est une ligne de la table 'reponses'. Des
+    index couvrants (profil, note|cle|jour, correct) permettent de calculer
+    les taux de réussite sans lire toute la table. Le mode WAL laisse l'écran
+    des statistiques lire pendant que le thread d'écriture ajoute des réponses.
+
+    Chaque thread utilise sa propre connexion (SQLite l'impose).
+
+    Attributs:
+        chemin: Fichier de la base
+        profil: Nom de l'élève
+        identifiant: Identifie le stockage (base + profil)
+        depuis_compaction: Toujours 0: SQLite tient ses index à jour tout seul
     """
-    def __init__(self, x, y, largeur, hauteur, texte, index):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS profils (
+            id INTEGER PRIMARY KEY,
+            nom TEXT UNIQUE NOT NULL,
+            high_score INTEGER NOT NULL DEFAULT 0,
+            sessions INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS reponses (
+            id INTEGER PRIMARY KEY,
+            profil INTEGER NOT NULL REFERENCES profils(id),
+            ts REAL NOT NULL,
+            jour TEXT NOT NULL,
+            cle TEXT NOT NULL,
+            note TEXT NOT NULL,
+            choix TEXT,
+            temps_ms INTEGER,
+            resultat TEXT NOT NULL,
+            correct INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS reponses_par_note ON reponses(profil, note, correct);
+        CREATE INDEX IF NOT EXISTS reponses_par_cle ON reponses(profil, cle, correct);
+        CREATE INDEX IF NOT EXISTS reponses_par_jour ON reponses(profil, jour, correct);
+        CREATE INDEX IF NOT EXISTS reponses_par_temps ON reponses(profil, temps_ms, resultat);
+        CREATE INDEX IF NOT EXISTS reponses_temps_detail ON reponses(profil, note, cle, temps_ms, resultat);
+        CREATE INDEX IF NOT EXISTS reponses_par_element ON reponses(profil, cle, note);
+        -- Réponses du mode accords: mêmes colonnes, 'note' est le nom de l'accord
+        CREATE TABLE IF NOT EXISTS reponses_accords (
+            id INTEGER PRIMARY KEY,
+            profil INTEGER NOT NULL REFERENCES profils(id),
+            ts REAL NOT NULL,
+            jour TEXT NOT NULL,
+            cle TEXT NOT NULL,
+            note TEXT NOT NULL,
+            choix TEXT,
+            temps_ms INTEGER,
+            resultat TEXT NOT NULL,
+            correct INTEGER NOT NULL,
+            exercice TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS accords_par_element ON reponses_accords(profil, cle, note);
+        -- Compteurs importés d'un ancien fichier JSON (sans le détail des réponses)
+        CREATE TABLE IF NOT EXISTS anterieur (
+            profil INTEGER NOT NULL REFERENCES profils(id),
+            note TEXT NOT NULL,
+            tentatives INTEGER NOT NULL,
+            reussites INTEGER NOT NULL,
+            PRIMARY KEY (profil, note)
+        );
+    """
+    INSERTION = ("INSERT INTO reponses(profil, ts, jour, cle, note, choix, temps_ms, resultat, correct)"
+                 " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    INSERTION_ACCORD = ("INSERT INTO reponses_accords(profil, ts, jour, cle, note, choix, temps_ms,"
+                        " resultat, correct, exercice) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    COLONNES = {'note': 'note', 'cle': 'cle', 'jour': 'jour'}  # Critères de taux_reussite()
+    depuis_compaction = 0
+
+    def __init__(self, chemin=None, profil=PROFIL_DEFAUT):
+        self.chemin = chemin or chemin_base()
+        self.profil = profil
+        self.identifiant = ('sqlite', os.path.abspath(self.chemin), profil)
+        self._local = threading.local()  # Une connexion par thread
+        self._id_profil = None
+        self._verrou = threading.Lock()
+
+    def _connexion(self):
+        """Retourne la connexion du thread courant (créée au premier appel)"""
+        cnx = getattr(self._local, 'cnx', None)
+        if cnx is None:
+            cnx = sqlite3.connect(self.chemin, timeout=5.0)
+            cnx.execute("PRAGMA journal_mode=WAL")
+            cnx.execute("PRAGMA synchronous=NORMAL")  # Sûr en mode WAL, bien plus rapide
+            cnx.executescript(self.SCHEMA)
+            self._local.cnx = cnx
+        return cnx
+
+    def _profil(self):
+        """Retourne l'id du profil, en le créant (et en migrant le JSON) au besoin"""
+        with self._verrou:
+            if self._id_profil is None:
+                cnx = self._connexion()
+                with cnx:
+                    nouveau = cnx.execute("INSERT OR IGNORE INTO profils(nom) VALUES (?)",
+                                          (self.profil,)).rowcount == 1
+                self._id_profil = cnx.execute("SELECT id FROM profils WHERE nom = ?",
+                                              (self.profil,)).fetchone()[0]
+                # Première ouverture: reprendre l'historique de l'ancien fichier JSON
+                if nouveau and self.profil == PROFIL_DEFAUT:
+                    self.importer_json()
+            return self._id_profil
+
+    def importer_json(self, chemin_json=None):
         """
-        Initialise un nouveau bouton.
-        
+        Importe dans ce profil les données d'un fichier JSON (et de son journal).
+
+        Les réponses du journal deviennent des lignes de la table 'reponses'.
+        Les compteurs plus anciens que le journal n'ont pas de détail: ils
+        sont gardés dans la table 'anterieur' et comptent seulement dans les
+        taux par note.
+
         Paramètres:
-            x, y: Position du coin supérieur gauche du bouton
-            largeur, hauteur: Dimensions du bouton en pixels
-            texte: Le texte affiché sur le bouton
-            index: Un numéro pour identifier le bouton (0-6 pour les notes)
+            chemin_json: Fichier à importer (par défaut FICHIER_DONNEES)
+
+        Retourne:
+            int: Nombre de réponses importées
         """
-        # pygame.Rect crée un rectangle pour détecter les clics
-        self.rect = pygame.Rect(x, y, largeur, hauteur)
-        self.texte = texte          # Le texte à afficher (ex: "Do", "Ré"...)
-        self.index = index          # L'identifiant du bouton
-        self.survole = False        # True si la souris est sur le bouton
-        
-    def dessiner(self, surface):
+        chemin_json = chemin_json or FICHIER_DONNEES
+        chemin_jnl = chemin_journal(chemin_json)
+        if not os.path.exists(chemin_json) and not os.path.exists(chemin_jnl):
+            return 0
+        id_profil = self._id_profil if self._id_profil is not None else self._profil()
+        donnees = charger_donnees(chemin_json)
+        reponses = [e for e in lire_journal(chemin_jnl) if e.get('type') == 'reponse']
+        # Compteurs du journal seul, pour isoler ce qui est plus ancien
+        detail = donnees_par_defaut()
+        for evenement in reponses:
+            appliquer_evenement(detail, evenement)
+        cnx = self._connexion()
+        with cnx:
+            self._inserer(cnx, id_profil, reponses)
+            for note, compteur in donnees['stats']['par_note'].items():
+                dans_journal = detail['stats']['par_note'].get(note, {'tentatives': 0, 'reussites': 0})
+                tentatives = max(0, compteur['tentatives'] - dans_journal['tentatives'])
+                reussites = max(0, compteur['reussites'] - dans_journal['reussites'])
+                if tentatives:
+                    cnx.execute("INSERT OR REPLACE INTO anterieur VALUES (?, ?, ?, ?)",
+                                (id_profil, note, tentatives, reussites))
+            cnx.execute("UPDATE profils SET high_score = MAX(high_score, ?),"
+                        " sessions = sessions + ? WHERE id = ?",
+                        (donnees['high_score'], donnees['stats']['sessions'], id_profil))
+        return len(reponses)
+
+    @staticmethod
+    def _ligne(id_profil, e):
+        """Convertit un événement 'reponse' en ligne de la table 'reponses'"""
+        return (id_profil, e['ts'], jour_de(e['ts']), e['cle'], e['note'], e.get('choix'),
+                e.get('temps_ms'), e['resultat'], int(e['resultat'] == 'correct'))
+
+    def _inserer(self, cnx, id_profil, reponses):
+        """Insère des réponses: les notes dans 'reponses', les accords dans 'reponses_accords'"""
+        cnx.executemany(self.INSERTION, [self._ligne(id_profil, e) for e in reponses
+                                         if not e.get('exercice')])
+        cnx.executemany(self.INSERTION_ACCORD, [self._ligne(id_profil, e) + (e['exercice'],)
+                                                for e in reponses if e.get('exercice')])
+
+    def ajouter(self, evenements):
         """
-        Dessine le bouton sur la surface donnée.
-        
-        Paramètre:
-            surface: La fenêtre Pygame où dessiner
+        Enregistre des événements dans une seule transaction.
+
+        Retourne:
+            bool: True si l'écriture a réussi
         """
-        # Choisir la couleur : bleu si survolé, gris sinon
-        couleur = BLEU if self.survole else (150, 150, 150)
-        # Dessiner le rectangle rempli avec des coins arrondis
-        pygame.draw.rect(surface, couleur, self.rect, border_radius=10)
-        # Dessiner le contour noir du bouton
-        pygame.draw.rect(surface, NOIR, self.rect, 3, border_radius=10)
-        
-        # Afficher le texte au centre du bouton
-        # render() crée une image du texte, True = antialiasing (lissage)
-        texte_surface = police_petite.render(self.texte, True, BLANC if self.survole else NOIR)
-        # Centrer le texte dans le rectangle du bouton
-        texte_rect = texte_surface.get_rect(center=self.rect.center)
-        # blit() = coller l'image du texte sur la surface
-        surface.blit(texte_surface, texte_rect)
-        
-    def verifier_clic(self, pos):
+        try:
+            id_profil = self._profil()
+            reponses = [e for e in evenements if e['type'] == 'reponse']
+            sessions = sum(1 for e in evenements if e['type'] == 'session')
+            record = max((e['score'] for e in evenements if e['type'] == 'record'), default=0)
+            cnx = self._connexion()
+            with cnx:
+                self._inserer(cnx, id_profil, reponses)
+                if sessions or record:
+                    cnx.execute("UPDATE profils SET high_score = MAX(high_score, ?),"
+                                " sessions = sessions + ? WHERE id = ?", (record, sessions, id_profil))
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture dans la base: {e}")
+            return False
+        return True
+
+    def compacter(self):
+        """Rien à compacter: les index de SQLite sont toujours à jour"""
+
+    def resume(self):
+        """Retourne le meilleur score, le nombre de sessions et les totaux de réponses"""
+        id_profil = self._profil()
+        high_score, sessions = self._connexion().execute(
+            "SELECT high_score, sessions FROM profils WHERE id = ?", (id_profil,)).fetchone()
+        par_note = self.taux_reussite('note')
+        return {'high_score': high_score, 'sessions': sessions,
+                'total_notes': sum(t for _, t, _ in par_note),
+                'notes_correctes': sum(r for _, _, r in par_note)}
+
+    def taux_reussite(self, critere):
         """
-        Vérifie si la position donnée est à l'intérieur du bouton.
-        
+        Retourne les tentatives et réussites regroupées par note, clé ou jour.
+
+        La requête ne lit que l'index du critère (index couvrant).
+
         Paramètre:
-            pos: Tuple (x, y) de la position de la souris
-        
+            critere: 'note', 'cle' ou 'jour'
+
         Retourne:
-            True si le clic est sur le bouton, False sinon
+            list: Tuples (valeur, tentatives, reussites) triés par valeur
         """
-        return self.rect.collidepoint(pos)  # Méthode de pygame.Rect
-        
-    def verifier_survol(self, pos):
+        colonne = self.COLONNES[critere]
+        id_profil = self._profil()
+        cnx = self._connexion()
+        resultats = {valeur: [tentatives, reussites] for valeur, tentatives, reussites in cnx.execute(
+            f"SELECT {colonne}, COUNT(*), SUM(correct) FROM reponses"
+            f" WHERE profil = ? GROUP BY {colonne}", (id_profil,))}
+        if critere == 'note':
+            for note, tentatives, reussites in cnx.execute(
+                    "SELECT note, tentatives, reussites FROM anterieur WHERE profil = ?", (id_profil,)):
+                compteur = resultats.setdefault(note, [0, 0])
+                compteur[0] += tentatives
+                compteur[1] += reussites
+        return sorted((valeur, t, r) for valeur, (t, r) in resultats.items())
+
+    def charger(self):
+        """Retourne les données du profil, dans le même format que charger_donnees()"""
+        donnees = donnees_par_defaut()
+        resume = self.resume()
+        donnees['high_score'] = resume['high_score']
+        stats = donnees['stats']
+        stats['sessions'] = resume['sessions']
+        stats['total_notes'] = resume['total_notes']
+        stats['notes_correctes'] = resume['notes_correctes']
+        for critere in ('note', 'cle', 'jour'):
+            for valeur, tentatives, reussites in self.taux_reussite(critere):
+                stats['par_' + critere][valeur] = {'tentatives': tentatives, 'reussites': reussites}
+        # Histogramme des temps de réponse: une ligne par durée distincte (index couvrant)
+        temps = stats['temps_reponse']
+        for temps_ms, nombre in self._connexion().execute(
+                "SELECT temps_ms, COUNT(*) FROM reponses WHERE profil = ? AND resultat != 'temps'"
+                " AND temps_ms IS NOT NULL GROUP BY temps_ms", (self._profil(),)):
+            seau = Histogramme.seau(temps_ms)
+            temps[seau] = temps.get(seau, 0) + nombre
+        # Par note et par clé
+        for note, cle, temps_ms, nombre in self._connexion().execute(
+                "SELECT note, cle, temps_ms, COUNT(*) FROM reponses WHERE profil = ?"
+                " AND resultat != 'temps' AND temps_ms IS NOT NULL GROUP BY note, cle, temps_ms",
+                (self._profil(),)):
+            seau = Histogramme.seau(temps_ms)
+            for temps in (stats['temps_par_note'].setdefault(note, {}),
+                          stats['temps_par_cle'].setdefault(cle, {})):
+                temps[seau] = temps.get(seau, 0) + nombre
+        stats['boites'] = self.boites()
+        # Mode accords: compteurs et boîtes à part
+        for nom, tentatives, reussites in self._connexion().execute(
+                "SELECT note, COUNT(*), SUM(correct) FROM reponses_accords WHERE profil = ?"
+                " GROUP BY note", (self._profil(),)):
+            stats['par_accord'][nom] = {'tentatives': tentatives, 'reussites': reussites}
+        stats['boites_accords'] = self.boites('reponses_accords')
+        return donnees
+    
+    def boites(self, table='reponses'):
         """
-        Met à jour l'état de survol selon la position de la souris.
+        Retourne la boîte de Leitner de chaque élément (clé, note) du profil.
+        
+        La boîte vaut 1 + le nombre de bonnes réponses d'affilée les plus
+        récentes (au plus NB_BOITES): c'est le résultat de appliquer_evenement().
+        Pour chaque élément, seules les dernières réponses sont lues, dans
+        l'index (profil, cle, note).
         
         Paramètre:
-            pos: Tuple (x, y) de la position de la souris
+            table: 'reponses' (notes) ou 'reponses_accords' (mode accords)
+        
+        Retourne:
+            dict: {'sol:Do': boite, ...}
         """
-        # Met self.survole à True si la souris est sur le bouton
-        self.survole = self.rect.collidepoint(pos)
+        id_profil = self._profil()
+        cnx = self._connexion()
+        boites = {}
+        for cle, note in cnx.execute(f"SELECT DISTINCT cle, note FROM {table} WHERE profil = ?",
+                                     (id_profil,)).fetchall():
+            serie = 0
+            for (correct,) in cnx.execute(
+                    f"SELECT correct FROM {table} WHERE profil = ? AND cle = ? AND note = ?"
+                    " ORDER BY id DESC LIMIT ?", (id_profil, cle, note, NB_BOITES - 1)):
+                if not correct:
+                    break
+                serie += 1
+            boites[element_leitner(cle, note)] = 1 + serie
+        return boites
+    
+    def dernieres_reponses(self, nombre):
+        """Retourne les 'nombre' dernières réponses du profil (les plus anciennes d'abord)"""
+        lignes = self._connexion().execute(
+            "SELECT ts, cle, note, choix, temps_ms, resultat FROM reponses WHERE profil = ?"
+            " ORDER BY id DESC LIMIT ?", (self._profil(), nombre)).fetchall()
+        return [{'type': 'reponse', 'ts': ts, 'cle': cle, 'note': note, 'choix': choix,
+                 'temps_ms': temps_ms, 'resultat': resultat}
+                for ts, cle, note, choix, temps_ms, resultat in reversed(lignes)]
+
+    def profils(self):
+        """Retourne les noms de tous les profils de la base, triés"""
+        return [nom for (nom,) in self._connexion().execute("SELECT nom FROM profils ORDER BY nom")]
+
+    def fermer(self):
+        """Ferme la connexion du thread courant"""
+        cnx = getattr(self._local, 'cnx', None)
+        if cnx is not None:
+            cnx.close()
+            self._local.cnx = None
+
 
 # ========================================
-# CLASSE NOTE - Représente une note musicale
+# STATISTIQUES EN MÉMOIRE
 # ========================================
-class Note:
+class ModeleStats:
     """
-    Représente une note de musique affichée sur la portée.
-    
-    Gère la position et l'affichage d'une note selon la clé musicale.
+    Statistiques du joueur gardées en mémoire et mises à jour à chaque réponse.
+
+    Chaque réponse coûte O(1): les compteurs sont ceux de appliquer_evenement()
+    (total, par note, par clé, par jour, histogramme des temps de réponse),
+    plus une fenêtre glissante des FENETRE_REPONSES dernières réponses.
+    L'écran des statistiques lit ce modèle sans toucher au disque.
+
+    Attributs:
+        donnees: Dictionnaire des données (même format que charger_donnees())
+        identifiant: Identifiant du stockage d'origine (None si aucun)
+        version: Augmente à chaque changement (pour ne redessiner qu'au besoin)
     """
-    def __init__(self, nom, cle='sol'):
+    FENETRE_REPONSES = 50  # Taux de réussite sur les 50 dernières réponses
+    FENETRE_JOURS = 7  # Taux de réussite sur les 7 derniers jours
+
+    def __init__(self, donnees=None, dernieres_reponses=(), identifiant=None):
+        self.donnees = donnees if donnees is not None else donnees_par_defaut()
+        self.identifiant = identifiant
+        self.version = 0
+        self.temps = Histogramme(self.donnees['stats'].setdefault('temps_reponse', {}))
+        # Fenêtre glissante: True pour une bonne réponse, et son total tenu à jour
+        self._recentes = collections.deque(maxlen=self.FENETRE_REPONSES)
+        self._recentes_correctes = 0
+        for evenement in dernieres_reponses:
+            self._glisser(evenement['resultat'] == 'correct')
+
+    @classmethod
+    def depuis_stockage(cls, stockage):
+        """Crée le modèle à partir des compteurs et des dernières réponses d'un stockage"""
+        return cls(stockage.charger(), stockage.dernieres_reponses(cls.FENETRE_REPONSES),
+                   stockage.identifiant)
+
+    def _glisser(self, correct):
+        """Ajoute une réponse à la fenêtre glissante (la plus ancienne sort)"""
+        if len(self._recentes) == self._recentes.maxlen and self._recentes[0]:
+            self._recentes_correctes -= 1
+        self._recentes.append(correct)
+        if correct:
+            self._recentes_correctes += 1
+
+    def appliquer(self, evenement):
+        """Met à jour le modèle avec un événement (voir appliquer_evenement)"""
+        appliquer_evenement(self.donnees, evenement)
+        if evenement['type'] == 'reponse' and not evenement.get('exercice'):
+            self._glisser(evenement['resultat'] == 'correct')
+            # L'histogramme partage ses comptes avec les données: seul le total change ici
+            if evenement['resultat'] != 'temps' and evenement.get('temps_ms') is not None:
+                self.temps.total += 1
+        self.version += 1
+
+    def resume(self):
+        """Retourne le meilleur score, le nombre de sessions et les totaux de réponses"""
+        stats = self.donnees['stats']
+        return {'high_score': self.donnees['high_score'], 'sessions': stats['sessions'],
+                'total_notes': stats['total_notes'], 'notes_correctes': stats['notes_correctes']}
+
+    def taux_reussite(self, critere):
+        """Comme le taux_reussite() des stockages, mais sans accès au disque"""
+        compteurs = self.donnees['stats'].get('par_' + critere, {})
+        return sorted((valeur, c['tentatives'], c['reussites']) for valeur, c in compteurs.items())
+
+    def fenetre_reponses(self):
+        """Retourne (réponses, bonnes réponses) parmi les FENETRE_REPONSES dernières"""
+        return len(self._recentes), self._recentes_correctes
+
+    def temps_par(self, critere, valeur):
         """
-        Crée une nouvelle note.
+        Retourne l'histogramme des temps de réponse (ms) d'une note ou d'une clé.
         
         Paramètres:
-            nom: Le nom de la note ('Do', 'Ré', 'Mi', etc.)
-            cle: La clé musicale ('sol' ou 'fa')
+            critere: 'note' ou 'cle'
+            valeur: Nom de la note ('Do') ou de la clé ('sol')
         """
-        self.nom = nom
-        self.cle = cle
-        self.x = LARGEUR // 2
-        if cle == 'sol':
-            self.y = POSITIONS_NOTES_SOL[nom]
-        else:
-            self.y = POSITIONS_NOTES_FA[nom]
-        self.rayon = 15
-        
-    def dessiner(self, surface):
-        # Dessiner une ligne additionnelle si la note est en dehors de la portée
-        # En clé de Sol: seul le Do (370) nécessite une ligne en dessous
-        # En clé de Fa: le Sol nécessite une ligne en dessous, le Do une ligne au-dessus
-        if self.y >= 370:  # Note en dessous de la portée
-            # Ligne additionnelle en dessous
-            pygame.draw.line(surface, NOIR, (self.x - 17, self.y), (self.x + 17, self.y), 2)
-        elif self.y <= 270:  # Note au-dessus de la portée (Do en clé de Fa à y=270)
-            # Ligne additionnelle au-dessus
-            pygame.draw.line(surface, NOIR, (self.x - 17, self.y), (self.x + 17, self.y), 2)
-        
-        # Dessiner une noire avec le caractère Bravura U+E1D3 (noteQuarterUp)
-        # C'est une noire complète (tête remplie + tige) professionnelle
-        note_noire = police_musicale.render('\U0000E1D3', True, NOIR)
-        rect_note = note_noire.get_rect()
-        rect_note.centery = self.y
-        rect_note.centerx = self.x
-        surface.blit(note_noire, rect_note)
+        return Histogramme(self.donnees['stats'].get('temps_par_' + critere, {}).get(valeur, {}))
+    
+    def fenetre_jours(self, maintenant=None):
+        """Retourne (réponses, bonnes réponses) des FENETRE_JOURS derniers jours"""
+        maintenant = time.time() if maintenant is None else maintenant
+        par_jour = self.donnees['stats'].get('par_jour', {})
+        tentatives = reussites = 0
+        for i in range(self.FENETRE_JOURS):
+            compteur = par_jour.get(jour_de(maintenant - i * 86400))
+            if compteur:
+                tentatives += compteur['tentatives']
+                reussites += compteur['reussites']
+        return tentatives, reussites
 
-class Jeu:
+# ========================================
+# RÉPÉTITION ESPACÉE (BOÎTES DE LEITNER)
+# ========================================
+class PlanificateurLeitner:
     """
-    Classe principale du jeu qui gère la logique, le score, les combos et les statistiques.
+    Choisit la prochaine note à travailler, d'après les boîtes de Leitner.
+    
+    Une note ratée (boîte 1) revient deux questions plus tard; une note bien
+    connue (boîte NB_BOITES) ne revient qu'après une trentaine de questions.
+    L'élève passe donc son temps sur les notes qu'il ne connaît pas encore.
+    
+    Les éléments (clé, note) attendent dans un tas (heapq), triés par
+    numéro de question d'échéance: choisir et reprogrammer une note coûte
+    O(log n), même avec beaucoup d'octaves, d'altérations et de clés.
+    
+    Les boîtes sont lues dans stats['boites'] (stats['boites_accords'] en
+    mode accords), tenu à jour par appliquer_evenement(): le planificateur
+    ne modifie pas les statistiques.
     
     Attributs:
-        score: Score actuel de la partie
-        niveau: Niveau de difficulté actuel (augmente avec le score)
-        combo: Nombre de bonnes réponses consécutives
-        high_score: Meilleur score enregistré
-        donnees: Dictionnaire contenant toutes les statistiques sauvegardées
+        elements: Liste des éléments (clé, note) possibles
+        question: Nombre de notes choisies depuis la création
     """
-    def __init__(self, mode_cle='mixte'):
-        # Variables de jeu de base
-        self.score = 0
-        self.niveau = 1
-        self.note_actuelle = None
-        self.mode_cle = mode_cle  # 'sol', 'fa', ou 'mixte'
-        self.cle_actuelle = 'sol'
-        self.temps_reponse = 0
-        self.max_temps = 10000  # 10 secondes au niveau 1
-        self.message = ""
-        self.couleur_message = NOIR
-        self.temps_message = 0
-        self.son_active = True  # Son activé par défaut
+    # Nombre de questions avant de revoir un élément, selon sa boîte (1 à NB_BOITES)
+    INTERVALLES = (2, 4, 8, 16, 32)
+    MIN_TENTATIVES = 3  # Réponses nécessaires pour estimer une note sans boîte
+    
+    def __init__(self, elements, stats, rng=None, boites='boites'):
+        """
+        Paramètres:
+            elements: Éléments (clé, note) à faire travailler
+            stats: donnees['stats'] du joueur (lu, jamais modifié)
+            rng: Générateur aléatoire (par défaut le module random)
+            boites: Clé des boîtes dans stats ('boites' ou 'boites_accords')
+        """
+        self.elements = list(elements)
+        self._possibles = set(self.elements)
+        self.stats = stats
+        self.boites = boites
+        self.rng = rng or random
+        self.question = 0
+        self._tas = []  # Entrées [échéance, numéro, élément]
+        self._entrees = {}  # Élément -> son entrée valide dans le tas
+        self._numero = 0  # Départage les échéances égales (ordre d'arrivée)
+        self._en_cours = None  # Élément choisi et pas encore noté
+        self._dernier = None  # Dernier élément posé
+        # Départ: les notes faibles passent en premier, dans un ordre mélangé
+        for element in self.elements:
+            self._programmer(element, self.rng.random() * self._intervalle(self.boite_initiale(element)))
+    
+    def boite_initiale(self, element):
+        """
+        Retourne la boîte d'un élément au début de la partie.
         
-        # Système de combo: récompense les séries de bonnes réponses
-        # Le combo augmente à chaque bonne réponse et se réinitialise à 0 en cas d'erreur
-        self.combo = 0  # Combo actuel
-        self.meilleur_combo = 0  # Meilleur combo de cette session
+        Sans boîte enregistrée (anciennes données), la boîte est estimée à
+        partir du taux de réussite de la note dans par_note.
+        """
+        boite = self.stats.get(self.boites, {}).get(element_leitner(*element))
+        if boite is not None:
+            return boite
+        compteur = self.stats.get('par_note', {}).get(element[1])
+        if not compteur or compteur['tentatives'] < self.MIN_TENTATIVES:
+            return 1
+        taux = compteur['reussites'] / compteur['tentatives']
+        return 1 + int(taux * (NB_BOITES - 1))
+    
+    def _intervalle(self, boite):
+        return self.INTERVALLES[min(max(boite, 1), NB_BOITES) - 1]
+    
+    def _programmer(self, element, echeance):
+        """Place (ou replace) un élément dans le tas"""
+        ancienne = self._entrees.get(element)
+        if ancienne is not None:
+            ancienne[2] = None  # Entrée périmée: ignorée quand elle sortira du tas
+        entree = [echeance, self._numero, element]
+        self._numero += 1
+        self._entrees[element] = entree
+        heapq.heappush(self._tas, entree)
+    
+    def _extraire(self):
+        """Retire et retourne l'élément dont l'échéance est la plus proche"""
+        while self._tas:
+            element = heapq.heappop(self._tas)[2]
+            if element is not None:
+                del self._entrees[element]
+                return element
+        raise IndexError("aucun élément à réviser")
+    
+    def suivant(self):
+        """
+        Choisit l'élément à poser maintenant.
         
-        # Charger les données sauvegardées (high score et statistiques)
-        self.donnees = charger_donnees()  # Charge depuis le fichier JSON
-        self.high_score = self.donnees['high_score']  # Meilleur score de tous les temps
+        C'est celui dont l'échéance est la plus proche (ou la plus dépassée),
+        sauf s'il vient d'être posé: on ne pose pas deux fois la même note
+        d'affilée quand il y a un autre choix.
         
-        self.boutons = self.creer_boutons()
-        self.nouvelle_note()
+        Retourne:
+            tuple: (cle, note)
+        """
+        if self._en_cours is not None:
+            # Élément pas noté (nouvelle note demandée sans réponse): il revient bientôt
+            self._programmer(self._en_cours, self.question + 1)
+        self.question += 1
+        element = self._extraire()
+        if element == self._dernier and self._tas:
+            autre = self._extraire()
+            self._programmer(element, self.question + 1)
+            element = autre
+        self._en_cours = self._dernier = element
+        return element
     
-    def creer_boutons(self):
-        """Crée les boutons pour chaque note"""
-        boutons = []
-        largeur_bouton = 80
-        hauteur_bouton = 50
-        x_debut = 50
-        y = 450
-        espacement = 100
+    def noter(self, element):
+        """
+        Reprogramme un élément qui vient d'être noté.
         
-        for i, note in enumerate(NOTES):
-            x = x_debut + i * espacement
-            bouton = Bouton(x, y, largeur_bouton, hauteur_bouton, note, i)
-            boutons.append(bouton)
+        À appeler après appliquer_evenement(): la boîte lue est déjà à jour.
+        Un peu de hasard (±25 %) évite de reposer les notes toujours dans
+        le même ordre.
+        """
+        if element not in self._possibles:
+            return  # Élément hors du mode de jeu actuel
+        boite = self.stats.get(self.boites, {}).get(element_leitner(*element), 1)
+        intervalle = self._intervalle(boite) * (0.75 + 0.5 * self.rng.random())
+        self._programmer(element, self.question + intervalle)
+        if element == self._en_cours:
+            self._en_cours = None
+
+# ========================================
+# CACHE DISQUE DES SONS SYNTHÉTISÉS
+# ========================================
+# Version de l'algorithme de synthèse: à incrémenter dès que synthetiser()
+# produit un résultat différent, pour invalider tous les sons en cache
+VERSION_SYNTHESE = 1
+
+def chemin_cache_sons():
+    """Retourne le dossier du cache des sons (à côté du fichier de données)"""
+    return os.path.join(os.path.dirname(FICHIER_DONNEES), 'music_game_cache')
+
+class CacheSons:
+    """
+    Cache disque des tampons PCM 16 bits produits par synthetiser().
+
+    Chaque son est stocké brut dans un fichier nommé d'après l'empreinte de
+    tous ses paramètres de synthèse (fréquence, durée, fréquence
+    d'échantillonnage, canaux, enveloppe, harmoniques du timbre et
+    VERSION_SYNTHESE). Changer un paramètre change donc le nom du fichier:
+    les anciens sons ne sont plus jamais relus et finissent évincés.
+
+    Les fichiers sont relus par projection mémoire (np.memmap) et passés tels
+    quels à pygame.mixer.Sound(buffer=...), sans aucun recalcul. Un fichier
+    qui n'a pas la taille attendue (écriture interrompue) est supprimé et le
+    son est recalculé.
+
+    Le préchargement (BanqueSons.prechauffer) et le jeu peuvent lire et
+    écrire le cache en même temps: l'inventaire est protégé par un verrou et
+    chaque thread écrit dans son propre fichier temporaire.
+
+    Attributs:
+        succes, echecs, evictions: Compteurs d'utilisation du cache
+        taille_max: Taille maximale du cache en octets (les plus anciens sont supprimés)
+    """
+    EXTENSION = '.pcm'
+
+    def __init__(self, dossier=None, taille_max=32 * 1024 * 1024):
+        self.dossier = dossier or chemin_cache_sons()
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self._tailles = None  # {nom de fichier: taille}, lu une fois sur le disque
+        self._verrou = threading.Lock()  # Protège _tailles (voir _inventaire) et les compteurs
+
+    @staticmethod
+    def empreinte(frequence, duree, sample_rate, canaux, enveloppe, timbre):
+        """Retourne la clé (hexadécimale) identifiant un son par son contenu"""
+        parametres = (VERSION_SYNTHESE, round(frequence, 4), duree, sample_rate,
+                      canaux, tuple(enveloppe), TIMBRES[timbre])
+        return hashlib.sha1(repr(parametres).encode('utf-8')).hexdigest()
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, cle + CacheSons.EXTENSION)
+
+    def _inventaire(self):
+        """Retourne les tailles des fichiers du cache, lues une seule fois (verrou déjà pris)"""
+        if self._tailles is None:
+            self._tailles = {}
+            try:
+                for entree in os.scandir(self.dossier):
+                    if entree.name.endswith(CacheSons.EXTENSION):
+                        self._tailles[entree.name] = entree.stat().st_size
+            except OSError:
+                pass  # Dossier absent: le cache est vide
+        return self._tailles
+
+    def charger(self, cle, attendu=None):
+        """
+        Retourne le tampon PCM projeté en mémoire, ou None s'il est absent.
+
+        La date de modification du fichier est rafraîchie: c'est elle qui
+        détermine l'ordre d'éviction (le moins récemment utilisé part en premier).
+
+        Paramètres:
+            cle: Empreinte du son (voir empreinte)
+            attendu: Nombre de valeurs int16 attendues (échantillons x canaux);
+                     un fichier d'une autre taille est supprimé
+        """
+        chemin = self._chemin(cle)
+        try:
+            tampon = np.memmap(chemin, dtype=np.int16, mode='r')
+            valide = attendu is None or tampon.size == attendu
+        except ValueError:
+            valide = False  # Fichier vide ou d'un nombre impair d'octets
+        except OSError:
+            # Fichier absent ou illisible
+            self._compter(False)
+            return None
+        if not valide:
+            # Fichier tronqué: la projection est libérée avant de le supprimer
+            tampon = None
+            self._supprimer(os.path.basename(chemin))
+            self._compter(False)
+            return None
+        try:
+            os.utime(chemin)
+        except OSError:
+            pass  # L'ordre d'éviction sera seulement moins précis
+        self._compter(True)
+        return tampon
+
+    def _compter(self, succes):
+        """Compte une lecture réussie ou manquée (sous le verrou: le préchargement lit aussi)"""
+        with self._verrou:
+            if succes:
+                self.succes += 1
+            else:
+                self.echecs += 1
+
+    def _supprimer(self, nom):
+        """Supprime un fichier du cache et l'oublie dans l'inventaire"""
+        try:
+            os.remove(os.path.join(self.dossier, nom))
+        except OSError:
+            pass
+        with self._verrou:
+            self._inventaire().pop(nom, None)
+
+    def stocker(self, cle, tampon):
+        """
+        Écrit un tampon PCM dans le cache puis évince si la taille maximale est dépassée.
+
+        L'écriture passe par un fichier temporaire renommé ensuite, pour
+        qu'un autre processus ne lise jamais un son à moitié écrit. Le nom du
+        fichier temporaire contient le processus et le thread: deux écritures
+        simultanées du même son ne se mélangent pas.
+        Une erreur disque n'empêche pas le jeu de fonctionner: le son n'est
+        simplement pas mis en cache.
+        """
+        chemin = self._chemin(cle)
+        temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.dossier, exist_ok=True)
+            tampon.tofile(temporaire)
+            os.replace(temporaire, chemin)
+        except OSError:
+            try:
+                os.remove(temporaire)
+            except OSError:
+                pass
+            return
+        with self._verrou:
+            self._inventaire()[os.path.basename(chemin)] = tampon.nbytes
+            self._evincer()
+
+    def _evincer(self):
+        """Supprime les fichiers les moins récemment utilisés jusqu'à respecter taille_max (verrou déjà pris)"""
+        tailles = self._inventaire()
+        total = sum(tailles.values())
+        if total <= self.taille_max:
+            return
+        fichiers = []
+        for nom in tailles:
+            try:
+                fichiers.append((os.path.getmtime(os.path.join(self.dossier, nom)), nom))
+            except OSError:
+                fichiers.append((0, nom))
+        for _, nom in sorted(fichiers):
+            if total <= self.taille_max:
+                break
+            try:
+                os.remove(os.path.join(self.dossier, nom))
+            except OSError:
+                pass
+            total -= tailles.pop(nom)
+            self.evictions += 1
+
+    def obtenir_tampon(self, frequence, duree=0.5, enveloppe=ENVELOPPE_DEFAUT, timbre=TIMBRE_DEFAUT,
+                       format_mixer=None):
+        """
+        Retourne le tampon PCM d'une note, lu depuis le cache ou synthétisé puis stocké.
+
+        Paramètres:
+            format_mixer: (fréquence d'échantillonnage, canaux) déjà lus avec
+                          format_audio(); None = les lire maintenant (ce qui
+                          peut initialiser le mixer, donc seulement depuis le
+                          thread principal)
+
+        Retourne:
+            np.ndarray: Tampon int16 au format du mixer
+        """
+        sample_rate, canaux = format_mixer or format_audio()
+        cle = CacheSons.empreinte(frequence, duree, sample_rate, canaux, enveloppe, timbre)
+        # Même nombre d'échantillons que synthetiser(), pour chaque canal
+        tampon = self.charger(cle, attendu=int(sample_rate * duree) * canaux)
+        if tampon is None:
+            tampon = synthetiser(frequence, duree, sample_rate, canaux, enveloppe, timbre)
+            self.stocker(cle, tampon)
+        return tampon
+
+    def obtenir_son(self, frequence, duree=0.5, enveloppe=ENVELOPPE_DEFAUT, timbre=TIMBRE_DEFAUT,
+                    format_mixer=None):
+        """
+        Retourne un pygame.mixer.Sound pour une note, sans recalcul si elle est en cache.
+        """
+        tampon = self.obtenir_tampon(frequence, duree, enveloppe, timbre, format_mixer)
+        return pygame.mixer.Sound(buffer=tampon)
+
+# ========================================
+# BANQUE DE SONS - Sons des notes chargés à la demande
+# ========================================
+class BanqueSons:
+    """
+    Fournit le son de n'importe quelle note, chargé seulement quand on en a besoin.
+
+    Au plus 'capacite' objets pygame.mixer.Sound restent en mémoire: quand la
+    banque est pleine, le son utilisé le moins récemment est libéré (LRU).
+    La mémoire reste donc stable même pour un clavier complet de 88 touches.
+    Un son libéré est relu très vite depuis le cache disque (CacheSons).
+
+    Les accords (obtenir_accord) partagent la même mémoire: ils sont rangés
+    sous l'ensemble de leurs numéros MIDI, donc un accord déjà joué ne coûte
+    plus rien, quel que soit l'ordre dans lequel on donne ses notes.
+
+    Attributs:
+        succes: Nombre de demandes servies par un son déjà en mémoire
+        echecs: Nombre de demandes qui ont dû charger ou synthétiser le son
+        evictions: Nombre de sons libérés pour respecter la capacité
+    """
+    def __init__(self, capacite=32, cache=None):
+        self.capacite = capacite
+        # Créé ici et non au premier chargement: le thread de préchargement
+        # ne doit jamais le créer en même temps que le jeu
+        self.cache = cache if cache is not None else CacheSons()
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.duree_chargement_ms = 0.0
+        # OrderedDict garde l'ordre d'utilisation: le plus ancien est au début
+        self._sons = collections.OrderedDict()
+        # Le préchargement tourne dans un autre thread: on protège le dictionnaire
+        self._verrou = threading.Lock()
+
+    @staticmethod
+    def frequence(cle, nom, octave=None, alteration=0):
+        """
+        Retourne la fréquence d'une note (lue dans FREQUENCES_MIDI).
+
+        Paramètres:
+            cle: La clé musicale, qui fixe l'octave par défaut
+            nom: Le nom de la note ('Do', 'Ré', ...)
+            octave: L'octave voulue (None = celle utilisée par la clé)
+            alteration: -1 (bémol), 0 ou 1 (dièse)
+        """
+        return FREQUENCES_MIDI[BanqueSons._cle(cle, nom, octave, alteration)]
+
+    @staticmethod
+    def _cle(cle, nom, octave=None, alteration=0):
+        # Le numéro MIDI: deux écritures de la même hauteur (Do4 en clé de Sol
+        # et en clé de Fa, Fa#4 et Solb4) partagent le même son
+        if octave is None:
+            octave = octave_par_defaut(cle, nom)
+        return numero_midi(nom, octave, alteration)
+
+    def obtenir(self, cle, nom, octave=None, alteration=0):
+        """
+        Retourne le son d'une note, en le chargeant s'il n'est pas en mémoire.
+
+        Paramètres:
+            cle: La clé musicale ('sol' ou 'fa')
+            nom: Le nom de la note ('Do', 'Ré', ...)
+            octave: L'octave voulue (None = celle utilisée par la clé)
+            alteration: -1 (bémol), 0 ou 1 (dièse)
+
+        Retourne:
+            pygame.mixer.Sound: Le son prêt à être joué
+        """
+        return self.obtenir_midi(self._cle(cle, nom, octave, alteration))
+
+    def obtenir_midi(self, identifiant):
+        """Retourne le son d'une hauteur donnée par son numéro MIDI (60 = Do4)"""
+        with self._verrou:
+            son = self._sons.get(identifiant)
+            if son is not None:
+                self._sons.move_to_end(identifiant)  # Devient le plus récent
+                self.succes += 1
+                return son
+            self.echecs += 1
+        return self._charger(identifiant, FREQUENCES_MIDI[identifiant])
+
+    def obtenir_accord(self, numeros):
+        """
+        Retourne le son de plusieurs hauteurs jouées ensemble (synthétisé une seule fois).
+
+        Paramètre:
+            numeros: Numéros MIDI des notes de l'accord (ordre et doublons sans importance)
+
+        Retourne:
+            pygame.mixer.Sound: Le son de l'accord
+        """
+        identifiant = tuple(sorted(set(numeros)))
+        with self._verrou:
+            son = self._sons.get(identifiant)
+            if son is not None:
+                self._sons.move_to_end(identifiant)
+                self.succes += 1
+                return son
+            self.echecs += 1
+        debut = time.perf_counter()
+        tampon = synthetiser_accord([FREQUENCES_MIDI[n] for n in identifiant])
+        son = pygame.sndarray.make_sound(tampon)
+        with self._verrou:
+            self.duree_chargement_ms += (time.perf_counter() - debut) * 1000
+            self._ranger(identifiant, son)
+        return son
+
+    def _ranger(self, identifiant, son):
+        """Ajoute un son (verrou déjà pris) et libère les moins récemment utilisés"""
+        self._sons[identifiant] = son
+        self._sons.move_to_end(identifiant)
+        while len(self._sons) > self.capacite:
+            self._sons.popitem(last=False)
+            self.evictions += 1
+
+    def _charger(self, identifiant, frequence, format_mixer=None):
+        """Charge un son (cache disque ou synthèse) et l'ajoute à la banque"""
+        debut = time.perf_counter()
+        son = self.cache.obtenir_son(frequence, format_mixer=format_mixer)
+        with self._verrou:
+            self.duree_chargement_ms += (time.perf_counter() - debut) * 1000
+            self._ranger(identifiant, son)
+        return son
+
+    def contient(self, cle, nom, octave=None, alteration=0):
+        """Indique si le son d'une note est déjà en mémoire"""
+        with self._verrou:
+            return self._cle(cle, nom, octave, alteration) in self._sons
+
+    def prechauffer(self, notes):
+        """
+        Charge des sons en arrière-plan, sans bloquer l'affichage.
+
+        Le mixer est initialisé et son format lu ici, dans le thread qui
+        appelle (le thread principal): le thread de chargement ne touche
+        jamais à l'initialisation de Pygame.
+
+        Paramètre:
+            notes: Liste de tuples (clé, nom), (clé, nom, octave) ou (clé, nom, octave, altération)
+
+        Retourne:
+            threading.Thread: Le thread de chargement (déjà démarré)
+        """
+        format_mixer = format_audio()
+        def charger_tout():
+            for note in notes:
+                identifiant = self._cle(*note)
+                with self._verrou:
+                    deja_la = identifiant in self._sons
+                if not deja_la:
+                    self._charger(identifiant, FREQUENCES_MIDI[identifiant], format_mixer)
+        thread = threading.Thread(target=charger_tout, name="prechargement-sons", daemon=True)
+        thread.start()
+        return thread
+
+    def statistiques(self):
+        """Retourne les compteurs de la banque sous forme de dictionnaire"""
+        with self._verrou:
+            return {
+                'en_memoire': len(self._sons),
+                'capacite': self.capacite,
+                'succes': self.succes,
+                'echecs': self.echecs,
+                'evictions': self.evictions,
+                'chargement_ms': round(self.duree_chargement_ms, 1),
+            }
+
+# ========================================
+# CANAUX DU MIXER - Chaque usage a ses propres canaux
+# ========================================
+# Réglages du mixer par défaut (modifiables avec --audio-frequence, --audio-tampon, --audio-canaux)
+# - frequence: échantillons par seconde
+# - taille: -16 = audio 16 bits signé
+# - canaux: 1 = mono, 2 = stéréo
+# - tampon: échantillons envoyés d'un coup à la carte son (plus petit = moins
+#   de latence, mais risque de craquements sur une machine lente)
+PARAMETRES_AUDIO = {'frequence': 22050, 'taille': -16, 'canaux': 1, 'tampon': 512}
+
+class CanauxAudio:
+    """
+    Canaux du mixer réservés à chaque usage (notes, métronome).
+    
+    Sound.play() prend n'importe quel canal libre: quand un joueur répond
+    très vite, les notes qui se chevauchent peuvent occuper tous les canaux
+    et faire taire le métronome. Ici, chaque groupe a ses canaux réservés
+    (pygame.mixer.set_reserved). Si tous sont occupés, le son le plus ancien
+    du groupe est coupé pour laisser place au nouveau.
+    
+    Mesure de latence: dans un bloc "with canaux.entree(entree.instant):",
+    ouvert pour chaque touche (ou clic, ou note MIDI), le délai entre l'instant
+    de l'entrée et le premier jouer() est ajouté à l'histogramme 'latences'
+    (en microsecondes). Il comprend l'attente de l'image suivante, la
+    réponse, le choix de la note suivante et le chargement du son s'il
+    n'était pas prêt. Un son joué plus tard (métronome, note de la lecture à
+    vue) ne compte pas.
+    
+    Attributs:
+        groupes: {nom du groupe: nombre de canaux}
+        lectures: Nombre de sons joués
+        coupures: Nombre de sons coupés faute de canal libre
+        latences: Histogramme des délais entrée -> play(), en µs
+    """
+    GROUPES = {'notes': 4, 'metronome': 1}
+    
+    def __init__(self, groupes=None):
+        self.groupes = dict(groupes or CanauxAudio.GROUPES)
+        self._canaux = None  # {groupe: [Channel...]}, du moins récent au plus récent
+        self.lectures = 0
+        self.coupures = 0
+        self.latences = Histogramme()
+        self._horloge = HorlogePygame()  # Le temps des instants des entrées (voir Entree)
+        self._entree = None  # Instant (ms) de la dernière entrée pas encore suivie d'un son
+        self._instant = None  # Instant donné à entree(), utilisé par __enter__
+    
+    def _preparer(self):
+        """Réserve les canaux de chaque groupe (au premier son joué)"""
+        format_audio()  # Le mixer doit être initialisé
+        total = sum(self.groupes.values())
+        # Garder aussi des canaux libres pour les Sound.play() ordinaires
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total + 4))
+        pygame.mixer.set_reserved(total)
+        self._canaux = {}
+        numero = 0
+        for groupe, nombre in self.groupes.items():
+            self._canaux[groupe] = [pygame.mixer.Channel(numero + i) for i in range(nombre)]
+            numero += nombre
+    
+    def entree(self, instant=None):
+        """
+        Retourne un gestionnaire de contexte pour le traitement d'une touche ou d'un clic.
+
+        Paramètre:
+            instant: Moment de l'entrée en ms de HorlogePygame().ticks()
+                     (Entree.instant); None pour maintenant
+        """
+        self._instant = instant
+        return self
+
+    def __enter__(self):
+        maintenant = self._horloge.ticks()
+        self._entree = maintenant if self._instant is None else min(self._instant, maintenant)
+        self._instant = None
+        return self
+
+    def __exit__(self, *exc):
+        self._entree = None
+        return False
+    
+    def jouer(self, son, groupe='notes'):
+        """
+        Joue un son sur un canal de son groupe.
         
-        return boutons
+        Paramètres:
+            son: pygame.mixer.Sound à jouer
+            groupe: Nom du groupe de canaux ('notes' ou 'metronome')
         
-    def nouvelle_note(self):
-        """Génère une nouvelle note aléatoire"""
-        # Choisir la clé selon le mode
-        if self.mode_cle == 'mixte':
-            self.cle_actuelle = random.choice(['sol', 'fa'])
+        Retourne:
+            pygame.mixer.Channel: Le canal utilisé
+        """
+        if self._canaux is None:
+            self._preparer()
+        canaux = self._canaux[groupe]
+        # Le premier canal libre, sinon le moins récemment utilisé
+        canal = next((c for c in canaux if not c.get_busy()), None)
+        if canal is None:
+            canal = canaux[0]
+            self.coupures += 1
+        canal.play(son)
+        if self._entree is not None:
+            self.latences.ajouter((self._horloge.ticks() - self._entree) * 1000)
+            self._entree = None
+        canaux.remove(canal)
+        canaux.append(canal)
+        self.lectures += 1
+        return canal
+    
+    def statistiques(self):
+        """Retourne le format réel du mixer et les compteurs des canaux"""
+        frequence, taille, canaux = pygame.mixer.get_init() or (None, None, None)
+        statistiques = {
+            'format': f"{frequence} Hz, {abs(taille or 0)} bits, {canaux} canal(aux)",
+            'lectures': self.lectures,
+            'coupures': self.coupures,
+        }
+        if self.latences.total:
+            statistiques['latence_p50_ms'] = round(self.latences.percentile(50) / 1000, 2)
+            statistiques['latence_p99_ms'] = round(self.latences.percentile(99) / 1000, 2)
+        return statistiques
+    
+    def rapport_latence(self, tampon):
+        """
+        Retourne un résumé lisible du délai entre une touche et le son.
+        
+        Paramètre:
+            tampon: Taille du tampon du mixer, en échantillons
+        """
+        frequence, _, _ = pygame.mixer.get_init() or (PARAMETRES_AUDIO['frequence'], 0, 0)
+        attente_image = 1000 / FPS  # Les événements sont lus une fois par image
+        duree_tampon = tampon * 1000 / frequence
+        lignes = [f"Latence touche -> son ({self.latences.total} mesures):"]
+        if self.latences.total:
+            p50 = self.latences.percentile(50) / 1000
+            p99 = self.latences.percentile(99) / 1000
+            lignes.append(f"  traitement (touche lue -> play)  p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
         else:
-            self.cle_actuelle = self.mode_cle
+            p50 = p99 = 0.0
+        lignes.append(f"  attente de l'image              jusqu'à {attente_image:6.2f} ms")
+        lignes.append(f"  tampon du mixer                 {duree_tampon:6.2f} ms"
+                      f" ({tampon} échantillons à {frequence} Hz)")
+        lignes.append(f"  total estimé                    p50 {p50 + attente_image / 2 + duree_tampon:6.2f} ms"
+                      f"   pire {p99 + attente_image + duree_tampon:6.2f} ms")
+        if self.coupures:
+            lignes.append(f"  {self.coupures} son(s) coupé(s) faute de canal libre")
+        lignes.append("  (--audio-tampon plus petit = moins de latence, tant que le son ne craque pas)")
+        return "\n".join(lignes)
+
+# ========================================
+# POSITIONS DES NOTES SUR LA PORTÉE
+# ========================================
+# Coordonnée Y de chaque degré, pour chaque clé
+# Plus le nombre est grand, plus la note est basse à l'écran
+Y_LIGNE_HAUT = 290  # Ligne du haut de la portée
+INTERLIGNE = 15     # Écart entre deux lignes: un degré = un demi-interligne
+Y_LIGNE_BAS = Y_LIGNE_HAUT + 4 * INTERLIGNE
+
+# Grande portée (piano): la portée de Sol au-dessus de celle de Fa
+# Y de la ligne du haut de chaque portée. Avec deux interlignes d'écart, le
+# Do4 tombe sur la même ligne additionnelle entre les deux portées.
+GRANDE_PORTEE = {'sol': 255, 'fa': 345}
+
+@functools.lru_cache(maxsize=None)
+def positions_y(cle, y_ligne_haut=Y_LIGNE_HAUT):
+    """
+    Retourne la coordonnée Y de chaque degré (0 à NB_DEGRES - 1) pour une portée.
+    
+    La table est calculée une seule fois par (clé, position de la portée).
+    """
+    y_ligne_bas = y_ligne_haut + 4 * INTERLIGNE
+    return tuple(round(y_ligne_bas - (d - DEGRE_LIGNE_BAS[cle]) * INTERLIGNE / 2)
+                 for d in range(NB_DEGRES))
+
+# Tables de la portée normale: POSITIONS_Y[cle][degre] -> y
+POSITIONS_Y = {cle: positions_y(cle) for cle in DEGRE_LIGNE_BAS}
+
+def lignes_supplementaires(cle, degre_note, y_ligne_haut=Y_LIGNE_HAUT):
+    """
+    Retourne les coordonnées Y des lignes additionnelles d'une note.
+    
+    Une note au-dessus ou en dessous de la portée a besoin d'une petite ligne
+    pour chaque ligne "manquante" entre la portée et elle (Do4 en clé de Sol:
+    une ligne; La5: une ligne; Do6: deux lignes).
+    """
+    bas = DEGRE_LIGNE_BAS[cle]
+    haut = bas + 8  # 5 lignes = 8 degrés
+    if degre_note <= bas - 2:
+        degres = range(bas - 2, degre_note - 1, -2)
+    elif degre_note >= haut + 2:
+        degres = range(haut + 2, degre_note + 1, 2)
+    else:
+        return ()
+    positions = positions_y(cle, y_ligne_haut)
+    return tuple(positions[d] for d in degres)
+
+# Positions des 7 notes du jeu, dans l'octave jouée par chaque clé
+POSITIONS_NOTES_SOL = {nom: POSITIONS_Y['sol'][degre(nom, octave_par_defaut('sol', nom))]
+                       for nom in NOTES}  # Do4 (ligne additionnelle) à Si4 (3e ligne)
+POSITIONS_NOTES_FA = {nom: POSITIONS_Y['fa'][degre(nom, octave_par_defaut('fa', nom))]
+                      for nom in NOTES}   # Ré3 (3e ligne) à Do4 (ligne additionnelle)
+
+# ========================================
+# PORTÉE PRÉ-RENDUE - Lignes et clé dessinées une seule fois
+# ========================================
+class RenduPortee:
+    """
+    Fournit le fond de portée (5 lignes, symbole de la clé, étiquette) déjà dessiné.
+
+    Chaque fond est composé une seule fois dans une surface transparente,
+    puis gardé en cache par (clé, position de l'étiquette, facteur d'échelle).
+    Les écrans de jeu et d'entraînement l'affichent ensuite en un seul blit,
+    au lieu de redessiner lignes et symboles à chaque image: ajouter des
+    clés n'ajoute aucun travail par image.
+
+    À la place d'une clé, 'grande_portee' donne les deux portées de
+    GRANDE_PORTEE (Sol et Fa) reliées par un trait, comme au piano.
+
+    Attribut:
+        creations: Nombre de fonds effectivement composés (les autres viennent du cache)
+    """
+    # Géométrie de la portée
+    X_DEBUT = 200        # Début des lignes
+    X_FIN = 600          # Fin des lignes
+    Y_PREMIERE_LIGNE = Y_LIGNE_HAUT
+    ESPACEMENT = INTERLIGNE  # Écart entre deux lignes
+    EPAISSEUR = 2
+    
+    # Pour chaque clé: symbole Bravura, décalage vertical du symbole par
+    # rapport à la ligne du haut, étiquette
+    CLES = {
+        # Clé de Sol: 𝄞 (U+1D11E) - la spirale centrale s'enroule autour de la ligne du Sol
+        'sol': ("\U0001D11E", -65, "Sol"),
+        # Clé de Fa: 𝄢 (U+1D122) - les deux points encadrent la ligne du Fa
+        'fa': ("\U0001D122", -95, "Fa"),
+        # Clé d'Ut: 𝄡 (U+1D121) - le milieu du symbole est sur la ligne du Do4
+        'ut3': ("\U0001D121", -81, "Ut 3"),  # 3e ligne (milieu de la portée)
+        'ut4': ("\U0001D121", -96, "Ut 4"),  # 4e ligne
+    }
+    X_CLE = 215
+    X_ETIQUETTE = 210
+    
+    def __init__(self):
+        self._couches = {}
+        self.creations = 0
+    
+    @staticmethod
+    def portees(cle):
+        """Retourne les portées à dessiner: liste de (clé, y de la ligne du haut)"""
+        if cle == 'grande_portee':
+            return list(GRANDE_PORTEE.items())
+        return [(cle, RenduPortee.Y_PREMIERE_LIGNE)]
+    
+    def couche(self, cle, y_etiquette, facteur):
+        """
+        Retourne (surface, position) du fond de portée, composé au premier appel.
         
-        nom_note = random.choice(NOTES)
-        self.note_actuelle = Note(nom_note, self.cle_actuelle)
-        self.temps_reponse = pygame.time.get_ticks()
+        La position est en pixels, comme si le point (0, 0) du jeu était le
+        coin de la fenêtre (voir dessiner).
         
-        # Jouer le son de la note si le son est activé
-        if self.son_active:
-            # Utiliser les sons de l'octave approprié selon la clé
-            sons = SONS_NOTES_FA if self.cle_actuelle == 'fa' else SONS_NOTES_SOL
-            sons[nom_note].play()
+        Paramètres:
+            cle: La clé musicale ('sol', 'fa', 'ut3', 'ut4') ou 'grande_portee'
+            y_etiquette: Ordonnée de l'étiquette texte de la clé (None: pas d'étiquette)
+            facteur: Facteur d'échelle de la fenêtre (voir Echelle)
+        """
+        identifiant = (cle, y_etiquette, facteur)
+        if identifiant not in self._couches:
+            self._couches[identifiant] = self._composer(cle, y_etiquette, Echelle(facteur))
+            self.creations += 1
+        return self._couches[identifiant]
+    
+    def dessiner(self, surface, cle, y_etiquette):
+        """Affiche le fond de portée sur la surface en un seul blit"""
+        echelle = init_runtime().echelle
+        couche, (x, y) = self.couche(cle, y_etiquette, echelle.facteur)
+        surface.blit(couche, (echelle.x0 + x, echelle.y0 + y))
+    
+    def _composer(self, cle, y_etiquette, echelle):
+        """Dessine lignes, clés et étiquette dans une surface transparente ajustée"""
+        rt = init_runtime()
+        portees = RenduPortee.portees(cle)
+        # Chaque élément à dessiner: (image, position en pixels)
+        images = []
+        for cle_portee, y_haut in portees:
+            glyphe, decalage, _ = RenduPortee.CLES[cle_portee]
+            images.append((rendre_texte(rt.police_musicale, glyphe, NOIR),
+                           echelle.point((RenduPortee.X_CLE, y_haut + decalage))))
+        if y_etiquette is not None:
+            nom = RenduPortee.CLES[cle][2]
+            images.append((rendre_texte(rt.police_moyenne, nom, BLEU),
+                           echelle.point((RenduPortee.X_ETIQUETTE, y_etiquette))))
+        y_min = portees[0][1]
+        y_max = portees[-1][1] + 4 * RenduPortee.ESPACEMENT
+        epaisseur = echelle.longueur(RenduPortee.EPAISSEUR)
         
-    def dessiner_portee(self, surface):
-        """Dessine la portée musicale"""
-        y_debut = 290
-        espacement = 15
-        # Dessiner les 5 lignes de la portée
-        for i in range(5):
-            y = y_debut + i * espacement
-            pygame.draw.line(surface, NOIR, (200, y), (600, y), 2)
-        
-        # Dessiner la clé selon le type avec la police musicale
-        if self.cle_actuelle == 'sol':
-            # Clé de Sol: 𝄞 (U+1D11E) - s'enroule autour de la ligne du Sol (2ème ligne du bas)
-            texte_cle = police_musicale.render("\U0001D11E", True, NOIR)
-            # Ajuster pour que la spirale centrale soit sur la ligne du Sol (y=335)
-            surface.blit(texte_cle, (215, 225))
-            # Étiquette texte entre la barre de temps et la portée
-            texte_nom = police_moyenne.render("Sol", True, BLEU)
-            surface.blit(texte_nom, (210, 220))
-        else:
-            # Clé de Fa: 𝄢 (U+1D122) - les deux points encadrent la ligne du Fa (4ème ligne)
-            texte_cle = police_musicale.render("\U0001D122", True, NOIR)
-            # Ajuster pour que les points soient autour de la ligne du Fa (y=320)
-            surface.blit(texte_cle, (215, 195))
-            # Étiquette texte entre la barre de temps et la portée
-            texte_nom = police_moyenne.render("Fa", True, BLEU)
-            surface.blit(texte_nom, (210, 220))
+        # Rectangle englobant tout ce qui est dessiné (seulement l'encre des symboles)
+        x_debut, x_fin = echelle.x(RenduPortee.X_DEBUT), echelle.x(RenduPortee.X_FIN)
+        cadre = pygame.Rect(x_debut, echelle.y(y_min) - epaisseur, x_fin - x_debut + 1,
+                            echelle.y(y_max) - echelle.y(y_min) + 2 * epaisseur)
+        for image, position in images:
+            cadre.union_ip(image.get_bounding_rect().move(position))
+        
+        # Surface transparente: seuls les traits recouvrent ce qui est en dessous
+        couche = pygame.Surface(cadre.size, pygame.SRCALPHA)
+        dx, dy = -cadre.x, -cadre.y
+        # Les 5 lignes de chaque portée
+        for _, y_haut in portees:
+            for i in range(5):
+                y = echelle.y(y_haut + i * RenduPortee.ESPACEMENT) + dy
+                pygame.draw.line(couche, NOIR, (x_debut + dx, y), (x_fin + dx, y), epaisseur)
+        if len(portees) > 1:
+            # Trait vertical qui relie les portées jouées ensemble
+            pygame.draw.line(couche, NOIR, (x_debut + dx, echelle.y(y_min) + dy),
+                             (x_debut + dx, echelle.y(y_max) + dy), epaisseur)
+        # Les symboles des clés puis l'étiquette
+        for image, (x, y) in images:
+            couche.blit(image, (x + dx, y + dy))
+        return couche, cadre.topleft
+
+# ========================================
+# CLASSE BOUTON - Pour les boutons cliquables
+# ========================================
+class Bouton:
+    """
+    Représente un bouton cliquable à l'écran.
+    
+    Gère l'affichage, la détection de clic et l'effet de survol.
+    """
+    def __init__(self, x, y, largeur, hauteur, texte, index):
+        """
+        Initialise un nouveau bouton.
+        
+        Paramètres:
+            x, y: Position du coin supérieur gauche du bouton
+            largeur, hauteur: Dimensions du bouton en pixels
+            texte: Le texte affiché sur le bouton
+            index: Un numéro pour identifier le bouton (0-6 pour les notes)
+        """
+        # pygame.Rect crée un rectangle pour détecter les clics
+        self.rect = pygame.Rect(x, y, largeur, hauteur)
+        self.texte = texte          # Le texte à afficher (ex: "Do", "Ré"...)
+        self.index = index          # L'identifiant du bouton
+        self.survole = False        # True si la souris est sur le bouton
+        
+    def dessiner(self, surface):
+        """
+        Dessine le bouton sur la surface donnée.
+        
+        Paramètre:
+            surface: La fenêtre Pygame où dessiner
+        """
+        rt = init_runtime()
+        echelle = rt.echelle
+        # self.rect est en unités du jeu (clics), rect en pixels de la fenêtre
+        rect = echelle.rect(self.rect)
+        arrondi = echelle.longueur(10)
+        # Choisir la couleur : bleu si survolé, gris sinon
+        couleur = BLEU if self.survole else (150, 150, 150)
+        # Dessiner le rectangle rempli avec des coins arrondis
+        pygame.draw.rect(surface, couleur, rect, border_radius=arrondi)
+        # Dessiner le contour noir du bouton
+        pygame.draw.rect(surface, NOIR, rect, echelle.longueur(3), border_radius=arrondi)
         
-    def verifier_reponse(self, index_note):
+        # Afficher le texte au centre du bouton
+        # rendre_texte() crée une image du texte (ou la reprend du cache)
+        texte_surface = rendre_texte(rt.police_petite, self.texte, BLANC if self.survole else NOIR)
+        # Centrer le texte dans le rectangle du bouton
+        texte_rect = texte_surface.get_rect(center=rect.center)
+        # blit() = coller l'image du texte sur la surface
+        surface.blit(texte_surface, texte_rect)
+        
+    def verifier_clic(self, pos):
+        """
+        Vérifie si la position donnée est à l'intérieur du bouton.
+        
+        Paramètre:
+            pos: Tuple (x, y) de la position de la souris
+        
+        Retourne:
+            True si le clic est sur le bouton, False sinon
+        """
+        return self.rect.collidepoint(pos)  # Méthode de pygame.Rect
+        
+    def verifier_survol(self, pos):
+        """
+        Met à jour l'état de survol selon la position de la souris.
+        
+        Paramètre:
+            pos: Tuple (x, y) de la position de la souris
+        """
+        # Met self.survole à True si la souris est sur le bouton
+        self.survole = self.rect.collidepoint(pos)
+
+def mettre_a_jour_survol(boutons, pos):
+    """
+    Met à jour l'état de survol d'une liste de boutons.
+    
+    Retourne:
+        True si au moins un bouton a changé d'état (il faut redessiner)
+    """
+    change = False
+    for bouton in boutons:
+        avant = bouton.survole
+        bouton.verifier_survol(pos)
+        change = change or bouton.survole != avant
+    return change
+
+def position_souris():
+    """Position actuelle de la souris, en unités du jeu (comme event.pos, voir Cadenceur)"""
+    return init_runtime().echelle.logique(pygame.mouse.get_pos())
+
+# ========================================
+# CLASSE NOTE - Représente une note musicale
+# ========================================
+class Note:
+    """
+    Représente une note de musique affichée sur la portée.
+    
+    Gère la position et l'affichage d'une note selon la clé musicale.
+    La position et les lignes additionnelles sont lues dans les tables
+    calculées une fois (POSITIONS_Y): n'importe quelle note du clavier,
+    avec dièse ou bémol, se place dans n'importe quelle clé.
+    
+    Attributs:
+        nom, octave, alteration: La hauteur écrite (ex: 'Fa', 4, 1 pour Fa#4)
+        midi: Son numéro MIDI (60 = Do4)
+        y: Position verticale de la tête de note
+        lignes: Positions Y des lignes additionnelles à dessiner
+    """
+    # Glyphes Bravura des altérations (accidentalFlat, accidentalSharp)
+    GLYPHES_ALTERATIONS = {-1: '\U0000E260', 1: '\U0000E262'}
+    
+    def __init__(self, nom, cle='sol', octave=None, alteration=0, y_ligne_haut=Y_LIGNE_HAUT):
+        """
+        Crée une nouvelle note.
+        
+        Paramètres:
+            nom: Le nom de la note ('Do', 'Ré', 'Mi', etc.)
+            cle: La clé musicale ('sol', 'fa', 'ut3' ou 'ut4')
+            octave: L'octave (None = celle utilisée par la clé dans le jeu)
+            alteration: -1 (bémol), 0 ou 1 (dièse)
+            y_ligne_haut: Position de la portée (voir GRANDE_PORTEE)
+        """
+        self.nom = nom
+        self.cle = cle
+        self.octave = octave_par_defaut(cle, nom) if octave is None else octave
+        self.alteration = alteration
+        self.midi = numero_midi(nom, self.octave, alteration)
+        degre_note = degre(nom, self.octave)
+        self.x = LARGEUR // 2
+        self.y = positions_y(cle, y_ligne_haut)[degre_note]
+        self.lignes = lignes_supplementaires(cle, degre_note, y_ligne_haut)
+        self.rayon = 15
+    
+    @classmethod
+    def depuis_midi(cls, numero, cle='sol', bemols=False, y_ligne_haut=Y_LIGNE_HAUT):
+        """Crée la note d'un numéro MIDI (touches noires en dièses, ou en bémols)"""
+        nom, octave, alteration = depuis_midi(numero, bemols)
+        return cls(nom, cle, octave, alteration, y_ligne_haut)
+        
+    def dessiner(self, surface, echelle=None, couleur=NOIR, x=None):
+        """
+        Dessine la note (et ses lignes additionnelles) sur la surface.
+        
+        Paramètres:
+            surface: Où dessiner
+            echelle: Echelle de la surface (par défaut celle de la fenêtre;
+                     Echelle.couche pour dessiner dans une image à part)
+            couleur: Couleur de la note (les lignes additionnelles restent noires)
+            x: Abscisse de la note, en unités du jeu (par défaut self.x)
+        """
+        rt = init_runtime()
+        echelle = echelle or rt.echelle
+        x = echelle.x(self.x if x is None else x)
+        y_note = echelle.y(self.y)
+        demi_ligne = echelle.longueur(17)
+        # Lignes additionnelles pour les notes au-dessus ou en dessous de la portée
+        for y in self.lignes:
+            y = echelle.y(y)
+            pygame.draw.line(surface, NOIR, (x - demi_ligne, y), (x + demi_ligne, y),
+                             echelle.longueur(2))
+        
+        # Dessiner une noire avec le caractère Bravura U+E1D3 (noteQuarterUp)
+        # C'est une noire complète (tête remplie + tige) professionnelle
+        note_noire = rendre_texte(rt.police_musicale, '\U0000E1D3', couleur)
+        rect_note = note_noire.get_rect()
+        rect_note.centery = y_note
+        rect_note.centerx = x
+        surface.blit(note_noire, rect_note)
+        
+        # Dièse ou bémol juste à gauche de la tête
+        if self.alteration:
+            glyphe = rendre_texte(rt.police_musicale, Note.GLYPHES_ALTERATIONS[self.alteration], couleur)
+            surface.blit(glyphe, glyphe.get_rect(centery=y_note, right=x - echelle.longueur(18)))
+
+# ========================================
+# HORLOGE ET SORTIE AUDIO DU JEU
+# ========================================
+# Le jeu demande l'heure et joue les notes à travers ces objets: on peut
+# ainsi les remplacer pour faire tourner la logique sans fenêtre ni son,
+# et plus vite que le temps réel (voir MoteurSimulation)
+class HorlogePygame:
+    """
+    Horloge réelle: millisecondes depuis le démarrage de pygame et heure du système.
+    
+    ticks() suit time.perf_counter(), précis à la microseconde, et non
+    pygame.time.get_ticks(), arrondi à la milliseconde: un temps de réponse
+    se mesure entre deux instants pris au milieu d'une image.
+    """
+    _origine = None  # perf_counter() quand pygame.time.get_ticks() valait 0 (commun à toutes)
+    
+    def ticks(self):
+        """Millisecondes écoulées (pour les délais de réponse), en nombre à virgule"""
+        maintenant = time.perf_counter()
+        if HorlogePygame._origine is None:
+            HorlogePygame._origine = maintenant - pygame.time.get_ticks() / 1000
+        return (maintenant - HorlogePygame._origine) * 1000
+    
+    def horodatage(self):
+        """Heure actuelle en secondes depuis 1970 (pour le journal)"""
+        return time.time()
+
+class HorlogeSimulee:
+    """
+    Horloge avancée à la main: le temps ne passe que quand on appelle avancer().
+    
+    Attributs:
+        ms: Millisecondes écoulées depuis la création
+        debut: Horodatage (secondes depuis 1970) correspondant à ms = 0
+    """
+    def __init__(self, debut=1_700_000_000.0):
+        self.ms = 0
+        self.debut = debut
+    
+    def ticks(self):
+        return self.ms
+    
+    def horodatage(self):
+        return self.debut + self.ms / 1000
+    
+    def avancer(self, ms):
+        """Fait avancer le temps de 'ms' millisecondes"""
+        self.ms += ms
+    
+    def regler(self, ms):
+        """Met l'horloge à l'instant 'ms' (boucle_jeu: heure lue une fois par étape de l'image)"""
+        self.ms = ms
+
+class SortieAudio:
+    """Joue les notes avec la banque de sons du Runtime"""
+    # Clic du métronome: (fréquence en Hz, volume), plus aigu et plus fort sur le 1er temps
+    CLICS = {True: (1760.0, 0.6), False: (1320.0, 0.35)}
+    
+    def __init__(self):
+        self._clics = {}  # Sons des clics, synthétisés au premier battement
+    
+    def jouer(self, cle, nom):
+        rt = init_runtime()
+        rt.canaux.jouer(rt.banque.obtenir(cle, nom))
+    
+    def jouer_accord(self, numeros):
+        """Joue plusieurs hauteurs (numéros MIDI) ensemble, en un seul son"""
+        rt = init_runtime()
+        rt.canaux.jouer(rt.banque.obtenir_accord(numeros))
+    
+    def battement(self, accent):
+        """Joue un clic de métronome (accent: premier temps de la mesure)"""
+        son = self._clics.get(accent)
+        if son is None:
+            frequence, volume = SortieAudio.CLICS[accent]
+            # Clic très court: 1 ms de montée, 40 ms d'extinction
+            son = generer_son(frequence, duree=0.05, enveloppe=(0.001, 0.0, 1.0, 0.04))
+            son.set_volume(volume)
+            self._clics[accent] = son
+        init_runtime().canaux.jouer(son, 'metronome')
+
+class AudioMuet:
+    """Sortie audio qui ne fait rien (tests, simulation)"""
+    def jouer(self, cle, nom):
+        pass
+    
+    def jouer_accord(self, numeros):
+        pass
+    
+    def battement(self, accent):
+        pass
+
+class Jeu:
+    """
+    Classe principale du jeu qui gère la logique, le score, les combos et les statistiques.
+    
+    Attributs:
+        score: Score actuel de la partie
+        niveau: Niveau de difficulté actuel (augmente avec le score)
+        combo: Nombre de bonnes réponses consécutives
+        high_score: Meilleur score enregistré
+        donnees: Dictionnaire contenant toutes les statistiques sauvegardées
+        stockage: Où sont enregistrées les réponses (fichier JSON ou base SQLite)
+        modele: Statistiques en mémoire, mises à jour à chaque réponse
+        planificateur: Choisit la prochaine note (répétition espacée)
+        horloge, audio, rng: Sources du temps, du son et du hasard
+        reponses: Libellés des 7 réponses possibles (boutons et touches 1 à 7)
+    """
+    reponses = NOTES
+    AIDE_TAB = None  # Effet de la touche Tab, affiché en bas à gauche (voir variante_suivante)
+    exercice = None  # Mode accords: 'triades' ou 'intervalles' (compté à part, voir appliquer_evenement)
+    BOITES = 'boites'  # Boîtes de Leitner utilisées par le planificateur
+    
+    def __init__(self, mode_cle='mixte', stockage=None, horloge=None, audio=None, rng=None,
+                 modele=None, puits=None):
+        """
+        Crée une partie.
+        
+        Tous les paramètres sauf mode_cle servent à faire tourner le jeu sans
+        affichage ni son (tests, simulation): par défaut, le jeu utilise
+        l'horloge de pygame, la banque de sons et le stockage du Runtime.
+        
+        Paramètres:
+            mode_cle: Une clé ('sol', 'fa', 'ut3', 'ut4'), un mode qui en fait
+                      alterner plusieurs ('mixte', 'ut', 'grande_portee')
+                      ou une liste de clés (voir cles_du_mode)
+            stockage: Stockage des réponses (par défaut celui du Runtime)
+            horloge: HorlogePygame (par défaut) ou HorlogeSimulee
+            audio: SortieAudio (par défaut) ou AudioMuet
+            rng: Générateur aléatoire (par défaut le module random)
+            modele: ModeleStats à utiliser tel quel (rien n'est lu sur le disque)
+            puits: Fonction appelée avec chaque événement (par défaut, il est
+                   enregistré en arrière-plan dans le stockage)
+        """
+        self.horloge = horloge or HorlogePygame()
+        self.audio = audio or SortieAudio()
+        self.rng = rng or random  # Le module lui-même: random.seed() reste utilisable
+        # Variables de jeu de base
+        self.score = 0
+        self.niveau = 1
+        self.note_actuelle = None
+        self.mode_cle = mode_cle  # 'sol', 'fa', 'mixte'... (voir cles_du_mode)
+        self.cles = cles_du_mode(mode_cle)  # Clés posées à tour de rôle
+        self.grande_portee = mode_cle == 'grande_portee'  # Sol et Fa affichées ensemble
+        self.cle_actuelle = self.cles[0]
+        self.temps_reponse = 0  # Instant (horloge.ticks()) d'où compte le temps de réponse
+        self._a_presenter = False  # True tant que la note actuelle n'a pas été affichée
+        self.max_temps = 10000  # 10 secondes au niveau 1
+        self.message = ""
+        self.couleur_message = NOIR
+        self.temps_message = 0
+        self.son_active = True  # Son activé par défaut
+        
+        # Système de combo: récompense les séries de bonnes réponses
+        # Le combo augmente à chaque bonne réponse et se réinitialise à 0 en cas d'erreur
+        self.combo = 0  # Combo actuel
+        self.meilleur_combo = 0  # Meilleur combo de cette session
+        
+        # Charger les données sauvegardées (high score et statistiques)
+        if modele is not None:
+            self.stockage = stockage
+            self.modele = modele
+        elif stockage is None:
+            # Stockage et statistiques partagés avec l'écran des statistiques
+            self.stockage = init_runtime().ouvrir_stockage()
+            self.modele = init_runtime().ouvrir_modele()
+        else:
+            self.stockage = stockage
+            self.modele = ModeleStats.depuis_stockage(stockage)
+        self.donnees = self.modele.donnees
+        self.high_score = self.donnees['high_score']  # Meilleur score de tous les temps
+        # Destination des événements (réponses, sessions, records)
+        self.puits = puits or functools.partial(init_runtime().ecrivain.enregistrer,
+                                                stockage=self.stockage)
+        
+        self.boutons = self.creer_boutons()
+        
+        # Répétition espacée: les notes les moins bien connues reviennent plus souvent
+        self.planificateur = PlanificateurLeitner(self.elements(), self.donnees['stats'], self.rng,
+                                                  self.BOITES)
+        
+        # Rendu partiel: fond statique et dernier état affiché de chaque zone
+        self._fond = None
+        self._etats_zones = {}
+        self.pixels_envoyes = 0
+        
+        self.nouvelle_note()
+    
+    def elements(self):
+        """Éléments que le planificateur fait travailler: (clé, nom) de chaque note"""
+        return [(cle, note) for cle in self.cles for note in NOTES]
+    
+    def variante_suivante(self):
+        """
+        Partie qui remplace celle-ci quand on appuie sur Tab (None: Tab sans effet).
+        
+        La nouvelle partie partage l'horloge, le son, le hasard et les
+        statistiques de celle-ci.
+        """
+        return None
+    
+    def _options_partagees(self):
+        """Paramètres de __init__ pour créer une partie qui partage tout avec celle-ci"""
+        return {'stockage': self.stockage, 'horloge': self.horloge, 'audio': self.audio,
+                'rng': self.rng, 'modele': self.modele, 'puits': self.puits}
+    
+    def creer_boutons(self):
+        """Crée un bouton pour chaque réponse possible"""
+        boutons = []
+        largeur_bouton = 80
+        hauteur_bouton = 50
+        x_debut = 50
+        y = 450
+        espacement = 100
+        
+        for i, reponse in enumerate(self.reponses):
+            x = x_debut + i * espacement
+            bouton = Bouton(x, y, largeur_bouton, hauteur_bouton, reponse, i)
+            boutons.append(bouton)
+        
+        return boutons
+        
+    def nouvelle_note(self):
+        """Choisit la prochaine note à travailler (voir PlanificateurLeitner)"""
+        self.cle_actuelle, nom_note = self.planificateur.suivant()
+        if self.grande_portee:
+            # La note se place sur la portée de sa clé, dans la grande portée
+            self.note_actuelle = Note(nom_note, self.cle_actuelle,
+                                      y_ligne_haut=GRANDE_PORTEE[self.cle_actuelle])
+        else:
+            self.note_actuelle = Note(nom_note, self.cle_actuelle)
+        # Provisoire: presentee() le remplacera par l'instant où la note est à l'écran
+        self.temps_reponse = self.horloge.ticks()
+        self._a_presenter = True
+        
+        # Jouer le son de la note si le son est activé
+        if self.son_active:
+            # Utiliser le son de l'octave approprié selon la clé
+            self.audio.jouer(self.cle_actuelle, nom_note)
+        
+    def dessiner_portee(self, surface):
+        """Dessine la portée musicale (couche pré-rendue, un seul blit)"""
+        if self.grande_portee:
+            # Les deux portées, sans étiquette (la place est prise par la portée de Sol)
+            init_runtime().portees.dessiner(surface, 'grande_portee', y_etiquette=None)
+        else:
+            # Étiquette de la clé entre la barre de temps et la portée
+            init_runtime().portees.dessiner(surface, self.cle_actuelle, y_etiquette=220)
+        
+    def verifier_reponse(self, index_note, instant=None):
+        """
+        Vérifie si la réponse du joueur est correcte et met à jour le score, combo et statistiques.
+        
+        Le système de points fonctionne ainsi:
+        - Points de base = 10 × niveau actuel
+        - Bonus combo = (combo - 1) × 2 points supplémentaires
+        - Exemple: au niveau 2 avec un combo de 3: 10×2 + (3-1)×2 = 20 + 4 = 24 points
+        
+        Paramètres:
+            index_note: L'index de la réponse choisie dans self.reponses (0-6 pour Do-Si)
+            instant: Moment de la réponse en ms de horloge.ticks() (voir Entree),
+                     None pour maintenant
+        """
+        choix = self.reponses[index_note]
+        note_correcte = choix == self.reponse_attendue()
+        
+        # Noter la réponse dans le journal (met aussi à jour les statistiques)
+        self.noter_reponse(choix, 'correct' if note_correcte else 'faux', instant)
+        
+        if note_correcte:
+            # === BONNE RÉPONSE ===
+            
+            # Incrémenter le combo (série de bonnes réponses)
+            self.combo += 1
+            if self.combo > self.meilleur_combo:
+                self.meilleur_combo = self.combo  # Enregistrer le meilleur combo de la session
+            
+            # Calcul du score avec système de bonus progressif
+            points_base = 10 * self.niveau  # Plus on avance, plus chaque note rapporte
+            bonus_combo = (self.combo - 1) * 2  # +2 points par niveau de combo (0 pour le 1er)
+            points_totaux = points_base + bonus_combo
+            self.score += points_totaux
+            
+            # Message avec combo
+            if self.combo >= 5:
+                self.message = f"Combo x{self.combo}! +{points_totaux} pts"
+                self.couleur_message = JAUNE
+            else:
+                self.message = "Correct!"
+                self.couleur_message = VERT
+            
+            # Augmenter le niveau tous les 5 bonnes réponses
+            if self.score % 50 == 0:
+                self.niveau += 1
+                self.max_temps = max(2000, self.max_temps - 500)  # Plus rapide à chaque niveau
+                self.message = f"Niveau {self.niveau}!"
+                self.couleur_message = JAUNE
+            
+            self.nouvelle_note()
+        else:
+            # Mauvaise réponse - perd le combo
+            self.combo = 0
+            self.score = max(0, self.score - 5)
+            self.message = f"Non! C'etait {self.note_actuelle.nom}"
+            self.couleur_message = ROUGE
+            self.nouvelle_note()
+        
+        self.temps_message = self.horloge.ticks()
+        
+        # Noter le nouveau record s'il est atteint
+        if self.score > self.high_score:
+            self.high_score = self.score
+            self.enregistrer({'type': 'record', 'score': self.score})
+    
+    def reponse_attendue(self):
+        """Libellé (parmi self.reponses) de la bonne réponse pour ce qui est affiché"""
+        return self.note_actuelle.nom
+    
+    def enregistrer(self, evenement):
+        """
+        Applique un événement aux statistiques et l'envoie au puits.
+        
+        Par défaut, le puits ajoute l'événement au journal en arrière-plan
+        (et par lots), sans ralentir l'affichage.
+        
+        Paramètre:
+            evenement: Dictionnaire décrit dans appliquer_evenement() (sans 'ts')
+        """
+        evenement['ts'] = round(self.horloge.horodatage(), 3)
+        self.modele.appliquer(evenement)
+        self.puits(evenement)
+    
+    def noter_reponse(self, choix, resultat, instant=None):
+        """
+        Enregistre la réponse donnée pour la note actuelle.
+        
+        Paramètres:
+            choix: Nom de la note choisie (None si le temps est écoulé)
+            resultat: 'correct', 'faux' ou 'temps'
+            instant: Moment de la réponse en ms de horloge.ticks() (None pour maintenant)
+        """
+        if instant is None:
+            instant = self.horloge.ticks()
+        evenement = {
+            'type': 'reponse',
+            'cle': self.cle_actuelle,
+            'note': self.note_actuelle.nom,
+            'choix': choix,
+            # Deux réponses lues dans la même image: la seconde peut dater d'avant cette note
+            'temps_ms': max(0, round(instant - self.temps_reponse)),
+            'resultat': resultat,
+        }
+        if self.exercice:
+            evenement['exercice'] = self.exercice
+        self.enregistrer(evenement)
+        self.planificateur.noter((self.cle_actuelle, self.note_actuelle.nom))
+    
+    def demarrer_session(self):
+        """Compte une nouvelle partie dans les statistiques"""
+        self.enregistrer({'type': 'session'})
+    
+    def signaler_temps_ecoule(self):
+        """Compte la note comme manquée (temps écoulé) et passe à la suivante"""
+        self.noter_reponse(None, 'temps')
+        self.combo = 0  # Perd le combo
+        self.message = f"Temps écoulé! C'était {self.note_actuelle.nom}"
+        self.couleur_message = ROUGE
+        self.temps_message = self.horloge.ticks()
+        self.score = max(0, self.score - 5)
+        self.nouvelle_note()
+    
+    def avancer(self):
+        """Fait avancer ce qui dépend du temps, à chaque image (rien pour une note seule)"""
+    
+    def presentee(self, instant):
+        """
+        Signale qu'une image vient d'être envoyée à l'écran (après display.flip).
+        
+        Le temps de réponse compte à partir de la première image où la note
+        est visible, et non du moment où elle a été choisie: le dessin et
+        l'envoi de l'image ne sont pas comptés au joueur.
+        
+        Paramètre:
+            instant: Moment où l'image a été envoyée, en ms de horloge.ticks()
+        """
+        if self._a_presenter and instant >= self.temps_reponse:
+            self.temps_reponse = instant
+            self._a_presenter = False
+    
+    def temps_ecoule(self):
+        """Vérifie si le temps est écoulé"""
+        temps_actuel = self.horloge.ticks()
+        return (temps_actuel - self.temps_reponse) > self.max_temps
+    
+    # Zones de l'écran redessinées indépendamment en mode rendu partiel
+    # Chaque zone est un rectangle fixe: quand son contenu change, on efface
+    # le rectangle avec le fond statique puis on redessine seulement cette zone
+    # (en unités du jeu, comme toutes les positions: voir Echelle)
+    ZONE_TITRE = pygame.Rect(0, 10, LARGEUR, 50)
+    ZONE_SCORE = pygame.Rect(10, 65, 260, 65)
+    ZONE_RECORD = pygame.Rect(LARGEUR - 300, 65, 290, 65)
+    ZONE_BARRE = pygame.Rect(20, 180, 200, 20)
+    ZONE_PORTEE = pygame.Rect(150, 201, 500, 211)
+    ZONE_MESSAGE = pygame.Rect(0, 510, LARGEUR, 45)
+    ZONE_SON = pygame.Rect(LARGEUR - 200, HAUTEUR - 45, 195, 40)  # À droite du compteur, sans le toucher
+    ZONE_COMPTEUR = pygame.Rect(LARGEUR // 2 - 110, HAUTEUR - 30, 220, 25)
+    _JAMAIS_DESSINE = object()  # État initial: différent de tout état réel
+    
+    def dessiner(self, surface):
+        """Dessine tous les éléments du jeu"""
+        self._dessiner_fond(surface)
+        self._dessiner_titre(surface)
+        self._dessiner_score(surface)
+        self._dessiner_record(surface)
+        self._dessiner_barre(surface)
+        self._dessiner_zone_portee(surface)
+        # Dessiner les boutons
+        for bouton in self.boutons:
+            bouton.dessiner(surface)
+        self._dessiner_message(surface)
+        self._dessiner_son(surface)
+    
+    def dessiner_partiel(self, surface, afficher_compteur=True):
+        """
+        Redessine seulement les zones qui ont changé depuis l'image précédente.
+        
+        Le fond statique (textes fixes) est dessiné une seule fois dans une
+        surface à part. Ensuite, pour chaque zone dont l'état a changé (barre
+        de temps, survol d'un bouton, score, combo, message...), on recopie le
+        fond sur le rectangle de la zone puis on redessine la zone.
+        
+        Paramètres:
+            surface: La fenêtre Pygame où dessiner
+            afficher_compteur: Si True, affiche le nombre de pixels envoyés à l'écran
+        
+        Retourne:
+            list: Les pygame.Rect modifiés, à passer à pygame.display.update()
+        """
+        rects = []
+        if self._fond is None or self._fond.get_size() != surface.get_size():
+            # Première image (ou fenêtre changée): préparer le fond et tout envoyer
+            self._fond = surface.copy()
+            self._dessiner_fond(self._fond)
+            self._etats_zones = {}
+            surface.blit(self._fond, (0, 0))
+            rects.append(surface.get_rect())
+        
+        echelle = init_runtime().echelle
+        for zone, etat, dessin in self._zones(afficher_compteur):
+            cle_zone = tuple(zone)  # pygame.Rect n'est pas utilisable comme clé
+            if self._etats_zones.get(cle_zone, Jeu._JAMAIS_DESSINE) == etat:
+                continue  # Rien n'a changé dans cette zone
+            self._etats_zones[cle_zone] = etat
+            zone = echelle.rect(zone)  # En pixels de la fenêtre
+            # Effacer la zone en recopiant le fond, puis la redessiner
+            # set_clip empêche le dessin de déborder sur les zones voisines
+            surface.blit(self._fond, zone, zone)
+            surface.set_clip(zone)
+            dessin(surface)
+            surface.set_clip(None)
+            if not rects or rects[0] != surface.get_rect():
+                rects.append(zone)
+        
+        # Mémoriser le nombre de pixels envoyés pour le compteur à l'écran
+        self.pixels_envoyes = sum(r.width * r.height for r in rects)
+        return rects
+    
+    def invalider_rendu(self):
+        """Force un rendu complet à la prochaine image (ex: après un autre écran)"""
+        self._fond = None
+    
+    def _zones(self, afficher_compteur):
+        """
+        Retourne les zones dynamiques: liste de (rectangle, état, fonction de dessin).
+        
+        L'état est une valeur simple qui résume ce qui est affiché: si elle
+        n'a pas changé depuis l'image précédente, la zone n'est pas redessinée.
+        """
+        largeur_barre, couleur_barre = self._etat_barre()
+        zones = [
+            (Jeu.ZONE_TITRE, self.cle_actuelle, self._dessiner_titre),
+            (Jeu.ZONE_SCORE, (self.score, self.niveau), self._dessiner_score),
+            (Jeu.ZONE_RECORD, (self.high_score, self.combo), self._dessiner_record),
+            (Jeu.ZONE_BARRE, (largeur_barre, couleur_barre), self._dessiner_barre),
+            (Jeu.ZONE_PORTEE, self._etat_portee(), self._dessiner_zone_portee),
+            (Jeu.ZONE_MESSAGE, self._etat_message(), self._dessiner_message),
+            (Jeu.ZONE_SON, self.son_active, self._dessiner_son),
+        ]
+        for bouton in self.boutons:
+            # Le rectangle est agrandi pour couvrir aussi la bordure du bouton
+            zones.append((bouton.rect.inflate(4, 4), bouton.survole, bouton.dessiner))
+        if afficher_compteur:
+            zones.append((Jeu.ZONE_COMPTEUR, self.pixels_envoyes, self._dessiner_compteur))
+        return zones
+    
+    def _dessiner_fond(self, surface):
+        """Dessine les éléments qui ne changent jamais pendant la partie"""
+        rt = init_runtime()
+        echelle = rt.echelle
+        surface.fill(BLANC)
+        # Texte "Temps" au-dessus de la barre
+        texte_temps = rendre_texte(rt.police_petite, "Temps:", NOIR)
+        surface.blit(texte_temps, echelle.point((Jeu.ZONE_BARRE.x, Jeu.ZONE_BARRE.y - 30)))
+        # Instructions
+        texte_instructions = rendre_texte(rt.police_petite, "Cliquez ou utilisez les touches 1-7:", NOIR)
+        surface.blit(texte_instructions, echelle.placer(texte_instructions, midtop=(LARGEUR // 2, 420)))
+        # Instructions ESC
+        texte_esc = rendre_texte(rt.police_mini, "ESC pour quitter", GRIS_FONCE)
+        surface.blit(texte_esc, echelle.point((10, HAUTEUR - 30)))
+        if self.AIDE_TAB:
+            texte_tab = rendre_texte(rt.police_mini, self.AIDE_TAB, GRIS_FONCE)
+            surface.blit(texte_tab, echelle.point((10, HAUTEUR - 55)))
+    
+    def _dessiner_titre(self, surface):
+        """Titre avec la clé actuelle"""
+        rt = init_runtime()
+        titre = rendre_texte(rt.police_moyenne, f"Notes de Musique - {NOMS_CLES[self.cle_actuelle]}", BLEU)
+        surface.blit(titre, rt.echelle.placer(titre, midtop=(LARGEUR // 2, 20)))
+    
+    def _dessiner_score(self, surface):
+        """Score et niveau à gauche"""
+        rt = init_runtime()
+        texte_score = rendre_texte(rt.police_petite, f"Score: {self.score}", NOIR)
+        texte_niveau = rendre_texte(rt.police_petite, f"Niveau: {self.niveau}", NOIR)
+        surface.blit(texte_score, rt.echelle.point((20, 70)))
+        surface.blit(texte_niveau, rt.echelle.point((20, 100)))
+    
+    def _dessiner_record(self, surface):
+        """High score à droite, et combo en dessous"""
+        rt = init_runtime()
+        texte_high = rendre_texte(rt.police_petite, f"Best: {self.high_score}", BLEU)
+        surface.blit(texte_high, rt.echelle.placer(texte_high, topright=(LARGEUR - 20, 70)))
+        
+        # Afficher le combo si >= 2 (en dessous du high score)
+        if self.combo >= 2:
+            couleur_combo = JAUNE if self.combo >= 5 else VERT
+            texte_combo = rendre_texte(rt.police_petite, f"Combo x{self.combo}!", couleur_combo)
+            surface.blit(texte_combo, rt.echelle.placer(texte_combo, topright=(LARGEUR - 20, 100)))
+    
+    def _etat_barre(self):
+        """Retourne (largeur en pixels de la fenêtre, couleur) de la barre de temps"""
+        temps_restant = max(0, self.max_temps - (self.horloge.ticks() - self.temps_reponse))
+        pourcentage = min(1, temps_restant / self.max_temps)
+        # En pixels et non en unités du jeu: la barre reste fluide en plein écran
+        barre = init_runtime().echelle.rect(Jeu.ZONE_BARRE)
+        largeur_barre = int(barre.width * pourcentage)
+        couleur_barre = VERT if pourcentage > 0.5 else (JAUNE if pourcentage > 0.25 else ROUGE)
+        return largeur_barre, couleur_barre
+    
+    def _dessiner_barre(self, surface):
+        """Barre de temps qui se vide et change de couleur selon l'urgence"""
+        largeur_barre, couleur_barre = self._etat_barre()
+        echelle = init_runtime().echelle
+        barre = echelle.rect(Jeu.ZONE_BARRE)
+        pygame.draw.rect(surface, couleur_barre, (barre.x, barre.y, largeur_barre, barre.height))
+        pygame.draw.rect(surface, NOIR, barre, echelle.longueur(2))
+    
+    def _etat_portee(self):
+        """État de la zone de la portée: la clé et la note affichées"""
+        return (self.cle_actuelle, id(self.note_actuelle))
+    
+    def _dessiner_zone_portee(self, surface):
+        """Dessine la portée et la note actuelle"""
+        self.dessiner_portee(surface)
+        if self.note_actuelle:
+            self.note_actuelle.dessiner(surface)
+    
+    def _etat_message(self):
+        """Retourne le message de feedback visible, ou None s'il a expiré"""
+        if self.temps_message > 0 and self.horloge.ticks() - self.temps_message < 1000:
+            return (self.message, self.couleur_message, self.temps_message)
+        return None
+    
+    def _dessiner_message(self, surface):
+        """Message de feedback (affiché pendant une seconde)"""
+        if self._etat_message() is not None:
+            rt = init_runtime()
+            texte_msg = rendre_texte(rt.police_moyenne, self.message, self.couleur_message)
+            surface.blit(texte_msg, rt.echelle.placer(texte_msg, midtop=(LARGEUR // 2, 520)))
+    
+    def _dessiner_son(self, surface):
+        """Indicateur de son"""
+        etat_son = "ON" if self.son_active else "OFF"
+        couleur_son = VERT if self.son_active else ROUGE
+        rt = init_runtime()
+        texte_son = rendre_texte(rt.police_petite, f"Son: {etat_son} (M)", couleur_son)
+        surface.blit(texte_son, rt.echelle.placer(texte_son, topright=(LARGEUR - 10, HAUTEUR - 40)))
+    
+    def _dessiner_compteur(self, surface):
+        """Compteur de pixels envoyés à l'écran lors de l'image précédente"""
+        rt = init_runtime()
+        texte = rendre_texte(rt.police_mini, f"Pixels/image: {self.pixels_envoyes}", GRIS_FONCE)
+        surface.blit(texte, rt.echelle.placer(texte, center=Jeu.ZONE_COMPTEUR.center))
+
+# ========================================
+# LECTURE À VUE - Phrases qui défilent
+# ========================================
+# Les notes arrivent de la droite et défilent vers une ligne de lecture, au
+# rythme d'un métronome: il faut nommer chaque note avant qu'elle la dépasse.
+TEMPO_DEFAUT = 60       # Battements par minute (une noire par battement)
+TEMPS_PAR_MESURE = 4    # Mesure à 4 temps: une barre de mesure toutes les 4 notes
+LONGUEUR_PHRASE = 8     # Notes par phrase (deux mesures)
+DECOMPTE = 4            # Battements du métronome avant la première note
+TAMPON_NOTES = 256      # Notes générées à l'avance
+PAS_MELODIQUES = (-2, -1, -1, 1, 1, 2)  # Mouvements d'une note à la suivante, en degrés
+
+def generer_phrases(cle, rng, longueur=LONGUEUR_PHRASE):
+    """
+    Générateur sans fin des notes de phrases mélodiques.
+    
+    Chaque phrase part d'une note au hasard puis avance par petits pas (une
+    ou deux notes vers le haut ou le bas), sans sortir des 7 notes du jeu de
+    la clé: arrivée à un bord, la mélodie repart dans l'autre sens.
+    
+    Paramètres:
+        cle: La clé ('sol', 'fa', 'ut3' ou 'ut4')
+        rng: Générateur aléatoire
+        longueur: Nombre de notes par phrase
+    
+    Retourne:
+        Générateur des noms de notes ('Do', 'Ré'...), une par appel à next()
+    """
+    premiere = DEGRE_PREMIERE_NOTE[cle]
+    while True:
+        position = rng.randrange(len(NOTES))  # 0 = note la plus grave du jeu
+        for _ in range(longueur):
+            yield NOTES[(premiere + position) % len(NOTES)]
+            pas = rng.choice(PAS_MELODIQUES)
+            if not 0 <= position + pas < len(NOTES):
+                pas = -pas  # Rebond sur le bord
+            position += pas
+
+class NotePhrase:
+    """
+    Une note de la bande qui défile.
+    
+    Attributs:
+        numero: Rang de la note depuis le début (0, 1, 2...)
+        nom: Nom de la note
+        temps_ms: Instant (ticks) où la note passe sur la ligne de lecture
+        resultat: None tant que la note n'a pas de réponse, puis 'correct', 'faux' ou 'temps'
+        note: La Note à dessiner
+    """
+    __slots__ = ('numero', 'nom', 'temps_ms', 'resultat', 'note')
+    
+    def __init__(self, numero, nom, temps_ms, note):
+        self.numero = numero
+        self.nom = nom
+        self.temps_ms = temps_ms
+        self.resultat = None
+        self.note = note
+
+class RenduBande:
+    """
+    Images des mesures de la bande qui défile, dessinées une seule fois.
+    
+    Chaque mesure (barre de mesure + 4 notes) est composée dans une petite
+    surface transparente. Pour faire défiler la bande, on recopie ces images
+    un peu plus à gauche à chaque image, au lieu de redessiner chaque note.
+    Une mesure est recomposée seulement quand une de ses notes change de
+    couleur (réponse donnée) ou quand l'échelle de la fenêtre change, et
+    oubliée quand elle sort de l'écran.
+    
+    Attribut:
+        creations: Nombre d'images de mesures composées
+    """
+    COULEURS = {None: NOIR, 'correct': VERT, 'faux': ROUGE, 'temps': ROUGE}
+    
+    def __init__(self, espace_note):
+        self.espace_note = espace_note
+        self._images = {}  # numéro de mesure -> ((facteur, résultats des notes), surface)
+        self.creations = 0
+    
+    def image(self, numero, notes):
+        """
+        Retourne l'image d'une mesure, composée si besoin.
+        
+        Paramètres:
+            numero: Numéro de la mesure
+            notes: Les NotePhrase de la mesure
+        """
+        echelle = init_runtime().echelle
+        etat = (echelle.facteur, tuple(n.resultat for n in notes))
+        en_cache = self._images.get(numero)
+        if en_cache is None or en_cache[0] != etat:
+            en_cache = (etat, self._composer(numero, notes, echelle))
+            self._images[numero] = en_cache
+            self.creations += 1
+        return en_cache[1]
+    
+    def oublier(self, numero):
+        """Libère l'image d'une mesure sortie de l'écran"""
+        self._images.pop(numero, None)
+    
+    def __len__(self):
+        return len(self._images)
+    
+    def _composer(self, numero, notes, echelle):
+        """Dessine la barre de mesure et les notes (le haut de l'image = haut de la zone de la portée)"""
+        zone = Jeu.ZONE_PORTEE
+        # Le coin de l'image est le point (0, haut de la zone) du jeu
+        couche = echelle.couche(0, zone.y)
+        taille = couche.rect((0, zone.y, TEMPS_PAR_MESURE * self.espace_note, zone.height)).size
+        image = pygame.Surface(taille, pygame.SRCALPHA)
+        # Barre de mesure, plus épaisse au début d'une phrase
+        debut_phrase = numero * TEMPS_PAR_MESURE % LONGUEUR_PHRASE == 0
+        x_barre = couche.longueur(1)
+        pygame.draw.line(image, NOIR, (x_barre, couche.y(Y_LIGNE_HAUT)), (x_barre, couche.y(Y_LIGNE_BAS)),
+                         couche.longueur(3 if debut_phrase else 1))
+        for i, note_phrase in enumerate(notes):
+            note_phrase.note.dessiner(image, couche, RenduBande.COULEURS[note_phrase.resultat],
+                                      x=(i + 0.5) * self.espace_note)
+        return image
+
+class LectureAVue(Jeu):
+    """
+    Mode lecture à vue: des phrases de notes défilent sur une seule clé.
+    
+    Les notes sont produites par generer_phrases() et gardées dans une file
+    (self._a_venir) de TAMPON_NOTES notes: quand une note reçoit sa réponse,
+    elle sort de la file et une nouvelle entre au bout. La note k passe sur
+    la ligne de lecture au battement DECOMPTE + k du métronome. On peut
+    répondre dès qu'une note entre à droite de la portée; si elle dépasse la
+    ligne de lecture d'un demi-temps sans réponse, elle compte comme manquée.
+    
+    Le score, les combos et les statistiques sont ceux de Jeu.
+    
+    Attributs (en plus de ceux de Jeu):
+        tempo: Battements par minute
+        periode_ms: Durée d'un battement
+        bande: RenduBande (images des mesures)
+        battements: Nombre de clics de métronome joués
+    """
+    AIDE_TAB = "Tab: clé suivante"
+    X_LECTURE = 290    # Ligne de lecture (juste après la clé)
+    X_BANDE = 265      # Les notes disparaissent à gauche de ce point
+    ESPACE_NOTE = 60   # Pixels entre deux notes (un battement)
+    
+    def __init__(self, cle='sol', tempo=TEMPO_DEFAUT, **options):
+        """
+        Crée une partie de lecture à vue.
+        
+        Paramètres:
+            cle: La clé ('sol', 'fa', 'ut3' ou 'ut4')
+            tempo: Battements par minute
+            options: Comme Jeu (horloge, audio, rng, modele, puits...)
+        """
+        if cle not in DEGRE_LIGNE_BAS:
+            raise ValueError(f"Clé inconnue: {cle}")
+        self.tempo = tempo
+        self.periode_ms = 60000 / tempo
+        # Temps entre l'entrée d'une note à droite et son passage sur la ligne de lecture
+        self.avance_ms = (RenduPortee.X_FIN - self.X_LECTURE) * self.periode_ms / self.ESPACE_NOTE
+        self.bande = RenduBande(self.ESPACE_NOTE)
+        self.battements = 0
+        self._a_venir = None  # Créée à la première note (voir _demarrer)
+        super().__init__(cle, **options)
+    
+    def _demarrer(self):
+        """Lance le métronome et remplit la file des notes à venir"""
+        self._debut_ms = self.horloge.ticks()
+        self._flux = generer_phrases(self.cle_actuelle, self.rng)
+        self._a_venir = collections.deque()
+        self._mesures = {}  # numéro de mesure -> ses NotePhrase (pour le dessin)
+        self._premiere_mesure = 0  # Plus ancienne mesure encore à l'écran
+        self._numero = 0  # Numéro de la prochaine note générée
+        self._prochain_battement = 0
+        self._prochain_son = 0
+        self._reussites_phrase = 0
+        for _ in range(TAMPON_NOTES):
+            self._ajouter_note()
+    
+    def variante_suivante(self):
+        """Nouvelle bande sur la clé suivante (Sol, Fa, Ut 3, Ut 4)"""
+        cles = list(DEGRE_LIGNE_BAS)
+        cle = cles[(cles.index(self.cle_actuelle) + 1) % len(cles)]
+        return LectureAVue(cle, self.tempo, **self._options_partagees())
+    
+    def _temps(self, numero):
+        """Instant où la note de ce numéro passe sur la ligne de lecture"""
+        return self._debut_ms + (DECOMPTE + numero) * self.periode_ms
+    
+    def _ajouter_note(self):
+        """Génère la note suivante et la met au bout de la file"""
+        numero = self._numero
+        self._numero += 1
+        nom = next(self._flux)
+        note = NotePhrase(numero, nom, self._temps(numero), Note(nom, self.cle_actuelle))
+        self._a_venir.append(note)
+        self._mesures.setdefault(numero // TEMPS_PAR_MESURE, []).append(note)
+    
+    def nouvelle_note(self):
+        """Passe à la note suivante de la bande (et résume la phrase qui se termine)"""
+        if self._a_venir is None:
+            self._demarrer()
+        else:
+            finie = self._a_venir.popleft()
+            self._ajouter_note()
+            if finie.numero % LONGUEUR_PHRASE == LONGUEUR_PHRASE - 1:
+                self.message = f"Phrase: {self._reussites_phrase}/{LONGUEUR_PHRASE}"
+                self.couleur_message = VERT if self._reussites_phrase == LONGUEUR_PHRASE else BLEU
+                self._reussites_phrase = 0
+        actuelle = self._a_venir[0]
+        self.note_actuelle = actuelle.note
+        # Le temps de réponse compte depuis l'entrée de la note à droite de la portée
+        self.temps_reponse = actuelle.temps_ms - self.avance_ms
+        # Déjà entrée (réponse en avance): elle défile à l'écran depuis son
+        # entrée, presentee() ne doit pas repousser son origine ni son échéance
+        self._a_presenter = self.horloge.ticks() < self.temps_reponse
+        self.max_temps = self.avance_ms + self.periode_ms / 2
+    
+    def verifier_reponse(self, index_note, instant=None):
+        """Comme Jeu.verifier_reponse, mais seulement une fois la note à l'écran"""
+        if (self.horloge.ticks() if instant is None else instant) >= self.temps_reponse:
+            super().verifier_reponse(index_note, instant)
+    
+    def noter_reponse(self, choix, resultat, instant=None):
+        """Enregistre la réponse et colore la note sur la bande"""
+        super().noter_reponse(choix, resultat, instant)
+        self._a_venir[0].resultat = resultat
+        if resultat == 'correct':
+            self._reussites_phrase += 1
+    
+    def avancer(self):
+        """Joue le métronome et le son des notes qui passent, oublie les mesures sorties"""
+        maintenant = self.horloge.ticks()
+        # Métronome: les battements trop en retard (image très lente) sont sautés
+        while self._debut_ms + self._prochain_battement * self.periode_ms <= maintenant:
+            retard = maintenant - (self._debut_ms + self._prochain_battement * self.periode_ms)
+            if self.son_active and retard < self.periode_ms / 2:
+                self.audio.battement(self._prochain_battement % TEMPS_PAR_MESURE == 0)
+                self.battements += 1
+            self._prochain_battement += 1
+        # Chaque note sonne en passant sur la ligne de lecture
+        while self._temps(self._prochain_son) <= maintenant:
+            retard = maintenant - self._temps(self._prochain_son)
+            if self.son_active and retard < self.periode_ms / 2:
+                mesure, temps = divmod(self._prochain_son, TEMPS_PAR_MESURE)
+                self.audio.jouer(self.cle_actuelle, self._mesures[mesure][temps].nom)
+            self._prochain_son += 1
+        # Mesures entièrement passées à gauche de la bande
+        while self._x(self._temps((self._premiere_mesure + 1) * TEMPS_PAR_MESURE)
+                      - self.periode_ms / 2, maintenant) < self.X_BANDE:
+            del self._mesures[self._premiere_mesure]
+            self.bande.oublier(self._premiere_mesure)
+            self._premiere_mesure += 1
+    
+    def _x(self, temps_ms, maintenant):
+        """Abscisse à l'écran de ce qui passe sur la ligne de lecture à temps_ms"""
+        return self.X_LECTURE + (temps_ms - maintenant) * self.ESPACE_NOTE / self.periode_ms
+    
+    def _dessiner_titre(self, surface):
+        """Titre avec la clé et le tempo"""
+        rt = init_runtime()
+        titre = rendre_texte(rt.police_moyenne,
+                             f"Lecture à vue - {NOMS_CLES[self.cle_actuelle]} - {self.tempo} BPM", BLEU)
+        surface.blit(titre, rt.echelle.placer(titre, midtop=(LARGEUR // 2, 20)))
+    
+    def _etat_portee(self):
+        """La bande bouge d'un pixel (de la fenêtre) dès que l'horloge avance assez"""
+        pixels_par_ms = self.ESPACE_NOTE * init_runtime().echelle.facteur / self.periode_ms
+        return (int(self.horloge.ticks() * pixels_par_ms), id(self.note_actuelle))
+    
+    def _dessiner_zone_portee(self, surface):
+        """Portée (un blit), images des mesures visibles (quelques blits) et ligne de lecture"""
+        self.dessiner_portee(surface)
+        echelle = init_runtime().echelle
+        maintenant = self.horloge.ticks()
+        zone = Jeu.ZONE_PORTEE
+        ancien_clip = surface.get_clip()
+        surface.set_clip(ancien_clip.clip(echelle.rect(
+            (self.X_BANDE, zone.y, RenduPortee.X_FIN - self.X_BANDE, zone.height))))
+        numero = self._premiere_mesure
+        while numero in self._mesures:
+            x = self._x(self._temps(numero * TEMPS_PAR_MESURE) - self.periode_ms / 2, maintenant)
+            if x > RenduPortee.X_FIN:
+                break  # Cette mesure et les suivantes ne sont pas encore visibles
+            surface.blit(self.bande.image(numero, self._mesures[numero]), echelle.point((x, zone.y)))
+            numero += 1
+        surface.set_clip(ancien_clip)
+        pygame.draw.line(surface, BLEU, echelle.point((self.X_LECTURE, Y_LIGNE_HAUT - 25)),
+                         echelle.point((self.X_LECTURE, Y_LIGNE_BAS + 25)), echelle.longueur(2))
+
+# ========================================
+# ACCORDS - Triades et intervalles
+# ========================================
+# Intervalle: écart entre deux notes, compté en notes (Do-Mi = tierce: Do, Ré, Mi)
+INTERVALLES = ('Seconde', 'Tierce', 'Quarte', 'Quinte', 'Sixte', 'Septième', 'Octave')
+ABREVIATIONS_INTERVALLES = ('2de', '3ce', '4te', '5te', '6te', '7e', '8ve')  # Sur les boutons
+
+# Qualité d'une triade selon ses deux tierces empilées (en demi-tons)
+QUALITES_TRIADES = {(4, 3): 'majeur', (3, 4): 'mineur', (3, 3): 'diminué', (4, 4): 'augmenté'}
+
+def triade(degre_racine):
+    """
+    Retourne (nom, degrés) de la triade sans altération posée sur un degré.
+    
+    La triade empile deux tierces: Do-Mi-Sol est 'Do majeur', Ré-Fa-La
+    'Ré mineur', Si-Ré-Fa 'Si diminué'.
+    """
+    degres = (degre_racine, degre_racine + 2, degre_racine + 4)
+    midis = [numero_midi(NOTES[d % 7], d // 7) for d in degres]
+    qualite = QUALITES_TRIADES[(midis[1] - midis[0], midis[2] - midis[1])]
+    return f"{NOTES[degre_racine % 7]} {qualite}", degres
+
+class Accord:
+    """
+    Plusieurs notes empilées sur la portée (triade ou intervalle).
+    
+    S'utilise comme une Note dans Jeu: mêmes attributs nom et dessiner().
+    
+    Attributs:
+        nom: Nom complet ('Ré mineur', 'Tierce'), enregistré dans les statistiques
+        reponse: Libellé du bouton de la bonne réponse ('Ré', '3ce')
+        notes: Les Note de l'accord, de la plus grave à la plus aiguë
+        midis: Leurs numéros MIDI
+    """
+    GLYPHE_TETE = '\U0000E0A4'  # Bravura noteheadBlack: tête de noire sans hampe
+    LONGUEUR_HAMPE = 3.5 * INTERLIGNE
+    
+    def __init__(self, nom, reponse, cle, degres, y_ligne_haut=Y_LIGNE_HAUT):
+        """
+        Paramètres:
+            nom, reponse: Voir les attributs
+            cle: La clé musicale
+            degres: Degrés des notes, du plus grave au plus aigu (voir degre())
+            y_ligne_haut: Position de la portée (voir GRANDE_PORTEE)
+        """
+        self.nom = nom
+        self.reponse = reponse
+        self.cle = cle
+        self.degres = tuple(degres)
+        self.notes = [Note(NOTES[d % 7], cle, d // 7, y_ligne_haut=y_ligne_haut) for d in self.degres]
+        self.midis = tuple(note.midi for note in self.notes)
+    
+    def dessiner(self, surface):
+        """Dessine les têtes empilées, leurs lignes additionnelles et une seule hampe"""
+        rt = init_runtime()
+        echelle = rt.echelle
+        tete = rendre_texte(rt.police_musicale, Accord.GLYPHE_TETE, NOIR)
+        # La tête seule, sans les marges de la police (déjà à l'échelle, comme la police)
+        encre = tete.get_bounding_rect()
+        epaisseur, demi_ligne = echelle.longueur(2), echelle.longueur(17)
+        x = echelle.x(LARGEUR // 2)
+        x_hampe = x + encre.width // 2 - epaisseur // 2
+        for i, note in enumerate(self.notes):
+            x_note = x
+            # Seconde: deux têtes voisines ne tiennent pas l'une sur l'autre,
+            # celle du dessus passe de l'autre côté de la hampe
+            if i and self.degres[i] - self.degres[i - 1] == 1:
+                x_note = x + encre.width - epaisseur
+            y_note = echelle.y(note.y)
+            for y in note.lignes:
+                y = echelle.y(y)
+                pygame.draw.line(surface, NOIR, (x_note - demi_ligne, y), (x_note + demi_ligne, y), epaisseur)
+            surface.blit(tete, (x_note - encre.centerx, y_note - encre.centery))
+        # Hampe de 3,5 interlignes au-dessus de la tête la plus aiguë (arrondie au pixel supérieur)
+        y_haut = echelle.y(self.notes[-1].y) - math.ceil(Accord.LONGUEUR_HAMPE * echelle.facteur)
+        pygame.draw.line(surface, NOIR, (x_hampe, echelle.y(self.notes[0].y)), (x_hampe, y_haut), epaisseur)
+
+class JeuAccords(Jeu):
+    """
+    Mode accords: une triade ou un intervalle est affiché et joué, le joueur le nomme.
+    
+    - Triades: nommer la note de base (fondamentale), avec les boutons Do à Si
+    - Intervalles: nommer l'écart entre les deux notes, de la seconde à l'octave
+    
+    Les accords sont choisis par le planificateur de répétition espacée,
+    comme les notes de Jeu. L'accord est joué en un seul son, synthétisé
+    une fois par la banque de sons (voir BanqueSons.obtenir_accord).
+    
+    Attribut (en plus de ceux de Jeu):
+        type_accord: 'triades' ou 'intervalles'
+    """
+    TYPES = ('triades', 'intervalles')
+    AIDE_TAB = "Tab: triades / intervalles"
+    BOITES = 'boites_accords'  # Les accords ne partagent pas les boîtes des notes
+    
+    def __init__(self, mode_cle='sol', type_accord='triades', **options):
+        """
+        Paramètres:
+            mode_cle: Comme Jeu
+            type_accord: 'triades' ou 'intervalles'
+            options: Comme Jeu (horloge, audio, rng, modele, puits...)
+        """
+        if type_accord not in JeuAccords.TYPES:
+            raise ValueError(f"Type d'accord inconnu: {type_accord}")
+        self.type_accord = type_accord
+        self.exercice = type_accord  # Réponses comptées à part des notes
+        self.reponses = NOTES if type_accord == 'triades' else ABREVIATIONS_INTERVALLES
+        super().__init__(mode_cle, **options)
+    
+    def elements(self):
+        """Les 7 triades, ou les 7 intervalles, de chaque clé"""
+        if self.type_accord == 'triades':
+            return [(cle, triade(DEGRE_PREMIERE_NOTE[cle] + rang)[0])
+                    for cle in self.cles for rang in range(len(NOTES))]
+        return [(cle, nom) for cle in self.cles for nom in INTERVALLES]
+    
+    def variante_suivante(self):
+        """Passe des triades aux intervalles, et inversement"""
+        autre = 'intervalles' if self.type_accord == 'triades' else 'triades'
+        return JeuAccords(self.mode_cle, autre, **self._options_partagees())
+    
+    def creer_accord(self, cle, nom):
+        """
+        Construit l'accord à afficher à partir de son nom.
+        
+        Les triades sont posées sur une des 7 notes du jeu de la clé; la
+        note grave d'un intervalle est une de ces 7 notes, tirée au hasard.
+        """
+        premiere = DEGRE_PREMIERE_NOTE[cle]
+        y_ligne_haut = GRANDE_PORTEE[cle] if self.grande_portee else Y_LIGNE_HAUT
+        if self.type_accord == 'triades':
+            racine = nom.split()[0]
+            _, degres = triade(premiere + (NOTES.index(racine) - premiere) % len(NOTES))
+            return Accord(nom, racine, cle, degres, y_ligne_haut)
+        rang = INTERVALLES.index(nom)
+        basse = premiere + self.rng.randrange(len(NOTES))
+        return Accord(nom, ABREVIATIONS_INTERVALLES[rang], cle, (basse, basse + rang + 1), y_ligne_haut)
+    
+    def nouvelle_note(self):
+        """Choisit le prochain accord (répétition espacée) et le joue"""
+        self.cle_actuelle, nom = self.planificateur.suivant()
+        # L'accord prend la place de la note (mêmes attributs nom et dessiner)
+        self.note_actuelle = self.creer_accord(self.cle_actuelle, nom)
+        self.temps_reponse = self.horloge.ticks()
+        self._a_presenter = True
+        if self.son_active:
+            self.audio.jouer_accord(self.note_actuelle.midis)
+    
+    def reponse_attendue(self):
+        """La fondamentale ('Ré') ou l'abréviation de l'intervalle ('3ce')"""
+        return self.note_actuelle.reponse
+    
+    def _dessiner_titre(self, surface):
+        """Titre avec le type d'accord et la clé"""
+        rt = init_runtime()
+        genre = "Triades" if self.type_accord == 'triades' else "Intervalles"
+        titre = rendre_texte(rt.police_moyenne, f"{genre} - {NOMS_CLES[self.cle_actuelle]}", BLEU)
+        surface.blit(titre, rt.echelle.placer(titre, midtop=(LARGEUR // 2, 20)))
+
+# ========================================
+# DÉTECTION DE HAUTEUR - Répondre en chantant ou en jouant
+# ========================================
+# L'élève répond en chantant (ou en jouant d'un instrument) la note affichée.
+# Le son arrive par une "source" (micro, fichier WAV ou flux PCM brut) et
+# passe par l'algorithme YIN, qui cherche la période du signal: le décalage
+# pour lequel le signal ressemble le plus à lui-même.
+# Seul le nom de la note compte (Do, Ré...): chanter une octave plus haut
+# ou plus bas que la portée est accepté.
+# Délai entre le début d'une note et la réponse: une trame, plus (STABILITE - 1)
+# pas pour la confirmer, soit 768 + 256 échantillons = 46.4 ms (moins de 50 ms)
+TAILLE_TRAME = 768    # Échantillons analysés d'un coup à 22050 Hz (34.8 ms de son, deux périodes à 60 Hz)
+PAS_TRAME = 256       # Une analyse tous les 256 échantillons (11.6 ms): les trames se chevauchent
+FREQUENCE_MIN = 60.0  # Hz: plus grave qu'un Si1, assez pour une voix de basse
+FREQUENCE_MAX = 1600.0  # Hz: plus aigu qu'un Sol6
+SEUIL_YIN = 0.15      # En dessous, le creux de YIN est une vraie période
+SEUIL_SILENCE = 0.01  # Niveau moyen (RMS) sous lequel on considère qu'il n'y a pas de son
+STABILITE = 2         # Trames de suite sur la même note avant de la donner comme réponse
+
+def decouper_trames(signal, taille, pas):
+    """
+    Découpe un signal en trames qui se chevauchent, sans copier les données.
+    
+    Retourne:
+        np.ndarray: Tableau (nombre de trames, taille) en lecture seule
+    """
+    if len(signal) < taille:
+        return np.empty((0, taille), dtype=signal.dtype)
+    return np.lib.stride_tricks.sliding_window_view(signal, taille)[::pas]
+
+def yin(trames, sample_rate, frequence_min=FREQUENCE_MIN, frequence_max=FREQUENCE_MAX,
+        seuil=SEUIL_YIN):
+    """
+    Estime la fréquence fondamentale de chaque trame avec l'algorithme YIN.
+    
+    Toutes les trames sont traitées en même temps (calculs NumPy sur un
+    tableau 2D). La fonction de différence de YIN,
+        d(τ) = Σ (x[j] - x[j+τ])²  =  énergie(0) + énergie(τ) - 2 × corrélation(τ),
+    est obtenue par FFT: la corrélation pour tous les décalages τ coûte
+    O(n log n) au lieu de O(n²).
+    
+    Paramètres:
+        trames: Tableau (nombre de trames, taille), échantillons entre -1 et 1
+        sample_rate: Fréquence d'échantillonnage en Hz
+        frequence_min, frequence_max: Plage de fréquences cherchées
+        seuil: Seuil de la différence normalisée (plus bas = plus exigeant)
+    
+    Retourne:
+        np.ndarray: Fréquence de chaque trame en Hz (NaN si aucune période nette)
+    """
+    trames = np.asarray(trames, dtype=np.float64)
+    nb, taille = trames.shape
+    tau_max = min(taille // 2, int(sample_rate / frequence_min) + 2)
+    tau_min = max(2, int(sample_rate / frequence_max))
+    fenetre = taille - tau_max  # Nombre d'échantillons comparés pour chaque décalage
+    n_fft = 1 << (taille + fenetre - 1).bit_length()
+    # Corrélation du début de la trame avec la trame décalée de τ
+    spectre = np.fft.rfft(trames, n_fft)
+    debut = np.fft.rfft(trames[:, :fenetre], n_fft)
+    correlation = np.fft.irfft(spectre * np.conj(debut), n_fft)[:, :tau_max]
+    # Énergie des échantillons [τ, τ + fenetre) grâce aux sommes cumulées
+    carres = np.zeros((nb, taille + 1))
+    np.cumsum(trames ** 2, axis=1, out=carres[:, 1:])
+    decalages = np.arange(tau_max)
+    energie = carres[:, decalages + fenetre] - carres[:, decalages]
+    difference = energie[:, :1] + energie - 2 * correlation
+    difference[:, 0] = 0
+    # Différence normalisée par sa moyenne cumulée: vaut 1 en moyenne, ~0 à la période
+    cumul = np.cumsum(difference[:, 1:], axis=1)
+    normalisee = np.ones_like(difference)
+    np.divide(difference[:, 1:] * decalages[1:], cumul, out=normalisee[:, 1:], where=cumul > 0)
+    # Premier décalage sous le seuil, au fond de son creux
+    creux = (normalisee[:, :-1] < seuil) & (normalisee[:, :-1] <= normalisee[:, 1:])
+    creux[:, :tau_min] = False
+    trouve = creux.any(axis=1)
+    tau = np.where(trouve, creux.argmax(axis=1), 1)
+    # Interpolation parabolique autour du creux (précision sous l'échantillon)
+    lignes = np.arange(nb)
+    avant = normalisee[lignes, tau - 1]
+    centre = normalisee[lignes, tau]
+    apres = normalisee[lignes, tau + 1]
+    courbure = avant - 2 * centre + apres
+    correction = np.divide(avant - apres, 2 * courbure, out=np.zeros(nb), where=courbure > 0)
+    frequences = sample_rate / (tau + np.clip(correction, -1, 1))
+    frequences[~trouve] = np.nan
+    return frequences
+
+def midi_de_frequence(frequence):
+    """Retourne le numéro MIDI le plus proche d'une fréquence (69 pour 440 Hz)"""
+    return int(round(MIDI_LA_REFERENCE + 12 * math.log2(frequence / LA_REFERENCE)))
+
+def _depuis_pcm16(octets, canaux):
+    """Convertit des octets PCM 16 bits signés en échantillons mono entre -1 et 1"""
+    octets = octets[:len(octets) // (2 * canaux) * (2 * canaux)]  # Échantillons complets seulement
+    echantillons = np.frombuffer(octets, dtype='<i2').astype(np.float32) / 32768
+    if canaux > 1:
+        echantillons = echantillons.reshape(-1, canaux).mean(axis=1)
+    return echantillons
+
+class SourcePCM:
+    """
+    Source de son: un flux d'octets PCM 16 bits signés (fichier, tube, stdin).
+    
+    Exemple, pour répondre depuis un autre programme:
+        arecord -f S16_LE -r 22050 -c 1 | python music_game.py --entree-audio -
+    
+    Attributs:
+        sample_rate: Fréquence d'échantillonnage en Hz
+        canaux: Nombre de canaux (mélangés en mono)
+        temps_reel: Si True, lire() attend pour suivre le rythme réel du son
+    """
+    def __init__(self, flux, sample_rate=PARAMETRES_AUDIO['frequence'], canaux=1, temps_reel=False):
+        self.flux = flux
+        self.sample_rate = sample_rate
+        self.canaux = canaux
+        self.temps_reel = temps_reel
+        self._lus = 0  # Échantillons déjà lus
+        self._debut = None
+    
+    def _lire_octets(self, n):
+        return self.flux.read(n * 2 * self.canaux)
+    
+    def lire(self, n):
+        """
+        Retourne jusqu'à n échantillons mono (float32), ou None à la fin du flux.
+        """
+        echantillons = _depuis_pcm16(self._lire_octets(n), self.canaux)
+        if not len(echantillons):
+            return None
+        self._lus += len(echantillons)
+        if self.temps_reel:
+            # Un fichier se lit d'un coup: on attend que ce son "ait été joué"
+            if self._debut is None:
+                self._debut = time.perf_counter()
+            attente = self._debut + self._lus / self.sample_rate - time.perf_counter()
+            if attente > 0:
+                time.sleep(attente)
+        return echantillons
+    
+    def fermer(self):
+        """Ferme le flux"""
+        self.flux.close()
+
+class SourceWav(SourcePCM):
+    """Source de son: un fichier WAV en 16 bits (enregistrement d'un élève, tests)"""
+    def __init__(self, chemin, temps_reel=False):
+        self._wav = wave.open(chemin, 'rb')
+        if self._wav.getsampwidth() != 2:
+            self._wav.close()
+            raise ValueError(f"{chemin}: seuls les fichiers WAV 16 bits sont lus")
+        super().__init__(self._wav, self._wav.getframerate(), self._wav.getnchannels(), temps_reel)
+    
+    def _lire_octets(self, n):
+        return self._wav.readframes(n)
+
+class SourceMicro:
+    """
+    Source de son: le micro, par la capture audio de SDL.
+    
+    SDL appelle _recevoir() depuis son propre thread à chaque bloc capté;
+    lire() les rend dans l'ordre. Si le détecteur prend du retard, les blocs
+    les plus anciens sont perdus (comptés dans 'perdus'): mieux vaut
+    répondre à ce qui se chante maintenant.
+    """
+    def __init__(self, sample_rate=PARAMETRES_AUDIO['frequence'], taille_bloc=PAS_TRAME):
+        try:
+            from pygame._sdl2 import audio as sdl_audio
+        except ImportError:
+            raise RuntimeError("capture audio indisponible dans cette version de Pygame")
+        self.sample_rate = sample_rate
+        self.perdus = 0
+        self._blocs = queue.Queue(maxsize=64)
+        try:
+            noms = sdl_audio.get_audio_device_names(True)  # Appareils de capture
+            if not noms:
+                raise RuntimeError("aucun micro trouvé")
+            self._appareil = sdl_audio.AudioDevice(
+                devicename=noms[0], iscapture=True, frequency=sample_rate,
+                audioformat=sdl_audio.AUDIO_F32, numchannels=1, chunksize=taille_bloc,
+                allowed_changes=0, callback=self._recevoir)
+        except pygame.error as e:
+            raise RuntimeError(f"aucun micro utilisable: {e}")
+        self._appareil.pause(0)  # Démarre la capture
+    
+    def _recevoir(self, appareil, memoire):
+        bloc = np.frombuffer(bytes(memoire), dtype=np.float32)
+        try:
+            self._blocs.put_nowait(bloc)
+        except queue.Full:
+            self._blocs.get_nowait()
+            self._blocs.put_nowait(bloc)
+            self.perdus += 1
+    
+    def lire(self, n):
+        """Retourne le prochain bloc capté (attend au plus une seconde)"""
+        try:
+            return self._blocs.get(timeout=1.0)
+        except queue.Empty:
+            return np.zeros(0, dtype=np.float32)  # Rien capté: le détecteur réessaie
+    
+    def fermer(self):
+        self._appareil.close()
+
+def ouvrir_source(nom):
+    """
+    Ouvre la source de son de l'option --entree-audio.
+    
+    Paramètre:
+        nom: 'micro', '-' (PCM brut sur l'entrée standard) ou chemin d'un fichier WAV
+    """
+    if nom == 'micro':
+        return SourceMicro()
+    if nom == '-':
+        frequence = init_runtime().parametres_audio()['frequence']
+        return SourcePCM(sys.stdin.buffer, frequence)
+    return SourceWav(nom, temps_reel=True)
+
+class Detection:
+    """Une note reconnue par le détecteur"""
+    __slots__ = ('nom', 'midi', 'frequence', 'instant', 'calcul_ms')
+    
+    def __init__(self, nom, midi, frequence, instant, calcul_ms):
+        self.nom = nom              # Nom de la note ('La'), None pour une touche noire
+        self.midi = midi            # Numéro MIDI le plus proche
+        self.frequence = frequence  # Fréquence mesurée en Hz
+        self.instant = instant      # Position dans le son (fin de la trame), en secondes
+        self.calcul_ms = calcul_ms  # Temps de calcul entre la lecture du bloc et la décision
+
+class DetecteurHauteur:
+    """
+    Détecteur de notes qui tourne dans son propre thread.
+    
+    Le thread lit la source bloc par bloc, analyse d'un coup toutes les
+    trames complètes (yin) et décide: une note tenue STABILITE trames de
+    suite est une réponse. La même note n'est redonnée qu'après un silence
+    ou une autre note. La boucle de jeu récupère les réponses avec notes(),
+    sans jamais attendre le calcul.
+    
+    Attributs:
+        source: Source de son (SourcePCM, SourceWav ou SourceMicro)
+        taille, pas: Taille des trames et écart entre deux trames, en échantillons
+        calculs: Histogramme du temps de calcul par bloc, en µs
+        trames: Nombre de trames analysées
+    """
+    def __init__(self, source, stabilite=STABILITE, seuil=SEUIL_YIN):
+        self.source = source
+        # Mêmes durées quelle que soit la fréquence d'échantillonnage
+        self.taille = TAILLE_TRAME * source.sample_rate // 22050
+        self.pas = PAS_TRAME * source.sample_rate // 22050
+        self.stabilite = stabilite
+        self.seuil = seuil
+        self.calculs = Histogramme()
+        self.trames = 0
+        self._detections = queue.Queue()
+        self._arret = threading.Event()
+        self._thread = None
+        self._tampon = np.zeros(0, dtype=np.float32)
+        self._position = 0   # Position du début du tampon dans le son, en échantillons
+        self._candidate = None  # Note des dernières trames et nombre de trames de suite
+        self._suite = 0
+        self._donnee = None  # Dernière note donnée comme réponse
+    
+    def demarrer(self):
+        """Lance le thread de détection"""
+        self._thread = threading.Thread(target=self._executer, daemon=True)
+        self._thread.start()
+        return self
+    
+    def arreter(self):
+        """Arrête le thread et ferme la source"""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.source.fermer()
+    
+    def attendre_fin(self, timeout=None):
+        """Attend que toute la source soit analysée (fichiers et tests)"""
+        self._thread.join(timeout)
+    
+    def entrees(self, horloge):
+        """Notes reconnues depuis le dernier appel, pour FileEntrees (datées de leur lecture)"""
+        maintenant = horloge.ticks()
+        return [Entree(maintenant, note=detection.midi) for detection in self.notes()]
+    
+    def fermer(self):
+        """Arrête la détection (FileEntrees.fermer)"""
+        self.arreter()
+    
+    def notes(self):
+        """Retourne les notes reconnues depuis le dernier appel (sans attendre)"""
+        detections = []
+        while True:
+            try:
+                detections.append(self._detections.get_nowait())
+            except queue.Empty:
+                return detections
+    
+    def _executer(self):
+        while not self._arret.is_set():
+            bloc = self.source.lire(self.pas)
+            if bloc is None:
+                return  # Fin du fichier ou du flux
+            self.analyser(bloc)
+    
+    def analyser(self, bloc):
+        """
+        Ajoute un bloc d'échantillons et analyse toutes les trames complètes.
+        
+        Appelée par le thread; utilisable directement dans les tests.
+        """
+        debut = time.perf_counter()
+        tampon = np.concatenate((self._tampon, bloc))
+        trames = decouper_trames(tampon, self.taille, self.pas)
+        if len(trames):
+            niveaux = np.sqrt(np.mean(np.square(trames, dtype=np.float64), axis=1))
+            frequences = yin(trames, self.source.sample_rate, seuil=self.seuil)
+            for i in range(len(trames)):
+                fin = self._position + i * self.pas + self.taille
+                self._decider(frequences[i], niveaux[i], fin, debut)
+            # Garder la suite du son: début de la prochaine trame
+            consommes = len(trames) * self.pas
+            tampon = tampon[consommes:]
+            self._position += consommes
+            self.trames += len(trames)
+        self._tampon = tampon
+        self.calculs.ajouter((time.perf_counter() - debut) * 1e6)
+    
+    def _decider(self, frequence, niveau, fin, debut):
+        """Met à jour la note en cours avec une trame; donne une réponse si elle est stable"""
+        if niveau < SEUIL_SILENCE:
+            self._candidate, self._suite, self._donnee = None, 0, None
+            return
+        if math.isnan(frequence):
+            return  # Pas de période nette (bruit, attaque): on garde l'état
+        midi = midi_de_frequence(frequence)
+        if midi == self._candidate:
+            self._suite += 1
+        else:
+            self._candidate, self._suite = midi, 1
+        # Même nom à une octave près: c'est encore la même réponse
+        if self._suite == self.stabilite and (self._donnee is None or (midi - self._donnee) % 12):
+            self._donnee = midi
+            nom, _, alteration = depuis_midi(midi)
+            self._detections.put(Detection(None if alteration else nom, midi, float(frequence),
+                                           fin / self.source.sample_rate,
+                                           (time.perf_counter() - debut) * 1000))
+
+# ========================================
+# ENTRÉES - Clavier, souris et MIDI dans une seule file
+# ========================================
+# Les boucles lisent toutes les actions du joueur dans une seule file
+# (FileEntrees): événements pygame (touches, clics, fenêtre) et notes jouées
+# sur un clavier MIDI, rejouées depuis un fichier .mid ou chantées (voir
+# DetecteurHauteur). Chaque entrée porte l'instant où elle s'est produite,
+# dans le temps de l'horloge du jeu (millisecondes de horloge.ticks()):
+# pour une note MIDI, c'est l'instant donné par l'appareil, et non celui où
+# la boucle, à 60 images par seconde, a fini par la lire.
+TAILLE_TAMPON_MIDI = 4096  # Notes MIDI gardées par PortMidi entre deux lectures
+LOT_MIDI = 256             # Notes lues d'un coup (on lit jusqu'à vider le tampon)
+NOTE_ON = 0x90             # Octet de statut "note enfoncée" (canaux 0x90 à 0x9F)
+
+class Entree:
+    """Une action du joueur: un événement pygame, ou une note (numéro MIDI)"""
+    __slots__ = ('instant', 'evenement', 'note')
+    
+    def __init__(self, instant, evenement=None, note=None):
+        self.instant = instant      # Millisecondes, dans le temps de horloge.ticks()
+        self.evenement = evenement  # Événement pygame (None pour une note)
+        self.note = note            # Numéro MIDI (None pour un événement pygame)
+
+def entree_midi(statut, note, velocite, instant):
+    """
+    Convertit un message MIDI en Entree (None si ce n'est pas une note enfoncée).
+    
+    Une "note enfoncée" de vélocité 0 veut dire "note relâchée" (norme MIDI).
+    """
+    if statut & 0xF0 == NOTE_ON and velocite > 0:
+        return Entree(instant, note=note)
+    return None
+
+def _lire_vlq(donnees, position):
+    """Lit une longueur MIDI à taille variable (7 bits par octet); retourne (valeur, position)"""
+    valeur = 0
+    while True:
+        octet = donnees[position]
+        position += 1
+        valeur = (valeur << 7) | (octet & 0x7F)
+        if octet < 0x80:
+            return valeur, position
+
+def lire_fichier_midi(chemin):
+    """
+    Lit les messages de canal d'un fichier MIDI standard (.mid, formats 0 et 1).
+    
+    Les changements de tempo sont appliqués pour convertir les temps en
+    secondes. Les autres méta-événements et les messages système sont ignorés.
+    
+    Retourne:
+        list: Tuples (secondes depuis le début, statut, donnée 1, donnée 2), dans l'ordre
+    """
+    with open(chemin, 'rb') as f:
+        donnees = f.read()
+    if donnees[:4] != b'MThd':
+        raise ValueError(f"{chemin}: ce n'est pas un fichier MIDI")
+    longueur = int.from_bytes(donnees[4:8], 'big')
+    division = int.from_bytes(donnees[12:14], 'big')
+    position = 8 + longueur
+    evenements = []  # (tick, ordre, tempo ou None, statut, d1, d2)
+    while position + 8 <= len(donnees):
+        type_bloc, taille = donnees[position:position + 4], int.from_bytes(donnees[position + 4:position + 8], 'big')
+        position += 8
+        fin, tick, statut = position + taille, 0, 0
+        while type_bloc == b'MTrk' and position < fin:
+            delta, position = _lire_vlq(donnees, position)
+            tick += delta
+            if donnees[position] >= 0x80:
+                statut = donnees[position]  # Sinon: "running status", même statut qu'avant
+                position += 1
+            if statut == 0xFF:  # Méta-événement: type, longueur, données
+                type_meta = donnees[position]
+                taille_meta, position = _lire_vlq(donnees, position + 1)
+                if type_meta == 0x51:  # Tempo: microsecondes par noire
+                    evenements.append((tick, len(evenements),
+                                       int.from_bytes(donnees[position:position + 3], 'big'), 0, 0, 0))
+                position += taille_meta
+            elif statut in (0xF0, 0xF7):  # Message système exclusif: ignoré
+                taille_sysex, position = _lire_vlq(donnees, position)
+                position += taille_sysex
+            else:
+                # Programme (0xC_) et pression (0xD_) n'ont qu'une donnée
+                nb = 1 if statut & 0xF0 in (0xC0, 0xD0) else 2
+                d1 = donnees[position]
+                d2 = donnees[position + 1] if nb == 2 else 0
+                evenements.append((tick, len(evenements), None, statut, d1, d2))
+                position += nb
+        position = fin
+    # Ticks -> secondes, en suivant les changements de tempo
+    evenements.sort()
+    if division & 0x8000:  # Division SMPTE: images par seconde × ticks par image
+        secondes_par_tick = lambda tempo: 1 / ((256 - (division >> 8)) * (division & 0xFF))
+    else:  # Ticks par noire
+        secondes_par_tick = lambda tempo: tempo / 1e6 / division
+    resultats, tempo, tick_precedent, secondes = [], 500_000, 0, 0.0
+    for tick, _, nouveau_tempo, statut, d1, d2 in evenements:
+        secondes += (tick - tick_precedent) * secondes_par_tick(tempo)
+        tick_precedent = tick
+        if nouveau_tempo is not None:
+            tempo = nouveau_tempo
+        else:
+            resultats.append((secondes, statut, d1, d2))
+    return resultats
+
+class SourceMidi:
+    """
+    Notes jouées sur un clavier MIDI branché (par PortMidi, avec pygame.midi).
+    
+    PortMidi date chaque message à son arrivée et le garde dans son tampon
+    (TAILLE_TAMPON_MIDI messages) jusqu'à la prochaine lecture: rien n'est
+    perdu, même quand l'élève plaque un accord entre deux images.
+    """
+    def __init__(self, appareil=None):
+        import pygame.midi
+        self._midi = pygame.midi
+        pygame.midi.init()
+        if appareil is None:
+            appareil = pygame.midi.get_default_input_id()
+        if appareil < 0:
+            raise RuntimeError("aucun clavier MIDI trouvé")
+        self._entree = pygame.midi.Input(appareil, TAILLE_TAMPON_MIDI)
+        self._decalage = None  # horloge.ticks() - pygame.midi.time()
+    
+    def entrees(self, horloge):
+        """Retourne toutes les notes reçues depuis le dernier appel"""
+        if self._decalage is None:
+            # L'horloge de PortMidi part de pygame.midi.init(): on l'aligne une fois sur celle du jeu
+            self._decalage = horloge.ticks() - self._midi.time()
+        entrees = []
+        while self._entree.poll():
+            for (statut, note, velocite, _), instant in self._entree.read(LOT_MIDI):
+                entree = entree_midi(statut, note, velocite, instant + self._decalage)
+                if entree is not None:
+                    entrees.append(entree)
+        return entrees
+    
+    def fermer(self):
+        self._entree.close()
+
+class SourceMidiFichier:
+    """
+    Notes rejouées depuis un fichier MIDI (ou une liste de messages), pour
+    s'entraîner sur un morceau enregistré ou tester sans clavier.
+    
+    En temps réel, chaque note arrive quand l'horloge du jeu atteint son
+    instant dans le fichier; sinon tout arrive à la première lecture. Dans
+    les deux cas, l'instant de chaque entrée est celui du fichier.
+    """
+    def __init__(self, messages, temps_reel=True):
+        if isinstance(messages, str):
+            messages = lire_fichier_midi(messages)
+        self.messages = list(messages)
+        self.temps_reel = temps_reel
+        self._suivant = 0
+        self._debut = None  # horloge.ticks() à la première lecture
+    
+    def entrees(self, horloge):
+        """Retourne les notes dont l'instant est passé"""
+        maintenant = horloge.ticks()
+        if self._debut is None:
+            self._debut = maintenant
+        entrees = []
+        while self._suivant < len(self.messages):
+            secondes, statut, note, velocite = self.messages[self._suivant]
+            instant = self._debut + secondes * 1000
+            if self.temps_reel and instant > maintenant:
+                break
+            self._suivant += 1
+            entree = entree_midi(statut, note, velocite, instant)
+            if entree is not None:
+                entrees.append(entree)
+        return entrees
+    
+    def fermer(self):
+        """Rien à fermer"""
+
+def ouvrir_source_midi(nom):
+    """
+    Ouvre la source de l'option --entree-midi.
+    
+    Paramètre:
+        nom: 'clavier' (appareil par défaut), numéro d'appareil, ou fichier .mid
+    """
+    if nom == 'clavier':
+        return SourceMidi()
+    if nom.isdigit():
+        return SourceMidi(int(nom))
+    return SourceMidiFichier(nom)
+
+class FileEntrees:
+    """
+    File unique des actions du joueur, dans l'ordre où elles se sont produites.
+    
+    attendre() rend les événements pygame (datés de leur arrivée, relevée
+    par le Cadenceur: pygame ne donne pas d'instant) et les notes des
+    sources (datées par l'appareil), triés par instant. Une source est tout
+    objet qui a une méthode entrees(horloge) et fermer().
+    
+    Attributs:
+        sources: Sources de notes (MIDI, fichier, voix)
+        recues: Nombre d'entrées rendues depuis la création
+    """
+    def __init__(self, cadenceur, horloge, sources=()):
+        self.cadenceur = cadenceur
+        self.horloge = horloge
+        self.sources = list(sources)
+        self.recues = 0
+    
+    def attendre(self, anime=False, bloquer=True):
+        """
+        Attend comme Cadenceur.attendre, puis rend toutes les entrées reçues.
+        
+        Avec des sources de notes, la boucle ne peut pas dormir jusqu'au
+        prochain événement pygame (une note MIDI n'en est pas un): elle
+        tourne alors à la cadence des images.
+        """
+        evenements = self.cadenceur.attendre(anime=anime or bool(self.sources), bloquer=bloquer)
+        # Heures d'arrivée (perf_counter, en secondes) -> temps de l'horloge du jeu
+        decalage = self.horloge.ticks() - time.perf_counter() * 1000
+        entrees = [Entree(arrivee * 1000 + decalage, evenement)
+                   for arrivee, evenement in zip(self.cadenceur.arrivees, evenements)]
+        for source in self.sources:
+            entrees.extend(source.entrees(self.horloge))
+        entrees.sort(key=lambda entree: entree.instant)  # Tri stable: l'ordre de pygame est gardé
+        self.recues += len(entrees)
+        return entrees
+    
+    def maintenant(self):
+        """Retourne l'instant présent, en ms de l'horloge (voir EnregistreurSession)"""
+        return self.horloge.ticks()
+    
+    def fermer(self):
+        """Ferme toutes les sources"""
+        for source in self.sources:
+            source.fermer()
+
+def ouvrir_entrees(voix=False):
+    """
+    Crée la file des entrées d'une boucle, avec les sources demandées en option.
+    
+    Paramètre:
+        voix: True pour ajouter aussi les réponses chantées (--entree-audio)
+    """
+    rt = init_runtime()
+    sources = []
+    options = [('entree_midi', ouvrir_source_midi, "MIDI")]
+    if voix:
+        options.append(('entree_audio', lambda nom: DetecteurHauteur(ouvrir_source(nom)).demarrer(), "audio"))
+    for option, ouvrir, nom in options:
+        if rt.options.get(option):
+            try:
+                sources.append(ouvrir(rt.options[option]))
+            except (RuntimeError, OSError, ValueError, wave.Error) as e:
+                print(f"Entrée {nom} désactivée: {e}")
+    return FileEntrees(rt.cadenceur, HorlogePygame(), sources)
+
+# ========================================
+# ENREGISTREMENT ET REJEU DES PARTIES
+# ========================================
+# Pour reproduire un problème signalé par un élève, une partie peut être
+# enregistrée (--enregistrer) puis rejouée à l'identique (--rejouer).
+# Tout ce qui rend une partie unique passe par la file des entrées:
+# - le hasard: le jeu tire ses notes avec random.Random(graine);
+# - le temps: boucle_jeu lit l'heure une fois par étape de l'image
+#   (maintenant()) et la donne au jeu par une HorlogeSimulee;
+# - le joueur: les touches, clics, déplacements de souris et notes.
+# EnregistreurSession écrit tout cela au fil de la partie et SessionRejouee
+# le relit, avec les mêmes méthodes que FileEntrees.
+#
+# Format du fichier (binaire, petit-boutiste):
+# - en-tête: magie, graine, horodatage du début, taille des paramètres,
+#   puis les paramètres (mode, tempo, données du joueur) en JSON compressé;
+# - puis des enregistrements: un octet de type, suivi de ses valeurs.
+# Chaque instant est l'écart (float32, en ms) avec l'instant précédent:
+# 5 octets par lecture de l'horloge, environ 1 Kio par seconde de jeu.
+MAGIE_SESSION = b'MGS1'
+ENTETE_SESSION = struct.Struct('<4sQdI')  # Magie, graine, début, taille des paramètres
+ECART_SESSION = struct.Struct('<f')       # Écart avec l'instant précédent (ms)
+FORMATS_SESSION = {
+    b'T': struct.Struct('<f'),     # Lecture de l'horloge
+    b'I': struct.Struct('<I'),     # Image: nombre d'entrées qui suivent
+    b'Q': struct.Struct('<f'),     # Fermeture de la fenêtre
+    b'K': struct.Struct('<fI'),    # Touche enfoncée (code pygame)
+    b'C': struct.Struct('<fBhh'),  # Clic (bouton, x, y)
+    b'S': struct.Struct('<fhh'),   # Souris déplacée (x, y)
+    b'N': struct.Struct('<fB'),    # Note MIDI ou chantée (numéro MIDI)
+}
+
+def _coder_entree(entree):
+    """Retourne (type, valeurs) d'une entrée, ou None si elle ne compte pas pour le jeu"""
+    if entree.note is not None:
+        return b'N', (entree.note,)
+    evenement = entree.evenement
+    if evenement.type == pygame.KEYDOWN:
+        return b'K', (evenement.key,)
+    if evenement.type == pygame.MOUSEBUTTONDOWN:
+        return b'C', (evenement.button,) + tuple(evenement.pos)
+    if evenement.type == pygame.MOUSEMOTION:
+        return b'S', tuple(evenement.pos)
+    if evenement.type == pygame.QUIT:
+        return b'Q', ()
+    return None
+
+def _decoder_entree(type_, instant, valeurs):
+    """Reconstruit l'Entree (avec son événement pygame) d'un enregistrement"""
+    if type_ == b'N':
+        return Entree(instant, note=valeurs[0])
+    if type_ == b'K':
+        evenement = pygame.event.Event(pygame.KEYDOWN, key=valeurs[0])
+    elif type_ == b'C':
+        evenement = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=valeurs[0], pos=valeurs[1:])
+    elif type_ == b'S':
+        evenement = pygame.event.Event(pygame.MOUSEMOTION, pos=valeurs)
+    else:
+        evenement = pygame.event.Event(pygame.QUIT)
+    return Entree(instant, evenement)
+
+class EnregistreurSession:
+    """
+    Enregistre une partie pendant qu'on la joue (option --enregistrer).
+
+    Se place devant la file des entrées de boucle_jeu: chaque appel à
+    attendre() et maintenant() est transmis à la vraie file, écrit dans le
+    fichier, et le résultat est rendu au jeu. Les instants sont arrondis
+    comme dans le fichier avant d'être rendus: le jeu voit exactement ce
+    que verra le rejeu.
+
+    Attributs:
+        chemin: Fichier de l'enregistrement
+        graine: Graine du hasard de la partie
+        debut: Horodatage (secondes depuis 1970) de l'instant 0 de l'horloge
+        octets: Taille écrite jusqu'ici
+    """
+    def __init__(self, chemin, entrees, graine, debut, parametres):
+        """
+        Paramètres:
+            chemin: Fichier à créer (remplacé s'il existe)
+            entrees: La file des entrées à enregistrer (FileEntrees)
+            graine: Graine du random.Random du jeu
+            debut: Horodatage de l'instant 0 de l'horloge du jeu
+            parametres: mode_cle, mode_jeu, tempo et donnees (données du joueur au départ)
+        """
+        self.chemin = chemin
+        self.entrees = entrees
+        self.graine = graine
+        self.debut = debut
+        self._dernier = 0.0  # Dernier instant écrit (le suivant est écrit en écart)
+        self._fichier = open(chemin, 'wb')
+        contenu = zlib.compress(json.dumps(parametres).encode('utf-8'))
+        self._fichier.write(ENTETE_SESSION.pack(MAGIE_SESSION, graine, debut, len(contenu)))
+        self._fichier.write(contenu)
+        self.octets = ENTETE_SESSION.size + len(contenu)
+
+    def _ecrire(self, type_, instant=None, valeurs=()):
+        """Écrit un enregistrement; retourne l'instant tel qu'il sera relu"""
+        if instant is not None:
+            ecart, = ECART_SESSION.unpack(ECART_SESSION.pack(instant - self._dernier))
+            self._dernier += ecart
+            valeurs = (ecart,) + tuple(valeurs)
+        donnees = type_ + FORMATS_SESSION[type_].pack(*valeurs)
+        self._fichier.write(donnees)
+        self.octets += len(donnees)
+        return self._dernier
+
+    def attendre(self, anime=False, bloquer=True):
+        """Comme FileEntrees.attendre; les entrées sans effet sur le jeu (fenêtre...) sont écartées"""
+        codees = []
+        for entree in self.entrees.attendre(anime, bloquer):
+            code = _coder_entree(entree)
+            if code is not None:
+                codees.append((entree, code))
+        self._ecrire(b'I', valeurs=(len(codees),))
+        entrees = []
+        for entree, (type_, valeurs) in codees:
+            entree.instant = self._ecrire(type_, entree.instant, valeurs)
+            entrees.append(entree)
+        return entrees
+
+    def maintenant(self):
+        """Comme FileEntrees.maintenant"""
+        return self._ecrire(b'T', self.entrees.maintenant())
+
+    def fermer(self):
+        """Ferme la vraie file et le fichier"""
+        self.entrees.fermer()
+        self._fichier.close()
+
+class SessionRejouee:
+    """
+    Rejoue une partie enregistrée par EnregistreurSession.
+
+    S'utilise comme la file des entrées de boucle_jeu: attendre() rend les
+    entrées de l'image suivante et maintenant() l'heure lue à ce moment de
+    la partie. À la fin de l'enregistrement, attendre() rend une fermeture
+    de la fenêtre.
+
+    Attributs:
+        graine, debut: Comme EnregistreurSession
+        parametres: mode_cle, mode_jeu, tempo et donnees du joueur au départ
+        temps_reel: True pour attendre entre les images comme pendant la
+                    partie; False pour rejouer aussi vite que possible
+        images: Nombre d'images rejouées
+        evenements: Événements émis par le jeu pendant le rejeu (voir rejouer_session)
+    """
+    def __init__(self, chemin, temps_reel=False):
+        with open(chemin, 'rb') as f:
+            self._donnees = f.read()
+        if len(self._donnees) < ENTETE_SESSION.size:
+            raise ValueError(f"{chemin}: enregistrement vide ou tronqué")
+        magie, self.graine, self.debut, taille = ENTETE_SESSION.unpack_from(self._donnees)
+        if magie != MAGIE_SESSION:
+            raise ValueError(f"{chemin}: ce n'est pas une partie enregistrée")
+        self._position = ENTETE_SESSION.size + taille
+        self.parametres = json.loads(zlib.decompress(self._donnees[ENTETE_SESSION.size:self._position]))
+        self.temps_reel = temps_reel
+        self.images = 0
+        self.evenements = []
+        self._dernier = 0.0
+        self._depart = None  # (perf_counter, instant) de la première lecture de l'horloge
+
+    def _lire(self, attendu):
+        """
+        Lit l'enregistrement suivant s'il est du type 'attendu'.
+
+        Retourne:
+            tuple: (type, instant ou None, autres valeurs), ou None à la fin
+                   (un fichier coupé net, par exemple par un plantage, se
+                   termine simplement plus tôt)
+        """
+        type_ = self._donnees[self._position:self._position + 1]
+        if type_ not in attendu:
+            return None
+        format_ = FORMATS_SESSION[type_]
+        try:
+            valeurs = format_.unpack_from(self._donnees, self._position + 1)
+        except struct.error:
+            return None
+        self._position += 1 + format_.size
+        if type_ == b'I':
+            return type_, None, valeurs
+        self._dernier += valeurs[0]
+        return type_, self._dernier, valeurs[1:]
+
+    def attendre(self, anime=False, bloquer=True):
+        """Rend les entrées de l'image suivante (une fermeture à la fin de l'enregistrement)"""
+        if self.temps_reel and pygame.display.get_init():
+            # Fenêtre ouverte: ESC ou la croix arrêtent le rejeu; la fenêtre
+            # peut changer de taille (ou passer en plein écran avec F11)
+            for evenement in pygame.event.get((pygame.QUIT, pygame.KEYDOWN, pygame.VIDEORESIZE,
+                                               pygame.WINDOWSIZECHANGED)):
+                if evenement.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+                    init_runtime().adapter_fenetre()
+                elif evenement.type == pygame.QUIT or evenement.key == pygame.K_ESCAPE:
+                    return [Entree(self._dernier, pygame.event.Event(pygame.QUIT))]
+                elif evenement.key == pygame.K_F11:
+                    init_runtime().basculer_plein_ecran()
+        image = self._lire((b'I',))
+        if image is None:
+            return [Entree(self._dernier, pygame.event.Event(pygame.QUIT))]
+        self.images += 1
+        entrees = []
+        for _ in range(image[2][0]):
+            enregistrement = self._lire((b'Q', b'K', b'C', b'S', b'N'))
+            if enregistrement is None:
+                break
+            entrees.append(_decoder_entree(*enregistrement))
+        return entrees
+
+    def maintenant(self):
+        """Rend l'heure lue à ce moment de la partie (en temps réel: attend qu'elle arrive)"""
+        lecture = self._lire((b'T',))
+        if lecture is None:
+            return self._dernier
+        if self._depart is None:
+            self._depart = (time.perf_counter(), lecture[1])
+        if self.temps_reel:
+            reste = self._depart[0] + (lecture[1] - self._depart[1]) / 1000 - time.perf_counter()
+            if reste > 0:
+                time.sleep(reste)
+        return self._dernier
+
+    def duree_ms(self):
+        """Durée de la partie rejouée jusqu'ici (ms de l'horloge)"""
+        return self._dernier - self._depart[1] if self._depart else 0.0
+
+    def fermer(self):
+        """Rien à fermer: le fichier est lu en entier à la création"""
+
+# ========================================
+# SIMULATION SANS AFFICHAGE
+# ========================================
+# Profils de joueurs virtuels: probabilité de bonne réponse, temps de réponse
+# moyen et écart type (en millisecondes)
+JOUEURS_VIRTUELS = {
+    'expert': {'precision': 0.98, 'temps_moyen_ms': 800, 'ecart_ms': 200},
+    'moyen': {'precision': 0.8, 'temps_moyen_ms': 1800, 'ecart_ms': 600},
+    'debutant': {'precision': 0.5, 'temps_moyen_ms': 4000, 'ecart_ms': 2500},
+    'hasard': {'precision': 1 / len(NOTES), 'temps_moyen_ms': 1000, 'ecart_ms': 300},
+}
+
+class JoueurVirtuel:
+    """
+    Joueur simulé: trouve la bonne note avec une probabilité donnée, après un
+    temps de réponse tiré selon une loi normale.
+    
+    Attributs:
+        precision: Probabilité de donner la bonne réponse (0 à 1)
+        temps_moyen_ms, ecart_ms: Moyenne et écart type du temps de réponse
+    """
+    def __init__(self, precision=0.8, temps_moyen_ms=1800, ecart_ms=600, rng=None):
+        self.precision = precision
+        self.temps_moyen_ms = temps_moyen_ms
+        self.ecart_ms = ecart_ms
+        self.rng = rng or random.Random()
+    
+    def repondre(self, nom_note):
         """
-        Vérifie si la réponse du joueur est correcte et met à jour le score, combo et statistiques.
-        
-        Le système de points fonctionne ainsi:
-        - Points de base = 10 × niveau actuel
-        - Bonus combo = (combo - 1) × 2 points supplémentaires
-        - Exemple: au niveau 2 avec un combo de 3: 10×2 + (3-1)×2 = 20 + 4 = 24 points
+        Choisit une réponse pour la note affichée.
         
-        Paramètre:
-            index_note: L'index de la note choisie (0-6 pour Do-Si)
+        Retourne:
+            tuple: (temps de réponse en ms, index de la note choisie)
         """
-        nom_note = NOTES[index_note]
-        note_correcte = nom_note == self.note_actuelle.nom
-        
-        # Mettre à jour les statistiques globales pour chaque tentative
-        self.donnees['stats']['total_notes'] += 1
-        self.donnees['stats']['par_note'][self.note_actuelle.nom]['tentatives'] += 1
-        
-        if note_correcte:
-            # === BONNE RÉPONSE ===
-            
-            # Incrémenter le combo (série de bonnes réponses)
-            self.combo += 1
-            if self.combo > self.meilleur_combo:
-                self.meilleur_combo = self.combo  # Enregistrer le meilleur combo de la session
-            
-            # Calcul du score avec système de bonus progressif
-            points_base = 10 * self.niveau  # Plus on avance, plus chaque note rapporte
-            bonus_combo = (self.combo - 1) * 2  # +2 points par niveau de combo (0 pour le 1er)
-            points_totaux = points_base + bonus_combo
-            self.score += points_totaux
-            
-            # Message avec combo
-            if self.combo >= 5:
-                self.message = f"Combo x{self.combo}! +{points_totaux} pts"
-                self.couleur_message = JAUNE
-            else:
-                self.message = "Correct!"
-                self.couleur_message = VERT
-            
-            # Mise à jour stats
-            self.donnees['stats']['notes_correctes'] += 1
-            self.donnees['stats']['par_note'][self.note_actuelle.nom]['reussites'] += 1
-            
-            # Augmenter le niveau tous les 5 bonnes réponses
-            if self.score % 50 == 0:
-                self.niveau += 1
-                self.max_temps = max(2000, self.max_temps - 500)  # Plus rapide à chaque niveau
-                self.message = f"Niveau {self.niveau}!"
-                self.couleur_message = JAUNE
-            
-            self.nouvelle_note()
-        else:
-            # Mauvaise réponse - perd le combo
-            self.combo = 0
-            self.score = max(0, self.score - 5)
-            self.message = f"Non! C'etait {self.note_actuelle.nom}"
-            self.couleur_message = ROUGE
-            self.nouvelle_note()
-        
-        self.temps_message = pygame.time.get_ticks()
-        
-        # Sauvegarder immédiatement si un nouveau record est atteint
-        # Cela garantit que le high score n'est pas perdu si le jeu se ferme brusquement
-        if self.score > self.high_score:
-            self.high_score = self.score
-            self.donnees['high_score'] = self.high_score
-            sauvegarder_donnees(self.donnees)  # Écriture dans le fichier JSON
+        temps_ms = max(100, int(self.rng.gauss(self.temps_moyen_ms, self.ecart_ms)))
+        index = NOTES.index(nom_note)
+        if self.rng.random() >= self.precision:
+            # Mauvaise réponse: une autre note, au hasard
+            index = (index + self.rng.randrange(1, len(NOTES))) % len(NOTES)
+        return temps_ms, index
+
+class MoteurSimulation:
+    """
+    Fait jouer un joueur virtuel contre la vraie logique du jeu (classe Jeu),
+    sans fenêtre, sans son et sans disque, aussi vite que possible.
     
-    def temps_ecoule(self):
-        """Vérifie si le temps est écoulé"""
-        temps_actuel = pygame.time.get_ticks()
-        return (temps_actuel - self.temps_reponse) > self.max_temps
+    Le temps est simulé (HorlogeSimulee) et tout le hasard vient de la
+    graine: deux simulations avec la même graine donnent le même résultat.
     
-    def dessiner(self, surface):
-        """Dessine tous les éléments du jeu"""
-        surface.fill(BLANC)
-        
-        # Titre avec la clé actuelle
-        cle_nom = "Sol" if self.cle_actuelle == 'sol' else "Fa"
-        titre = police_moyenne.render(f"Notes de Musique - Clé de {cle_nom}", True, BLEU)
-        surface.blit(titre, (LARGEUR // 2 - titre.get_width() // 2, 20))
-        
-        # Score et niveau à gauche
-        texte_score = police_petite.render(f"Score: {self.score}", True, NOIR)
-        texte_niveau = police_petite.render(f"Niveau: {self.niveau}", True, NOIR)
-        surface.blit(texte_score, (20, 70))
-        surface.blit(texte_niveau, (20, 100))
-        
-        # High score à droite
-        texte_high = police_petite.render(f"Best: {self.high_score}", True, BLEU)
-        surface.blit(texte_high, (LARGEUR - texte_high.get_width() - 20, 70))
-        
-        # Afficher le combo si >= 2 (en dessous du high score)
-        if self.combo >= 2:
-            couleur_combo = JAUNE if self.combo >= 5 else VERT
-            texte_combo = police_petite.render(f"Combo x{self.combo}!", True, couleur_combo)
-            surface.blit(texte_combo, (LARGEUR - texte_combo.get_width() - 20, 100))
-        
-        # Barre de temps (déplacée plus bas pour être visible)
-        temps_restant = max(0, self.max_temps - (pygame.time.get_ticks() - self.temps_reponse))
-        pourcentage = temps_restant / self.max_temps
-        largeur_barre = int(200 * pourcentage)
-        couleur_barre = VERT if pourcentage > 0.5 else (JAUNE if pourcentage > 0.25 else ROUGE)
-        
-        # Position de la barre
-        barre_x = 20
-        barre_y = 180
-        pygame.draw.rect(surface, couleur_barre, (barre_x, barre_y, largeur_barre, 20))
-        pygame.draw.rect(surface, NOIR, (barre_x, barre_y, 200, 20), 2)
-        
-        # Texte "Temps" au-dessus de la barre
-        texte_temps = police_petite.render("Temps:", True, NOIR)
-        surface.blit(texte_temps, (barre_x, barre_y - 30))
-        
-        # Dessiner la portée
-        self.dessiner_portee(surface)
-        
-        # Dessiner la note
-        if self.note_actuelle:
-            self.note_actuelle.dessiner(surface)
-        
-        # Instructions
-        texte_instructions = police_petite.render("Cliquez ou utilisez les touches 1-7:", True, NOIR)
-        surface.blit(texte_instructions, (LARGEUR // 2 - texte_instructions.get_width() // 2, 420))
-        
-        # Dessiner les boutons
-        for bouton in self.boutons:
-            bouton.dessiner(surface)
-        
-        # Message de feedback
-        if self.temps_message > 0 and pygame.time.get_ticks() - self.temps_message < 1000:
-            texte_msg = police_moyenne.render(self.message, True, self.couleur_message)
-            surface.blit(texte_msg, (LARGEUR // 2 - texte_msg.get_width() // 2, 520))
-        
-        # Instructions ESC et son
-        texte_esc = police_mini.render("ESC pour quitter", True, GRIS_FONCE)
-        surface.blit(texte_esc, (10, HAUTEUR - 30))
+    Attributs:
+        jeu: La partie simulée
+        horloge: Horloge simulée de la partie
+        evenements: Nombre d'événements émis par le jeu
+        journal: Liste des événements émis (si garder_evenements=True)
+    """
+    def __init__(self, joueur='moyen', mode_cle='mixte', graine=0, garder_evenements=False):
+        """
+        Paramètres:
+            joueur: Nom d'un profil de JOUEURS_VIRTUELS ou objet JoueurVirtuel
+            mode_cle: Clé ou mode de jeu (voir Jeu)
+            graine: Graine du hasard (notes tirées et réponses du joueur)
+            garder_evenements: Si True, garde tous les événements dans 'journal'
+        """
+        if isinstance(joueur, str):
+            joueur = JoueurVirtuel(**JOUEURS_VIRTUELS[joueur], rng=random.Random(graine + 1))
+        self.joueur = joueur
+        self.horloge = HorlogeSimulee()
+        self.evenements = 0
+        self.journal = [] if garder_evenements else None
+        self.jeu = Jeu(mode_cle, horloge=self.horloge, audio=AudioMuet(),
+                       rng=random.Random(graine), modele=ModeleStats(), puits=self._recevoir)
+        self.jeu.demarrer_session()
+    
+    def _recevoir(self, evenement):
+        """Puits des événements du jeu"""
+        self.evenements += 1
+        if self.journal is not None:
+            self.journal.append(evenement)
+    
+    def executer(self, nb_reponses):
+        """
+        Simule 'nb_reponses' notes (réponses ou temps écoulés).
         
-        # Indicateur de son
-        etat_son = "ON" if self.son_active else "OFF"
-        couleur_son = VERT if self.son_active else ROUGE
-        texte_son = police_petite.render(f"Son: {etat_son} (M)", True, couleur_son)
-        surface.blit(texte_son, (LARGEUR - texte_son.get_width() - 10, HAUTEUR - 40))
+        Retourne:
+            dict: Résultats de la simulation (voir resultats())
+        """
+        jeu = self.jeu
+        horloge = self.horloge
+        for _ in range(nb_reponses):
+            temps_ms, index = self.joueur.repondre(jeu.note_actuelle.nom)
+            if temps_ms > jeu.max_temps:
+                # Trop lent: on laisse le temps s'écouler, comme dans boucle_jeu
+                horloge.avancer(jeu.max_temps + 1)
+                if jeu.temps_ecoule():
+                    jeu.signaler_temps_ecoule()
+            else:
+                horloge.avancer(temps_ms)
+                jeu.verifier_reponse(index)
+        return self.resultats()
+    
+    def resultats(self):
+        """Retourne le score, le niveau et les statistiques de la partie simulée"""
+        jeu = self.jeu
+        resume = jeu.modele.resume()
+        return {
+            'notes': resume['total_notes'],
+            'taux_reussite': resume['notes_correctes'] / max(1, resume['total_notes']),
+            'score': jeu.score,
+            'niveau': jeu.niveau,
+            'meilleur_combo': jeu.meilleur_combo,
+            'temps_median_ms': jeu.modele.temps.percentile(50),
+            'duree_simulee_s': self.horloge.ms / 1000,
+        }
 
 def ecran_accueil():
     """Affiche l'écran d'accueil avec sélection de clé"""
+    rt = init_runtime()
+    fenetre = rt.fenetre
     en_attente = True
     mode_choisi = None
     
     # Créer les boutons de sélection (centrés sur l'écran)
     centre_x = LARGEUR // 2
-    bouton_sol = Bouton(centre_x - 225, 260, 150, 60, "Clé de Sol", 0)
-    bouton_fa = Bouton(centre_x + 25, 260, 150, 60, "Clé de Fa", 1)
-    bouton_mixte = Bouton(centre_x - 75, 340, 150, 60, "Les deux", 2)
-    bouton_entrainement = Bouton(centre_x - 125, 420, 250, 60, "Entraînement", 3)
-    bouton_stats = Bouton(centre_x - 75, 500, 150, 50, "Statistiques", 4)
-    boutons_menu = [bouton_sol, bouton_fa, bouton_mixte, bouton_entrainement, bouton_stats]
+    bouton_sol = Bouton(centre_x - 250, 260, 160, 60, "Clé de Sol", 0)
+    bouton_fa = Bouton(centre_x - 80, 260, 160, 60, "Clé de Fa", 1)
+    bouton_ut = Bouton(centre_x + 90, 260, 160, 60, "Clés d'Ut", 5)
+    bouton_mixte = Bouton(centre_x - 250, 340, 160, 60, "Sol et Fa", 2)
+    bouton_grande_portee = Bouton(centre_x - 80, 340, 330, 60, "Grande portée (piano)", 6)
+    bouton_entrainement = Bouton(centre_x - 250, 420, 245, 60, "Entraînement", 3)
+    bouton_lecture = Bouton(centre_x + 5, 420, 245, 60, "Lecture à vue", 7)
+    bouton_accords = Bouton(centre_x - 250, 500, 245, 50, "Accords", 8)
+    bouton_stats = Bouton(centre_x + 5, 500, 245, 50, "Statistiques", 4)
+    boutons_menu = [bouton_sol, bouton_fa, bouton_ut, bouton_mixte, bouton_grande_portee,
+                    bouton_entrainement, bouton_lecture, bouton_accords, bouton_stats]
+    mettre_a_jour_survol(boutons_menu, position_souris())
+    redessiner = True  # L'écran est statique: on ne redessine que si besoin
     
     while en_attente:
-        pos_souris = pygame.mouse.get_pos()
-        for bouton in boutons_menu:
-            bouton.verifier_survol(pos_souris)
-        
-        for event in pygame.event.get():
+        # Dormir jusqu'au prochain événement (aucune animation sur ce menu),
+        # sauf si une image est en attente d'affichage
+        for event in rt.cadenceur.attendre(bloquer=not redessiner):
             if event.type == pygame.QUIT:
                 return None  # Retourner None pour quitter
             
+            if event.type == pygame.MOUSEMOTION:
+                # Redessiner seulement si un bouton change d'aspect
+                redessiner |= mettre_a_jour_survol(boutons_menu, event.pos)
+            elif event.type in EVENEMENTS_REDESSIN:
+                redessiner = True
+            
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     pos = event.pos
@@ -662,12 +5338,24 @@ def ecran_accueil():
                     elif bouton_fa.verifier_clic(pos):
                         mode_choisi = 'fa'
                         en_attente = False
+                    elif bouton_ut.verifier_clic(pos):
+                        mode_choisi = 'ut'
+                        en_attente = False
                     elif bouton_mixte.verifier_clic(pos):
                         mode_choisi = 'mixte'
                         en_attente = False
+                    elif bouton_grande_portee.verifier_clic(pos):
+                        mode_choisi = 'grande_portee'
+                        en_attente = False
                     elif bouton_entrainement.verifier_clic(pos):
                         mode_choisi = 'entrainement'
                         en_attente = False
+                    elif bouton_lecture.verifier_clic(pos):
+                        mode_choisi = 'lecture'
+                        en_attente = False
+                    elif bouton_accords.verifier_clic(pos):
+                        mode_choisi = 'accords'
+                        en_attente = False
                     elif bouton_stats.verifier_clic(pos):
                         mode_choisi = 'stats'
                         en_attente = False
@@ -690,12 +5378,28 @@ def ecran_accueil():
                 elif event.key == pygame.K_5:
                     mode_choisi = 'stats'
                     en_attente = False
+                elif event.key == pygame.K_6:
+                    mode_choisi = 'ut'
+                    en_attente = False
+                elif event.key == pygame.K_7:
+                    mode_choisi = 'grande_portee'
+                    en_attente = False
+                elif event.key == pygame.K_8:
+                    mode_choisi = 'lecture'
+                    en_attente = False
+                elif event.key == pygame.K_9:
+                    mode_choisi = 'accords'
+                    en_attente = False
         
+        if not redessiner or not en_attente:
+            continue
+        redessiner = False
+        echelle = rt.echelle  # Positions en unités du jeu -> pixels (voir Echelle)
         fenetre.fill(BLANC)
         
         # Titre
-        titre = police_grande.render("Notes de Musique", True, BLEU)
-        fenetre.blit(titre, (LARGEUR // 2 - titre.get_width() // 2, 50))
+        titre = rendre_texte(rt.police_grande, "Notes de Musique", BLEU)
+        fenetre.blit(titre, echelle.placer(titre, midtop=(LARGEUR // 2, 50)))
         
         # Instructions
         instructions = [
@@ -706,8 +5410,8 @@ def ecran_accueil():
         
         y = 130
         for ligne in instructions:
-            texte = police_petite.render(ligne, True, NOIR)
-            fenetre.blit(texte, (LARGEUR // 2 - texte.get_width() // 2, y))
+            texte = rendre_texte(rt.police_petite, ligne, NOIR)
+            fenetre.blit(texte, echelle.placer(texte, midtop=(LARGEUR // 2, y)))
             y += 35
         
         # Dessiner les boutons
@@ -715,77 +5419,230 @@ def ecran_accueil():
             bouton.dessiner(fenetre)
         
         # Instructions clavier
-        texte_info = police_petite.render("Cliquez ou appuyez sur 1, 2, 3, 4 ou 5", True, NOIR)
-        fenetre.blit(texte_info, (LARGEUR // 2 - texte_info.get_width() // 2, 580))
+        texte_info = rendre_texte(rt.police_petite, "Cliquez ou appuyez sur 1 à 9", NOIR)
+        fenetre.blit(texte_info, echelle.placer(texte_info, midtop=(LARGEUR // 2, 562)))
         
         # Instruction ESC en bas à gauche
-        texte_esc = police_mini.render("ESC pour quitter", True, GRIS_FONCE)
-        fenetre.blit(texte_esc, (10, HAUTEUR - 30))
+        texte_esc = rendre_texte(rt.police_mini, "ESC pour quitter", GRIS_FONCE)
+        fenetre.blit(texte_esc, echelle.point((10, HAUTEUR - 30)))
         
         pygame.display.flip()
-        horloge.tick(FPS)
+        rt.marquer_premiere_image()  # Mesure du démarrage à froid (sans effet ensuite)
     
     return mode_choisi
 
-def boucle_jeu(mode_cle='mixte'):
-    """Boucle de jeu"""
-    jeu = Jeu(mode_cle)
-    jeu.donnees['stats']['sessions'] += 1
+def boucle_jeu(mode_cle='mixte', mode_jeu='notes', rejeu=None):
+    """
+    Boucle de jeu
+    
+    Paramètres:
+        mode_cle: Clé ou mode de clés (voir cles_du_mode)
+        mode_jeu: 'notes' (une note à la fois), 'lecture' (lecture à vue)
+                  ou 'accords' (triades et intervalles)
+        rejeu: SessionRejouee qui remplace le joueur (voir rejouer_session);
+               sans temps réel, rien n'est dessiné ni joué
+    """
+    rt = init_runtime()
+    affichage = rejeu is None or rejeu.temps_reel
+    # Latence touche -> son mesurée depuis l'instant de chaque entrée, sauf
+    # en rejeu: les instants enregistrés viennent d'une autre horloge
+    instant_reel = (lambda entree: entree.instant) if rejeu is None else (lambda entree: None)
+    if rejeu is None:
+        # Touches, clics, et notes jouées sur un clavier MIDI ou chantées (options)
+        entrees = ouvrir_entrees(voix=True)
+        tempo = rt.options.get('tempo', TEMPO_DEFAUT)
+        graine = random.getrandbits(63)
+        # Le jeu lit l'heure une fois par étape de l'image: une partie ne
+        # dépend que de la graine et des entrées, et peut être rejouée
+        horloge = HorlogeSimulee(debut=time.time() - entrees.maintenant() / 1000)
+        options = {'horloge': horloge, 'rng': random.Random(graine)}
+        if rt.options.get('enregistrer'):
+            entrees = EnregistreurSession(
+                rt.options['enregistrer'], entrees, graine, horloge.debut,
+                {'mode_cle': mode_cle, 'mode_jeu': mode_jeu, 'tempo': tempo,
+                 'donnees': rt.ouvrir_modele().donnees})
+    else:
+        entrees = rejeu
+        tempo = rejeu.parametres['tempo']
+        horloge = HorlogeSimulee(debut=rejeu.debut)
+        # Les données du joueur au départ de la partie; rien n'est écrit sur le disque
+        options = {'horloge': horloge, 'rng': random.Random(rejeu.graine),
+                   'modele': ModeleStats(rejeu.parametres['donnees']),
+                   'puits': rejeu.evenements.append}
+        if not affichage:
+            options['audio'] = AudioMuet()
+    if affichage:
+        fenetre = rt.fenetre
+        # Charger en arrière-plan les sons des notes du mode choisi
+        # (en lecture à vue, de toutes les clés: Tab change de clé)
+        cles = list(DEGRE_LIGNE_BAS) if mode_jeu == 'lecture' else cles_du_mode(mode_cle)
+        rt.banque.prechauffer([(cle, nom) for cle in cles for nom in NOTES])
+    horloge.regler(entrees.maintenant())
+    if mode_jeu == 'lecture':
+        jeu = LectureAVue(mode_cle, tempo, **options)
+    elif mode_jeu == 'accords':
+        jeu = JeuAccords(mode_cle, **options)
+    else:
+        jeu = Jeu(mode_cle, **options)
+    jeu.demarrer_session()
+    rendu_partiel = rt.options.get('rendu_partiel', False)
+    profileur = rt.profileur  # Mesure des phases de chaque image (F3)
     en_cours = True
-    retour_menu = False
     
-    while en_cours:
-        # Gérer le survol des boutons
-        pos_souris = pygame.mouse.get_pos()
-        for bouton in jeu.boutons:
-            bouton.verifier_survol(pos_souris)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False  # Quitter l'application
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return True  # Retour au menu
-                elif event.key == pygame.K_m:
-                    jeu.son_active = not jeu.son_active  # Toggle le son
+    # Position de la souris, suivie par ses déplacements (survol des boutons)
+    souris = position_souris() if rejeu is None else (-1, -1)
+    mettre_a_jour_survol(jeu.boutons, souris)
+    
+    try:
+        # Appels de dessin comptés pendant la boucle seulement (voir Profileur)
+        with profileur:
+            while en_cours:
+                profileur.debut_image()
+                # La barre de temps avance en continu: cadence fixe (FPS)
+                lues = entrees.attendre(anime=True)
+                horloge.regler(entrees.maintenant())
+                for entree in lues:
+                    if entree.note is not None:
+                        # Note MIDI ou chantée: seul son nom compte (les touches noires sont ignorées)
+                        nom, _, alteration = depuis_midi(entree.note)
+                        if not alteration and nom in jeu.reponses:
+                            with rt.canaux.entree(instant_reel(entree)), profileur.phase('reponse'):
+                                jeu.verifier_reponse(jeu.reponses.index(nom), entree.instant)
+                        continue
+                    event = entree.evenement
+                    if event.type == pygame.QUIT:
+                        return False  # Quitter l'application
+                
+                    if event.type == pygame.MOUSEMOTION:
+                        # Gérer le survol des boutons
+                        souris = event.pos
+                        with profileur.phase('survol'):
+                            mettre_a_jour_survol(jeu.boutons, souris)
+                
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            return True  # Retour au menu
+                        elif event.key == pygame.K_m:
+                            jeu.son_active = not jeu.son_active  # Toggle le son
+                        elif event.key == pygame.K_F3:
+                            profileur.basculer_overlay()  # Afficher/masquer le profileur
+                            jeu.invalider_rendu()
+                        elif event.key == pygame.K_TAB:
+                            # Lecture à vue: clé suivante; accords: triades ou intervalles
+                            suivante = jeu.variante_suivante()
+                            if suivante is not None:
+                                suivante.son_active = jeu.son_active
+                                jeu = suivante
+                                mettre_a_jour_survol(jeu.boutons, souris)
+                    
+                        # Vérifier si une touche de note est pressée
+                        for i, touche in enumerate(TOUCHES):
+                            if event.key == touche:
+                                # Mesure du délai entre la touche et le son
+                                with rt.canaux.entree(instant_reel(entree)), profileur.phase('reponse'):
+                                    jeu.verifier_reponse(i, entree.instant)
                 
-                # Vérifier si une touche de note est pressée
-                for i, touche in enumerate(TOUCHES):
-                    if event.key == touche:
-                        jeu.verifier_reponse(i)
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        if event.button == 1:  # Clic gauche
+                            pos = event.pos
+                            # Vérifier si un bouton a été cliqué
+                            for bouton in jeu.boutons:
+                                if bouton.verifier_clic(pos):
+                                    with rt.canaux.entree(instant_reel(entree)), profileur.phase('reponse'):
+                                        jeu.verifier_reponse(bouton.index, entree.instant)
             
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Clic gauche
-                    pos = event.pos
-                    # Vérifier si un bouton a été cliqué
-                    for bouton in jeu.boutons:
-                        if bouton.verifier_clic(pos):
-                            jeu.verifier_reponse(bouton.index)
-        
-        # Vérifier si le temps est écoulé
-        if jeu.temps_ecoule():
-            jeu.combo = 0  # Perd le combo
-            jeu.message = f"Temps écoulé! C'était {jeu.note_actuelle.nom}"
-            jeu.couleur_message = ROUGE
-            jeu.temps_message = pygame.time.get_ticks()
-            jeu.score = max(0, jeu.score - 5)
-            jeu.donnees['stats']['total_notes'] += 1
-            jeu.donnees['stats']['par_note'][jeu.note_actuelle.nom]['tentatives'] += 1
-            jeu.nouvelle_note()
-        
-        # Dessiner
-        jeu.dessiner(fenetre)
-        
-        pygame.display.flip()
-        horloge.tick(FPS)
-    
-    # Sauvegarder les données avant de quitter
-    sauvegarder_donnees(jeu.donnees)
+                # Vérifier si le temps est écoulé
+                with profileur.phase('logique'):
+                    jeu.avancer()
+                    # En lecture à vue, plusieurs notes peuvent passer pendant une image lente
+                    while jeu.temps_ecoule():
+                        jeu.signaler_temps_ecoule()
+            
+                if affichage:
+                    # Dessiner
+                    with profileur.phase('dessin'):
+                        if rendu_partiel:
+                            # Seulement les zones qui ont changé
+                            zones = jeu.dessiner_partiel(fenetre)
+                        else:
+                            jeu.dessiner(fenetre)
+                        if profileur.overlay:
+                            zone_overlay = profileur.dessiner_overlay(fenetre, rt.police_mini)
+                            if rendu_partiel:
+                                zones.append(zone_overlay)
+                
+                    # Envoyer l'image à l'écran
+                    with profileur.phase('affichage'):
+                        if rendu_partiel:
+                            pygame.display.update(zones)
+                        else:
+                            pygame.display.flip()
+                # Le temps de réponse d'une nouvelle note part d'ici
+                horloge.regler(entrees.maintenant())
+                jeu.presentee(horloge.ticks())
+                profileur.fin_image()
+    finally:
+        entrees.fermer()
+        # Écrire les réponses en attente et l'instantané des compteurs en quittant
+        # (menu ou fermeture de la fenêtre)
+        rt.ecrivain.vider()
     return False
 
+def rejouer_session(chemin, affichage=False):
+    """
+    Rejoue une partie enregistrée avec --enregistrer (option --rejouer).
+    
+    La partie est rejouée par la vraie boucle de jeu, avec la même graine,
+    les mêmes entrées et les mêmes heures: elle donne les mêmes réponses,
+    au même instant. Le profileur mesure chaque image: un même
+    enregistrement, rejoué avant et après une modification, sert de test de
+    performance reproductible.
+    
+    Paramètres:
+        chemin: Fichier de l'enregistrement
+        affichage: True pour voir la partie en temps réel (fenêtre et son),
+                   False pour la rejouer sans fenêtre, aussi vite que possible
+    
+    Retourne:
+        dict: Images rejouées, durées (partie et rejeu), réponses et
+              événements émis par le jeu
+    """
+    rejeu = SessionRejouee(chemin, temps_reel=affichage)
+    profileur = init_runtime().profileur
+    profileur.reinitialiser(fenetre=None)  # Percentiles sur toute la partie
+    actif = profileur.actif
+    profileur.continu = True  # F3 pendant la partie enregistrée n'arrête pas les mesures
+    profileur.activer(True)
+    debut = time.perf_counter()
+    try:
+        boucle_jeu(rejeu.parametres['mode_cle'], rejeu.parametres['mode_jeu'], rejeu=rejeu)
+    finally:
+        profileur.continu = False
+        profileur.activer(actif)  # Les images mesurées restent pour rapport_rejeu
+    reponses = [e for e in rejeu.evenements if e['type'] == 'reponse']
+    return {
+        'images': rejeu.images,
+        'duree_partie_s': rejeu.duree_ms() / 1000,
+        'duree_rejeu_s': time.perf_counter() - debut,
+        'reponses': len(reponses),
+        'correctes': sum(1 for e in reponses if e['resultat'] == 'correct'),
+        'evenements': rejeu.evenements,
+    }
+
+def rapport_rejeu(resultats):
+    """Retourne un résumé lisible d'un rejeu et des durées de ses images"""
+    vitesse = resultats['duree_partie_s'] / max(resultats['duree_rejeu_s'], 1e-9)
+    lignes = [
+        f"Rejeu: {resultats['images']} images, {resultats['duree_partie_s']:.1f} s de partie"
+        f" en {resultats['duree_rejeu_s']:.2f} s (x{vitesse:.1f})",
+        f"  réponses {resultats['reponses']}, correctes {resultats['correctes']}",
+    ]
+    return "\n".join(lignes + init_runtime().profileur.lignes())
+
 def mode_entrainement():
     """Mode entraînement: cliquez sur une note pour la voir et l'entendre"""
+    rt = init_runtime()
+    fenetre = rt.fenetre
     en_cours = True
     note_affichee = None
     cle_actuelle = 'sol'  # Commencer en clé de Sol
@@ -802,194 +5659,294 @@ def mode_entrainement():
     # Bouton pour changer de clé
     bouton_changer_cle = Bouton(LARGEUR // 2 - 75, 520, 150, 40, "Changer clé", -1)
     
-    while en_cours:
-        pos_souris = pygame.mouse.get_pos()
-        for bouton in boutons_notes:
-            bouton.verifier_survol(pos_souris)
-        bouton_changer_cle.verifier_survol(pos_souris)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False  # Quitter l'application
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return True  # Retour au menu
-                elif event.key == pygame.K_m:
-                    son_active = not son_active  # Toggle le son
+    # Charger en arrière-plan les sons de toutes les clés
+    rt.banque.prechauffer([(cle, nom) for cle in DEGRE_LIGNE_BAS for nom in notes_list])
+    
+    tous_les_boutons = boutons_notes + [bouton_changer_cle]
+    mettre_a_jour_survol(tous_les_boutons, position_souris())
+    redessiner = True  # Rien n'est animé: on ne redessine qu'après une action
+    # Touches, clics et notes d'un clavier MIDI (option --entree-midi)
+    entrees = ouvrir_entrees()
+    
+    try:
+        while en_cours:
+            for entree in entrees.attendre(bloquer=not redessiner):
+                if entree.note is not None:
+                    # Note d'un clavier MIDI: affichée et jouée à sa vraie hauteur
+                    redessiner = True
+                    nom_note, octave, alteration = depuis_midi(entree.note)
+                    note_affichee = Note(nom_note, cle_actuelle, octave, alteration)
+                    if son_active:
+                        with rt.canaux.entree(entree.instant):
+                            rt.canaux.jouer(rt.banque.obtenir_midi(entree.note))
+                    continue
+                event = entree.evenement
+                if event.type == pygame.QUIT:
+                    return False  # Quitter l'application
                 
-                # Vérifier si une touche de note est pressée
-                for i, touche in enumerate(TOUCHES):
-                    if event.key == touche:
-                        nom_note = notes_list[i]
-                        note_affichee = Note(nom_note, cle_actuelle)
-                        if son_active:
-                            sons = SONS_NOTES_FA if cle_actuelle == 'fa' else SONS_NOTES_SOL
-                            sons[nom_note].play()
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Clic gauche
-                    pos = event.pos
-                    # Vérifier si un bouton de note a été cliqué
-                    for bouton in boutons_notes:
-                        if bouton.verifier_clic(pos):
-                            nom_note = bouton.texte
+                if event.type == pygame.MOUSEMOTION:
+                    redessiner |= mettre_a_jour_survol(tous_les_boutons, event.pos)
+                elif event.type in EVENEMENTS_REDESSIN:
+                    redessiner = True
+                
+                if event.type == pygame.KEYDOWN:
+                    redessiner = True
+                    if event.key == pygame.K_ESCAPE:
+                        return True  # Retour au menu
+                    elif event.key == pygame.K_m:
+                        son_active = not son_active  # Toggle le son
+                    
+                    # Vérifier si une touche de note est pressée
+                    for i, touche in enumerate(TOUCHES):
+                        if event.key == touche:
+                            nom_note = notes_list[i]
                             note_affichee = Note(nom_note, cle_actuelle)
                             if son_active:
-                                sons = SONS_NOTES_FA if cle_actuelle == 'fa' else SONS_NOTES_SOL
-                                sons[nom_note].play()
-                    
-                    # Vérifier si le bouton changer clé a été cliqué
-                    if bouton_changer_cle.verifier_clic(pos):
-                        cle_actuelle = 'fa' if cle_actuelle == 'sol' else 'sol'
-                        # Recréer la note affichée avec la nouvelle clé
-                        if note_affichee:
-                            note_affichee = Note(note_affichee.nom, cle_actuelle)
-        
-        # Dessiner
-        fenetre.fill(BLANC)
-        
-        # Titre
-        titre = police_grande.render("Mode Entraînement", True, BLEU)
-        fenetre.blit(titre, (LARGEUR // 2 - titre.get_width() // 2, 30))
-        
-        # Sous-titre (nom de la clé)
-        sous_titre = police_moyenne.render(f"Clé de {cle_actuelle.capitalize()}", True, BLEU)
-        fenetre.blit(sous_titre, (LARGEUR // 2 - sous_titre.get_width() // 2, 170))
-        
-        # Instructions
-        instruction = police_petite.render("Cliquez sur une note pour la voir et l'entendre", True, NOIR)
-        fenetre.blit(instruction, (LARGEUR // 2 - instruction.get_width() // 2, 100))
-        
-        # Dessiner la portée
-        y_debut = 290
-        espacement = 15
-        for i in range(5):
-            y = y_debut + i * espacement
-            pygame.draw.line(fenetre, NOIR, (200, y), (600, y), 2)
-        
-        # Dessiner la clé
-        if cle_actuelle == 'sol':
-            texte_cle = police_musicale.render("\U0001D11E", True, NOIR)
-            fenetre.blit(texte_cle, (215, 225))
-            texte_nom = police_moyenne.render("Sol", True, BLEU)
-            fenetre.blit(texte_nom, (210, 140))
-        else:
-            texte_cle = police_musicale.render("\U0001D122", True, NOIR)
-            fenetre.blit(texte_cle, (215, 195))
-            texte_nom = police_moyenne.render("Fa", True, BLEU)
-            fenetre.blit(texte_nom, (210, 140))
-        
-        # Dessiner la note si une est affichée
-        if note_affichee:
-            note_affichee.dessiner(fenetre)
-        
-        # Dessiner les boutons de notes
-        for bouton in boutons_notes:
-            bouton.dessiner(fenetre)
-        
-        # Dessiner le bouton changer clé
-        bouton_changer_cle.dessiner(fenetre)
-        
-        # État du son
-        etat_son = "ON" if son_active else "OFF"
-        couleur_son = VERT if son_active else ROUGE
-        texte_son = police_petite.render(f"Son: {etat_son} (M)", True, couleur_son)
-        fenetre.blit(texte_son, (LARGEUR - texte_son.get_width() - 10, HAUTEUR - 40))
-        
-        # Instruction ESC
-        texte_esc = police_mini.render("ESC pour quitter", True, GRIS_FONCE)
-        fenetre.blit(texte_esc, (10, HAUTEUR - 30))
-        
-        pygame.display.flip()
-        horloge.tick(FPS)
+                                with rt.canaux.entree(entree.instant):
+                                    rt.canaux.jouer(rt.banque.obtenir(cle_actuelle, nom_note))
+                
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    redessiner = True
+                    if event.button == 1:  # Clic gauche
+                        pos = event.pos
+                        # Vérifier si un bouton de note a été cliqué
+                        for bouton in boutons_notes:
+                            if bouton.verifier_clic(pos):
+                                nom_note = bouton.texte
+                                note_affichee = Note(nom_note, cle_actuelle)
+                                if son_active:
+                                    with rt.canaux.entree(entree.instant):
+                                        rt.canaux.jouer(rt.banque.obtenir(cle_actuelle, nom_note))
+                        
+                        # Vérifier si le bouton changer clé a été cliqué
+                        if bouton_changer_cle.verifier_clic(pos):
+                            # Passer à la clé suivante: Sol, Fa, Ut 3, Ut 4, puis de nouveau Sol
+                            cles = list(DEGRE_LIGNE_BAS)
+                            cle_actuelle = cles[(cles.index(cle_actuelle) + 1) % len(cles)]
+                            # Recréer la note affichée avec la nouvelle clé
+                            if note_affichee:
+                                note_affichee = Note(note_affichee.nom, cle_actuelle)
+            
+            if not redessiner:
+                continue
+            redessiner = False
+            
+            # Dessiner
+            echelle = rt.echelle  # Positions en unités du jeu -> pixels (voir Echelle)
+            fenetre.fill(BLANC)
+            
+            # Titre
+            titre = rendre_texte(rt.police_grande, "Mode Entraînement", BLEU)
+            fenetre.blit(titre, echelle.placer(titre, midtop=(LARGEUR // 2, 30)))
+            
+            # Sous-titre (nom de la clé)
+            sous_titre = rendre_texte(rt.police_moyenne, NOMS_CLES[cle_actuelle], BLEU)
+            fenetre.blit(sous_titre, echelle.placer(sous_titre, midtop=(LARGEUR // 2, 170)))
+            
+            # Instructions
+            instruction = rendre_texte(rt.police_petite, "Cliquez sur une note pour la voir et l'entendre", NOIR)
+            fenetre.blit(instruction, echelle.placer(instruction, midtop=(LARGEUR // 2, 100)))
+            
+            # Dessiner la portée et la clé (couche pré-rendue, un seul blit)
+            rt.portees.dessiner(fenetre, cle_actuelle, y_etiquette=140)
+            
+            # Dessiner la note si une est affichée
+            if note_affichee:
+                note_affichee.dessiner(fenetre)
+            
+            # Dessiner les boutons de notes
+            for bouton in boutons_notes:
+                bouton.dessiner(fenetre)
+            
+            # Dessiner le bouton changer clé
+            bouton_changer_cle.dessiner(fenetre)
+            
+            # État du son
+            etat_son = "ON" if son_active else "OFF"
+            couleur_son = VERT if son_active else ROUGE
+            texte_son = rendre_texte(rt.police_petite, f"Son: {etat_son} (M)", couleur_son)
+            fenetre.blit(texte_son, echelle.placer(texte_son, topright=(LARGEUR - 10, HAUTEUR - 40)))
+            
+            # Instruction ESC
+            texte_esc = rendre_texte(rt.police_mini, "ESC pour quitter", GRIS_FONCE)
+            fenetre.blit(texte_esc, echelle.point((10, HAUTEUR - 30)))
+            
+            pygame.display.flip()
+    finally:
+        entrees.fermer()
     
     return False
 
+def couleur_taux(taux):
+    """Couleur d'un taux de réussite: vert (≥70%), jaune (≥50%) ou rouge"""
+    return VERT if taux >= 70 else (JAUNE if taux >= 50 else ROUGE)
+
+def preparer_statistiques(modele, profil=None):
+    """
+    Calcule tout ce que l'écran des statistiques affiche.
+    
+    Appelée seulement quand le modèle a changé (voir ModeleStats.version):
+    à chaque image, l'écran se contente de rejouer cette liste.
+    
+    Paramètres:
+        modele: ModeleStats à afficher
+        profil: Nom de l'élève à afficher dans le titre (None: aucun)
+    
+    Retourne:
+        list: Éléments ('texte', police, texte, couleur, (x, y)) ou ('ligne', y),
+              où police est le nom d'une police du Runtime
+    """
+    elements = []
+    
+    def texte(police, contenu, couleur, x, y):
+        elements.append(('texte', police, contenu, couleur, (x, y)))
+    
+    def taux(nom, tentatives, reussites, x, y, temps=None):
+        pourcentage = (reussites / tentatives) * 100
+        # Temps de réponse médian, si l'histogramme de la note ou de la clé en a
+        median = temps.percentile(50) if temps is not None else None
+        duree = f", {median / 1000:.1f} s" if median is not None else ""
+        texte('police_petite', f"{nom}: {reussites}/{tentatives} ({pourcentage:.0f}%{duree})",
+              couleur_taux(pourcentage), x, y)
+    
+    resume = modele.resume()
+    texte('police_grande', f"Statistiques - {profil}" if profil else "Statistiques", BLEU, None, 15)
+    elements.append(('ligne', 75))
+    
+    # Statistiques globales
+    y = 95
+    texte('police_moyenne', f"Meilleur score: {resume['high_score']}", NOIR, 50, y)
+    y += 50
+    texte('police_petite', f"Sessions jouées: {resume['sessions']}", NOIR, 50, y)
+    y += 40
+    texte('police_petite', f"Notes jouées: {resume['total_notes']}", NOIR, 50, y)
+    y += 40
+    if resume['total_notes'] > 0:
+        pourcentage = (resume['notes_correctes'] / resume['total_notes']) * 100
+        texte('police_petite', f"Taux de réussite: {pourcentage:.1f}%",
+              VERT if pourcentage >= 70 else ROUGE, 50, y)
+    y += 60
+    
+    # Fenêtres glissantes et temps de réponse, à droite des statistiques globales
+    x, y_droite = LARGEUR // 2 + 30, 145
+    for nom, (tentatives, reussites) in (
+            (f"{modele.FENETRE_REPONSES} dernières", modele.fenetre_reponses()),
+            (f"{modele.FENETRE_JOURS} derniers jours", modele.fenetre_jours())):
+        if tentatives > 0:
+            taux(nom, tentatives, reussites, x, y_droite)
+        y_droite += 30
+    for nom, p in (("Temps médian", 50), ("Temps à 90%", 90)):
+        valeur = modele.temps.percentile(p)
+        if valeur is not None:
+            texte('police_petite', f"{nom}: {valeur / 1000:.1f} s", NOIR, x, y_droite)
+        y_droite += 30
+    
+    elements.append(('ligne', y))
+    y += 25
+    
+    # Statistiques par note
+    y_detail = y
+    texte('police_moyenne', "Détail par note:", BLEU, 50, y)
+    y += 40
+    par_note = {note: (t, r) for note, t, r in modele.taux_reussite('note')}
+    for note in NOTES:
+        tentatives, reussites = par_note.get(note, (0, 0))
+        if tentatives > 0:
+            taux(note, tentatives, reussites, 80, y, modele.temps_par('note', note))
+        else:
+            texte('police_petite', f"{note}: Pas encore jouée", NOIR, 80, y)
+        y += 30
+    
+    # Colonne de droite: détail par clé puis par jour (derniers jours joués)
+    # La colonne a la place de 6 lignes: chaque clé jouée prend celle d'un jour
+    y = y_detail
+    par_cle = modele.taux_reussite('cle')
+    nb_jours = max(1, 6 - len(par_cle))
+    for titre_colonne, lignes in (("Par clé:", par_cle),
+                                  ("Derniers jours:", modele.taux_reussite('jour')[-nb_jours:])):
+        texte('police_moyenne', titre_colonne, BLEU, x, y)
+        y += 40
+        for valeur, tentatives, reussites in lignes:
+            if titre_colonne == "Par clé:":
+                taux(NOMS_CLES.get(valeur, valeur), tentatives, reussites, x + 30, y,
+                     modele.temps_par('cle', valeur))
+            else:
+                taux(valeur, tentatives, reussites, x + 30, y)
+            y += 30
+        y += 10
+    
+    texte('police_mini', "ESC pour quitter", GRIS_FONCE, 10, HAUTEUR - 30)
+    return elements
+
 def ecran_statistiques():
     """Affiche l'écran des statistiques"""
-    donnees = charger_donnees()
-    stats = donnees['stats']
+    rt = init_runtime()
+    fenetre = rt.fenetre
+    # Statistiques en mémoire: rien n'est relu sur le disque
+    modele = rt.ouvrir_modele()
+    profil = rt.ouvrir_stockage().profil
+    version_affichee = None
+    elements = []
     en_cours = True
+    redessiner = True
     
     while en_cours:
-        for event in pygame.event.get():
+        for event in rt.cadenceur.attendre(bloquer=not redessiner):
             if event.type == pygame.QUIT:
                 return False  # Quitter l'application
             
+            if event.type in EVENEMENTS_REDESSIN:
+                redessiner = True
+            
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return True  # Retour au menu
         
-        # Dessiner
-        fenetre.fill(BLANC)
-        
-        # Titre
-        titre = police_grande.render("Statistiques", True, BLEU)
-        fenetre.blit(titre, (LARGEUR // 2 - titre.get_width() // 2, 15))
-        
-        # Ligne séparatrice
-        pygame.draw.line(fenetre, BLEU, (50, 75), (LARGEUR - 50, 75), 2)
-        
-        # Statistiques globales
-        y = 95
-        texte_high = police_moyenne.render(f"Meilleur score: {donnees['high_score']}", True, NOIR)
-        fenetre.blit(texte_high, (50, y))
-        y += 50
-        
-        texte_sessions = police_petite.render(f"Sessions jouées: {stats['sessions']}", True, NOIR)
-        fenetre.blit(texte_sessions, (50, y))
-        y += 40
-        
-        texte_total = police_petite.render(f"Notes jouées: {stats['total_notes']}", True, NOIR)
-        fenetre.blit(texte_total, (50, y))
-        y += 40
-        
-        if stats['total_notes'] > 0:
-            pourcentage = (stats['notes_correctes'] / stats['total_notes']) * 100
-            texte_taux = police_petite.render(f"Taux de réussite: {pourcentage:.1f}%", True, VERT if pourcentage >= 70 else ROUGE)
-            fenetre.blit(texte_taux, (50, y))
-        y += 60
+        # Recalculer les textes seulement si les chiffres ont changé
+        if modele.version != version_affichee:
+            elements = preparer_statistiques(modele, profil)
+            version_affichee = modele.version
+            redessiner = True
         
-        # Ligne séparatrice
-        pygame.draw.line(fenetre, BLEU, (50, y), (LARGEUR - 50, y), 2)
-        y += 25
+        if not redessiner:
+            continue
+        redessiner = False
         
-        # Statistiques par note
-        texte_par_note = police_moyenne.render("Détail par note:", True, BLEU)
-        fenetre.blit(texte_par_note, (50, y))
-        y += 40
-        
-        for note in NOTES:
-            note_stats = stats['par_note'][note]
-            tentatives = note_stats['tentatives']
-            reussites = note_stats['reussites']
-            
-            if tentatives > 0:
-                taux = (reussites / tentatives) * 100
-                couleur = VERT if taux >= 70 else (JAUNE if taux >= 50 else ROUGE)
-                texte_note = police_petite.render(f"{note}: {reussites}/{tentatives} ({taux:.0f}%)", True, couleur)
+        # Dessiner (éléments en unités du jeu, placés selon l'échelle de la fenêtre)
+        echelle = rt.echelle
+        fenetre.fill(BLANC)
+        for element in elements:
+            if element[0] == 'ligne':
+                # Ligne séparatrice
+                pygame.draw.line(fenetre, BLEU, echelle.point((50, element[1])),
+                                 echelle.point((LARGEUR - 50, element[1])), echelle.longueur(2))
+                continue
+            _, police, contenu, couleur, (x, y) = element
+            surface = rendre_texte(getattr(rt, police), contenu, couleur)
+            if x is None:
+                fenetre.blit(surface, echelle.placer(surface, midtop=(LARGEUR // 2, y)))  # Centré
             else:
-                texte_note = police_petite.render(f"{note}: Pas encore jouée", True, NOIR)
-            
-            fenetre.blit(texte_note, (80, y))
-            y += 30
-        
-        # Instruction ESC
-        texte_esc = police_mini.render("ESC pour quitter", True, GRIS_FONCE)
-        fenetre.blit(texte_esc, (10, HAUTEUR - 30))
+                fenetre.blit(surface, echelle.point((x, y)))
         
         pygame.display.flip()
-        horloge.tick(FPS)
     
     return False
 
-def boucle_principale():
-    """Boucle principale avec menu"""
+def boucle_principale(profil_demarrage=False, stats_perf=False):
+    """
+    Boucle principale avec menu
+
+    Paramètres:
+        profil_demarrage: Si True, affiche les durées de démarrage dans la console
+        stats_perf: Si True, affiche les compteurs de performance en quittant
+    """
     continuer = True
     
     while continuer:
         mode = ecran_accueil()
+        if profil_demarrage and mode is not None:
+            print(init_runtime().rapport_demarrage())
+            profil_demarrage = False  # Une seule fois, après la première image
         if mode is None:
             # L'utilisateur a quitté depuis le menu
             continuer = False
@@ -999,13 +5956,85 @@ def boucle_principale():
         elif mode == 'stats':
             # Afficher les statistiques
             continuer = ecran_statistiques()
+        elif mode == 'lecture':
+            # Lecture à vue, en clé de Sol pour commencer
+            continuer = boucle_jeu('sol', 'lecture')
+        elif mode == 'accords':
+            # Triades (Tab: intervalles), en clé de Sol
+            continuer = boucle_jeu('sol', 'accords')
         else:
             # Lancer le jeu et vérifier si on doit continuer
             continuer = boucle_jeu(mode)
     
+    if profil_demarrage:
+        print(init_runtime().rapport_demarrage())
+    # Attendre la fin des sauvegardes en cours avant de fermer
+    init_runtime().ecrivain.vider()
+    if init_runtime().options.get('trace'):
+        init_runtime().profileur.ecrire_trace(init_runtime().options['trace'])
+    if stats_perf:
+        print(init_runtime().rapport_performances())
+    if init_runtime().options.get('mesure_latence'):
+        rt = init_runtime()
+        print(rt.canaux.rapport_latence(rt.parametres_audio()['tampon']))
     pygame.quit()
     sys.exit()
 
+def main(argv=None):
+    """Point d'entrée: lit les options de la ligne de commande et lance le jeu"""
+    parser = argparse.ArgumentParser(description="Apprendre les Notes de Musique")
+    parser.add_argument('--profil-demarrage', action='store_true',
+                        help="affiche la durée de chaque étape du démarrage")
+    parser.add_argument('--stats-perf', action='store_true',
+                        help="affiche les compteurs de performance en quittant")
+    parser.add_argument('--rendu-partiel', action='store_true',
+                        help="ne redessine que les zones modifiées (machines peu puissantes)")
+    parser.add_argument('--plein-ecran', action='store_true',
+                        help="démarre en plein écran, à la résolution de l'écran (F11 pour basculer)")
+    parser.add_argument('--stockage', choices=('json', 'sqlite'), default='json',
+                        help="où enregistrer les scores: fichier JSON ou base SQLite (PC partagés)")
+    parser.add_argument('--profil', default=PROFIL_DEFAUT,
+                        help="nom de l'élève (avec --stockage sqlite)")
+    parser.add_argument('--tempo', type=int, default=TEMPO_DEFAUT, metavar='BPM',
+                        help="vitesse de la lecture à vue, en battements par minute")
+    parser.add_argument('--audio-frequence', type=int, metavar='HZ',
+                        help=f"fréquence du mixer (défaut {PARAMETRES_AUDIO['frequence']})")
+    parser.add_argument('--audio-tampon', type=int, metavar='N',
+                        help=f"tampon du mixer en échantillons, plus petit = moins de latence"
+                             f" (défaut {PARAMETRES_AUDIO['tampon']})")
+    parser.add_argument('--audio-canaux', type=int, choices=(1, 2),
+                        help="1 = mono (défaut), 2 = stéréo")
+    parser.add_argument('--entree-audio', metavar='SOURCE',
+                        help="répondre en chantant ou en jouant: 'micro', un fichier WAV,"
+                             " ou '-' pour du PCM 16 bits mono sur l'entrée standard")
+    parser.add_argument('--entree-midi', metavar='SOURCE',
+                        help="répondre sur un clavier MIDI: 'clavier' (appareil par défaut),"
+                             " numéro d'appareil, ou fichier .mid rejoué en temps réel")
+    parser.add_argument('--mesure-latence', action='store_true',
+                        help="affiche le délai entre une touche et le son en quittant")
+    parser.add_argument('--enregistrer', metavar='FICHIER',
+                        help="enregistre chaque partie pour la rejouer (la dernière remplace les autres)")
+    parser.add_argument('--rejouer', metavar='FICHIER',
+                        help="rejoue une partie enregistrée et affiche la durée des images")
+    parser.add_argument('--sans-affichage', action='store_true',
+                        help="avec --rejouer: sans fenêtre ni son, aussi vite que possible")
+    parser.add_argument('--trace', metavar='FICHIER',
+                        help="enregistre le temps de chaque phase des images (format Chrome trace)")
+    options = parser.parse_args(argv)
+    init_runtime().options.update(vars(options))
+    if options.trace:
+        init_runtime().profileur.demarrer_trace()
+    if options.rejouer:
+        print(rapport_rejeu(rejouer_session(options.rejouer, affichage=not options.sans_affichage)))
+        if options.trace:
+            init_runtime().profileur.ecrire_trace(options.trace)
+        if options.stats_perf:
+            print(init_runtime().rapport_performances())
+        pygame.quit()
+        return
+    boucle_principale(profil_demarrage=options.profil_demarrage,
+                      stats_perf=options.stats_perf)
+
 # Lancement du jeu
 if __name__ == "__main__":
-    boucle_principale()
+    main()
@@ -3,6 +3,9 @@ import pytest
 import numpy as np
 import sys
 import os
+import tempfile
+import io
+import wave
 
 # Ajouter le répertoire parent au path pour importer music_game
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,7 +15,10 @@ import pygame
 pygame.init()
 pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
 
-from music_game import generer_son, FREQUENCIES_SOL, FREQUENCIES_FA
+import music_game
+from music_game import (generer_son, CacheSons, BanqueSons, synthetiser, synthetiser_accord,
+                        enveloppe_adsr, TIMBRES, FREQUENCIES_SOL, FREQUENCIES_FA, CanauxAudio,
+                        DetecteurHauteur, SourcePCM, SourceWav, decouper_trames, yin)
 
 
 class TestGenerationAudio:
@@ -69,8 +75,433 @@ class TestGenerationAudio:
     def test_frequencies_fa_plus_graves(self):
         """Vérifie que les fréquences en clé de Fa sont plus graves"""
         # Les notes communes aux deux clés devraient être plus graves en clé de Fa
-        notes_communes = ['Do', 'Ré', 'Mi', 'Fa', 'Sol', 'La', 'Si']
+        # sauf le Do central, qui est la même hauteur dans les deux clés
+        notes_communes = ['Ré', 'Mi', 'Fa', 'Sol', 'La', 'Si']
         for note in notes_communes:
             if note in FREQUENCIES_FA and note in FREQUENCIES_SOL:
                 assert FREQUENCIES_FA[note] < FREQUENCIES_SOL[note], \
                     f"La fréquence de {note} devrait être plus grave en clé de Fa"
+        assert FREQUENCIES_FA['Do'] == FREQUENCIES_SOL['Do']
+
+
+class TestSynthese:
+    """Tests du moteur de synthèse vectorisé"""
+    
+    def test_synthetiser_mono_int16(self):
+        """Vérifie qu'en mono on obtient un tableau int16 à une dimension"""
+        tampon = synthetiser(440.0, 0.5, sample_rate=22050, canaux=1)
+        assert tampon.dtype == np.int16
+        assert tampon.shape == (11025,)
+    
+    def test_synthetiser_stereo(self):
+        """Vérifie que chaque canal reçoit le même signal"""
+        tampon = synthetiser(440.0, 0.5, sample_rate=22050, canaux=2)
+        assert tampon.shape == (11025, 2)
+        assert np.array_equal(tampon[:, 0], tampon[:, 1])
+    
+    def test_synthetiser_format_du_mixer(self):
+        """Vérifie que le son généré correspond au format réel du mixer"""
+        frequence, _, canaux = pygame.mixer.get_init()
+        tampon = pygame.sndarray.array(generer_son(440.0))
+        assert tampon.shape[0] == int(frequence * 0.5)
+        assert tampon.ndim == (1 if canaux == 1 else 2)
+    
+    def test_pas_de_saturation(self):
+        """Vérifie que tous les timbres restent dans la plage 16 bits sans saturer"""
+        for timbre in TIMBRES:
+            tampon = synthetiser(261.63, 0.5, sample_rate=22050, canaux=1, timbre=timbre)
+            assert np.abs(tampon.astype(np.int32)).max() < 2**15
+            assert np.abs(tampon.astype(np.int32)).max() > 2**13
+    
+    def test_timbre_inconnu(self):
+        """Vérifie qu'un timbre inconnu est refusé"""
+        with pytest.raises(ValueError):
+            synthetiser(440.0, 0.5, sample_rate=22050, canaux=1, timbre='inconnu')
+    
+    def test_accord_d_une_voix_comme_une_note(self):
+        """Vérifie qu'un accord d'une seule voix donne le même son que synthetiser()"""
+        for timbre in TIMBRES:
+            note = synthetiser(440.0, 0.5, sample_rate=22050, canaux=1, timbre=timbre)
+            accord = synthetiser_accord([440.0], 0.5, sample_rate=22050, canaux=1, timbre=timbre, marge=1.0)
+            assert np.abs(note.astype(np.int32) - accord).max() <= 1
+    
+    def test_accord_sans_saturation(self):
+        """Vérifie que l'accord garde sa marge et sonne à peu près aussi fort qu'une note"""
+        frequences = [music_game.FREQUENCES_MIDI[n] for n in (60, 64, 67)]
+        for timbre in TIMBRES:
+            accord = synthetiser_accord(frequences, 0.5, sample_rate=22050, canaux=2, timbre=timbre)
+            assert accord.shape == (11025, 2)
+            assert np.abs(accord.astype(np.int32)).max() <= music_game.MARGE_ACCORD * (2**15 - 1) + 1
+            note = synthetiser(440.0, 0.5, sample_rate=22050, canaux=1, timbre=timbre)
+            rms = lambda t: np.sqrt(np.mean(t.astype(np.float64) ** 2))
+            # La marge peut réduire un peu le volume quand les crêtes des voix coïncident
+            assert 0.4 < rms(accord[:, 0]) / rms(note) < 1.5
+    
+    def test_accord_contient_chaque_voix(self):
+        """Vérifie que chaque note de l'accord est présente dans le spectre"""
+        accord = synthetiser_accord([261.63, 329.63, 392.0], 1.0, sample_rate=22050, canaux=1)
+        spectre = np.abs(np.fft.rfft(accord.astype(np.float64)))
+        pics = np.argsort(spectre)[-3:]  # Résolution: 1 Hz par case (1 seconde de son)
+        assert sorted(pics) == [262, 330, 392]
+    
+    def test_enveloppe_adsr_rampes(self):
+        """Vérifie les quatre phases de l'enveloppe ADSR"""
+        env = enveloppe_adsr(1000, 1000, (0.1, 0.1, 0.5, 0.2))
+        assert env[0] == 0.0  # Début de l'attack
+        assert env[100] == pytest.approx(1.0)  # Fin de l'attack
+        assert env[200:800].max() == pytest.approx(0.5)  # Sustain
+        assert env[-1] == 0.0  # Fin du release
+        assert np.all(np.diff(env[:100]) > 0)  # Attack croissante
+        assert np.all(np.diff(env[800:]) < 0)  # Release décroissant
+    
+    def test_enveloppe_adsr_note_courte(self):
+        """Vérifie qu'une note plus courte que l'enveloppe reste valide"""
+        env = enveloppe_adsr(50, 1000, (0.1, 0.1, 0.5, 0.2))
+        assert env.shape == (50,)
+        assert env[-1] == 0.0
+
+
+class TestCacheSons:
+    """Tests du cache disque des sons"""
+    
+    def test_second_appel_lu_depuis_le_cache(self, monkeypatch):
+        """Vérifie qu'un son en cache est relu sans être recalculé"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = CacheSons(tmpdir)
+            tampon = cache.obtenir_tampon(440.0)
+            assert cache.echecs == 1
+            
+            # Un nouveau cache sur le même dossier ne doit plus rien synthétiser
+            def interdit(*args, **kwargs):
+                raise AssertionError("synthetiser ne doit pas être appelé")
+            monkeypatch.setattr(music_game, 'synthetiser', interdit)
+            cache2 = CacheSons(tmpdir)
+            relu = cache2.obtenir_tampon(440.0)
+            assert cache2.succes == 1
+            assert np.array_equal(np.asarray(relu).reshape(tampon.shape), tampon)
+            son = cache2.obtenir_son(440.0)
+            assert isinstance(son, pygame.mixer.Sound)
+    
+    def test_empreinte_change_avec_les_parametres(self):
+        """Vérifie que changer un paramètre de synthèse change la clé du cache"""
+        base = CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.01, 0.0, 1.0, 0.1), 'sinus')
+        assert base == CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.01, 0.0, 1.0, 0.1), 'sinus')
+        assert base != CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.01, 0.0, 1.0, 0.1), 'piano')
+        assert base != CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.02, 0.0, 1.0, 0.1), 'sinus')
+        assert base != CacheSons.empreinte(440.0, 0.5, 44100, 1, (0.01, 0.0, 1.0, 0.1), 'sinus')
+    
+    def test_version_invalide_le_cache(self, monkeypatch):
+        """Vérifie qu'un changement de VERSION_SYNTHESE invalide les anciens sons"""
+        base = CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.01, 0.0, 1.0, 0.1), 'sinus')
+        monkeypatch.setattr(music_game, 'VERSION_SYNTHESE', music_game.VERSION_SYNTHESE + 1)
+        assert base != CacheSons.empreinte(440.0, 0.5, 22050, 1, (0.01, 0.0, 1.0, 0.1), 'sinus')
+    
+    def test_eviction_taille_maximale(self):
+        """Vérifie que le cache ne dépasse pas sa taille maximale"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            taille_son = synthetiser(440.0).nbytes
+            cache = CacheSons(tmpdir, taille_max=int(taille_son * 2.5))
+            for frequence in (261.63, 293.66, 329.63, 349.23):
+                cache.obtenir_tampon(frequence)
+            fichiers = os.listdir(tmpdir)
+            assert len(fichiers) == 2
+            assert cache.evictions == 2
+    
+    def test_fichier_tronque_recalcule(self):
+        """Vérifie qu'un fichier du cache de la mauvaise taille est supprimé puis recalculé"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = CacheSons(tmpdir)
+            tampon = cache.obtenir_tampon(440.0)
+            chemin = os.path.join(tmpdir, os.listdir(tmpdir)[0])
+            with open(chemin, 'r+b') as fichier:
+                fichier.truncate(tampon.nbytes // 2)  # Écriture interrompue
+            cache2 = CacheSons(tmpdir)
+            relu = cache2.obtenir_tampon(440.0)
+            assert cache2.echecs == 1 and relu.size == tampon.size
+            assert os.path.getsize(chemin) == tampon.nbytes
+            # Un nombre impair d'octets ne fait pas planter la lecture
+            with open(chemin, 'r+b') as fichier:
+                fichier.truncate(3)
+            assert CacheSons(tmpdir).obtenir_tampon(440.0).size == tampon.size
+    
+    def test_ecritures_simultanees(self):
+        """Vérifie que plusieurs threads peuvent écrire le même son sans abîmer le cache"""
+        import threading
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = CacheSons(tmpdir)
+            tampon = synthetiser(440.0)
+            cle = CacheSons.empreinte(440.0, 0.5, *music_game.format_audio(),
+                                      music_game.ENVELOPPE_DEFAUT, music_game.TIMBRE_DEFAUT)
+            threads = [threading.Thread(target=lambda: [cache.stocker(cle, tampon) for _ in range(20)])
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert os.listdir(tmpdir) == [cle + CacheSons.EXTENSION]
+            assert np.array_equal(cache.charger(cle, tampon.size), tampon.reshape(-1))
+
+    def test_lectures_simultanees_comptees(self):
+        """Vérifie qu'aucune lecture n'est oubliée quand plusieurs threads lisent le cache"""
+        import threading
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = CacheSons(tmpdir)
+            tampon = synthetiser(440.0)
+            cache.stocker('present', tampon)
+            lire = lambda: [(cache.charger('present', tampon.size), cache.charger('absent'))
+                            for _ in range(200)]
+            threads = [threading.Thread(target=lire) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert cache.succes == 800 and cache.echecs == 800
+
+    def test_dossier_inaccessible(self):
+        """Vérifie qu'une erreur disque n'empêche pas d'obtenir le son"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'pas_un_dossier')
+            open(fichier, 'w').close()
+            cache = CacheSons(os.path.join(fichier, 'cache'))
+            assert cache.obtenir_tampon(440.0).size > 0
+
+
+class TestBanqueSons:
+    """Tests de la banque de sons à la demande"""
+    
+    def creer_banque(self, tmpdir, capacite=32):
+        return BanqueSons(capacite=capacite, cache=CacheSons(tmpdir))
+    
+    def test_premier_appel_echec_puis_succes(self):
+        """Vérifie que le son est chargé une fois puis réutilisé"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir)
+            son = banque.obtenir('sol', 'La')
+            assert isinstance(son, pygame.mixer.Sound)
+            assert banque.obtenir('sol', 'La') is son
+            assert banque.echecs == 1
+            assert banque.succes == 1
+    
+    def test_capacite_lru(self):
+        """Vérifie que la banque ne garde que les sons les plus récents"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir, capacite=3)
+            for nom in ['Do', 'Ré', 'Mi']:
+                banque.obtenir('sol', nom)
+            banque.obtenir('sol', 'Do')  # Do redevient le plus récent
+            banque.obtenir('sol', 'Fa')  # Évince Ré, le moins récent
+            assert banque.evictions == 1
+            assert banque.contient('sol', 'Do')
+            assert not banque.contient('sol', 'Ré')
+            assert banque.statistiques()['en_memoire'] == 3
+    
+    def test_meme_hauteur_meme_son(self):
+        """Vérifie que le Do central est partagé entre clé de Sol et clé de Fa"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir)
+            assert banque.obtenir('sol', 'Do') is banque.obtenir('fa', 'Do')
+            # Fa#4 et Solb4: deux écritures du même son
+            assert banque.obtenir('sol', 'Fa', 4, 1) is banque.obtenir('sol', 'Sol', 4, -1)
+            assert banque.obtenir_midi(60) is banque.obtenir('sol', 'Do')
+    
+    def test_accord_en_cache_par_hauteurs(self):
+        """Vérifie qu'un accord est synthétisé une fois, quel que soit l'ordre des notes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir, capacite=4)
+            son = banque.obtenir_accord((60, 64, 67))
+            assert isinstance(son, pygame.mixer.Sound)
+            assert banque.obtenir_accord([67, 60, 64, 60]) is son
+            assert (banque.echecs, banque.succes) == (1, 1)
+            # Les accords comptent dans la même capacité que les notes
+            for nom in ['Do', 'Ré', 'Mi', 'Fa']:
+                banque.obtenir('sol', nom)
+            assert banque.obtenir_accord((60, 64, 67)) is not son
+            assert banque.statistiques()['en_memoire'] == 4
+    
+    def test_frequence_octave(self):
+        """Vérifie qu'une octave au-dessus double la fréquence"""
+        assert BanqueSons.frequence('sol', 'La', 5) == pytest.approx(880.0)
+        assert BanqueSons.frequence('fa', 'La', 3) == pytest.approx(220.0)
+        assert BanqueSons.frequence('sol', 'La') == FREQUENCIES_SOL['La']
+        assert BanqueSons.frequence('sol', 'Do', 8) == pytest.approx(4186.01, abs=0.01)
+        assert BanqueSons.frequence('sol', 'La', 4, 1) == pytest.approx(466.16, abs=0.01)
+    
+    def test_prechauffer_en_arriere_plan(self):
+        """Vérifie que le préchargement remplit la banque"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir)
+            banque.prechauffer([('sol', nom) for nom in FREQUENCIES_SOL]).join(timeout=10)
+            assert banque.statistiques()['en_memoire'] == 7
+            banque.obtenir('sol', 'Si')
+            assert banque.succes == 1
+    
+    def test_prechauffer_initialise_audio_dans_thread_appelant(self, monkeypatch):
+        """Vérifie que le mixer n'est jamais initialisé par le thread de préchargement"""
+        import threading
+        formats = []
+        def format_audio():
+            formats.append(threading.current_thread())
+            return pygame.mixer.get_init()[0], pygame.mixer.get_init()[2]
+        monkeypatch.setattr(music_game, 'format_audio', format_audio)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            banque = self.creer_banque(tmpdir)
+            banque.prechauffer([('sol', nom) for nom in FREQUENCIES_SOL]).join(timeout=10)
+            assert banque.statistiques()['en_memoire'] == 7
+        assert formats == [threading.current_thread()]
+    
+    def test_cache_cree_a_la_construction(self):
+        """Vérifie que la banque a son cache disque dès sa création"""
+        assert isinstance(BanqueSons().cache, CacheSons)
+
+
+class TestCanauxAudio:
+    """Tests des canaux du mixer réservés aux notes et au métronome"""
+    
+    def test_canaux_reserves_par_groupe(self):
+        """Vérifie que les notes ne prennent jamais le canal du métronome"""
+        canaux = CanauxAudio({'notes': 2, 'metronome': 1})
+        son = generer_son(440, duree=2.0)
+        joues = [canaux.jouer(son) for _ in range(5)]
+        clic = canaux.jouer(generer_son(1760, duree=2.0), 'metronome')
+        assert clic not in joues
+        assert len({id(c) for c in joues}) == 2
+        # Les canaux réservés ne sont pas proposés aux Sound.play() ordinaires
+        libre = pygame.mixer.find_channel()
+        assert libre is not None and libre not in joues + [clic]
+        pygame.mixer.stop()
+    
+    def test_plus_ancien_coupe(self):
+        """Vérifie que, sans canal libre, c'est le son le plus ancien qui est coupé"""
+        canaux = CanauxAudio({'notes': 2, 'metronome': 1})
+        son = generer_son(440, duree=2.0)
+        premier = canaux.jouer(son)
+        second = canaux.jouer(son)
+        assert canaux.coupures == 0
+        assert canaux.jouer(son) is premier
+        assert canaux.jouer(son) is second
+        assert (canaux.lectures, canaux.coupures) == (4, 2)
+        pygame.mixer.stop()
+    
+    def test_latence_mesuree_apres_une_entree(self):
+        """Vérifie qu'un délai n'est mesuré que pour le son qui suit une touche"""
+        canaux = CanauxAudio()
+        son = generer_son(440, duree=0.05)
+        canaux.jouer(son)
+        assert canaux.latences.total == 0
+        with canaux.entree():
+            canaux.jouer(son)
+            canaux.jouer(son)  # Deuxième son de la même touche: pas de deuxième mesure
+        with canaux.entree():
+            pass  # Touche sans son (lecture à vue)
+        canaux.jouer(son, 'metronome')
+        assert canaux.latences.total == 1
+        rapport = canaux.rapport_latence(512)
+        assert "1 mesures" in rapport
+        frequence = pygame.mixer.get_init()[0]
+        assert f"{512 * 1000 / frequence:.2f} ms (512 échantillons à {frequence} Hz)" in rapport
+    
+    def test_latence_depuis_l_instant_de_l_entree(self):
+        """Vérifie que le délai compte depuis l'instant de l'entrée, pas depuis sa lecture"""
+        canaux = CanauxAudio()
+        son = generer_son(440, duree=0.05)
+        # Touche enfoncée 40 ms avant que la boucle ne la traite
+        with canaux.entree(music_game.HorlogePygame().ticks() - 40):
+            canaux.jouer(son)
+        assert canaux.latences.percentile(50) >= 40000
+        pygame.mixer.stop()
+    
+    def test_format_relu_apres_init(self):
+        """Vérifie que les sons sont synthétisés au format réel du mixer"""
+        frequence, _, nb_canaux = pygame.mixer.get_init()
+        son = generer_son(440, duree=1.0)
+        echantillons = pygame.sndarray.array(son)
+        assert len(echantillons) == frequence
+        assert (echantillons.ndim == 1) == (nb_canaux == 1)
+        assert CanauxAudio().statistiques()['format'].startswith(f"{frequence} Hz, 16 bits")
+
+
+class TestDetectionHauteur:
+    """Tests de la détection de hauteur (réponses chantées ou jouées)"""
+    
+    SR = 22050
+    
+    def melodie(self, noms, duree=0.3, timbre='piano'):
+        """Notes de la clé de Sol séparées par un court silence, en PCM 16 bits"""
+        silence = np.zeros(int(0.1 * self.SR), dtype=np.int16)
+        morceaux = []
+        for nom in noms:
+            morceaux += [synthetiser(FREQUENCIES_SOL[nom], duree, sample_rate=self.SR, canaux=1,
+                                     timbre=timbre), silence]
+        return np.concatenate(morceaux)
+    
+    def detecter(self, source):
+        detecteur = DetecteurHauteur(source).demarrer()
+        detecteur.attendre_fin(timeout=10)
+        return detecteur, detecteur.notes()
+    
+    def test_yin_toutes_les_trames_ensemble(self):
+        """Vérifie la fréquence trouvée par YIN, trame par trame, à moins d'un quart de ton"""
+        signal = synthetiser(440.0, 0.3, sample_rate=self.SR, canaux=1, timbre='piano') / 32768
+        trames = decouper_trames(signal[2000:], 1024, 256)
+        frequences = yin(trames, self.SR)
+        assert len(frequences) == len(trames) > 10
+        assert np.all(np.abs(np.log2(frequences / 440.0)) < 1 / 24)
+        # Du bruit n'a pas de période nette
+        bruit = np.random.default_rng(0).uniform(-0.5, 0.5, (4, 1024))
+        assert np.isnan(yin(bruit, self.SR)).all()
+    
+    def test_flux_pcm_melodie(self):
+        """Vérifie qu'une mélodie lue sur un flux PCM donne une réponse par note, dans l'ordre"""
+        noms = ['Do', 'Mi', 'Sol', 'Sol', 'Si', 'Ré']
+        source = SourcePCM(io.BytesIO(self.melodie(noms).tobytes()), self.SR)
+        detecteur, detections = self.detecter(source)
+        assert [d.nom for d in detections] == noms
+        assert max(d.calcul_ms for d in detections) < 50
+        assert all(0 < d.instant for d in detections)
+    
+    def test_reponse_moins_de_50_ms_apres_la_note(self):
+        """Vérifie que la réponse arrive moins de 50 ms après le début de la note, même grave"""
+        for frequence, nom in ((440.0, 'La'), (65.41, 'Do')):  # La4 et Do2 (voix de basse)
+            son = synthetiser(frequence, 0.3, sample_rate=self.SR, canaux=1, timbre='piano')
+            detecteur, detections = self.detecter(SourcePCM(io.BytesIO(son.tobytes()), self.SR))
+            assert detections[0].nom == nom
+            assert detections[0].instant < 0.050
+    
+    def test_note_tenue_une_seule_reponse(self):
+        """Vérifie qu'une note tenue (même chantée à l'octave) ne répond qu'une fois"""
+        la4 = synthetiser(440.0, 0.5, sample_rate=self.SR, canaux=1)
+        la5 = synthetiser(880.0, 0.5, sample_rate=self.SR, canaux=1)
+        source = SourcePCM(io.BytesIO(np.concatenate((la4, la5)).tobytes()), self.SR)
+        _, detections = self.detecter(source)
+        assert [d.nom for d in detections] == ['La']
+    
+    def test_fichier_wav_stereo(self):
+        """Vérifie la lecture d'un fichier WAV stéréo (canaux mélangés)"""
+        mono = self.melodie(['Fa', 'La'])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            chemin = os.path.join(tmpdir, 'reponse.wav')
+            with wave.open(chemin, 'wb') as wav:
+                wav.setnchannels(2)
+                wav.setsampwidth(2)
+                wav.setframerate(self.SR)
+                wav.writeframes(np.repeat(mono, 2).tobytes())
+            _, detections = self.detecter(SourceWav(chemin))
+        assert [d.nom for d in detections] == ['Fa', 'La']
+    
+    def test_decoupage_en_blocs_sans_effet(self):
+        """Vérifie que la taille des blocs lus ne change pas les réponses"""
+        signal = self.melodie(['Ré', 'Fa', 'Do']).astype(np.float32) / 32768
+        resultats = []
+        for taille_bloc in (100, 256, 5000):
+            detecteur = DetecteurHauteur(SourcePCM(io.BytesIO(), self.SR))
+            for debut in range(0, len(signal), taille_bloc):
+                detecteur.analyser(signal[debut:debut + taille_bloc])
+            resultats.append([(d.nom, d.instant) for d in detecteur.notes()])
+        assert resultats[0] == resultats[1] == resultats[2]
+        assert [nom for nom, _ in resultats[0]] == ['Ré', 'Fa', 'Do']
+    
+    def test_touche_noire_sans_nom(self):
+        """Vérifie qu'un Fa# est reconnu mais sans nom de réponse (le jeu l'ignore)"""
+        fa_diese = synthetiser(BanqueSons.frequence('sol', 'Fa', 4, 1), 0.3, sample_rate=self.SR, canaux=1)
+        _, detections = self.detecter(SourcePCM(io.BytesIO(fa_diese.tobytes()), self.SR))
+        assert [(d.nom, d.midi) for d in detections] == [(None, 66)]
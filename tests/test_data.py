@@ -4,6 +4,7 @@ import sys
 import os
 import tempfile
 import json
+import time
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,6 +13,20 @@ import music_game
 from music_game import NOTES
 
 
+def reponse(**champs):
+    """
+    Construit un événement de réponse pour les tests.
+
+    Par défaut: Do en clé de sol, réponse correcte en 800 ms. Les champs
+    donnés remplacent ces valeurs; une réponse fausse choisit Ré.
+    """
+    evenement = {'type': 'reponse', 'ts': 0.0, 'cle': 'sol', 'note': 'Do',
+                 'temps_ms': 800, 'resultat': 'correct'}
+    evenement.update(champs)
+    evenement.setdefault('choix', evenement['note'] if evenement['resultat'] == 'correct' else 'Ré')
+    return evenement
+
+
 class TestPersistanceDonnees:
     """Tests de sauvegarde et chargement des données"""
     
@@ -163,3 +178,464 @@ class TestPersistanceDonnees:
             # Vérifier que les notes avec accents sont bien présentes
             donnees_chargees = music_game.charger_donnees()
             assert 'Ré' in donnees_chargees['stats']['par_note']
+
+
+class TestJournalReponses:
+    """Tests du journal des réponses et de sa compaction"""
+    
+    def test_chemin_journal(self):
+        """Vérifie que le journal est rangé à côté du fichier de données"""
+        assert music_game.chemin_journal('/tmp/x/donnees.json') == '/tmp/x/donnees_journal.jsonl'
+    
+    def test_appliquer_evenement(self):
+        """Vérifie la mise à jour des compteurs pour chaque type d'événement"""
+        donnees = music_game.donnees_par_defaut()
+        music_game.appliquer_evenement(donnees, reponse(note='Mi'))
+        music_game.appliquer_evenement(donnees, reponse(note='Mi', resultat='faux'))
+        music_game.appliquer_evenement(donnees, {'type': 'session', 'ts': 0.0})
+        music_game.appliquer_evenement(donnees, {'type': 'record', 'ts': 0.0, 'score': 40})
+        music_game.appliquer_evenement(donnees, {'type': 'record', 'ts': 0.0, 'score': 20})
+        
+        assert donnees['stats']['total_notes'] == 2
+        assert donnees['stats']['notes_correctes'] == 1
+        assert donnees['stats']['par_note']['Mi'] == {'tentatives': 2, 'reussites': 1}
+        assert donnees['stats']['sessions'] == 1
+        assert donnees['high_score'] == 40
+    
+    def test_boites_de_leitner(self):
+        """Vérifie qu'une bonne réponse monte d'une boîte et qu'une erreur renvoie en boîte 1"""
+        donnees = music_game.donnees_par_defaut()
+        boites = donnees['stats']['boites']
+        for _ in range(music_game.NB_BOITES + 2):
+            music_game.appliquer_evenement(donnees, reponse(note='Mi'))
+        assert boites['sol:Mi'] == music_game.NB_BOITES
+        music_game.appliquer_evenement(donnees, reponse(note='Mi', resultat='temps'))
+        music_game.appliquer_evenement(donnees, reponse(note='La'))
+        assert boites == {'sol:Mi': 1, 'sol:La': 2}
+    
+    def test_ajout_en_fin_de_journal(self):
+        """Vérifie que chaque réponse est une ligne ajoutée au journal"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            journal.ajouter([reponse(), reponse(note='Sol', resultat='temps')])
+            journal.ajouter([reponse(note='La')])
+            
+            with open(journal.chemin, encoding='utf-8') as f:
+                lignes = [json.loads(ligne) for ligne in f]
+            assert [e['note'] for e in lignes] == ['Do', 'Sol', 'La']
+            assert lignes[1]['resultat'] == 'temps'
+            # Pas encore d'instantané: tout est relu depuis le journal
+            assert not os.path.exists(fichier)
+            assert music_game.charger_donnees(fichier)['stats']['total_notes'] == 3
+    
+    def test_compaction(self):
+        """Vérifie que seuls les événements postérieurs à l'instantané sont rejoués"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            journal.ajouter([reponse() for _ in range(5)])
+            journal.compacter()
+            journal.ajouter([reponse(note='Si', resultat='faux')])
+            
+            with open(fichier, encoding='utf-8') as f:
+                instantane = json.load(f)
+            assert instantane['stats']['total_notes'] == 5
+            assert instantane['journal']['position'] > 0
+            
+            donnees = music_game.charger_donnees(fichier)
+            assert donnees['stats']['total_notes'] == 6
+            assert donnees['stats']['notes_correctes'] == 5
+            assert 'journal' not in donnees
+            debut = music_game.donnees_par_defaut()
+            assert music_game.rejouer_journal(debut, journal.chemin,
+                                              instantane['journal']['position']) == 1
+    
+    def test_ligne_tronquee_ignoree(self):
+        """Vérifie qu'une écriture interrompue ne corrompt pas le journal"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            with open(music_game.chemin_journal(fichier), 'w', encoding='utf-8') as f:
+                f.write(json.dumps(reponse()) + '\n{"type": "repo')
+            assert music_game.charger_donnees(fichier)['stats']['total_notes'] == 1
+            
+            # L'ajout suivant reste lisible malgré la ligne incomplète
+            music_game.JournalReponses(fichier).ajouter([reponse(note='Ré')])
+            assert music_game.charger_donnees(fichier)['stats']['total_notes'] == 2
+    
+    def test_instantane_corrompu_reconstruit(self):
+        """Vérifie qu'un instantané illisible est reconstruit depuis le journal"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            journal.ajouter([reponse() for _ in range(3)])
+            journal.compacter()
+            with open(fichier, 'w') as f:
+                f.write("{ invalid json }")
+            assert music_game.charger_donnees(fichier)['stats']['total_notes'] == 3
+
+    
+    def test_reponses_du_jeu_rechargees(self):
+        """Vérifie que les réponses du jeu sont retrouvées au chargement suivant"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            music_game.FICHIER_DONNEES = os.path.join(tmpdir, 'test.json')
+            jeu = music_game.Jeu(mode_cle='sol')
+            jeu.son_active = False
+            note = jeu.note_actuelle.nom
+            jeu.verifier_reponse(NOTES.index(note))
+            jeu.signaler_temps_ecoule()
+            music_game.init_runtime().ecrivain.vider()
+            
+            donnees = music_game.charger_donnees()
+            assert donnees['stats']['total_notes'] == 2
+            assert donnees['stats']['notes_correctes'] == 1
+            assert donnees['high_score'] == 10
+            with open(music_game.chemin_journal(), encoding='utf-8') as f:
+                resultats = [json.loads(ligne).get('resultat') for ligne in f]
+            assert resultats == ['correct', None, 'temps']
+
+
+class TestEcrivainDonnees:
+    """Tests de l'écriture du journal en arrière-plan"""
+    
+    def test_evenements_regroupes(self):
+        """Vérifie que plusieurs réponses rapprochées donnent un seul ajout"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            ecrivain = music_game.EcrivainDonnees(delai_max_s=60)
+            for _ in range(10):
+                ecrivain.enregistrer(reponse(), journal)
+            ecrivain.vider()
+            
+            assert ecrivain.ecritures == 1
+            assert ecrivain.compactions == 1
+            assert ecrivain.statistiques()['ecritures_evitees'] == 9
+            with open(fichier, encoding='utf-8') as f:
+                assert json.load(f)['stats']['total_notes'] == 10
+    
+    def test_ecriture_apres_delai(self):
+        """Vérifie que le journal est écrit après le délai, sans vider()"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            ecrivain = music_game.EcrivainDonnees(delai_max_s=0.05)
+            ecrivain.enregistrer(reponse(), journal)
+            limite = time.monotonic() + 5
+            while ecrivain.ecritures == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+            assert os.path.exists(music_game.chemin_journal(fichier))
+            assert len(ecrivain.latences_ms) == 1
+    
+    def test_ecriture_apres_trop_de_demandes(self):
+        """Vérifie qu'un lot plein est écrit sans attendre le délai"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            ecrivain = music_game.EcrivainDonnees(delai_max_s=60, max_en_attente=3)
+            for _ in range(3):
+                ecrivain.enregistrer(reponse(), journal)
+            limite = time.monotonic() + 5
+            while ecrivain.ecritures == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+            assert ecrivain.ecritures == 1
+    
+    def test_compaction_periodique(self):
+        """Vérifie que l'instantané est réécrit tous les 'seuil_compaction' événements"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            journal = music_game.JournalReponses(fichier)
+            ecrivain = music_game.EcrivainDonnees(delai_max_s=60, max_en_attente=4,
+                                                  seuil_compaction=4)
+            for _ in range(4):
+                ecrivain.enregistrer(reponse(), journal)
+            limite = time.monotonic() + 5
+            while ecrivain.compactions == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+            with open(fichier, encoding='utf-8') as f:
+                assert json.load(f)['stats']['total_notes'] == 4
+    
+    class StockageCapricieux:
+        """Stockage dont les premiers ajouts lèvent une exception imprévue"""
+        identifiant = 'capricieux'
+        depuis_compaction = 0
+        
+        def __init__(self, echecs, refus=0):
+            self.echecs = echecs
+            self.refus = refus  # Échecs signalés par False (disque plein, base verrouillée)
+            self.recus = []
+        
+        def ajouter(self, evenements):
+            if self.echecs:
+                self.echecs -= 1
+                raise KeyError('resultat')
+            if self.refus:
+                self.refus -= 1
+                return False
+            self.recus.extend(evenements)
+            return True
+    
+    def test_erreur_imprevue_lot_reessaye(self):
+        """Vérifie qu'une exception n'arrête pas le thread et que le lot est réécrit"""
+        stockage = self.StockageCapricieux(echecs=1)
+        ecrivain = music_game.EcrivainDonnees(delai_max_s=60)
+        ecrivain.enregistrer(reponse(), stockage)
+        debut = time.monotonic()
+        ecrivain.vider()
+        assert time.monotonic() - debut < 1  # vider() n'attend pas son délai maximal
+        assert ecrivain.erreurs == 1 and stockage.recus == []
+        ecrivain.enregistrer(reponse(note='Ré'), stockage)
+        ecrivain.vider()
+        assert [e['note'] for e in stockage.recus] == ['Do', 'Ré']
+    
+    def test_ecriture_refusee_reessayee(self):
+        """Vérifie qu'un lot refusé par le stockage (False) est réessayé, puis compté perdu"""
+        stockage = self.StockageCapricieux(echecs=0, refus=1)
+        ecrivain = music_game.EcrivainDonnees(delai_max_s=60)
+        ecrivain.enregistrer(reponse(), stockage)
+        ecrivain.vider()
+        assert ecrivain.erreurs == 1 and ecrivain.ecritures == 0
+        ecrivain.vider()
+        assert len(stockage.recus) == 1 and ecrivain.ecritures == 1
+        # Toujours refusé: abandonné et compté après ESSAIS_MAX essais
+        stockage.refus = music_game.EcrivainDonnees.ESSAIS_MAX
+        ecrivain.enregistrer(reponse(), stockage)
+        for _ in range(music_game.EcrivainDonnees.ESSAIS_MAX):
+            ecrivain.vider()
+        assert ecrivain.perdus == 1
+    
+    def test_lot_abandonne_apres_essais(self):
+        """Vérifie qu'un lot toujours refusé finit abandonné au lieu de bloquer la file"""
+        stockage = self.StockageCapricieux(echecs=music_game.EcrivainDonnees.ESSAIS_MAX)
+        ecrivain = music_game.EcrivainDonnees(delai_max_s=60)
+        ecrivain.enregistrer(reponse(), stockage)
+        for _ in range(music_game.EcrivainDonnees.ESSAIS_MAX):
+            ecrivain.vider()
+        assert ecrivain.perdus == 1
+        ecrivain.enregistrer(reponse(), stockage)
+        ecrivain.vider()
+        assert len(stockage.recus) == 1
+    
+    def test_ecriture_atomique(self):
+        """Vérifie qu'aucun fichier temporaire ne reste après la sauvegarde"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fichier = os.path.join(tmpdir, 'test.json')
+            donnees = music_game.donnees_par_defaut()
+            music_game.sauvegarder_donnees(donnees, fichier)
+            music_game.sauvegarder_donnees(donnees, fichier)
+            assert os.listdir(tmpdir) == ['test.json']
+
+
+class TestStockageSQLite:
+    """Tests du stockage SQLite par profil d'élève"""
+    
+    def test_profils_separes(self):
+        """Vérifie que chaque élève a ses propres statistiques"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base = os.path.join(tmpdir, 'classe.sqlite3')
+            alice = music_game.StockageSQLite(base, 'Alice')
+            bob = music_game.StockageSQLite(base, 'Bob')
+            alice.ajouter([reponse(), reponse(note='Mi', resultat='faux'),
+                           {'type': 'session', 'ts': 0.0}, {'type': 'record', 'ts': 0.0, 'score': 30}])
+            bob.ajouter([reponse(note='Sol')])
+            
+            donnees = alice.charger()
+            assert donnees['high_score'] == 30
+            assert donnees['stats']['sessions'] == 1
+            assert donnees['stats']['total_notes'] == 2
+            assert donnees['stats']['par_note']['Mi'] == {'tentatives': 1, 'reussites': 0}
+            assert bob.resume()['total_notes'] == 1
+            assert alice.profils() == ['Alice', 'Bob']
+            alice.fermer()
+            bob.fermer()
+    
+    def test_accords_a_part(self):
+        """Vérifie que les réponses du mode accords ne comptent pas dans les notes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            accord = {**reponse(note='Ré mineur'), 'exercice': 'triades'}
+            stockage.ajouter([reponse(), accord, {**accord, 'resultat': 'faux'}])
+            donnees = stockage.charger()
+            assert donnees['stats']['total_notes'] == 1
+            assert 'Ré mineur' not in donnees['stats']['par_note']
+            assert donnees['stats']['par_accord'] == {'Ré mineur': {'tentatives': 2, 'reussites': 1}}
+            assert donnees['stats']['boites'] == {'sol:Do': 2}
+            assert donnees['stats']['boites_accords'] == {'sol:Ré mineur': 1}
+            # Même résultat que les compteurs tenus en mémoire
+            memoire = music_game.donnees_par_defaut()
+            for evenement in [reponse(), accord, {**accord, 'resultat': 'faux'}]:
+                music_game.appliquer_evenement(memoire, evenement)
+            assert memoire['stats']['par_accord'] == donnees['stats']['par_accord']
+            assert memoire['stats']['boites_accords'] == donnees['stats']['boites_accords']
+            assert [e['note'] for e in stockage.dernieres_reponses(10)] == ['Do']
+            stockage.fermer()
+    
+    def test_taux_par_cle_et_par_jour(self):
+        """Vérifie les regroupements par clé et par jour"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            ts = 1700000000.0
+            stockage.ajouter([reponse(cle='sol', ts=ts), reponse(cle='fa', resultat='faux', ts=ts),
+                              reponse(cle='fa', ts=ts + 86400)])
+            assert stockage.taux_reussite('cle') == [('fa', 2, 1), ('sol', 1, 1)]
+            jours = stockage.taux_reussite('jour')
+            assert [t for _, t, _ in jours] == [2, 1]
+            assert jours[0][0] == music_game.jour_de(ts)
+            stockage.fermer()
+    
+    def test_requetes_indexees(self):
+        """Vérifie que les regroupements utilisent un index couvrant"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            cnx = stockage._connexion()
+            assert cnx.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            for colonne in ('note', 'cle', 'jour'):
+                plan = ' '.join(str(ligne) for ligne in cnx.execute(
+                    f"EXPLAIN QUERY PLAN SELECT {colonne}, COUNT(*), SUM(correct) FROM reponses"
+                    f" WHERE profil = 1 GROUP BY {colonne}"))
+                assert f'COVERING INDEX reponses_par_{colonne}' in plan
+            stockage.fermer()
+    
+    def test_migration_depuis_json(self):
+        """Vérifie que le profil par défaut reprend l'ancien fichier JSON"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            music_game.FICHIER_DONNEES = os.path.join(tmpdir, 'test.json')
+            # Ancien format: compteurs seuls, puis quelques réponses au journal
+            ancien = music_game.donnees_par_defaut()
+            ancien['high_score'] = 80
+            ancien['stats']['sessions'] = 3
+            ancien['stats']['total_notes'] = 10
+            ancien['stats']['notes_correctes'] = 6
+            ancien['stats']['par_note']['Do'] = {'tentatives': 10, 'reussites': 6}
+            music_game.sauvegarder_donnees(ancien)
+            music_game.JournalReponses().ajouter([reponse(), reponse(note='La', resultat='faux')])
+            
+            stockage = music_game.StockageSQLite(profil=music_game.PROFIL_DEFAUT)
+            donnees = stockage.charger()
+            assert donnees['high_score'] == 80
+            assert donnees['stats']['sessions'] == 3
+            assert donnees['stats']['total_notes'] == 12
+            assert donnees['stats']['par_note']['Do'] == {'tentatives': 11, 'reussites': 7}
+            # Seules les réponses du journal ont un détail par clé
+            assert stockage.taux_reussite('cle') == [('sol', 2, 1)]
+            
+            # La migration n'a lieu qu'une fois
+            stockage.fermer()
+            assert music_game.StockageSQLite().resume()['total_notes'] == 12
+    
+    def test_boites_comme_le_journal(self):
+        """Vérifie que la base retrouve les mêmes boîtes de Leitner que appliquer_evenement"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            reponses = ([reponse(note='Do')] * 7 + [reponse(note='Ré', resultat='faux')]
+                        + [reponse(note='Mi'), reponse(note='Mi', resultat='faux'), reponse(note='Mi')]
+                        + [reponse(note='Do', cle='fa', resultat='faux'), reponse(note='Do', cle='fa')])
+            stockage.ajouter(reponses)
+            attendu = music_game.donnees_par_defaut()
+            for evenement in reponses:
+                music_game.appliquer_evenement(attendu, evenement)
+            assert stockage.charger()['stats']['boites'] == attendu['stats']['boites']
+            assert attendu['stats']['boites'] == {'sol:Do': 5, 'sol:Ré': 1, 'sol:Mi': 2, 'fa:Do': 2}
+            stockage.fermer()
+    
+    def test_temps_par_note_comme_le_journal(self):
+        """Vérifie que la base retrouve les histogrammes de temps par note et par clé"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            reponses = [reponse(note=note, cle='sol' if i % 2 else 'fa', temps_ms=400 + 300 * i)
+                        for i, note in enumerate(['Do', 'Ré', 'Do', 'Mi', 'Do'])]
+            reponses.append(reponse(note='Ré', resultat='temps'))
+            stockage.ajouter(reponses)
+            attendu = music_game.donnees_par_defaut()
+            for evenement in reponses:
+                music_game.appliquer_evenement(attendu, evenement)
+            stats = stockage.charger()['stats']
+            for critere in ('temps_par_note', 'temps_par_cle'):
+                assert stats[critere] == attendu['stats'][critere]
+            assert sum(attendu['stats']['temps_par_note']['Do'].values()) == 3
+            plan = ' '.join(str(ligne) for ligne in stockage._connexion().execute(
+                "EXPLAIN QUERY PLAN SELECT note, cle, temps_ms, COUNT(*) FROM reponses WHERE profil = 1"
+                " AND resultat != 'temps' AND temps_ms IS NOT NULL GROUP BY note, cle, temps_ms"))
+            assert 'COVERING INDEX reponses_temps_detail' in plan
+            stockage.fermer()
+    
+    def test_ecrivain_vers_sqlite(self):
+        """Vérifie que le thread d'écriture enregistre dans la base"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stockage = music_game.StockageSQLite(os.path.join(tmpdir, 'b.sqlite3'), 'Alice')
+            ecrivain = music_game.EcrivainDonnees(delai_max_s=60)
+            for _ in range(5):
+                ecrivain.enregistrer(reponse(), stockage)
+            ecrivain.vider()
+            assert ecrivain.ecritures == 1
+            assert stockage.resume()['notes_correctes'] == 5
+            stockage.fermer()
+
+
+class TestModeleStats:
+    """Tests des statistiques en mémoire"""
+    
+    def test_fenetre_glissante(self):
+        """Vérifie que seules les 50 dernières réponses comptent dans la fenêtre"""
+        modele = music_game.ModeleStats()
+        for _ in range(50):
+            modele.appliquer(reponse(resultat='faux'))
+        for _ in range(20):
+            modele.appliquer(reponse())
+        assert modele.fenetre_reponses() == (50, 20)
+        assert modele.resume()['total_notes'] == 70
+        assert modele.version == 70
+    
+    def test_fenetre_jours(self):
+        """Vérifie que les réponses de plus de 7 jours sont exclues"""
+        maintenant = time.time()
+        modele = music_game.ModeleStats()
+        modele.appliquer(reponse(ts=maintenant))
+        modele.appliquer(reponse(resultat='faux', ts=maintenant - 3 * 86400))
+        modele.appliquer(reponse(ts=maintenant - 10 * 86400))
+        assert modele.fenetre_jours(maintenant) == (2, 1)
+    
+    def test_percentiles_temps(self):
+        """Vérifie les percentiles des temps de réponse (précision de 10 %)"""
+        modele = music_game.ModeleStats()
+        for temps_ms in range(100, 10100, 100):
+            modele.appliquer(reponse(temps_ms=temps_ms))
+        modele.appliquer(reponse(resultat='temps', temps_ms=60000))  # Ignoré: pas de réponse
+        assert modele.temps.total == 100
+        assert abs(modele.temps.percentile(50) - 5000) <= 500
+        assert abs(modele.temps.percentile(90) - 9000) <= 900
+        assert music_game.Histogramme().percentile(50) is None
+    
+    def test_temps_par_note_et_cle(self):
+        """Vérifie un histogramme de temps de réponse par note et par clé"""
+        modele = music_game.ModeleStats()
+        for temps_ms in (500, 600, 700):
+            modele.appliquer(reponse(temps_ms=temps_ms))
+        modele.appliquer(reponse(temps_ms=3000, cle='fa'))
+        assert modele.temps_par('note', 'Do').total == 4
+        assert abs(modele.temps_par('cle', 'sol').percentile(50) - 600) <= 60
+        assert abs(modele.temps_par('cle', 'fa').percentile(50) - 3000) <= 300
+        assert modele.temps_par('note', 'Mi').percentile(50) is None
+    
+    def test_depuis_stockage(self):
+        """Vérifie que le modèle reprend les compteurs et les dernières réponses du journal"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal = music_game.JournalReponses(os.path.join(tmpdir, 'test.json'))
+            journal.ajouter([reponse(resultat='faux', cle='fa')] * 60 + [reponse()] * 10)
+            journal.compacter()
+            
+            modele = music_game.ModeleStats.depuis_stockage(journal)
+            assert modele.fenetre_reponses() == (50, 10)
+            assert modele.taux_reussite('cle') == [('fa', 60, 0), ('sol', 10, 10)]
+            assert modele.temps.total == 70
+    
+    def test_ecran_recalcule_seulement_si_change(self):
+        """Vérifie que le contenu de l'écran des statistiques suit le modèle"""
+        modele = music_game.ModeleStats()
+        vide = music_game.preparer_statistiques(modele)
+        assert not any('dernières' in str(e) for e in vide)
+        modele.appliquer(reponse(temps_ms=1000))
+        textes = [e[2] for e in music_game.preparer_statistiques(modele, 'Alice') if e[0] == 'texte']
+        assert "Statistiques - Alice" in textes
+        assert "50 dernières: 1/1 (100%)" in textes
+        assert "Do: 1/1 (100%, 1.0 s)" in textes  # Avec le temps médian de la note
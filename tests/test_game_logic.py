@@ -4,6 +4,8 @@ import sys
 import os
 import tempfile
 import json
+import random
+import itertools
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -13,7 +15,22 @@ import pygame
 pygame.init()
 pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
 
-from music_game import Jeu, Note, NOTES, POSITIONS_NOTES_SOL, POSITIONS_NOTES_FA
+import music_game
+from music_game import Jeu, Note, NOTES, POSITIONS_NOTES_SOL, POSITIONS_NOTES_FA, RenduPortee
+
+
+def creer_jeu(*parametres, classe=Jeu, rng=None, horloge=None):
+    """
+    Crée une partie sans son ni fichier: les statistiques restent en mémoire.
+
+    Paramètres:
+        parametres: Paramètres du mode de jeu (clé, tempo, type d'accord...)
+        classe: Jeu ou un de ses modes (LectureAVue, JeuAccords)
+        rng: Générateur aléatoire, pour tirer toujours les mêmes notes
+        horloge: Horloge du jeu (HorlogeSimulee pour avancer le temps à la main)
+    """
+    return classe(*parametres, horloge=horloge, audio=music_game.AudioMuet(), rng=rng,
+                  modele=music_game.ModeleStats(), puits=lambda e: None)
 
 
 class TestNote:
@@ -44,6 +61,63 @@ class TestNote:
         for nom in NOTES:
             note = Note(nom, 'fa')
             assert note.y in POSITIONS_NOTES_FA.values()
+    
+    def test_lignes_supplementaires(self):
+        """Vérifie le nombre de lignes additionnelles selon la hauteur"""
+        assert Note('Do', 'sol').lignes == (POSITIONS_NOTES_SOL['Do'],)  # Do4 sur sa ligne
+        assert Note('Si', 'sol', 3).lignes == (POSITIONS_NOTES_SOL['Do'],)  # Si3 sous la ligne
+        assert len(Note('La', 'sol', 3).lignes) == 2
+        assert len(Note('Do', 'sol', 6).lignes) == 2
+        assert Note('Do', 'fa').lignes == (POSITIONS_NOTES_FA['Do'],)
+        for nom in NOTES:
+            assert Note(nom, 'sol', 5).lignes == () or nom in ('La', 'Si')
+    
+    def test_note_alteree(self):
+        """Vérifie qu'un dièse garde la place de la note et change le son"""
+        fa_diese = Note('Fa', 'sol', 4, 1)
+        assert fa_diese.y == POSITIONS_NOTES_SOL['Fa']
+        assert fa_diese.midi == 66
+        sol_bemol = Note.depuis_midi(66, 'sol', bemols=True)
+        assert (sol_bemol.nom, sol_bemol.octave, sol_bemol.alteration) == ('Sol', 4, -1)
+        assert sol_bemol.y == POSITIONS_NOTES_SOL['Sol']
+
+
+class TestModeleHauteurs:
+    """Tests du modèle des hauteurs (numéros MIDI, degrés, fréquences)"""
+    
+    def test_numeros_midi(self):
+        """Vérifie les numéros MIDI de quelques notes de référence"""
+        assert music_game.numero_midi('Do', 4) == 60
+        assert music_game.numero_midi('La', 4) == 69
+        assert music_game.numero_midi('La', 0) == music_game.MIDI_MIN
+        assert music_game.numero_midi('Do', 8) == music_game.MIDI_MAX
+        assert music_game.numero_midi('Si', 3, 1) == music_game.numero_midi('Do', 4)
+    
+    def test_aller_retour_midi(self):
+        """Vérifie que chaque touche du piano retrouve son numéro, en dièses comme en bémols"""
+        for numero in range(music_game.MIDI_MIN, music_game.MIDI_MAX + 1):
+            for bemols in (False, True):
+                assert music_game.numero_midi(*music_game.depuis_midi(numero, bemols)) == numero
+        assert music_game.nom_complet(*music_game.depuis_midi(61)) == 'Do#4'
+        assert music_game.nom_complet(*music_game.depuis_midi(61, bemols=True)) == 'Réb4'
+    
+    def test_frequences_temperees(self):
+        """Vérifie le La 440 et le rapport d'un demi-ton"""
+        frequences = music_game.FREQUENCES_MIDI
+        assert frequences[69] == 440.0
+        assert frequences[57] == pytest.approx(220.0)
+        assert frequences[61] / frequences[60] == pytest.approx(2 ** (1 / 12))
+        assert music_game.FREQUENCIES_SOL['Do'] == pytest.approx(261.63, abs=0.01)
+    
+    def test_positions_calculees(self):
+        """Vérifie que chaque degré monte d'un demi-interligne et que les lignes tombent juste"""
+        for cle, positions in music_game.POSITIONS_Y.items():
+            bas = music_game.DEGRE_LIGNE_BAS[cle]
+            for i in range(5):
+                assert positions[bas + 2 * i] == RenduPortee.Y_PREMIERE_LIGNE + (4 - i) * RenduPortee.ESPACEMENT
+        # Même hauteur, deux clés: le Do central est sous la portée de Sol et au-dessus de celle de Fa
+        assert POSITIONS_NOTES_SOL['Do'] > RenduPortee.Y_PREMIERE_LIGNE + 4 * RenduPortee.ESPACEMENT
+        assert POSITIONS_NOTES_FA['Do'] < RenduPortee.Y_PREMIERE_LIGNE
 
 
 class TestJeuInitialisation:
@@ -51,7 +125,7 @@ class TestJeuInitialisation:
     
     def test_jeu_init_mode_sol(self):
         """Vérifie l'initialisation en mode clé de Sol"""
-        jeu = Jeu(mode_cle='sol')
+        jeu = creer_jeu('sol')
         assert jeu.score == 0
         assert jeu.niveau == 1
         assert jeu.combo == 0
@@ -60,29 +134,29 @@ class TestJeuInitialisation:
     
     def test_jeu_init_mode_fa(self):
         """Vérifie l'initialisation en mode clé de Fa"""
-        jeu = Jeu(mode_cle='fa')
+        jeu = creer_jeu('fa')
         assert jeu.mode_cle == 'fa'
         assert jeu.cle_actuelle == 'fa'
     
     def test_jeu_init_mode_mixte(self):
         """Vérifie l'initialisation en mode mixte"""
-        jeu = Jeu(mode_cle='mixte')
+        jeu = creer_jeu('mixte')
         assert jeu.mode_cle == 'mixte'
         assert jeu.cle_actuelle in ['sol', 'fa']
     
     def test_jeu_init_temps_initial(self):
         """Vérifie que le temps initial est de 10 secondes"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         assert jeu.max_temps == 10000  # 10 secondes en millisecondes
     
     def test_jeu_init_son_active(self):
         """Vérifie que le son est activé par défaut"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         assert jeu.son_active == True
     
     def test_jeu_init_boutons_crees(self):
         """Vérifie que 7 boutons sont créés (un par note)"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         assert len(jeu.boutons) == 7
 
 
@@ -91,14 +165,14 @@ class TestJeuLogique:
     
     def test_nouvelle_note_genere_note(self):
         """Vérifie que nouvelle_note() génère bien une note"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.nouvelle_note()
         assert jeu.note_actuelle is not None
         assert jeu.note_actuelle.nom in NOTES
     
     def test_nouvelle_note_mode_sol(self):
         """Vérifie que nouvelle_note() utilise la bonne clé en mode Sol"""
-        jeu = Jeu(mode_cle='sol')
+        jeu = creer_jeu('sol')
         for _ in range(10):  # Tester plusieurs fois
             jeu.nouvelle_note()
             assert jeu.cle_actuelle == 'sol'
@@ -106,7 +180,7 @@ class TestJeuLogique:
     
     def test_nouvelle_note_mode_fa(self):
         """Vérifie que nouvelle_note() utilise la bonne clé en mode Fa"""
-        jeu = Jeu(mode_cle='fa')
+        jeu = creer_jeu('fa')
         for _ in range(10):
             jeu.nouvelle_note()
             assert jeu.cle_actuelle == 'fa'
@@ -114,7 +188,7 @@ class TestJeuLogique:
     
     def test_verifier_reponse_correcte_augmente_score(self):
         """Vérifie que la bonne réponse augmente le score"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.note_actuelle = Note('Do', 'sol')
         score_initial = jeu.score
         
@@ -125,7 +199,7 @@ class TestJeuLogique:
     
     def test_verifier_reponse_correcte_augmente_combo(self):
         """Vérifie que la bonne réponse augmente le combo"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.note_actuelle = Note('Do', 'sol')
         
         jeu.verifier_reponse(0)  # Correct
@@ -137,7 +211,7 @@ class TestJeuLogique:
     
     def test_verifier_reponse_incorrecte_reset_combo(self):
         """Vérifie que la mauvaise réponse réinitialise le combo"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.combo = 5
         jeu.note_actuelle = Note('Do', 'sol')
         
@@ -148,7 +222,7 @@ class TestJeuLogique:
     
     def test_calcul_points_niveau_1_sans_combo(self):
         """Vérifie le calcul des points: niveau 1, pas de combo = 10 points"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.niveau = 1
         jeu.combo = 0
         jeu.note_actuelle = Note('Do', 'sol')
@@ -161,7 +235,7 @@ class TestJeuLogique:
     
     def test_calcul_points_avec_combo(self):
         """Vérifie le calcul des points avec bonus combo"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.niveau = 2
         jeu.combo = 2  # Combo actuel avant la réponse
         jeu.note_actuelle = Note('Do', 'sol')
@@ -175,7 +249,7 @@ class TestJeuLogique:
     
     def test_niveau_augmente_avec_score(self):
         """Vérifie que le niveau augmente tous les 50 points"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         niveau_initial = jeu.niveau
         
         # Le niveau augmente automatiquement dans verifier_reponse()
@@ -190,7 +264,7 @@ class TestJeuLogique:
     
     def test_high_score_mise_a_jour(self):
         """Vérifie que le high score est mis à jour"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.high_score = 100
         jeu.score = 150
         jeu.note_actuelle = Note('Do', 'sol')
@@ -202,7 +276,7 @@ class TestJeuLogique:
     
     def test_statistiques_mise_a_jour_bonne_reponse(self):
         """Vérifie que les stats sont mises à jour après une bonne réponse"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.note_actuelle = Note('Do', 'sol')
         
         stats_avant = jeu.donnees['stats']['par_note']['Do']['reussites']
@@ -215,7 +289,7 @@ class TestJeuLogique:
     
     def test_statistiques_mise_a_jour_mauvaise_reponse(self):
         """Vérifie que les tentatives sont comptées même en cas d'erreur"""
-        jeu = Jeu()
+        jeu = creer_jeu()
         jeu.note_actuelle = Note('Do', 'sol')
         
         tentatives_avant = jeu.donnees['stats']['par_note']['Do']['tentatives']
@@ -223,3 +297,349 @@ class TestJeuLogique:
         jeu.verifier_reponse(1)  # Incorrect (Ré au lieu de Do)
         
         assert jeu.donnees['stats']['par_note']['Do']['tentatives'] == tentatives_avant + 1
+
+
+class TestRenduPartiel:
+    """Tests du rendu par zones modifiées (dirty rectangles)"""
+    
+    def test_premiere_image_complete(self):
+        """Vérifie que la première image envoie toute la fenêtre"""
+        jeu = creer_jeu('sol')
+        surface = pygame.Surface((800, 600))
+        rects = jeu.dessiner_partiel(surface)
+        assert rects[0] == surface.get_rect()
+        assert jeu.pixels_envoyes == 800 * 600
+    
+    def test_image_suivante_seulement_zones_modifiees(self):
+        """Vérifie que seules les zones modifiées sont renvoyées"""
+        jeu = creer_jeu('sol')
+        surface = pygame.Surface((800, 600))
+        jeu.dessiner_partiel(surface, afficher_compteur=False)
+        jeu.boutons[2].survole = True
+        rects = jeu.dessiner_partiel(surface, afficher_compteur=False)
+        # Le bouton survolé, et éventuellement la barre de temps qui avance
+        assert jeu.boutons[2].rect.inflate(4, 4) in rects
+        assert len(rects) <= 2
+        assert jeu.pixels_envoyes < 800 * 600 // 10
+    
+    def test_rendu_partiel_identique_au_rendu_complet(self):
+        """Vérifie que le rendu partiel produit exactement la même image"""
+        jeu = creer_jeu('sol')
+        partiel = pygame.Surface((800, 600))
+        complet = pygame.Surface((800, 600))
+        for i in range(10):
+            jeu.boutons[i % 7].survole = (i % 2 == 0)
+            if i % 3 == 0:
+                jeu.verifier_reponse(i % 7)
+            jeu.dessiner_partiel(partiel, afficher_compteur=False)
+            jeu.dessiner(complet)
+            assert pygame.image.tobytes(partiel, 'RGB') == pygame.image.tobytes(complet, 'RGB')
+    
+    def test_zones_disjointes(self):
+        """Vérifie qu'aucune zone n'en recouvre une autre (sinon l'effacer abîmerait sa voisine)"""
+        assert not Jeu.ZONE_SON.colliderect(Jeu.ZONE_COMPTEUR)
+        zones = [getattr(Jeu, nom) for nom in dir(Jeu) if nom.startswith('ZONE_')]
+        for i, zone in enumerate(zones):
+            assert zone.collidelist(zones[i + 1:]) == -1
+    
+    def test_invalider_rendu(self):
+        """Vérifie qu'après invalidation toute la fenêtre est redessinée"""
+        jeu = creer_jeu('sol')
+        surface = pygame.Surface((800, 600))
+        jeu.dessiner_partiel(surface)
+        jeu.invalider_rendu()
+        assert jeu.dessiner_partiel(surface)[0] == surface.get_rect()
+
+
+class TestRenduPortee:
+    """Tests du fond de portée pré-rendu"""
+    
+    def test_couche_composee_une_seule_fois(self):
+        """Vérifie que le fond d'une clé est composé une fois puis réutilisé"""
+        portees = RenduPortee()
+        surface = pygame.Surface((800, 600))
+        for _ in range(5):
+            portees.dessiner(surface, 'sol', y_etiquette=220)
+        assert portees.creations == 1
+        portees.dessiner(surface, 'fa', y_etiquette=220)
+        portees.dessiner(surface, 'sol', y_etiquette=140)
+        assert portees.creations == 3
+    
+    def test_lignes_de_la_portee(self):
+        """Vérifie que les 5 lignes sont dessinées aux bonnes hauteurs"""
+        surface = pygame.Surface((800, 600))
+        surface.fill((255, 255, 255))
+        RenduPortee().dessiner(surface, 'sol', y_etiquette=220)
+        for i in range(5):
+            y = RenduPortee.Y_PREMIERE_LIGNE + i * RenduPortee.ESPACEMENT
+            assert surface.get_at((500, y))[:3] == (0, 0, 0)
+        # Entre deux lignes, le fond reste visible (couche transparente)
+        assert surface.get_at((500, RenduPortee.Y_PREMIERE_LIGNE + 7))[:3] == (255, 255, 255)
+    
+    def test_nouvelle_echelle_nouvelle_couche(self):
+        """Vérifie que le cache distingue les facteurs d'échelle de la fenêtre"""
+        rt = music_game.init_runtime()
+        portees = RenduPortee()
+        portees.dessiner(pygame.Surface((800, 600)), 'fa', y_etiquette=220)
+        ancienne, rt.echelle = rt.echelle, music_game.Echelle(2)
+        try:
+            for _ in range(3):
+                portees.dessiner(pygame.Surface((1600, 1200)), 'fa', y_etiquette=220)
+        finally:
+            rt.echelle = ancienne
+        assert portees.creations == 2
+        assert portees.couche('fa', 220, 2)[0].get_width() > 2 * RenduPortee.X_FIN - 2 * RenduPortee.X_DEBUT
+    
+    def test_grande_portee(self):
+        """Vérifie que la grande portée dessine les 10 lignes des deux clés"""
+        surface = pygame.Surface((800, 600))
+        surface.fill((255, 255, 255))
+        RenduPortee().dessiner(surface, 'grande_portee', y_etiquette=None)
+        for y_haut in music_game.GRANDE_PORTEE.values():
+            for i in range(5):
+                assert surface.get_at((500, y_haut + i * RenduPortee.ESPACEMENT))[:3] == (0, 0, 0)
+        # Le Do4, entre les deux portées, n'est sur aucune de leurs lignes
+        y_do = Note('Do', 'sol', y_ligne_haut=music_game.GRANDE_PORTEE['sol']).y
+        assert surface.get_at((500, y_do))[:3] == (255, 255, 255)
+
+
+class TestClesSupplementaires:
+    """Tests des clés d'Ut, de la grande portée et des modes à plusieurs clés"""
+    
+    def test_do_central_sur_sa_ligne(self):
+        """Vérifie que la clé d'Ut place le Do4 sur la 3e (alto) ou la 4e ligne (ténor)"""
+        ligne = lambda n: RenduPortee.Y_PREMIERE_LIGNE + (5 - n) * RenduPortee.ESPACEMENT
+        assert Note('Do', 'ut3', 4).y == ligne(3)
+        assert Note('Do', 'ut4', 4).y == ligne(4)
+        # Les 7 notes du jeu tiennent dans la portée, sans ligne additionnelle
+        for cle in ('ut3', 'ut4'):
+            assert all(Note(nom, cle).lignes == () for nom in NOTES)
+    
+    def test_octaves_du_jeu(self):
+        """Vérifie que les 7 notes du jeu se suivent à partir de la première note de la clé"""
+        for cle, premiere in music_game.DEGRE_PREMIERE_NOTE.items():
+            degres = sorted(music_game.degre(nom, music_game.octave_par_defaut(cle, nom)) for nom in NOTES)
+            assert degres == list(range(premiere, premiere + 7))
+        assert music_game.octave_par_defaut('fa', 'Do') == 4
+        assert music_game.octave_par_defaut('fa', 'Si') == 3
+    
+    def test_mode_avec_toutes_les_cles(self):
+        """Vérifie qu'un mode peut faire alterner n'importe quel ensemble de clés"""
+        assert music_game.cles_du_mode('ut4') == ['ut4']
+        assert music_game.cles_du_mode('mixte') == ['sol', 'fa']
+        jeu = creer_jeu(['sol', 'ut3', 'ut4'])
+        vues = set()
+        for _ in range(60):
+            jeu.nouvelle_note()
+            vues.add(jeu.cle_actuelle)
+        assert vues == {'sol', 'ut3', 'ut4'}
+        with pytest.raises(ValueError):
+            creer_jeu('alto')
+    
+    def test_notes_de_la_grande_portee(self):
+        """Vérifie que chaque note se place sur la portée de sa clé, et le Do4 au milieu"""
+        jeu = creer_jeu('grande_portee')
+        for _ in range(20):
+            jeu.nouvelle_note()
+            y_haut = music_game.GRANDE_PORTEE[jeu.cle_actuelle]
+            assert jeu.note_actuelle.y == music_game.positions_y(jeu.cle_actuelle, y_haut)[
+                music_game.degre(jeu.note_actuelle.nom, jeu.note_actuelle.octave)]
+        do_sol = Note('Do', 'sol', y_ligne_haut=music_game.GRANDE_PORTEE['sol'])
+        do_fa = Note('Do', 'fa', y_ligne_haut=music_game.GRANDE_PORTEE['fa'])
+        assert do_sol.y == do_fa.y and do_sol.lignes == do_fa.lignes == (do_sol.y,)
+
+
+class TestLectureAVue:
+    """Tests du mode lecture à vue (phrases qui défilent)"""
+    
+    def creer_jeu(self, cle='sol', tempo=60):
+        return creer_jeu(cle, tempo, classe=music_game.LectureAVue, rng=random.Random(5),
+                         horloge=music_game.HorlogeSimulee())
+    
+    def avancer(self, jeu, ms, pas=16):
+        """Fait tourner la logique comme boucle_jeu, une image toutes les `pas` ms"""
+        for _ in range(ms // pas):
+            jeu.horloge.avancer(pas)
+            jeu.avancer()
+            while jeu.temps_ecoule():
+                jeu.signaler_temps_ecoule()
+    
+    def test_phrases_par_petits_pas(self):
+        """Vérifie que les phrases restent dans les 7 notes de la clé, par pas d'au plus 2 notes"""
+        for cle in music_game.DEGRE_LIGNE_BAS:
+            flux = music_game.generer_phrases(cle, random.Random(1))
+            notes = list(itertools.islice(flux, 400))
+            degres = [music_game.degre(nom, music_game.octave_par_defaut(cle, nom)) for nom in notes]
+            premiere = music_game.DEGRE_PREMIERE_NOTE[cle]
+            assert all(premiere <= d < premiere + 7 for d in degres)
+            for i in range(1, len(degres)):
+                if i % music_game.LONGUEUR_PHRASE:  # Dans une même phrase
+                    assert 1 <= abs(degres[i] - degres[i - 1]) <= 2
+    
+    def test_reponse_seulement_note_visible(self):
+        """Vérifie qu'on ne peut pas répondre à une note encore hors de la portée"""
+        jeu = self.creer_jeu()
+        # Pendant le décompte, seules les notes déjà entrées à droite de la portée comptent
+        visibles = int(jeu.avance_ms // jeu.periode_ms) - music_game.DECOMPTE + 1
+        for _ in range(10):
+            jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+        assert jeu.donnees['stats']['total_notes'] == visibles
+        assert jeu._a_venir[0].numero == visibles
+        # Une note de plus entre à chaque battement
+        self.avancer(jeu, 1008)
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+        assert jeu.donnees['stats']['notes_correctes'] == visibles + 1
+        assert len(jeu._a_venir) == music_game.TAMPON_NOTES
+    
+    def test_reponse_en_avance_ne_decale_pas_la_suivante(self):
+        """Vérifie que la note suivante, déjà à l'écran, garde son entrée comme origine"""
+        jeu = self.creer_jeu()
+        evenements = []
+        jeu.puits = lambda e: e['type'] == 'reponse' and evenements.append(e)
+        self.avancer(jeu, 2000)
+        jeu.presentee(jeu.horloge.ticks())
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+        suivante = jeu._a_venir[0]
+        entree = suivante.temps_ms - jeu.avance_ms  # Déjà passée: la note défile
+        assert entree < jeu.horloge.ticks()
+        jeu.presentee(jeu.horloge.ticks())  # Image suivante
+        assert jeu.temps_reponse == entree
+        jeu.horloge.avancer(500)
+        jeu.verifier_reponse(NOTES.index(suivante.nom))
+        assert evenements[-1]['temps_ms'] == round(jeu.horloge.ticks() - entree)
+        # L'échéance reste un demi-temps après la ligne de lecture
+        troisieme = jeu._a_venir[0]
+        jeu.presentee(jeu.horloge.ticks())
+        self.avancer(jeu, round(troisieme.temps_ms + jeu.periode_ms / 2 - jeu.horloge.ticks()) + 16)
+        assert evenements[-1]['resultat'] == 'temps'
+        assert evenements[-1]['note'] == troisieme.nom
+    
+    def test_note_manquee_en_passant_la_ligne(self):
+        """Vérifie qu'une note sans réponse compte comme 'temps' un demi-temps après la ligne"""
+        jeu = self.creer_jeu()
+        self.avancer(jeu, 4000 + 480)
+        assert jeu.donnees['stats']['total_notes'] == 0
+        self.avancer(jeu, 48)
+        assert jeu.donnees['stats']['total_notes'] == 1
+        assert jeu._mesures[0][0].resultat == 'temps'
+        # Puis une note par battement
+        self.avancer(jeu, 7000)
+        assert jeu.donnees['stats']['total_notes'] == 8
+        assert jeu.message == "Phrase: 0/8"
+    
+    def test_metronome(self):
+        """Vérifie un clic par battement, et aucun quand le son est coupé"""
+        jeu = self.creer_jeu(tempo=120)
+        self.avancer(jeu, 2000)
+        assert jeu.battements == 5  # Battements 0 à 4 (toutes les 500 ms)
+        jeu.son_active = False
+        self.avancer(jeu, 2000)
+        assert jeu.battements == 5
+    
+    def test_images_des_mesures_bornees(self):
+        """Vérifie qu'on ne garde que les mesures visibles, même après des centaines de notes"""
+        jeu = self.creer_jeu(tempo=240)
+        surface = pygame.Surface((800, 600))
+        for i in range(2000):
+            self.avancer(jeu, 16)
+            if i % 7 == 0:
+                jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+            jeu.dessiner(surface)
+        assert jeu.donnees['stats']['total_notes'] > 100
+        assert len(jeu.bande) <= 3
+        assert len(jeu._mesures) <= music_game.TAMPON_NOTES // music_game.TEMPS_PAR_MESURE + 3
+        # Une image par mesure, plus une par réponse au plus (changement de couleur)
+        mesures_vues = jeu._premiere_mesure + len(jeu.bande)
+        assert jeu.bande.creations <= mesures_vues + jeu.donnees['stats']['total_notes']
+    
+    def test_une_seule_cle(self):
+        """Vérifie que la lecture à vue refuse les modes à plusieurs clés"""
+        with pytest.raises(ValueError):
+            self.creer_jeu('mixte')
+
+
+class TestJeuAccords:
+    """Tests du mode accords (triades et intervalles)"""
+    
+    def creer_jeu(self, type_accord='triades', mode_cle='sol'):
+        return creer_jeu(mode_cle, type_accord, classe=music_game.JeuAccords, rng=random.Random(2),
+                         horloge=music_game.HorlogeSimulee())
+    
+    def test_noms_des_triades(self):
+        """Vérifie la qualité des triades sans altération"""
+        debut_sol = music_game.DEGRE_PREMIERE_NOTE['sol']  # Do4
+        noms = [music_game.triade(debut_sol + i)[0] for i in range(7)]
+        assert noms == ['Do majeur', 'Ré mineur', 'Mi mineur', 'Fa majeur',
+                        'Sol majeur', 'La mineur', 'Si diminué']
+    
+    def test_triade_nommee_par_sa_fondamentale(self):
+        """Vérifie qu'on répond avec la fondamentale, et que la statistique garde le nom complet"""
+        jeu = self.creer_jeu()
+        accord = jeu.note_actuelle
+        assert len(accord.notes) == 3 and accord.midis == tuple(sorted(accord.midis))
+        jeu.verifier_reponse(NOTES.index(accord.reponse))
+        assert jeu.score == 10
+        stats = jeu.donnees['stats']
+        assert stats['par_accord'][accord.nom] == {'tentatives': 1, 'reussites': 1}
+        assert stats['boites_accords'] == {f"sol:{accord.nom}": 2}
+        # Les accords ne comptent pas dans les statistiques des notes
+        assert accord.nom not in stats['par_note'] and stats['boites'] == {}
+        assert stats['total_notes'] == 0 and stats['temps_reponse'] == {}
+        mauvaise = (NOTES.index(jeu.note_actuelle.reponse) + 1) % 7
+        nom = jeu.note_actuelle.nom
+        jeu.verifier_reponse(mauvaise)
+        assert jeu.message == f"Non! C'etait {nom}"
+    
+    def test_intervalles(self):
+        """Vérifie les boutons et l'écart entre les deux notes de chaque intervalle"""
+        jeu = self.creer_jeu('intervalles', 'fa')
+        assert [b.texte for b in jeu.boutons] == list(music_game.ABREVIATIONS_INTERVALLES)
+        for _ in range(30):
+            accord = jeu.note_actuelle
+            rang = music_game.INTERVALLES.index(accord.nom)
+            assert accord.degres[1] - accord.degres[0] == rang + 1
+            assert accord.reponse == music_game.ABREVIATIONS_INTERVALLES[rang]
+            jeu.verifier_reponse(rang)
+        assert sum(c['reussites'] for c in jeu.donnees['stats']['par_accord'].values()) == 30
+        assert jeu.donnees['stats']['notes_correctes'] == 0
+        assert jeu.planificateur.boites == 'boites_accords'
+        assert music_game.Accord('Octave', '8ve', 'sol', (28, 35)).midis == (60, 72)
+    
+    def test_accord_bien_connu_revient_plus_tard(self):
+        """Vérifie que les boîtes des accords espacent leurs révisions"""
+        jeu = self.creer_jeu()
+        planificateur = jeu.planificateur
+        connu, nouveau = planificateur.elements[0], planificateur.elements[1]
+        jeu.donnees['stats']['boites_accords'][music_game.element_leitner(*connu)] = music_game.NB_BOITES
+        planificateur.noter(connu)
+        planificateur.noter(nouveau)
+        premieres = {}
+        for question in range(40):
+            element = planificateur.suivant()
+            premieres.setdefault(element, question)
+            if element not in (connu, nouveau):
+                planificateur.noter(element)
+        # Boîte 1: revu après ~2 questions; dernière boîte: après ~32
+        assert premieres[nouveau] < 10
+        assert premieres[connu] >= 20
+    
+    def test_tab_change_de_type(self):
+        """Vérifie que Tab passe aux intervalles en gardant les statistiques"""
+        jeu = self.creer_jeu()
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.reponse))
+        autre = jeu.variante_suivante()
+        assert autre.type_accord == 'intervalles' and autre.modele is jeu.modele
+        assert autre.variante_suivante().type_accord == 'triades'
+        assert creer_jeu('sol').variante_suivante() is None
+        with pytest.raises(ValueError):
+            self.creer_jeu('septiemes')
+    
+    def test_dessin(self):
+        """Vérifie que les têtes de l'accord sont dessinées sur leurs lignes ou interlignes"""
+        jeu = self.creer_jeu()
+        jeu.note_actuelle = jeu.creer_accord('sol', 'Do majeur')
+        surface = pygame.Surface((800, 600))
+        jeu.dessiner(surface)
+        for note in jeu.note_actuelle.notes:
+            assert surface.get_at((music_game.LARGEUR // 2, note.y))[:3] == (0, 0, 0)
@@ -0,0 +1,592 @@
+"""Tests pour l'initialisation paresseuse du runtime"""
+import pytest
+import sys
+import os
+import subprocess
+import time
+import json
+
+import pygame
+
+# Ajouter le répertoire parent au path
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RACINE)
+
+import music_game
+
+
+def executer(code):
+    """Exécute du code Python dans un processus neuf et retourne sa sortie"""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    resultat = subprocess.run([sys.executable, '-c', code], cwd=RACINE, env=env,
+                              capture_output=True, text=True, check=True)
+    return resultat.stdout.strip().splitlines()[-1]
+
+
+class TestImportSansEffet:
+    """Tests: importer music_game ne doit rien initialiser"""
+
+    def test_import_sans_fenetre_ni_mixer(self):
+        """Vérifie que l'import ne crée ni fenêtre ni mixer"""
+        sortie = executer(
+            "import music_game, pygame;"
+            "print(pygame.display.get_init(), pygame.mixer.get_init(), music_game._runtime)")
+        assert sortie == "False None None"
+
+    def test_import_generer_son_sans_fenetre(self):
+        """Vérifie qu'on peut importer Jeu, Note et generer_son sans affichage"""
+        sortie = executer(
+            "from music_game import Jeu, Note, generer_son; import pygame;"
+            "print(pygame.display.get_surface())")
+        assert sortie == "None"
+
+
+class TestRuntime:
+    """Tests de l'objet Runtime"""
+
+    def test_init_runtime_instance_unique(self):
+        """Vérifie que init_runtime() retourne toujours le même objet"""
+        assert music_game.init_runtime() is music_game.init_runtime()
+
+    def test_banque_sons_creee_sans_audio(self):
+        """Vérifie que créer le Runtime n'initialise pas l'audio"""
+        rt = music_game.Runtime()
+        assert rt.banque.statistiques()['en_memoire'] == 0
+        assert 'audio' not in rt.chronos
+
+    def test_attribut_inconnu(self):
+        """Vérifie qu'un attribut inconnu lève AttributeError"""
+        with pytest.raises(AttributeError):
+            music_game.Runtime().inexistant
+
+
+class TestCacheTextes:
+    """Tests du cache des surfaces de texte"""
+
+    @pytest.fixture
+    def police(self):
+        pygame.font.init()
+        return pygame.font.Font(None, 24)
+
+    def test_meme_texte_meme_surface(self, police):
+        """Vérifie qu'un texte déjà rendu est repris du cache"""
+        cache = music_game.CacheTextes()
+        surface = cache.rendre(police, "ESC pour quitter", (0, 0, 0))
+        assert cache.rendre(police, "ESC pour quitter", (0, 0, 0)) is surface
+        assert cache.echecs == 1
+        assert cache.succes == 1
+        assert cache.taux_succes() == 0.5
+
+    def test_couleur_fait_partie_de_la_cle(self, police):
+        """Vérifie qu'un même texte dans une autre couleur est rendu à part"""
+        cache = music_game.CacheTextes()
+        noir = cache.rendre(police, "Do", (0, 0, 0))
+        blanc = cache.rendre(police, "Do", (255, 255, 255))
+        assert noir is not blanc
+        assert cache.echecs == 2
+
+    def test_capacite_lru(self, police):
+        """Vérifie que le cache oublie les textes les moins récemment utilisés"""
+        cache = music_game.CacheTextes(capacite=2)
+        cache.rendre(police, "a", (0, 0, 0))
+        cache.rendre(police, "b", (0, 0, 0))
+        cache.rendre(police, "a", (0, 0, 0))
+        cache.rendre(police, "c", (0, 0, 0))  # Évince "b"
+        assert cache.evictions == 1
+        cache.rendre(police, "a", (0, 0, 0))
+        assert cache.succes == 2
+
+    def test_image_stable_sans_rasterisation(self):
+        """Vérifie qu'une image de jeu identique ne rend plus aucun texte"""
+        pygame.init()
+        jeu = music_game.Jeu('sol', audio=music_game.AudioMuet(), modele=music_game.ModeleStats(),
+                             puits=lambda e: None)
+        jeu.son_active = False
+        surface = pygame.Surface((800, 600))
+        jeu.dessiner(surface)
+        textes = music_game.init_runtime().textes
+        echecs_avant = textes.echecs
+        jeu.dessiner(surface)
+        assert textes.echecs == echecs_avant
+
+
+class TestCadenceur:
+    """Tests de l'attente des événements sur les écrans statiques"""
+
+    @pytest.fixture
+    def cadenceur(self):
+        pygame.display.init()
+        pygame.event.clear()
+        return music_game.Cadenceur(pygame.time.Clock(), delai_max_ms=50)
+
+    def test_attente_sans_evenement(self, cadenceur):
+        """Vérifie qu'un écran statique dort jusqu'au délai maximal"""
+        assert cadenceur.attendre() == []
+        assert cadenceur.attendre() == []
+        stats = cadenceur.statistiques()
+        assert stats['reveils'] == 2
+        assert stats['statique_reel_s'] >= 0.04
+        # Pendant l'attente, le processeur travaille très peu
+        assert stats['statique_cpu_s'] < stats['statique_reel_s']
+
+    def test_evenement_reveille_immediatement(self, cadenceur):
+        """Vérifie qu'un événement en attente est retourné tout de suite"""
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+        evenements = cadenceur.attendre()
+        assert [e.type for e in evenements] == [pygame.KEYDOWN]
+
+    def test_sans_blocage(self, cadenceur):
+        """Vérifie que bloquer=False retourne sans attendre"""
+        assert cadenceur.attendre(bloquer=False) == []
+        assert cadenceur.reveils == 0
+
+    def test_evenement_date_a_son_arrivee(self, cadenceur):
+        """Vérifie qu'un événement arrivé pendant l'attente d'une image est daté à son arrivée"""
+        cadenceur.fps = 10  # Images de 100 ms
+        cadenceur.attendre(anime=True)
+        debut = time.perf_counter()
+        pygame.time.set_timer(pygame.USEREVENT, 20, loops=1)
+        evenements = cadenceur.attendre(anime=True)
+        fin = time.perf_counter()
+        assert [e.type for e in evenements] == [pygame.USEREVENT]
+        assert fin - debut >= 0.08  # L'image a bien duré sa période
+        # Daté vers 20 ms, pas à la fin de l'image
+        assert cadenceur.arrivees[0] - debut < 0.06
+
+    def test_mode_anime(self, cadenceur):
+        """Vérifie que le temps passé en mode animé est compté à part"""
+        cadenceur.attendre(anime=True)
+        cadenceur.attendre(anime=True)
+        cadenceur.attendre()
+        stats = cadenceur.statistiques()
+        assert stats['anime_reel_s'] >= 0
+        assert cadenceur.reveils == 1
+
+
+class TestEchelle:
+    """Tests de la fenêtre de taille libre (échelle, polices, souris)"""
+
+    @pytest.fixture
+    def rt(self):
+        rt = music_game.init_runtime()
+        ancienne = rt.echelle
+        yield rt
+        rt.echelle = ancienne
+
+    def test_facteur_et_centrage(self):
+        """Vérifie que le jeu tient dans la fenêtre, centré, avec un facteur par huitièmes"""
+        echelle = music_game.Echelle.pour_fenetre((800, 600))
+        assert (echelle.facteur, echelle.x0, echelle.y0) == (1, 0, 0)
+        # 4K: 3840 / 800 = 4.8, 2160 / 600 = 3.6 -> 3.5, bandes sur les côtés
+        echelle = music_game.Echelle.pour_fenetre((3840, 2160))
+        assert (echelle.facteur, echelle.x0, echelle.y0) == (3.5, 520, 30)
+        assert music_game.Echelle.pour_fenetre((100, 100)).facteur == music_game.ECHELLE_MIN
+
+    def test_zones_jointives_et_souris(self):
+        """Vérifie que deux zones voisines restent jointives et que la souris revient en unités du jeu"""
+        echelle = music_game.Echelle(1.375, 7, 3)
+        gauche, droite = echelle.rect((10, 20, 33, 17)), echelle.rect((43, 20, 50, 17))
+        assert gauche.right == droite.left and gauche.height == droite.height
+        for point in ((0, 0), (399, 301), (799, 599)):
+            assert echelle.logique(echelle.point(point)) == point
+        # Une couche affichée à son point retombe sur les mêmes pixels
+        couche = echelle.couche(265, 201)
+        assert echelle.x(265) + couche.x(333) == echelle.x(333)
+
+    def test_polices_une_fois_par_facteur(self, rt):
+        """Vérifie que les polices sont chargées à la taille de l'échelle, une seule fois"""
+        petite = rt.police_petite
+        rt.echelle = music_game.Echelle(2)
+        grande = rt.police_petite
+        assert grande is not petite and grande is rt.police_petite
+        assert abs(grande.get_height() - 2 * petite.get_height()) <= 2
+        rt.echelle = music_game.Echelle()
+        assert rt.police_petite is petite
+
+    def test_jeu_dessine_a_l_echelle(self, rt):
+        """Vérifie que le jeu est dessiné aux positions doublées, sans agrandir d'image à chaque fois"""
+        pygame.init()
+        jeu = music_game.Jeu('sol', audio=music_game.AudioMuet(), modele=music_game.ModeleStats(),
+                             puits=lambda e: None)
+        jeu.son_active = False
+        jeu.note_actuelle = music_game.Note('Do', 'sol')  # Sur une ligne additionnelle
+        rt.echelle = music_game.Echelle(2)
+        surface = pygame.Surface((1600, 1200))
+        jeu.dessiner(surface)
+        y = music_game.Y_LIGNE_HAUT
+        for i in range(5):
+            assert surface.get_at((1000, 2 * (y + i * music_game.INTERLIGNE)))[:3] == (0, 0, 0)
+        # Ligne additionnelle du Do: 2 x 17 unités de chaque côté de la note
+        assert surface.get_at((800 + 30, 2 * jeu.note_actuelle.y))[:3] == (0, 0, 0)
+        # Image suivante: aucun texte n'est rendu de nouveau
+        echecs = rt.textes.echecs
+        jeu.dessiner(surface)
+        assert rt.textes.echecs == echecs
+        # Rendu partiel: les zones envoyées sont en pixels de la fenêtre
+        jeu.dessiner_partiel(surface)
+        jeu.boutons[2].survole = True
+        rects = jeu.dessiner_partiel(surface, afficher_compteur=False)
+        assert rt.echelle.rect(jeu.boutons[2].rect.inflate(4, 4)) in rects
+
+    def test_cadenceur_suit_la_fenetre(self):
+        """Vérifie que la souris arrive en unités du jeu et que la taille de la fenêtre est suivie"""
+        class Ecran:
+            echelle = music_game.Echelle(2, 100, 0)
+            adaptations = bascules = 0
+            def adapter_fenetre(self):
+                self.adaptations += 1
+            def basculer_plein_ecran(self):
+                self.bascules += 1
+        ecran = Ecran()
+        pygame.display.init()
+        pygame.event.clear()
+        cadenceur = music_game.Cadenceur(pygame.time.Clock(), delai_max_ms=50, ecran=ecran)
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(900, 401), button=1))
+        pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, size=(1600, 1200), w=1600, h=1200))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F11))
+        clic, redimension, _ = cadenceur.attendre()
+        assert clic.pos == (400, 200) and clic.button == 1
+        assert redimension.type in music_game.EVENEMENTS_REDESSIN
+        assert (ecran.adaptations, ecran.bascules) == (1, 1)
+
+    def test_plein_ecran(self, rt):
+        """Vérifie que F11 passe en plein écran à la résolution de l'écran, puis revient"""
+        rt.init_affichage()
+        rt.basculer_plein_ecran()
+        try:
+            assert rt.plein_ecran
+            largeur, hauteur = rt.fenetre.get_size()
+            assert rt.echelle.facteur == music_game.Echelle.pour_fenetre((largeur, hauteur)).facteur
+            assert pygame.VIDEOEXPOSE in [e.type for e in pygame.event.get()]
+        finally:
+            rt.basculer_plein_ecran()
+            pygame.event.clear()
+        assert not rt.plein_ecran and rt.fenetre.get_size() == (800, 600)
+        assert rt.echelle.facteur == 1
+
+def fichier_midi(chemin, pistes, division=480):
+    """
+    Écrit un petit fichier MIDI standard (format 1).
+
+    Paramètres:
+        pistes: Listes de (delta en ticks, octets du message) par piste
+    """
+    def vlq(valeur):
+        octets = [valeur & 0x7F]
+        while valeur > 0x7F:
+            valeur >>= 7
+            octets.insert(0, 0x80 | (valeur & 0x7F))
+        return bytes(octets)
+    donnees = b'MThd' + (6).to_bytes(4, 'big') + (1).to_bytes(2, 'big') \
+        + len(pistes).to_bytes(2, 'big') + division.to_bytes(2, 'big')
+    for piste in pistes:
+        contenu = b''.join(vlq(delta) + bytes(message) for delta, message in piste) + b'\x00\xff\x2f\x00'
+        donnees += b'MTrk' + len(contenu).to_bytes(4, 'big') + contenu
+    with open(chemin, 'wb') as f:
+        f.write(donnees)
+
+
+class TestEntrees:
+    """Tests de la file des entrées (clavier, souris, MIDI)"""
+
+    @pytest.fixture
+    def cadenceur(self):
+        pygame.display.init()
+        pygame.event.clear()
+        return music_game.Cadenceur(pygame.time.Clock(), delai_max_ms=50)
+
+    def test_lecture_fichier_midi(self, tmp_path):
+        """Vérifie les temps en secondes, le tempo et le 'running status' d'un fichier .mid"""
+        chemin = str(tmp_path / 'gamme.mid')
+        tempo = [(0, [0xFF, 0x51, 0x03, 0x07, 0xA1, 0x20]),  # 500 000 µs par noire
+                 (960, [0xFF, 0x51, 0x03, 0x03, 0xD0, 0x90])]  # puis 250 000 µs
+        notes = [(0, [0x90, 60, 100]), (480, [62, 90]),  # Même statut: "running status"
+                 (0, [0x80, 60, 0]), (480, [0xC0, 5]), (480, [0x91, 64, 0])]
+        fichier_midi(chemin, [tempo, notes])
+        messages = music_game.lire_fichier_midi(chemin)
+        assert messages == [(0.0, 0x90, 60, 100), (0.5, 0x90, 62, 90), (0.5, 0x80, 60, 0),
+                            (1.0, 0xC0, 5, 0), (1.25, 0x91, 64, 0)]
+
+    def test_seules_les_notes_enfoncees(self):
+        """Vérifie qu'une note de vélocité 0 (relâchée) n'est pas une entrée"""
+        assert music_game.entree_midi(0x93, 60, 80, 12.5).note == 60
+        assert music_game.entree_midi(0x90, 60, 0, 0) is None
+        assert music_game.entree_midi(0x80, 60, 64, 0) is None
+
+    def test_fichier_rejoue_avec_ses_instants(self):
+        """Vérifie que les notes arrivent en temps réel mais gardent l'instant du fichier"""
+        horloge = music_game.HorlogeSimulee()
+        horloge.avancer(1000)
+        messages = [(0.0, 0x90, 60, 90), (0.0123, 0x90, 64, 90), (0.5, 0x90, 67, 90)]
+        source = music_game.SourceMidiFichier(messages)
+        assert [e.instant for e in source.entrees(horloge)] == [1000]
+        horloge.avancer(100)  # Une image très lente: la note de 1012.3 ms est lue à 1100 ms
+        assert [(e.note, e.instant) for e in source.entrees(horloge)] == [(64, pytest.approx(1012.3))]
+        horloge.avancer(1000)
+        assert [e.note for e in source.entrees(horloge)] == [67]
+        assert source.entrees(horloge) == []
+
+    def test_rafale_sans_perte(self, cadenceur):
+        """Vérifie qu'une rafale de notes et de touches arrive en entier et dans l'ordre"""
+        horloge = music_game.HorlogeSimulee()
+        rafale = [(i / 10000, 0x90, 21 + i % 88, 100) for i in range(5000)]
+        entrees = music_game.FileEntrees(cadenceur, horloge,
+                                         [music_game.SourceMidiFichier(rafale, temps_reel=False)])
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+        horloge.avancer(600)
+        recues = entrees.attendre()
+        notes = [e.note for e in recues if e.note is not None]
+        assert notes == [21 + i % 88 for i in range(5000)]
+        # Le fichier démarre à la première lecture (600 ms), comme la touche:
+        # à instant égal, l'événement pygame reste en premier
+        assert recues[0].evenement.key == pygame.K_1
+        assert recues[-1].instant == pytest.approx(600 + 499.9)
+        assert [e.instant for e in recues] == sorted(e.instant for e in recues)
+        assert entrees.recues == 5001
+
+    def test_reponse_datee_par_l_appareil(self):
+        """Vérifie que le temps de réponse vient de l'instant de la note, pas de sa lecture"""
+        horloge = music_game.HorlogeSimulee()
+        jeu = music_game.Jeu('sol', horloge=horloge, audio=music_game.AudioMuet(),
+                             modele=music_game.ModeleStats(), puits=lambda e: None)
+        debut = jeu.temps_reponse
+        horloge.avancer(500)
+        jeu.verifier_reponse(0, instant=debut + 432.6)
+        assert jeu.modele.temps.total == 1
+        evenements = []
+        jeu.puits = evenements.append
+        horloge.avancer(500)
+        jeu.verifier_reponse(0, instant=jeu.temps_reponse - 3)  # Lue dans la même image
+        assert evenements[0]['temps_ms'] == 0
+
+
+class FileScriptee:
+    """File des entrées jouée d'avance: une liste d'entrées par image, une heure par lecture"""
+
+    def __init__(self, images, heures):
+        self.images = list(images)
+        self.heures = list(heures)
+
+    def attendre(self, anime=False, bloquer=True):
+        return self.images.pop(0)
+
+    def maintenant(self):
+        return self.heures.pop(0)
+
+    def fermer(self):
+        pass
+
+
+class TestEnregistrementSessions:
+    """Tests de l'enregistrement et du rejeu des parties"""
+
+    PARAMETRES = {'mode_cle': 'sol', 'mode_jeu': 'notes', 'tempo': 60,
+                  'donnees': music_game.donnees_par_defaut()}
+
+    def test_partie_rejouee_a_l_identique(self, tmp_path, monkeypatch):
+        """Vérifie qu'une partie jouée dans boucle_jeu se rejoue avec les mêmes réponses"""
+        import threading
+        rt = music_game.init_runtime()
+        monkeypatch.setattr(music_game, 'FICHIER_DONNEES', str(tmp_path / 'donnees.json'))
+        monkeypatch.setattr(rt, '_stockage', None)
+        monkeypatch.setattr(rt, '_modele', None)
+        monkeypatch.setattr(rt.banque, 'cache', music_game.CacheSons(str(tmp_path / 'cache')))
+        joues = []
+        monkeypatch.setattr(rt.ecrivain, 'enregistrer', lambda e, stockage=None: joues.append(e))
+        chemin_midi = str(tmp_path / 'notes.mid')
+        fichier_midi(chemin_midi, [[(0, [0x90, 60, 90]), (240, [0x90, 64, 90]), (240, [0x90, 67, 90])]])
+        chemin = str(tmp_path / 'partie.mgs')
+        monkeypatch.setitem(rt.options, 'enregistrer', chemin)
+        monkeypatch.setitem(rt.options, 'entree_midi', chemin_midi)
+        pygame.display.init()
+        pygame.event.clear()
+
+        def joueur():
+            time.sleep(0.3)
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_2))
+            time.sleep(0.3)
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+        threading.Thread(target=joueur, daemon=True).start()
+        assert music_game.boucle_jeu('sol') is True
+        monkeypatch.delitem(rt.options, 'enregistrer')
+        monkeypatch.delitem(rt.options, 'entree_midi')
+        assert len([e for e in joues if e['type'] == 'reponse']) == 4
+
+        rapide = music_game.rejouer_session(chemin)
+        assert rapide['evenements'] == joues
+        assert rapide['duree_rejeu_s'] < rapide['duree_partie_s'] / 10
+        assert "Image (ms): p50" in music_game.rapport_rejeu(rapide)
+        # Avec la fenêtre: même partie, au rythme où elle a été jouée
+        affichee = music_game.rejouer_session(chemin, affichage=True)
+        assert affichee['evenements'] == joues
+        assert affichee['images'] == rapide['images']
+        assert affichee['duree_rejeu_s'] >= affichee['duree_partie_s'] * 0.95
+
+    def test_instants_relus_a_l_identique(self, tmp_path):
+        """Vérifie que le jeu reçoit pendant la partie les instants exacts du rejeu"""
+        chemin = str(tmp_path / 'partie.mgs')
+        cle = music_game.Entree(1016.123456789, pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F3))
+        clic = music_game.Entree(1020.5, pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(-3, 590)))
+        fenetre = music_game.Entree(1021.0, pygame.event.Event(pygame.WINDOWEXPOSED))
+        note = music_game.Entree(1030.987654321, note=61)
+        file = FileScriptee([[], [cle, clic, fenetre, note]],
+                            [1000.333333333, 1016.7, 1033.9, 1050.1, 1050.2])
+        enregistreur = music_game.EnregistreurSession(chemin, file, 2 ** 62 + 1, 1.7e9, self.PARAMETRES)
+        heures = [enregistreur.maintenant()]
+        images = []
+        tailles = [enregistreur.octets]
+        for _ in range(2):
+            images.append(enregistreur.attendre(anime=True))
+            heures += [enregistreur.maintenant(), enregistreur.maintenant()]
+            tailles.append(enregistreur.octets)
+        enregistreur.fermer()
+        assert heures == pytest.approx([1000.333333333, 1016.7, 1033.9, 1050.1, 1050.2], abs=1e-3)
+        # L'événement de fenêtre, sans effet sur le jeu, n'est pas enregistré
+        assert images[1] == [cle, clic, note]
+
+        rejeu = music_game.SessionRejouee(chemin)
+        assert (rejeu.graine, rejeu.debut, rejeu.parametres) == (2 ** 62 + 1, 1.7e9, self.PARAMETRES)
+        assert rejeu.maintenant() == heures[0]
+        relues = []
+        for _ in range(2):
+            relues.append(rejeu.attendre())
+            assert [rejeu.maintenant(), rejeu.maintenant()] == heures[len(relues) * 2 - 1:][:2]
+        assert [e.instant for e in relues[1]] == [e.instant for e in images[1]]
+        assert [relues[1][0].evenement.key, relues[1][1].evenement.pos, relues[1][2].note] \
+            == [pygame.K_F3, (-3, 590), 61]
+        # Fin de l'enregistrement: le rejeu ferme la fenêtre
+        assert [e.evenement.type for e in rejeu.attendre()] == [pygame.QUIT]
+        # Une image sans entrée coûte 15 octets: 5 pour l'image, 5 par lecture de l'horloge
+        assert tailles[1] - tailles[0] == 15
+        assert enregistreur.octets == os.path.getsize(chemin)
+
+    def test_fichier_coupe_ou_invalide(self, tmp_path):
+        """Vérifie qu'un enregistrement coupé se rejoue jusqu'à la coupure, et qu'un autre fichier est refusé"""
+        chemin = str(tmp_path / 'partie.mgs')
+        file = FileScriptee([[music_game.Entree(5.0, note=60)]], [0.0, 10.0])
+        enregistreur = music_game.EnregistreurSession(chemin, file, 1, 0.0, self.PARAMETRES)
+        enregistreur.maintenant()
+        enregistreur.attendre()
+        enregistreur.maintenant()
+        enregistreur.fermer()
+        with open(chemin, 'r+b') as f:
+            f.truncate(os.path.getsize(chemin) - 2)  # Plantage pendant l'écriture
+        rejeu = music_game.SessionRejouee(chemin)
+        assert rejeu.maintenant() == 0.0
+        assert [e.note for e in rejeu.attendre()] == [60]
+        assert rejeu.maintenant() == 5.0  # Heure coupée: on reste au dernier instant lu
+        assert [e.evenement.type for e in rejeu.attendre()] == [pygame.QUIT]
+        (tmp_path / 'autre.json').write_text('{"high_score": 0}')
+        with pytest.raises(ValueError):
+            music_game.SessionRejouee(str(tmp_path / 'autre.json'))
+
+
+class TestSurvol:
+    """Tests de la mise à jour du survol des boutons"""
+
+    def test_changement_detecte(self):
+        """Vérifie que seul un changement d'état demande de redessiner"""
+        boutons = [music_game.Bouton(0, 0, 50, 50, "Do", 0), music_game.Bouton(60, 0, 50, 50, "Ré", 1)]
+        assert music_game.mettre_a_jour_survol(boutons, (10, 10)) is True
+        assert music_game.mettre_a_jour_survol(boutons, (20, 20)) is False
+        assert music_game.mettre_a_jour_survol(boutons, (70, 10)) is True
+        assert [b.survole for b in boutons] == [False, True]
+
+
+class TestProfileur:
+    """Tests du profileur d'images"""
+
+    def test_inactif_ne_mesure_rien(self):
+        """Vérifie que le profileur désactivé n'enregistre aucune image"""
+        profileur = music_game.Profileur()
+        profileur.debut_image()
+        with profileur.phase('dessin'):
+            pass
+        profileur.fin_image()
+        assert profileur.images == 0
+        assert profileur.percentiles() == {}
+        assert profileur.phase('dessin') is profileur.phase('logique')  # Objet partagé
+
+    def test_phases_imbriquees_sans_double_comptage(self):
+        """Vérifie que le temps d'une phase imbriquée n'est pas compté deux fois"""
+        profileur = music_game.Profileur()
+        profileur.activer()
+        profileur.debut_image()
+        with profileur.phase('logique'):
+            with profileur.phase('survol'):
+                time.sleep(0.02)
+        profileur.fin_image()
+        profileur.activer(False)
+        phases, _ = profileur.moyennes()
+        assert phases['survol'] >= 20
+        assert phases['logique'] < 5
+        assert profileur.percentiles()[50] >= 20
+
+    def test_compteurs_par_image(self):
+        """Vérifie le comptage des appels de dessin et des compteurs ajoutés"""
+        total = [0]
+        profileur = music_game.Profileur()
+        profileur.ajouter_compteur('textes', lambda: total[0])
+        originale = pygame.draw.line
+        profileur.activer()
+        surface = pygame.Surface((10, 10))
+        with profileur:
+            for _ in range(2):
+                profileur.debut_image()
+                pygame.draw.line(surface, (0, 0, 0), (0, 0), (9, 9))
+                pygame.draw.rect(surface, (0, 0, 0), (0, 0, 5, 5))
+                total[0] += 3
+                profileur.fin_image()
+        _, compteurs = profileur.moyennes()
+        assert compteurs == {'textes': 3, 'dessins': 2}
+        assert pygame.draw.line is originale  # Fonctions d'origine remises en place
+        assert profileur.actif  # Les mesures restent actives pour la boucle suivante
+    
+    def test_dessin_restaure_apres_la_boucle(self):
+        """Vérifie que pygame.draw n'est modifié que dans la boucle, même si elle échoue"""
+        originale = pygame.draw.rect
+        profileur = music_game.Profileur()
+        profileur.activer()
+        assert pygame.draw.rect is originale  # Hors d'une boucle: rien n'est remplacé
+        with pytest.raises(RuntimeError):
+            with profileur:
+                assert pygame.draw.rect is not originale
+                raise RuntimeError("image ratée")
+        assert pygame.draw.rect is originale
+        with profileur:
+            profileur.activer(False)  # F3 pendant la boucle
+            assert pygame.draw.rect is originale
+            profileur.activer()
+            assert pygame.draw.rect is not originale
+        assert pygame.draw.rect is originale
+
+    def test_trace_chrome(self, tmp_path):
+        """Vérifie que la trace est un JSON « Chrome trace event » valide"""
+        profileur = music_game.Profileur()
+        profileur.demarrer_trace()
+        profileur.debut_image()
+        with profileur.phase('dessin'):
+            pass
+        profileur.fin_image()
+        chemin = tmp_path / 'trace.json'
+        profileur.ecrire_trace(chemin)
+        with open(chemin, encoding='utf-8') as f:
+            evenements = json.load(f)['traceEvents']
+        assert [e['name'] for e in evenements] == ['dessin', 'image', 'compteurs']
+        assert evenements[0]['ph'] == 'X' and evenements[0]['dur'] >= 0
+        assert evenements[2]['ph'] == 'C'
+
+    def test_overlay(self):
+        """Vérifie que F3 active les mesures et que l'overlay se dessine"""
+        pygame.font.init()
+        profileur = music_game.Profileur()
+        profileur.basculer_overlay()
+        assert profileur.actif
+        profileur.debut_image()
+        profileur.fin_image()
+        surface = pygame.Surface((800, 600))
+        zone = profileur.dessiner_overlay(surface, pygame.font.Font(None, 20))
+        assert zone.topleft == (5, 5) and zone.width > 0
+        assert profileur.lignes()[0].startswith("Image (ms): p50")
+        profileur.basculer_overlay()
+        assert not profileur.actif
@@ -0,0 +1,152 @@
+"""Tests pour la simulation sans affichage de la logique du jeu"""
+import pytest
+import sys
+import os
+import random
+import subprocess
+
+# Ajouter le répertoire parent au path
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RACINE)
+
+import music_game
+from music_game import (Jeu, NOTES, HorlogeSimulee, AudioMuet, ModeleStats, MoteurSimulation,
+                        PlanificateurLeitner)
+
+
+class TestJeuSansPygame:
+    """Tests du jeu piloté par une horloge simulée, sans son ni disque"""
+
+    @pytest.fixture
+    def jeu(self):
+        self.evenements = []
+        return Jeu('sol', horloge=HorlogeSimulee(), audio=AudioMuet(), rng=random.Random(3),
+                   modele=ModeleStats(), puits=self.evenements.append)
+
+    def test_temps_ecoule_avec_horloge_simulee(self, jeu):
+        """Vérifie que le délai de réponse suit l'horloge injectée"""
+        jeu.horloge.avancer(jeu.max_temps)
+        assert not jeu.temps_ecoule()
+        jeu.horloge.avancer(1)
+        assert jeu.temps_ecoule()
+
+    def test_evenements_vers_le_puits(self, jeu):
+        """Vérifie que les réponses partent vers le puits, avec le temps simulé"""
+        jeu.horloge.avancer(1234)
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom))
+        reponse, record = self.evenements
+        assert reponse['temps_ms'] == 1234
+        assert reponse['ts'] == pytest.approx(jeu.horloge.debut + 1.234)
+        assert record == {'type': 'record', 'score': 10, 'ts': reponse['ts']}
+        assert jeu.donnees['stats']['total_notes'] == 1
+
+    def test_temps_depuis_l_affichage(self, jeu):
+        """Vérifie que le temps de réponse part de l'image où la note apparaît"""
+        jeu.horloge.avancer(40)  # Dessin et envoi de l'image
+        jeu.presentee(jeu.horloge.ticks())
+        jeu.horloge.avancer(16)
+        jeu.presentee(jeu.horloge.ticks())  # Images suivantes: rien ne change
+        jeu.horloge.avancer(984)
+        jeu.verifier_reponse(NOTES.index(jeu.note_actuelle.nom), instant=jeu.horloge.ticks() - 0.4)
+        assert self.evenements[0]['temps_ms'] == 1000
+
+    def test_import_et_simulation_sans_pygame_init(self):
+        """Vérifie qu'une simulation n'initialise ni l'affichage ni le son"""
+        env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+        sortie = subprocess.run(
+            [sys.executable, '-c',
+             "import music_game, pygame;"
+             "music_game.MoteurSimulation(graine=1).executer(500);"
+             "print(pygame.display.get_init(), pygame.mixer.get_init())"],
+            cwd=RACINE, env=env, capture_output=True, text=True, check=True)
+        assert sortie.stdout.strip().splitlines()[-1] == "False None"
+
+
+class TestMoteurSimulation:
+    """Tests du moteur de simulation et des joueurs virtuels"""
+
+    def test_reproductible(self):
+        """Vérifie que la même graine donne exactement la même partie"""
+        premier = MoteurSimulation('moyen', graine=7, garder_evenements=True)
+        second = MoteurSimulation('moyen', graine=7, garder_evenements=True)
+        assert premier.executer(2000) == second.executer(2000)
+        assert premier.journal == second.journal
+
+    def test_graines_differentes(self):
+        """Vérifie que deux graines différentes donnent deux parties différentes"""
+        assert (MoteurSimulation(graine=1).executer(500)
+                != MoteurSimulation(graine=2).executer(500))
+
+    def test_precision_des_joueurs(self):
+        """Vérifie que l'expert réussit bien mieux qu'un joueur au hasard"""
+        expert = MoteurSimulation('expert', mode_cle='sol', graine=1).executer(3000)
+        hasard = MoteurSimulation('hasard', mode_cle='sol', graine=1).executer(3000)
+        assert expert['taux_reussite'] > 0.9
+        assert hasard['taux_reussite'] < 0.25
+        assert expert['score'] > hasard['score']
+
+    def test_temps_ecoules_comptes(self):
+        """Vérifie qu'un joueur trop lent perd des notes par dépassement du temps"""
+        lent = music_game.JoueurVirtuel(precision=1.0, temps_moyen_ms=20000, ecart_ms=10,
+                                        rng=random.Random(0))
+        moteur = MoteurSimulation(lent, graine=0, garder_evenements=True)
+        resultats = moteur.executer(10)
+        assert resultats['taux_reussite'] == 0
+        assert resultats['notes'] == 10
+        assert resultats['duree_simulee_s'] == pytest.approx(10 * 10.001)
+        assert {e['resultat'] for e in moteur.journal if e['type'] == 'reponse'} == {'temps'}
+
+    def test_session_comptee(self):
+        """Vérifie que la simulation compte une session"""
+        moteur = MoteurSimulation(graine=0)
+        assert moteur.jeu.donnees['stats']['sessions'] == 1
+        assert moteur.evenements == 1
+
+
+class TestPlanificateurLeitner:
+    """Tests du choix des notes par répétition espacée"""
+
+    def elements(self):
+        return [('sol', note) for note in NOTES]
+
+    def test_notes_faibles_plus_frequentes(self):
+        """Vérifie qu'une note toujours ratée revient bien plus souvent que les autres"""
+        class JoueurSansFa:
+            def repondre(self, nom_note):
+                return 800, NOTES.index('Si' if nom_note == 'Fa' else nom_note)
+        moteur = MoteurSimulation(JoueurSansFa(), mode_cle='sol', graine=4, garder_evenements=True)
+        moteur.executer(700)
+        notes = [e['note'] for e in moteur.journal if e['type'] == 'reponse']
+        # Tirage uniforme: 1 note sur 7; ici la note ratée revient une fois sur deux environ
+        assert notes.count('Fa') > 0.4 * len(notes)
+        assert set(notes) == set(NOTES)
+
+    def test_pas_deux_fois_la_meme_note(self):
+        """Vérifie qu'une note n'est jamais posée deux fois d'affilée"""
+        moteur = MoteurSimulation('debutant', mode_cle='sol', graine=2, garder_evenements=True)
+        moteur.executer(500)
+        notes = [e['note'] for e in moteur.journal if e['type'] == 'reponse']
+        assert all(a != b for a, b in zip(notes, notes[1:]))
+
+    def test_depart_selon_par_note(self):
+        """Vérifie qu'au départ, sans boîtes, les notes les moins réussies passent en premier"""
+        stats = music_game.donnees_par_defaut()['stats']
+        for note in NOTES:
+            stats['par_note'][note] = {'tentatives': 20, 'reussites': 20}
+        stats['par_note']['Sol'] = {'tentatives': 20, 'reussites': 2}
+        planificateur = PlanificateurLeitner(self.elements(), stats, random.Random(0))
+        assert planificateur.boite_initiale(('sol', 'Sol')) == 1
+        assert planificateur.boite_initiale(('sol', 'Do')) == music_game.NB_BOITES
+        assert planificateur.suivant() == ('sol', 'Sol')
+
+    def test_tas_borne(self):
+        """Vérifie que le tas ne grossit pas, même si des notes restent sans réponse"""
+        stats = music_game.donnees_par_defaut()['stats']
+        planificateur = PlanificateurLeitner(self.elements(), stats, random.Random(0))
+        for i in range(1000):
+            element = planificateur.suivant()
+            if i % 3:
+                planificateur.noter(element)
+            if i % 5 == 0:
+                planificateur.noter(('sol', 'Do'))  # Note remplacée à la main (tests du jeu)
+        assert len(planificateur._tas) <= 2 * len(NOTES)